@@ -0,0 +1,153 @@
+"""
+论坛主持人发言后台生成
+监控线程只负责把凑满的 agent 发言批次放入有界队列，由单个后台线程依次调用主持人 LLM 并写入 forum.log，
+日志读取不再被 LLM 调用阻塞；单消费者保证主持人发言按提交顺序写入。
+"""
+
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from loguru import logger
+
+
+@dataclass
+class _SpeechBatch:
+    speeches: List[str]
+    generation: int
+    submitted_at: float = field(default_factory=time.monotonic)
+
+
+class HostSpeechWorker:
+    """主持人发言生成工作线程（有界队列 + 单消费者）"""
+
+    def __init__(
+        self,
+        generate: Callable[[List[str]], Optional[str]],
+        write: Callable[[str], None],
+        max_pending: int = 4,
+    ):
+        """
+        Args:
+            generate: 根据一批 agent 发言生成主持人发言，失败返回None
+            write: 写入主持人发言（通常为写 forum.log）
+            max_pending: 队列中最多等待的批次数，满时丢弃最早的批次
+        """
+        self._generate = generate
+        self._write = write
+        self._queue: "queue.Queue[Optional[_SpeechBatch]]" = queue.Queue(maxsize=max(1, max_pending))
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._generation = 0  # 会话代数，discard_pending 后旧批次的结果不再写入
+        self._in_flight = False
+
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._dropped = 0
+        self._discarded = 0
+        self._last_latency = 0.0
+        self._total_latency = 0.0
+        self._max_latency = 0.0
+
+    def _ensure_started(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="forum-host-speech", daemon=True)
+            self._thread.start()
+
+    def submit(self, speeches: List[str]) -> None:
+        """提交一批 agent 发言，不阻塞调用方"""
+        with self._lock:
+            self._ensure_started()
+            batch = _SpeechBatch(list(speeches), self._generation)
+            try:
+                self._queue.put_nowait(batch)
+            except queue.Full:
+                # 主持人跟不上时优先点评最新的发言
+                try:
+                    self._queue.get_nowait()
+                    self._dropped += 1
+                    logger.warning("ForumEngine: 主持人发言队列已满，丢弃最早的一批发言")
+                except queue.Empty:
+                    pass
+                self._queue.put_nowait(batch)
+            self._submitted += 1
+
+    def discard_pending(self) -> None:
+        """丢弃尚未写入的批次（会话结束或重新开始时调用），正在生成的结果也不会再写入"""
+        with self._lock:
+            self._generation += 1
+            while True:
+                try:
+                    if self._queue.get_nowait() is not None:
+                        self._discarded += 1
+                except queue.Empty:
+                    break
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """丢弃积压并停止工作线程"""
+        self.discard_pending()
+        thread = self._thread
+        if thread and thread.is_alive():
+            self._queue.put(None)
+            thread.join(timeout=timeout)
+        self._thread = None
+
+    def _run(self):
+        while True:
+            batch = self._queue.get()
+            if batch is None:
+                return
+            with self._lock:
+                if batch.generation != self._generation:
+                    continue
+                self._in_flight = True
+
+            logger.info("ForumEngine: 正在生成主持人发言...")
+            try:
+                speech = self._generate(batch.speeches)
+            except Exception as e:
+                logger.exception(f"ForumEngine: 生成主持人发言时出错: {e}")
+                speech = None
+
+            with self._lock:
+                self._in_flight = False
+                if batch.generation != self._generation:
+                    self._discarded += 1
+                    continue
+                if not speech:
+                    self._failed += 1
+                    logger.error("ForumEngine: 主持人发言生成失败")
+                    continue
+                # 在锁内写入，保证 discard_pending 之后不会再出现上一会话的主持人发言
+                self._write(speech)
+                latency = time.monotonic() - batch.submitted_at
+                self._completed += 1
+                self._last_latency = latency
+                self._total_latency += latency
+                self._max_latency = max(self._max_latency, latency)
+            logger.info(f"ForumEngine: 主持人发言已记录（耗时 {latency:.1f}s）")
+
+    def get_metrics(self) -> Dict[str, float]:
+        """
+        获取运行指标
+
+        Returns:
+            queue_depth（排队批次数）、in_flight、各类计数，以及从提交到写入的延迟（秒）
+        """
+        with self._lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "queue_capacity": self._queue.maxsize,
+                "in_flight": self._in_flight,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "failed": self._failed,
+                "dropped": self._dropped,
+                "discarded": self._discarded,
+                "last_latency": round(self._last_latency, 3),
+                "avg_latency": round(self._total_latency / self._completed, 3) if self._completed else 0.0,
+                "max_latency": round(self._max_latency, 3),
+            }
@@ -0,0 +1,227 @@
+"""
+日志增量读取与文件变化监听
+LogTailer 按字节偏移量追踪每个日志文件，只读取新追加的完整行，并通过 inode 识别日志轮转、
+通过文件变小或已读末尾内容变化识别清空；LogWatcher 在 Linux 上使用 inotify 等待文件变化，其他平台退化为定时轮询。
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from loguru import logger
+
+# inotify 事件掩码（见 <sys/inotify.h>）
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+# 记录已读内容末尾的字节数，用于识别「清空后又写到原长度以上」的情况
+FINGERPRINT_BYTES = 64
+
+
+@dataclass
+class TailResult:
+    """一次增量读取的结果"""
+    lines: List[str] = field(default_factory=list)
+    truncated: bool = False  # 文件被清空（或删除），调用方应重置该文件相关的解析状态
+
+
+@dataclass
+class _TailState:
+    inode: Optional[int] = None
+    offset: int = 0
+    fingerprint: bytes = b""  # offset 之前最后 FINGERPRINT_BYTES 个字节
+
+
+class LogTailer:
+    """按字节偏移增量读取日志文件（非线程安全，由监控线程独占使用）"""
+
+    def __init__(self):
+        self._states: Dict[str, _TailState] = {}
+
+    @staticmethod
+    def _stat(path: Path) -> Optional[os.stat_result]:
+        try:
+            return path.stat()
+        except OSError:
+            return None
+
+    @staticmethod
+    def _read_fingerprint(path: Path, offset: int) -> bytes:
+        try:
+            with open(path, "rb") as f:
+                f.seek(max(0, offset - FINGERPRINT_BYTES))
+                return f.read(min(offset, FINGERPRINT_BYTES))
+        except OSError:
+            return b""
+
+    def _baseline(self, name: str, path: Path, st: Optional[os.stat_result]) -> None:
+        if st is None:
+            self._states[name] = _TailState()
+            return
+        self._states[name] = _TailState(
+            inode=st.st_ino,
+            offset=st.st_size,
+            fingerprint=self._read_fingerprint(path, st.st_size),
+        )
+
+    def seek_to_end(self, name: str, path: Path) -> None:
+        """以文件当前末尾为基线，之后只读取新追加的内容"""
+        self._baseline(name, path, self._stat(path))
+
+    def offset(self, name: str) -> int:
+        """当前已消费的字节偏移"""
+        state = self._states.get(name)
+        return state.offset if state else 0
+
+    def read(self, name: str, path: Path) -> TailResult:
+        """
+        读取自上次以来新追加的完整行
+
+        - 文件被清空（变小，或已读部分的末尾内容变了）：以新的文件末尾为基线，truncated=True
+        - 文件被删除：偏移归零，truncated=True，重新出现后从头读取
+        - inode 变化（日志轮转）：从新文件开头读取
+        - 末尾不完整的行留到下次读取，避免半行和被截断的多字节字符
+
+        Args:
+            name: 文件标识（如 insight/media/query）
+            path: 文件路径
+
+        Returns:
+            TailResult
+        """
+        state = self._states.setdefault(name, _TailState())
+        st = self._stat(path)
+
+        if st is None:
+            truncated = state.inode is not None or state.offset > 0
+            self._states[name] = _TailState()
+            return TailResult(truncated=truncated)
+
+        if state.inode is not None and st.st_ino != state.inode:
+            state.offset, state.fingerprint = 0, b""
+        elif st.st_size < state.offset:
+            self._baseline(name, path, st)
+            return TailResult(truncated=True)
+        state.inode = st.st_ino
+
+        if st.st_size == state.offset:
+            return TailResult()
+
+        # 连同已读末尾一起读取，顺便校验文件没有被清空重写
+        start = state.offset - len(state.fingerprint)
+        try:
+            with open(path, "rb") as f:
+                f.seek(start)
+                data = f.read(st.st_size - start)
+        except OSError as e:
+            logger.warning(f"ForumEngine: 读取{name}日志失败: {e}")
+            return TailResult()
+
+        if not data.startswith(state.fingerprint):
+            self._baseline(name, path, st)
+            return TailResult(truncated=True)
+        data = data[len(state.fingerprint):]
+
+        end = data.rfind(b"\n")
+        if end < 0:
+            return TailResult()
+        consumed = data[: end + 1]
+        state.offset += len(consumed)
+        state.fingerprint = (state.fingerprint + consumed)[-FINGERPRINT_BYTES:]
+
+        text = consumed.decode("utf-8", errors="replace")
+        lines = [line.strip() for line in text.split("\n") if line.strip()]
+        return TailResult(lines=lines)
+
+
+class LogWatcher:
+    """等待指定目录中若干文件发生变化：Linux 使用 inotify，其余平台按固定间隔轮询"""
+
+    def __init__(self, directory: Path, filenames: Iterable[str]):
+        self.directory = Path(directory)
+        self.filenames: Set[str] = set(filenames)
+        self._fd: Optional[int] = None
+        if sys.platform.startswith("linux"):
+            self._fd = self._init_inotify()
+
+    @property
+    def uses_inotify(self) -> bool:
+        return self._fd is not None
+
+    def _init_inotify(self) -> Optional[int]:
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd < 0:
+                raise OSError(ctypes.get_errno(), "inotify_init1 失败")
+            # 监听目录而不是文件本身，这样日志被删除、重建或轮转后仍能收到事件
+            wd = libc.inotify_add_watch(fd, os.fsencode(str(self.directory)), WATCH_MASK)
+            if wd < 0:
+                os.close(fd)
+                raise OSError(ctypes.get_errno(), "inotify_add_watch 失败")
+            return fd
+        except (OSError, AttributeError) as e:
+            logger.warning(f"ForumEngine: inotify 不可用，改用定时轮询: {e}")
+            return None
+
+    def _drain(self) -> bool:
+        """读取所有待处理事件，返回其中是否包含被监听的文件"""
+        relevant = False
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return relevant
+            if not data:
+                return relevant
+            pos = 0
+            while pos + _EVENT_HEADER.size <= len(data):
+                _, mask, _, length = _EVENT_HEADER.unpack_from(data, pos)
+                pos += _EVENT_HEADER.size
+                name = data[pos : pos + length].split(b"\0", 1)[0].decode("utf-8", errors="replace")
+                pos += length
+                if mask & IN_Q_OVERFLOW or name in self.filenames:
+                    relevant = True
+
+    def wait(self, timeout: float) -> bool:
+        """
+        阻塞直到被监听的文件发生变化或超时
+
+        Args:
+            timeout: 最长等待秒数
+
+        Returns:
+            是否观察到变化（轮询模式下始终返回True，由调用方自行检查文件状态）
+        """
+        if self._fd is None:
+            time.sleep(timeout)
+            return True
+
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            ready, _, _ = select.select([self._fd], [], [], remaining)
+            if ready and self._drain():
+                return True
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
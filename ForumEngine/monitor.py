@@ -13,6 +13,9 @@ from typing import Dict, Optional, List
 from threading import Lock
 from loguru import logger
 
+from .host_worker import HostSpeechWorker
+from .log_tailer import LogTailer, LogWatcher
+
 # 导入论坛主持人模块
 try:
     from .llm_host import generate_host_speech
@@ -21,6 +24,12 @@ except ImportError:
     logger.exception("ForumEngine: 论坛主持人模块未找到，将以纯监控模式运行")
     HOST_AVAILABLE = False
 
+# 论坛会话在无任何日志增长时自动结束的秒数
+SEARCH_INACTIVE_TIMEOUT = 7200
+
+# 主持人发言队列中最多等待的批次数
+HOST_QUEUE_MAX_PENDING = 4
+
 class LogMonitor:
     """基于文件变化的智能日志监控器"""
    
@@ -39,16 +48,20 @@ class LogMonitor:
         # 监控状态
         self.is_monitoring = False
         self.monitor_thread = None
-        self.file_positions = {}  # 记录每个文件的读取位置
-        self.file_line_counts = {}  # 记录每个文件的行数
+        self.tailer = LogTailer()  # 按字节偏移增量读取各日志文件
         self.is_searching = False  # 是否正在搜索
-        self.search_inactive_count = 0  # 搜索非活跃计数器
+        self.last_activity_time = 0.0  # 搜索会话最近一次有日志增长的时间
         self.write_lock = Lock()  # 写入锁，防止并发写入冲突
         
         # 主持人相关状态
         self.agent_speeches_buffer = []  # agent发言缓冲区
         self.host_speech_threshold = 5  # 每5条agent发言触发一次主持人发言
-        self.is_host_generating = False  # 主持人是否正在生成发言
+        # 主持人发言在后台线程生成，不阻塞日志读取
+        self.host_worker = HostSpeechWorker(
+            generate_host_speech,
+            lambda speech: self.write_to_forum_log(speech, "HOST"),
+            max_pending=HOST_QUEUE_MAX_PENDING,
+        ) if HOST_AVAILABLE else None
        
         # 目标节点识别模式
         # 1. 类名（旧格式可能包含）
@@ -81,6 +94,17 @@ class LogMonitor:
     def clear_forum_log(self):
         """清空forum.log文件"""
         try:
+            # 先丢弃上一会话排队中的主持人发言并重置缓冲，再重建日志文件，
+            # 避免旧发言写进新会话的forum.log
+            self._discard_host_backlog()
+            self.agent_speeches_buffer = []
+
+            # 重置JSON捕获状态
+            self.capturing_json = {}
+            self.json_buffer = {}
+            self.json_start_line = {}
+            self.in_error_block = {}
+
             if self.forum_log_file.exists():
                 self.forum_log_file.unlink()
            
@@ -92,16 +116,6 @@ class LogMonitor:
             self.write_to_forum_log(f"=== ForumEngine 监控开始 - {start_time} ===", "SYSTEM")
                
             logger.info(f"ForumEngine: forum.log 已清空并初始化")
-            
-            # 重置JSON捕获状态
-            self.capturing_json = {}
-            self.json_buffer = {}
-            self.json_start_line = {}
-            self.in_error_block = {}
-            
-            # 重置主持人相关状态
-            self.agent_speeches_buffer = []
-            self.is_host_generating = False
            
         except Exception as e:
             logger.exception(f"ForumEngine: 清空forum.log失败: {e}")
@@ -209,6 +223,11 @@ class LogMonitor:
             
         return True
     
+    def get_paragraph_tag(self, line: str) -> Optional[str]:
+        """提取日志消息开头的段落编号（并行处理段落时各节点日志带有"[段落 N]"前缀），没有则返回None"""
+        match = re.search(r'\|\s*[A-Z]+\s*\|[^|]*?\s-\s*\[段落 (\d+)\]', line)
+        return match.group(1) if match else None
+
     def is_json_start_line(self, line: str) -> bool:
         """判断是否是JSON开始行"""
         return "清理后的输出: {" in line
@@ -378,51 +397,18 @@ class LogMonitor:
         except:
             return 0
    
-    def get_file_line_count(self, file_path: Path) -> int:
-        """获取文件行数"""
-        try:
-            if not file_path.exists():
-                return 0
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return sum(1 for _ in f)
-        except:
-            return 0
-   
     def read_new_lines(self, file_path: Path, app_name: str) -> List[str]:
-        """读取文件中的新行"""
-        new_lines = []
-       
-        try:
-            if not file_path.exists():
-                return new_lines
-           
-            current_size = self.get_file_size(file_path)
-            last_position = self.file_positions.get(app_name, 0)
-           
-            # 如果文件变小了，说明被清空了，重新从头开始
-            if current_size < last_position:
-                last_position = 0
-                # 重置JSON捕获状态
-                self.capturing_json[app_name] = False
-                self.json_buffer[app_name] = []
-                self.in_error_block[app_name] = False
-           
-            if current_size > last_position:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    f.seek(last_position)
-                    new_content = f.read()
-                    new_lines = new_content.split('\n')
-                   
-                    # 更新位置
-                    self.file_positions[app_name] = f.tell()
-                   
-                    # 过滤空行
-                    new_lines = [line.strip() for line in new_lines if line.strip()]
-                   
-        except Exception as e:
-            logger.exception(f"ForumEngine: 读取{app_name}日志失败: {e}")
-       
-        return new_lines
+        """读取文件中新追加的完整行（文件被清空时重置该app的JSON捕获状态）"""
+        result = self.tailer.read(app_name, file_path)
+        if result.truncated:
+            self._reset_capture_state(app_name)
+        return result.lines
+
+    def _reset_capture_state(self, app_name: str):
+        """重置某个app的多行JSON捕获状态"""
+        self.capturing_json[app_name] = False
+        self.json_buffer[app_name] = []
+        self.in_error_block[app_name] = False
    
     def process_lines_for_json(self, lines: List[str], app_name: str) -> List[str]:
         """处理行以捕获多行JSON内容
@@ -496,6 +482,11 @@ class LogMonitor:
                 captured_contents.append(f"{clean_content}")
                     
             elif self.capturing_json[app_name]:
+                # 并行段落的日志会交错：其他段落的新日志记录不属于正在捕获的JSON
+                paragraph = self.get_paragraph_tag(line)
+                if paragraph is not None and paragraph != self.get_paragraph_tag(self.json_start_line[app_name]):
+                    continue
+
                 # 正在捕获JSON的后续行
                 self.json_buffer[app_name].append(line)
                 
@@ -524,41 +515,30 @@ class LogMonitor:
         return captured_contents
     
     def _trigger_host_speech(self):
-        """触发主持人发言（同步执行）"""
-        if not HOST_AVAILABLE or self.is_host_generating:
+        """触发主持人发言：把缓冲区中凑满的发言批次交给后台线程，立即返回"""
+        if self.host_worker is None:
             return
         
         try:
-            # 设置生成标志
-            self.is_host_generating = True
-            
-            # 获取缓冲区的5条发言
-            recent_speeches = self.agent_speeches_buffer[:5]
-            if len(recent_speeches) < 5:
-                self.is_host_generating = False
-                return
-            
-            logger.info("ForumEngine: 正在生成主持人发言...")
-            
-            # 调用主持人生成发言（传入最近5条）
-            host_speech = generate_host_speech(recent_speeches)
-            
-            if host_speech:
-                # 写入主持人发言到forum.log
-                self.write_to_forum_log(host_speech, "HOST")
-                logger.info(f"ForumEngine: 主持人发言已记录")
-                
-                # 清空已处理的5条发言
-                self.agent_speeches_buffer = self.agent_speeches_buffer[5:]
-            else:
-                logger.error("ForumEngine: 主持人发言生成失败")
-            
-            # 重置生成标志
-            self.is_host_generating = False
+            threshold = self.host_speech_threshold
+            while len(self.agent_speeches_buffer) >= threshold:
+                batch = self.agent_speeches_buffer[:threshold]
+                self.agent_speeches_buffer = self.agent_speeches_buffer[threshold:]
+                self.host_worker.submit(batch)
                 
         except Exception as e:
             logger.exception(f"ForumEngine: 触发主持人发言时出错: {e}")
-            self.is_host_generating = False
+
+    def _discard_host_backlog(self):
+        """丢弃尚未写入的主持人发言（会话结束或重新开始时调用）"""
+        if self.host_worker is not None:
+            self.host_worker.discard_pending()
+
+    def get_host_metrics(self) -> Dict:
+        """获取主持人发言队列深度与延迟指标"""
+        if self.host_worker is None:
+            return {"available": False}
+        return {"available": True, **self.host_worker.get_metrics()}
     
     def _clean_content_tags(self, content: str, app_name: str) -> str:
         """清理内容中的重复标签和多余前缀"""
@@ -587,17 +567,18 @@ class LogMonitor:
         """智能监控日志文件"""
         logger.info("ForumEngine: 论坛创建中...")
        
-        # 初始化文件行数和位置 - 记录当前状态作为基线
+        # 以各文件当前末尾作为基线，之后只处理新追加的内容
         for app_name, log_file in self.monitored_logs.items():
-            self.file_line_counts[app_name] = self.get_file_line_count(log_file)
-            self.file_positions[app_name] = self.get_file_size(log_file)
-            self.capturing_json[app_name] = False
-            self.json_buffer[app_name] = []
-            self.in_error_block[app_name] = False
-            # logger.info(f"ForumEngine: {app_name} 基线行数: {self.file_line_counts[app_name]}")
+            self.tailer.seek_to_end(app_name, log_file)
+            self._reset_capture_state(app_name)
+
+        # 等待文件变化：Linux 上由 inotify 唤醒，其他平台每秒轮询一次
+        watcher = LogWatcher(self.log_dir, [path.name for path in self.monitored_logs.values()])
        
         while self.is_monitoring:
             try:
+                watcher.wait(1.0)
+
                 # 同时检测三个log文件的变化
                 any_growth = False
                 any_shrink = False
@@ -605,13 +586,11 @@ class LogMonitor:
                
                 # 为每个log文件独立处理
                 for app_name, log_file in self.monitored_logs.items():
-                    current_lines = self.get_file_line_count(log_file)
-                    previous_lines = self.file_line_counts.get(app_name, 0)
+                    result = self.tailer.read(app_name, log_file)
+                    new_lines = result.lines
                    
-                    if current_lines > previous_lines:
+                    if new_lines:
                         any_growth = True
-                        # 立即读取新增内容
-                        new_lines = self.read_new_lines(log_file, app_name)
                        
                         # 先检查是否需要触发搜索（只触发一次）
                         if not self.is_searching:
@@ -622,7 +601,7 @@ class LogMonitor:
                                     if 'FirstSummaryNode' in line or '正在生成首次段落总结' in line:
                                         logger.info(f"ForumEngine: 在{app_name}中检测到第一次论坛发表内容")
                                         self.is_searching = True
-                                        self.search_inactive_count = 0
+                                        self.last_activity_time = time.monotonic()
                                         # 清空forum.log开始新会话
                                         self.clear_forum_log()
                                         break  # 找到一个就够了，跳出循环
@@ -645,22 +624,14 @@ class LogMonitor:
                                 self.agent_speeches_buffer.append(log_line)
                                 
                                 # 检查是否需要触发主持人发言
-                                if len(self.agent_speeches_buffer) >= self.host_speech_threshold and not self.is_host_generating:
-                                    # 同步触发主持人发言
+                                if len(self.agent_speeches_buffer) >= self.host_speech_threshold:
+                                    # 提交给后台线程生成，不阻塞日志读取
                                     self._trigger_host_speech()
                    
-                    elif current_lines < previous_lines:
+                    elif result.truncated:
                         any_shrink = True
-                        # logger.info(f"ForumEngine: 检测到 {app_name} 日志缩短，将重置基线")
-                        # 重置文件位置到新的文件末尾
-                        self.file_positions[app_name] = self.get_file_size(log_file)
-                        # 重置JSON捕获状态
-                        self.capturing_json[app_name] = False
-                        self.json_buffer[app_name] = []
-                        self.in_error_block[app_name] = False
-                   
-                    # 更新行数记录
-                    self.file_line_counts[app_name] = current_lines
+                        # 日志被清空，tailer已将基线移到新的文件末尾，这里重置JSON捕获状态
+                        self._reset_capture_state(app_name)
                
                 # 检查是否应该结束当前搜索会话
                 if self.is_searching:
@@ -668,32 +639,26 @@ class LogMonitor:
                         # log变短，结束当前搜索会话，重置为等待状态
                         # logger.info("ForumEngine: 日志缩短，结束当前搜索会话，回到等待状态")
                         self.is_searching = False
-                        self.search_inactive_count = 0
                         # 重置主持人相关状态
                         self.agent_speeches_buffer = []
-                        self.is_host_generating = False
+                        self._discard_host_backlog()
                         # 写入结束标记
                         end_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
                         self.write_to_forum_log(f"=== ForumEngine 论坛结束 - {end_time} ===", "SYSTEM")
                         # logger.info("ForumEngine: 已重置基线，等待下次FirstSummaryNode触发")
                     elif not any_growth and not captured_any:
-                        # 没有增长也没有捕获内容，增加非活跃计数
-                        self.search_inactive_count += 1
-                        if self.search_inactive_count >= 7200:  # 超时无活动自动结束
+                        # 没有增长也没有捕获内容，超时无活动自动结束
+                        if time.monotonic() - self.last_activity_time >= SEARCH_INACTIVE_TIMEOUT:
                             logger.info("ForumEngine: 长时间无活动，结束论坛")
                             self.is_searching = False
-                            self.search_inactive_count = 0
                             # 重置主持人相关状态
                             self.agent_speeches_buffer = []
-                            self.is_host_generating = False
+                            self._discard_host_backlog()
                             # 写入结束标记
                             end_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
                             self.write_to_forum_log(f"=== ForumEngine 论坛结束 - {end_time} ===", "SYSTEM")
                     else:
-                        self.search_inactive_count = 0  # 重置计数器
-               
-                # 短暂休眠
-                time.sleep(1)
+                        self.last_activity_time = time.monotonic()
                
             except Exception as e:
                 logger.exception(f"ForumEngine: 论坛记录中出错: {e}")
@@ -701,6 +666,7 @@ class LogMonitor:
                 traceback.print_exc()
                 time.sleep(2)
        
+        watcher.close()
         logger.info("ForumEngine: 停止论坛日志文件")
    
     def start_monitoring(self):
@@ -734,6 +700,9 @@ class LogMonitor:
            
             if self.monitor_thread and self.monitor_thread.is_alive():
                 self.monitor_thread.join(timeout=2)
+
+            if self.host_worker is not None:
+                self.host_worker.stop()
            
             # 写入结束标记
             end_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
@@ -858,4 +827,8 @@ def stop_forum_monitoring():
 
 def get_forum_log():
     """获取forum.log内容"""
-    return get_monitor().get_forum_log_content()
\ No newline at end of file
+    return get_monitor().get_forum_log_content()
+
+def get_host_metrics():
+    """获取主持人发言队列指标"""
+    return get_monitor().get_host_metrics()
\ No newline at end of file
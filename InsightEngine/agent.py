@@ -6,15 +6,18 @@ Deep Search Agent主类
 import json
 import os
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Awaitable, Dict, List, Optional, Union
 
 import numpy as np
 from loguru import logger
 from sentence_transformers import SentenceTransformer
-from sklearn.cluster import KMeans
+from sklearn.cluster import KMeans, MiniBatchKMeans
 
 from .llms import LLMClient
+from .llms.base import get_rate_limiter
 from .nodes import (
     FirstSearchNode,
     FirstSummaryNode,
@@ -26,6 +29,7 @@ from .nodes import (
 from .state import State
 from .tools import (
     DBResponse,
+    EmbeddingCache,
     MediaCrawlerDB,
     keyword_optimizer,
     multilingual_sentiment_analyzer,
@@ -36,6 +40,21 @@ from .utils.config import Settings, settings
 ENABLE_CLUSTERING: bool = True  # 是否启用聚类采样
 MAX_CLUSTERED_RESULTS: int = 50  # 聚类后最大返回结果数
 RESULTS_PER_CLUSTER: int = 5  # 每个聚类返回的结果数
+# 聚类采样方式：默认 kmeans（KMeans, n_init=10，与原有行为一致）；
+# 可选更轻量的 minibatch_kmeans（MiniBatchKMeans）或
+# farthest_point（最远点贪心采样，不做聚类，按语义差异直接挑选代表性结果）
+CLUSTERING_METHOD: str = "kmeans"
+CLUSTERING_MODEL_NAME: str = "paraphrase-multilingual-MiniLM-L12-v2"
+
+
+def _tag_paragraph_log(record):
+    """段落处理期间的日志（包括各节点内部的日志）加上"[段落 N]"前缀，使并行段落交错的输出可区分归属"""
+    paragraph = record["extra"].get("paragraph")
+    if paragraph is not None:
+        record["message"] = f"[段落 {paragraph}] {record['message']}"
+
+
+logger.configure(patcher=_tag_paragraph_log)
 
 
 class DeepSearchAgent:
@@ -56,8 +75,19 @@ class DeepSearchAgent:
         # 初始化搜索工具集
         self.search_agency = MediaCrawlerDB()
 
-        # 初始化聚类小模型（懒加载）
+        # 初始化聚类小模型（懒加载）；并行段落共享同一模型，加载与编码在锁内进行
         self._clustering_model = None
+        self._clustering_lock = threading.Lock()
+
+        # 句向量缓存：重复出现的搜索结果不再重复编码
+        self._embedding_cache: Optional[EmbeddingCache] = None
+        if self.config.EMBEDDING_CACHE_ENABLED:
+            self._embedding_cache = EmbeddingCache(
+                self.config.EMBEDDING_CACHE_DIR
+                or os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "embeddings"),
+                CLUSTERING_MODEL_NAME,
+                self.config.EMBEDDING_CACHE_MAX_ENTRIES,
+            )
 
         # 初始化情感分析器
         self.sentiment_analyzer = multilingual_sentiment_analyzer
@@ -78,10 +108,20 @@ class DeepSearchAgent:
 
     def _initialize_llm(self) -> LLMClient:
         """初始化LLM客户端"""
+        model_name = self.config.INSIGHT_ENGINE_MODEL_NAME
+        rate_limiter = None
+        if get_rate_limiter is not None:
+            # 同一引擎同一模型的所有客户端共享一份并发/速率配额
+            rate_limiter = get_rate_limiter(
+                f"InsightEngine:{model_name}",
+                self.config.LLM_MAX_CONCURRENCY,
+                self.config.LLM_REQUESTS_PER_MINUTE,
+            )
         return LLMClient(
             api_key=self.config.INSIGHT_ENGINE_API_KEY,
-            model_name=self.config.INSIGHT_ENGINE_MODEL_NAME,
+            model_name=model_name,
             base_url=self.config.INSIGHT_ENGINE_BASE_URL,
+            rate_limiter=rate_limiter,
         )
 
     def _initialize_nodes(self):
@@ -95,12 +135,50 @@ class DeepSearchAgent:
     def _get_clustering_model(self):
         """懒加载聚类模型"""
         if self._clustering_model is None:
-            logger.info("  加载聚类模型 (paraphrase-multilingual-MiniLM-L12-v2)...")
-            self._clustering_model = SentenceTransformer(
-                "paraphrase-multilingual-MiniLM-L12-v2"
-            )
+            logger.info(f"  加载聚类模型 ({CLUSTERING_MODEL_NAME})...")
+            self._clustering_model = SentenceTransformer(CLUSTERING_MODEL_NAME)
         return self._clustering_model
 
+    def _encode_texts(self, texts: List[str]) -> np.ndarray:
+        """编码文本为句向量，优先复用缓存，仅对未命中的文本调用模型"""
+
+        def encode(batch: List[str]) -> np.ndarray:
+            with self._clustering_lock:
+                model = self._get_clustering_model()
+                return model.encode(batch, show_progress_bar=False)
+
+        if self._embedding_cache is not None:
+            return self._embedding_cache.encode(texts, encode)
+        return encode(texts)
+
+    @staticmethod
+    def _farthest_point_sample(
+        results: List, embeddings: np.ndarray, max_results: int
+    ) -> List:
+        """
+        最远点贪心采样：从热度最高的结果出发，每次选取与已选结果余弦距离最远的一条
+
+        Args:
+            results: 搜索结果列表
+            embeddings: 与results对应的句向量
+            max_results: 最大返回结果数
+
+        Returns:
+            采样后的结果列表（按选取顺序）
+        """
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        vectors = embeddings / np.maximum(norms, 1e-12)
+        start = int(np.argmax([r.hotness_score or 0 for r in results]))
+        min_distance = 1.0 - vectors @ vectors[start]
+        min_distance[start] = -np.inf
+        selected = [start]
+        while len(selected) < min(max_results, len(results)):
+            index = int(np.argmax(min_distance))
+            selected.append(index)
+            min_distance = np.minimum(min_distance, 1.0 - vectors @ vectors[index])
+            min_distance[index] = -np.inf
+        return [results[i] for i in selected]
+
     def _validate_date_format(self, date_str: str) -> bool:
         """
         验证日期格式是否为YYYY-MM-DD
@@ -150,15 +228,28 @@ class DeepSearchAgent:
             # 提取文本
             texts = [r.title_or_content[:500] for r in results]
 
-            # 获取模型并编码
-            model = self._get_clustering_model()
-            embeddings = model.encode(texts, show_progress_bar=False)
+            # 编码（命中缓存的文本直接复用向量）
+            embeddings = self._encode_texts(texts)
+
+            if CLUSTERING_METHOD == "farthest_point":
+                sampled_results = self._farthest_point_sample(
+                    results, embeddings, max_results
+                )
+                logger.info(
+                    f"  最远点采样完成: {len(results)} 条 -> {len(sampled_results)} 条代表性结果"
+                )
+                return sampled_results
 
             # 计算聚类数
             n_clusters = min(max(2, max_results // results_per_cluster), len(results))
 
             # KMeans聚类
-            kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
+            if CLUSTERING_METHOD == "minibatch_kmeans":
+                kmeans = MiniBatchKMeans(
+                    n_clusters=n_clusters, random_state=42, n_init=3, batch_size=256
+                )
+            else:
+                kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
             labels = kmeans.fit_predict(embeddings)
 
             # 从每个聚类采样
@@ -253,84 +344,37 @@ class DeepSearchAgent:
         logger.info(f"  🔍 原始查询: '{query}'")
         logger.info(f"  ✨ 优化后关键词: {optimized_response.optimized_keywords}")
 
-        # 使用优化后的关键词进行多次查询并整合结果
+        # 使用优化后的关键词并发查询并整合结果（共享连接池，总并发度受 DB_QUERY_CONCURRENCY 限制）
+        keywords = optimized_response.optimized_keywords
         all_results = []
         total_count = 0
 
-        for keyword in optimized_response.optimized_keywords:
+        pending_keywords = []
+        coros = []
+        for keyword in keywords:
             logger.info(f"    查询关键词: '{keyword}'")
-
             try:
-                if tool_name == "search_topic_globally":
-                    # 使用配置文件中的默认值，忽略agent提供的limit_per_table参数
-                    limit_per_table = (
-                        self.config.DEFAULT_SEARCH_TOPIC_GLOBALLY_LIMIT_PER_TABLE
-                    )
-                    response = self.search_agency.search_topic_globally(
-                        topic=keyword, limit_per_table=limit_per_table
-                    )
-                elif tool_name == "search_topic_by_date":
-                    start_date = kwargs.get("start_date")
-                    end_date = kwargs.get("end_date")
-                    # 使用配置文件中的默认值，忽略agent提供的limit_per_table参数
-                    limit_per_table = (
-                        self.config.DEFAULT_SEARCH_TOPIC_BY_DATE_LIMIT_PER_TABLE
-                    )
-                    if not start_date or not end_date:
-                        raise ValueError(
-                            "search_topic_by_date工具需要start_date和end_date参数"
-                        )
-                    response = self.search_agency.search_topic_by_date(
-                        topic=keyword,
-                        start_date=start_date,
-                        end_date=end_date,
-                        limit_per_table=limit_per_table,
+                coros.append(
+                    self._keyword_search_coroutine(
+                        tool_name, keyword, len(keywords), **kwargs
                     )
-                elif tool_name == "get_comments_for_topic":
-                    # 使用配置文件中的默认值，按关键词数量分配，但保证最小值
-                    limit = self.config.DEFAULT_GET_COMMENTS_FOR_TOPIC_LIMIT // len(
-                        optimized_response.optimized_keywords
-                    )
-                    limit = max(limit, 50)
-                    response = self.search_agency.get_comments_for_topic(
-                        topic=keyword, limit=limit
-                    )
-                elif tool_name == "search_topic_on_platform":
-                    platform = kwargs.get("platform")
-                    start_date = kwargs.get("start_date")
-                    end_date = kwargs.get("end_date")
-                    # 使用配置文件中的默认值，按关键词数量分配，但保证最小值
-                    limit = self.config.DEFAULT_SEARCH_TOPIC_ON_PLATFORM_LIMIT // len(
-                        optimized_response.optimized_keywords
-                    )
-                    limit = max(limit, 30)
-                    if not platform:
-                        raise ValueError("search_topic_on_platform工具需要platform参数")
-                    response = self.search_agency.search_topic_on_platform(
-                        platform=platform,
-                        topic=keyword,
-                        start_date=start_date,
-                        end_date=end_date,
-                        limit=limit,
-                    )
-                else:
-                    logger.info(f"    未知的搜索工具: {tool_name}，使用默认全局搜索")
-                    response = self.search_agency.search_topic_globally(
-                        topic=keyword,
-                        limit_per_table=self.config.DEFAULT_SEARCH_TOPIC_GLOBALLY_LIMIT_PER_TABLE,
-                    )
-
-                # 收集结果
-                if response.results:
-                    logger.info(f"     找到 {len(response.results)} 条结果")
-                    all_results.extend(response.results)
-                    total_count += len(response.results)
-                else:
-                    logger.info(f"     未找到结果")
-
+                )
+                pending_keywords.append(keyword)
             except Exception as e:
                 logger.error(f"      查询'{keyword}'时出错: {str(e)}")
+
+        responses = self.search_agency.run_concurrently(coros) if coros else []
+        for keyword, response in zip(pending_keywords, responses):
+            if isinstance(response, BaseException):
+                logger.error(f"      查询'{keyword}'时出错: {str(response)}")
                 continue
+            # 收集结果
+            if response.results:
+                logger.info(f"     '{keyword}' 找到 {len(response.results)} 条结果")
+                all_results.extend(response.results)
+                total_count += len(response.results)
+            else:
+                logger.info(f"     '{keyword}' 未找到结果")
 
         # 去重和整合结果
         unique_results = self._deduplicate_results(all_results)
@@ -370,6 +414,65 @@ class DeepSearchAgent:
 
         return integrated_response
 
+    def _keyword_search_coroutine(
+        self, tool_name: str, keyword: str, keyword_count: int, **kwargs
+    ) -> Awaitable[DBResponse]:
+        """
+        为单个优化关键词构建异步查询协程
+
+        Args:
+            tool_name: 工具名称
+            keyword: 优化后的关键词
+            keyword_count: 本次查询的关键词总数，用于分配limit
+            **kwargs: 工具参数（start_date, end_date, platform等）
+
+        Returns:
+            对应 `a*` 异步工具接口的协程
+        """
+        if tool_name == "search_topic_globally":
+            # 使用配置文件中的默认值，忽略agent提供的limit_per_table参数
+            limit_per_table = self.config.DEFAULT_SEARCH_TOPIC_GLOBALLY_LIMIT_PER_TABLE
+            return self.search_agency.asearch_topic_globally(
+                topic=keyword, limit_per_table=limit_per_table
+            )
+        if tool_name == "search_topic_by_date":
+            start_date = kwargs.get("start_date")
+            end_date = kwargs.get("end_date")
+            # 使用配置文件中的默认值，忽略agent提供的limit_per_table参数
+            limit_per_table = self.config.DEFAULT_SEARCH_TOPIC_BY_DATE_LIMIT_PER_TABLE
+            if not start_date or not end_date:
+                raise ValueError("search_topic_by_date工具需要start_date和end_date参数")
+            return self.search_agency.asearch_topic_by_date(
+                topic=keyword,
+                start_date=start_date,
+                end_date=end_date,
+                limit_per_table=limit_per_table,
+            )
+        if tool_name == "get_comments_for_topic":
+            # 使用配置文件中的默认值，按关键词数量分配，但保证最小值
+            limit = self.config.DEFAULT_GET_COMMENTS_FOR_TOPIC_LIMIT // keyword_count
+            limit = max(limit, 50)
+            return self.search_agency.aget_comments_for_topic(topic=keyword, limit=limit)
+        if tool_name == "search_topic_on_platform":
+            platform = kwargs.get("platform")
+            # 使用配置文件中的默认值，按关键词数量分配，但保证最小值
+            limit = self.config.DEFAULT_SEARCH_TOPIC_ON_PLATFORM_LIMIT // keyword_count
+            limit = max(limit, 30)
+            if not platform:
+                raise ValueError("search_topic_on_platform工具需要platform参数")
+            return self.search_agency.asearch_topic_on_platform(
+                platform=platform,
+                topic=keyword,
+                start_date=kwargs.get("start_date"),
+                end_date=kwargs.get("end_date"),
+                limit=limit,
+            )
+        logger.info(f"    未知的搜索工具: {tool_name}，使用默认全局搜索")
+        return self.search_agency.asearch_topic_globally(
+            topic=keyword,
+            limit_per_table=self.config.DEFAULT_SEARCH_TOPIC_GLOBALLY_LIMIT_PER_TABLE,
+        )
+
     def _deduplicate_results(self, results: List) -> List:
         """
         去重搜索结果
@@ -562,27 +665,60 @@ class DeepSearchAgent:
         logger.info(_message)
 
     def _process_paragraphs(self):
-        """处理所有段落"""
-        total_paragraphs = len(self.state.paragraphs)
+        """
+        处理所有段落
 
-        for i in range(total_paragraphs):
-            logger.info(
-                f"\n[步骤 2.{i + 1}] 处理段落: {self.state.paragraphs[i].title}"
-            )
+        段落在生成最终报告前互不依赖，按 PARAGRAPH_CONCURRENCY 有界并行处理：
+        每个工作线程只修改自己段落的 Research，完成进度在锁内统计与播报；
+        LLM 请求的并发数与速率由 LLMClient 的限流器统一约束。
+        """
+        total_paragraphs = len(self.state.paragraphs)
+        if total_paragraphs == 0:
+            return
+        workers = max(1, min(self.config.PARAGRAPH_CONCURRENCY, total_paragraphs))
+        progress_lock = threading.Lock()
+        completed = 0
+
+        def process(i: int):
+            nonlocal completed
+            paragraph = self.state.paragraphs[i]
+            logger.info(f"\n[步骤 2.{i + 1}] 处理段落: {paragraph.title}")
             logger.info("-" * 50)
 
-            # 初始搜索和总结
-            self._initial_search_and_summary(i)
-
-            # 反思循环
-            self._reflection_loop(i)
-
-            # 标记段落完成
-            self.state.paragraphs[i].research.mark_completed()
-
-            progress = (i + 1) / total_paragraphs * 100
-            self.speak(f"段落《{self.state.paragraphs[i].title}》深度分析已完成 ({progress:.1f}%)")
-            logger.info(f"段落处理完成 ({progress:.1f}%)")
+            # 段落内（包括各节点）的日志都带上段落编号，见 _tag_paragraph_log
+            with logger.contextualize(paragraph=i + 1):
+                # 初始搜索和总结
+                self._initial_search_and_summary(i)
+
+                # 反思循环
+                self._reflection_loop(i)
+
+                # 标记段落完成
+                paragraph.research.mark_completed()
+
+                with progress_lock:
+                    completed += 1
+                    progress = completed / total_paragraphs * 100
+                    self.speak(f"段落《{paragraph.title}》深度分析已完成 ({progress:.1f}%)")
+                    logger.info(f"段落 {i + 1} 处理完成 ({progress:.1f}%)")
+
+        if workers == 1:
+            for i in range(total_paragraphs):
+                process(i)
+            return
+
+        logger.info(f"并行处理 {total_paragraphs} 个段落（并发数: {workers}）")
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="InsightEngine-paragraph") as executor:
+            futures = {executor.submit(process, i): i for i in range(total_paragraphs)}
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception:
+                    # 与串行处理一致：任一段落失败即终止研究，未开始的段落不再执行
+                    for pending in futures:
+                        pending.cancel()
+                    logger.error(f"段落 {futures[future] + 1} 处理失败，取消剩余段落")
+                    raise
 
     def _initial_search_and_summary(self, paragraph_index: int):
         """执行初始搜索和总结"""
@@ -723,8 +859,8 @@ class DeepSearchAgent:
             ),
         }
 
-        # 更新状态
-        self.state = self.first_summary_node.mutate_state(
+        # 更新状态：节点原地更新本段落的总结，不重新绑定 self.state，避免并行段落互相覆盖
+        self.first_summary_node.mutate_state(
             summary_input, self.state, paragraph_index
         )
 
@@ -881,7 +1017,7 @@ class DeepSearchAgent:
             }
 
             # 更新状态
-            self.state = self.reflection_summary_node.mutate_state(
+            self.reflection_summary_node.mutate_state(
                 reflection_summary_input, self.state, paragraph_index
             )
 
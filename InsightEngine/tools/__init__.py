@@ -14,6 +14,7 @@ from .keyword_optimizer import (
     KeywordOptimizationResponse,
     keyword_optimizer
 )
+from .embedding_cache import EmbeddingCache
 from .sentiment_analyzer import (
     WeiboMultilingualSentimentAnalyzer,
     SentimentResult,
@@ -34,5 +35,6 @@ __all__ = [
     "SentimentResult",
     "BatchSentimentResult",
     "multilingual_sentiment_analyzer",
-    "analyze_sentiment"
+    "analyze_sentiment",
+    "EmbeddingCache"
 ]
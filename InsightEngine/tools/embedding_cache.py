@@ -0,0 +1,173 @@
+"""
+文本向量缓存
+以「模型名 + 文本」的哈希为键，将句向量以 float16 存入内存映射矩阵（vectors.f16），
+行号索引保存在同目录的 SQLite 中。重复出现的搜索结果无需再次编码，
+聚类采样时直接复用缓存向量。
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+from typing import Callable, List, Optional
+
+import numpy as np
+from loguru import logger
+
+
+class EmbeddingCache:
+    """基于 float16 内存映射矩阵的句向量缓存（线程安全）"""
+
+    # 矩阵文件按行数翻倍扩容
+    INITIAL_ROWS = 1024
+
+    def __init__(self, directory: str, model_name: str, max_entries: int = 500000):
+        self.directory = directory
+        self.model_name = model_name
+        self.max_entries = max(1, max_entries)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._matrix: Optional[np.memmap] = None
+        self._dim: Optional[int] = None
+
+    @property
+    def _matrix_path(self) -> str:
+        return os.path.join(self.directory, "vectors.f16")
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(self.directory, exist_ok=True)
+            conn = sqlite3.connect(
+                os.path.join(self.directory, "index.db"), timeout=30, check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS embedding_index (cache_key TEXT PRIMARY KEY, row INTEGER NOT NULL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS embedding_meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            conn.commit()
+            row = conn.execute("SELECT value FROM embedding_meta WHERE name = 'dim'").fetchone()
+            self._dim = int(row[0]) if row else None
+            self._conn = conn
+        return self._conn
+
+    def _open_matrix(self, min_rows: int) -> np.memmap:
+        """打开（必要时扩容）向量矩阵，保证至少容纳 min_rows 行"""
+        assert self._dim is not None
+        row_bytes = self._dim * np.dtype(np.float16).itemsize
+        current_rows = os.path.getsize(self._matrix_path) // row_bytes if os.path.exists(self._matrix_path) else 0
+        if current_rows < min_rows:
+            new_rows = max(self.INITIAL_ROWS, current_rows)
+            while new_rows < min_rows:
+                new_rows *= 2
+            self._matrix = None
+            with open(self._matrix_path, "ab") as f:
+                f.truncate(new_rows * row_bytes)
+            current_rows = new_rows
+        if self._matrix is None or self._matrix.shape[0] != current_rows:
+            self._matrix = np.memmap(self._matrix_path, dtype=np.float16, mode="r+", shape=(current_rows, self._dim))
+        return self._matrix
+
+    def _reset(self, conn: sqlite3.Connection) -> None:
+        """缓存已满时整体清空（缓存只是加速手段，清空不影响正确性）；在调用方的写事务内执行"""
+        logger.info(f"向量缓存达到上限 {self.max_entries} 条，清空后重新累积")
+        conn.execute("DELETE FROM embedding_index")
+
+    def make_key(self, text: str) -> str:
+        """生成缓存键：模型名与文本的SHA-256"""
+        return hashlib.sha256(f"{self.model_name}\x00{text}".encode("utf-8")).hexdigest()
+
+    def encode(self, texts: List[str], encoder: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+        """
+        返回 texts 的向量，仅对未命中缓存的文本调用 encoder
+
+        Args:
+            texts: 文本列表
+            encoder: 批量编码函数，输入文本列表，返回 (n, dim) 矩阵
+
+        Returns:
+            (len(texts), dim) 的 float32 矩阵，行顺序与 texts 一致
+        """
+        if not texts:
+            return np.zeros((0, self._dim or 0), dtype=np.float32)
+        keys = [self.make_key(text) for text in texts]
+
+        unique_keys = list(dict.fromkeys(keys))
+        with self._lock:
+            cached = {}
+            try:
+                conn = self._connect()
+                rows = {}
+                for start in range(0, len(unique_keys), 500):
+                    chunk = unique_keys[start : start + 500]
+                    placeholders = ",".join("?" * len(chunk))
+                    rows.update(conn.execute(
+                        f"SELECT cache_key, row FROM embedding_index WHERE cache_key IN ({placeholders})", chunk
+                    ).fetchall())
+                if rows and self._dim is not None:
+                    matrix = self._open_matrix(max(rows.values()) + 1)
+                    cached = {key: np.asarray(matrix[row], dtype=np.float32) for key, row in rows.items()}
+            except (OSError, sqlite3.Error, ValueError) as e:
+                logger.warning(f"读取向量缓存失败，本次全部重新编码: {e}")
+            missing = [key for key in unique_keys if key not in cached]
+            self.hits += len(unique_keys) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            first_index = {key: i for i, key in reversed(list(enumerate(keys)))}
+            encoded = np.asarray(encoder([texts[first_index[key]] for key in missing]), dtype=np.float32)
+            for key, vector in zip(missing, encoded):
+                cached[key] = vector
+            self._store(missing, encoded)
+
+        return np.stack([cached[key] for key in keys])
+
+    def _store(self, keys: List[str], vectors: np.ndarray) -> None:
+        """
+        把新编码的向量追加到矩阵末尾并登记行号；写入失败只记录日志
+
+        行号分配、矩阵写入与索引登记在同一个 BEGIN IMMEDIATE 事务中完成：SQLite 的写锁跨进程互斥，
+        多个进程共用缓存目录时不会分到相同的行而互相覆盖向量。
+        """
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    # 其他进程可能已先写入维度，以事务内读到的为准
+                    row = conn.execute("SELECT value FROM embedding_meta WHERE name = 'dim'").fetchone()
+                    self._dim = int(row[0]) if row else None
+                    if self._dim is None:
+                        self._dim = int(vectors.shape[1])
+                        conn.execute("INSERT INTO embedding_meta (name, value) VALUES ('dim', ?)", (str(self._dim),))
+                    elif vectors.shape[1] != self._dim:
+                        logger.warning(f"向量维度 {vectors.shape[1]} 与缓存维度 {self._dim} 不一致，跳过缓存写入")
+                        conn.rollback()
+                        return
+                    next_row = conn.execute("SELECT COALESCE(MAX(row) + 1, 0) FROM embedding_index").fetchone()[0]
+                    if next_row + len(keys) > self.max_entries:
+                        self._reset(conn)
+                        next_row = 0
+                    matrix = self._open_matrix(next_row + len(keys))
+                    matrix[next_row : next_row + len(keys)] = vectors.astype(np.float16)
+                    matrix.flush()
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO embedding_index (cache_key, row) VALUES (?, ?)",
+                        [(key, next_row + i) for i, key in enumerate(keys)],
+                    )
+                    conn.commit()
+                except BaseException:
+                    conn.rollback()
+                    raise
+        except (OSError, sqlite3.Error, ValueError) as e:
+            logger.warning(f"写入向量缓存失败: {e}")
+
+    def stats(self) -> dict:
+        """返回命中统计"""
+        lookups = self.hits + self.misses
+        return {
+            "directory": self.directory,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
@@ -14,6 +14,9 @@ V3.0 核心更新:
 - 新增平台精搜工具: 新增 `search_topic_on_platform` 工具，作为特例，
   允许Agent在特定平台（B站、微博等七大平台）上对某一话题进行精确搜索，并支持时间筛选。
 - 结构优化: 调整了数据结构与函数文档，以适应新功能。
+- 异步优先: 每个工具都提供 `a*` 异步版本（如 `asearch_topic_globally`），多表查询在连接池上并发执行；
+  原同步接口保留为对异步版本的包装，可被多个线程（如并行处理的段落）同时调用。
+- 热度预计算: `search_hot_content` 在 `hot_content` 表完成覆盖所需时间窗口的全量回填（`hot_content_refresh` 完成标记）后读取该表，否则回退为实时计算。
 
 主要工具:
 - search_hot_content: 查找指定时间范围内的综合热度最高的内容。
@@ -27,9 +30,13 @@ import os
 import json
 from loguru import logger
 import asyncio
-from typing import List, Dict, Any, Optional, Literal
+import threading
+import time
+import weakref
+from typing import Awaitable, List, Dict, Any, Optional, Literal, Tuple, Union
 from dataclasses import dataclass, field
 from ..utils.db import fetch_all
+from .search_backend import get_search_backend
 from datetime import datetime, timedelta, date
 from InsightEngine.utils.config import settings
 
@@ -73,23 +80,81 @@ class MediaCrawlerDB:
         """
         初始化客户端。
         """
-        pass
-        
+        # 话题匹配条件由检索后端生成（FULLTEXT/pg_trgm 索引或 LIKE 回退）
+        self._search_backend = get_search_backend()
+        self._query_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+    # 同步接口共用的后台事件循环：无论从哪个线程调用（如并行处理段落的工作线程），
+    # 协程都在同一个loop上执行，异步引擎连接池始终绑定在该loop上
+    _sync_loop: Optional[asyncio.AbstractEventLoop] = None
+    _sync_loop_lock = threading.Lock()
+
+    @classmethod
+    def _get_sync_loop(cls) -> asyncio.AbstractEventLoop:
+        with cls._sync_loop_lock:
+            if cls._sync_loop is None or cls._sync_loop.is_closed():
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="mediacrawler-db", daemon=True).start()
+                cls._sync_loop = loop
+            return cls._sync_loop
+
+    @classmethod
+    def _run_sync(cls, coro):
+        """
+        在同步上下文中驱动协程，供同步工具接口复用。
+
+        协程提交到后台事件循环执行并阻塞等待结果，可被多个线程同时调用。
+        已在事件循环中的调用方请直接 await 对应的 `a*` 异步接口，避免阻塞当前循环。
+        """
+        return asyncio.run_coroutine_threadsafe(coro, cls._get_sync_loop()).result()
+
+    async def _aexecute_query(self, query: str, params: Any = None) -> List[Dict[str, Any]]:
+        try:
+            return await fetch_all(query, params)
+        except Exception as e:
+            logger.exception(f"数据库查询时发生错误: {e}")
+            return []
+
+    def _get_query_semaphore(self) -> asyncio.Semaphore:
+        """返回当前事件循环共享的查询信号量，多个关键词/工具并发调用时总并发度仍受限"""
+        loop = asyncio.get_running_loop()
+        semaphore = self._query_semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(max(1, settings.DB_QUERY_CONCURRENCY))
+            self._query_semaphores[loop] = semaphore
+        return semaphore
+
+    def run_concurrently(self, coros: List[Awaitable[DBResponse]]) -> List[Union[DBResponse, BaseException]]:
+        """
+        同步等待多个异步工具调用并发完成（如同一工具的多个关键词）。
+
+        Args:
+            coros: `a*` 异步工具接口返回的协程列表
+
+        Returns:
+            与输入顺序一致的结果列表；单个调用失败时对应位置为异常对象，不影响其他调用
+        """
+        async def _gather():
+            return await asyncio.gather(*coros, return_exceptions=True)
+
+        return list(self._run_sync(_gather()))
+
+    async def _aexecute_many(self, queries: List[Tuple[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """
+        在连接池上并发执行多条互不依赖的查询，返回顺序与输入一致。
+        并发度受 DB_QUERY_CONCURRENCY 限制（同一事件循环上的所有工具调用共享），避免超出连接池容量。
+        """
+        semaphore = self._get_query_semaphore()
+
+        async def _run(query: str, params: Any) -> List[Dict[str, Any]]:
+            async with semaphore:
+                return await self._aexecute_query(query, params)
+
+        return list(await asyncio.gather(*(_run(query, params) for query, params in queries)))
+
     def _execute_query(self, query: str, params: tuple = None) -> List[Dict[str, Any]]:
         try:
-            # 获取或创建event loop
-            try:
-                loop = asyncio.get_event_loop()
-                if loop.is_closed():
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-            except RuntimeError:
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-            
-            # 直接运行协程
-            return loop.run_until_complete(fetch_all(query, params))
-        
+            return self._run_sync(self._aexecute_query(query, params))
         except Exception as e:
             logger.exception(f"数据库查询时发生错误: {e}")
             return []
@@ -108,13 +173,16 @@ class MediaCrawlerDB:
         except (ValueError, TypeError): return None
 
     _table_columns_cache = {}
-    def _get_table_columns(self, table_name: str) -> List[str]:
+    async def _aget_table_columns(self, table_name: str) -> List[str]:
         if table_name in self._table_columns_cache: return self._table_columns_cache[table_name]
-        results = self._execute_query(f"SHOW COLUMNS FROM `{table_name}`")
+        results = await self._aexecute_query(f"SHOW COLUMNS FROM `{table_name}`")
         columns = [row['Field'] for row in results] if results else []
         self._table_columns_cache[table_name] = columns
         return columns
 
+    def _get_table_columns(self, table_name: str) -> List[str]:
+        return self._run_sync(self._aget_table_columns(table_name))
+
     def _extract_engagement(self, row: Dict[str, Any]) -> Dict[str, int]:
         """从数据行中提取并统一互动指标"""
         engagement = {}
@@ -127,6 +195,28 @@ class MediaCrawlerDB:
                     break
         return engagement
 
+    def _row_to_query_result(self, row: Dict[str, Any], table: str, content_type: str) -> QueryResult:
+        """将话题搜索返回的原始行转换为统一的 QueryResult"""
+        content = (row.get('title') or row.get('content') or row.get('desc') or row.get('content_text', ''))
+        time_key = row.get('create_time') or row.get('time') or row.get('created_time') or row.get('publish_time') or row.get('crawl_date')
+        return QueryResult(
+            platform=table.split('_')[0], content_type=content_type,
+            title_or_content=content if content else '',
+            author_nickname=row.get('nickname') or row.get('user_nickname') or row.get('user_name'),
+            url=row.get('video_url') or row.get('note_url') or row.get('content_url') or row.get('url') or row.get('aweme_url'),
+            publish_time=self._to_datetime(time_key),
+            engagement=self._extract_engagement(row),
+            source_keyword=row.get('source_keyword'),
+            source_table=table
+        )
+
+    def _build_topic_table_query(self, table: str, fields: List[str], topic: str, limit: int) -> Tuple[str, Dict[str, Any]]:
+        """构建单表话题检索SQL，匹配条件由检索后端生成"""
+        where_clause, param_dict = self._search_backend.build_clause(table, fields, topic)
+        param_dict['limit'] = limit
+        query = f'SELECT * FROM {self._wrap_query_field_with_dialect(table)} WHERE {where_clause} ORDER BY id DESC LIMIT :limit'
+        return query, param_dict
+
     def search_hot_content(
         self,
         time_period: Literal['24h', 'week', 'year'] = 'week',
@@ -142,11 +232,57 @@ class MediaCrawlerDB:
         Returns:
             DBResponse: 包含按综合热度排序后的内容列表。
         """
+        return self._run_sync(self.asearch_hot_content(time_period=time_period, limit=limit))
+
+    # 最近一次完成的全量刷新覆盖的天数及读取时间；刷新会删除窗口外的数据，只能以最新一次为准
+    _hot_content_window = (0, 0.0)
+    HOT_CONTENT_MARKER_TTL = 300
+
+    async def _ahot_content_covers(self, days: int) -> bool:
+        """
+        hot_content 是否已完成覆盖最近 days 天的全量回填。
+
+        以 db_manager --refresh-hot-content 最后写入的 hot_content_refresh 完成标记为准，取最新一条的窗口：
+        全年回填之后的每日7天刷新会删掉7天以前的数据，不能沿用历史上更大的窗口；
+        回填进行中或中途失败时没有新标记，不会据此切换。标记按 HOT_CONTENT_MARKER_TTL 秒缓存。
+        """
+        window_days, checked_at = MediaCrawlerDB._hot_content_window
+        if time.monotonic() - checked_at >= self.HOT_CONTENT_MARKER_TTL:
+            try:
+                rows = await fetch_all(
+                    "SELECT window_days FROM hot_content_refresh ORDER BY completed_ts DESC, id DESC LIMIT 1"
+                )
+                window_days = int((rows[0].get('window_days') if rows else None) or 0)
+            except Exception:
+                window_days = 0
+            MediaCrawlerDB._hot_content_window = (window_days, time.monotonic())
+        return window_days >= days
+
+    async def asearch_hot_content(
+        self,
+        time_period: Literal['24h', 'week', 'year'] = 'week',
+        limit: int = 50
+    ) -> DBResponse:
+        """
+        `search_hot_content` 的异步版本。
+
+        优先读取由爬虫入库与 db_manager --refresh-hot-content 维护的 hot_content 表（按发布时间与热度索引）；
+        该表尚无覆盖所需时间窗口的完成标记时回退为在各平台表上实时计算热度。
+        """
         params_for_log = {'time_period': time_period, 'limit': limit}
         logger.info(f"--- TOOL: 查找热点内容 (params: {params_for_log}) ---")
         
         now = datetime.now()
-        start_time = now - timedelta(days={'24h': 1, 'week': 7}.get(time_period, 365))
+        period_days = {'24h': 1, 'week': 7}.get(time_period, 365)
+        start_time = now - timedelta(days=period_days)
+
+        if await self._ahot_content_covers(period_days):
+            query = ("SELECT platform as p, content_type as t, title, author, url, publish_ts as ts, hotness_score, "
+                     "source_keyword, source_table as tbl, engagement FROM hot_content "
+                     "WHERE publish_ts >= :start_ts ORDER BY hotness_score DESC LIMIT :limit")
+            raw_results = await self._aexecute_query(query, {'start_ts': int(start_time.timestamp()), 'limit': limit})
+            formatted_results = [QueryResult(platform=r['p'], content_type=r['t'], title_or_content=r['title'] or '', author_nickname=r.get('author'), url=r['url'], publish_time=self._to_datetime(r['ts']), engagement=self._extract_engagement(json.loads(r['engagement'] or '{}')), hotness_score=float(r.get('hotness_score') or 0.0), source_keyword=r.get('source_keyword'), source_table=r['tbl']) for r in raw_results]
+            return DBResponse("search_hot_content", params_for_log, results=formatted_results, results_count=len(formatted_results))
 
         # 定义各平台的热度计算SQL片段
         hotness_formulas = {
@@ -158,13 +294,14 @@ class MediaCrawlerDB:
             'zhihu_content':  f"(COALESCE(CAST(voteup_count AS UNSIGNED), 0) * {self.W_LIKE} + COALESCE(CAST(comment_count AS UNSIGNED), 0) * {self.W_COMMENT})",
         }
 
-        all_queries, params = [], []
+        all_queries, params = [], {}
         for table, formula in hotness_formulas.items():
             time_filter_sql, time_filter_param = "", None
-            if table == 'weibo_note': time_filter_sql, time_filter_param = "`create_date_time` >= %s", start_time.strftime('%Y-%m-%d %H:%M:%S')
-            elif table in ['kuaishou_video', 'xhs_note', 'douyin_aweme']: time_col = 'time' if table == 'xhs_note' else 'create_time'; time_filter_sql, time_filter_param = f"`{time_col}` >= %s", str(int(start_time.timestamp() * 1000))
-            elif table == 'zhihu_content': time_filter_sql, time_filter_param = "CAST(`created_time` AS UNSIGNED) >= %s", str(int(start_time.timestamp()))
-            else: time_filter_sql, time_filter_param = "`create_time` >= %s", str(int(start_time.timestamp()))
+            pname = f"start_{table}"
+            if table == 'weibo_note': time_filter_sql, time_filter_param = f"`create_date_time` >= :{pname}", start_time.strftime('%Y-%m-%d %H:%M:%S')
+            elif table in ['kuaishou_video', 'xhs_note', 'douyin_aweme']: time_col = 'time' if table == 'xhs_note' else 'create_time'; time_filter_sql, time_filter_param = f"`{time_col}` >= :{pname}", str(int(start_time.timestamp() * 1000))
+            elif table == 'zhihu_content': time_filter_sql, time_filter_param = f"CAST(`created_time` AS UNSIGNED) >= :{pname}", str(int(start_time.timestamp()))
+            else: time_filter_sql, time_filter_param = f"`create_time` >= :{pname}", str(int(start_time.timestamp()))
 
             content_type = 'note' if table in ['weibo_note', 'xhs_note'] else 'content' if table == 'zhihu_content' else 'video'
             query_template = "SELECT '{platform}' as p, '{type}' as t, {title} as title, {author} as author, {url} as url, {ts} as ts, {formula} as hotness_score, source_keyword, '{tbl}' as tbl FROM `{tbl}` WHERE {time_filter}"
@@ -176,19 +313,18 @@ class MediaCrawlerDB:
             elif table == 'douyin_aweme': field_subs.update({'url': 'aweme_url'})
 
             all_queries.append(query_template.format(**field_subs))
-            params.append(time_filter_param)
+            params[pname] = time_filter_param
         
-        final_query = f"({' ) UNION ALL ( '.join(all_queries)}) ORDER BY hotness_score DESC LIMIT %s"
-        raw_results = self._execute_query(final_query, tuple(params) + (limit,))
+        final_query = f"({' ) UNION ALL ( '.join(all_queries)}) ORDER BY hotness_score DESC LIMIT :limit"
+        params['limit'] = limit
+        raw_results = await self._aexecute_query(final_query, params)
 
         formatted_results = [QueryResult(platform=r['p'], content_type=r['t'], title_or_content=r['title'], author_nickname=r.get('author'), url=r['url'], publish_time=self._to_datetime(r['ts']), engagement=self._extract_engagement(r), hotness_score=r.get('hotness_score', 0.0), source_keyword=r.get('source_keyword'), source_table=r['tbl']) for r in raw_results]
         return DBResponse("search_hot_content", params_for_log, results=formatted_results, results_count=len(formatted_results))    
 
     def _wrap_query_field_with_dialect(self, field: str) -> str:
-        """根据数据库方言包装SQL查询"""
-        if settings.DB_DIALECT == 'postgresql':
-            return f'"{field}"'
-        return f'`{field}`'
+        """根据数据库方言包装SQL查询（与检索后端使用同一份规范化后的方言）"""
+        return self._search_backend.quote(field)
 
     def search_topic_globally(self, topic: str, limit_per_table: int = 100) -> DBResponse:
         """
@@ -201,36 +337,21 @@ class MediaCrawlerDB:
         Returns:
             DBResponse: 包含所有匹配结果的聚合列表。
         """
+        return self._run_sync(self.asearch_topic_globally(topic, limit_per_table=limit_per_table))
+
+    async def asearch_topic_globally(self, topic: str, limit_per_table: int = 100) -> DBResponse:
+        """`search_topic_globally` 的异步版本，各表查询并发执行。"""
         params_for_log = {'topic': topic, 'limit_per_table': limit_per_table}
         logger.info(f"--- TOOL: 全局话题搜索 (params: {params_for_log}) ---")
         
-        search_term, all_results = f"%{topic}%", []
+        all_results = []
         search_configs = { 'bilibili_video': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'video'}, 'bilibili_video_comment': {'fields': ['content'], 'type': 'comment'}, 'douyin_aweme': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'video'}, 'douyin_aweme_comment': {'fields': ['content'], 'type': 'comment'}, 'kuaishou_video': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'video'}, 'kuaishou_video_comment': {'fields': ['content'], 'type': 'comment'}, 'weibo_note': {'fields': ['content', 'source_keyword'], 'type': 'note'}, 'weibo_note_comment': {'fields': ['content'], 'type': 'comment'}, 'xhs_note': {'fields': ['title', 'desc', 'tag_list', 'source_keyword'], 'type': 'note'}, 'xhs_note_comment': {'fields': ['content'], 'type': 'comment'}, 'zhihu_content': {'fields': ['title', 'desc', 'content_text', 'source_keyword'], 'type': 'content'}, 'zhihu_comment': {'fields': ['content'], 'type': 'comment'}, 'tieba_note': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'note'}, 'tieba_comment': {'fields': ['content'], 'type': 'comment'}, 'daily_news': {'fields': ['title'], 'type': 'news'}, }
         
-        for table, config in search_configs.items():
-            param_dict = {}
-            where_clauses = []
-            for idx, field in enumerate(config['fields']):
-                pname = f"term_{idx}"
-                where_clauses.append(f'{self._wrap_query_field_with_dialect(field)} LIKE :{pname}')
-                param_dict[pname] = search_term
-            param_dict['limit'] = limit_per_table
-            where_clause = " OR ".join(where_clauses)
-            query = f'SELECT * FROM {self._wrap_query_field_with_dialect(table)} WHERE {where_clause} ORDER BY id DESC LIMIT :limit'
-            raw_results = self._execute_query(query, param_dict)
-            for row in raw_results:
-                content = (row.get('title') or row.get('content') or row.get('desc') or row.get('content_text', ''))
-                time_key = row.get('create_time') or row.get('time') or row.get('created_time') or row.get('publish_time') or row.get('crawl_date')
-                all_results.append(QueryResult(
-                    platform=table.split('_')[0], content_type=config['type'],
-                    title_or_content=content if content else '',
-                    author_nickname=row.get('nickname') or row.get('user_nickname') or row.get('user_name'),
-                    url=row.get('video_url') or row.get('note_url') or row.get('content_url') or row.get('url') or row.get('aweme_url'),
-                    publish_time=self._to_datetime(time_key),
-                    engagement=self._extract_engagement(row),
-                    source_keyword=row.get('source_keyword'),
-                    source_table=table
-                ))
+        await self._search_backend.prepare(search_configs)
+        queries = [self._build_topic_table_query(table, config['fields'], topic, limit_per_table) for table, config in search_configs.items()]
+        table_results = await self._aexecute_many(queries)
+        for (table, config), raw_results in zip(search_configs.items(), table_results):
+            all_results.extend(self._row_to_query_result(row, table, config['type']) for row in raw_results)
         return DBResponse("search_topic_globally", params_for_log, results=all_results, results_count=len(all_results))
 
     def search_topic_by_date(self, topic: str, start_date: str, end_date: str, limit_per_table: int = 100) -> DBResponse:
@@ -246,6 +367,10 @@ class MediaCrawlerDB:
         Returns:
             DBResponse: 包含在指定日期范围内找到的结果的聚合列表。
         """
+        return self._run_sync(self.asearch_topic_by_date(topic, start_date, end_date, limit_per_table=limit_per_table))
+
+    async def asearch_topic_by_date(self, topic: str, start_date: str, end_date: str, limit_per_table: int = 100) -> DBResponse:
+        """`search_topic_by_date` 的异步版本，各表查询并发执行。"""
         params_for_log = {'topic': topic, 'start_date': start_date, 'end_date': end_date, 'limit_per_table': limit_per_table}
         logger.info(f"--- TOOL: 按日期搜索话题 (params: {params_for_log}) ---")
         
@@ -254,7 +379,7 @@ class MediaCrawlerDB:
         except ValueError:
             return DBResponse("search_topic_by_date", params_for_log, error_message="日期格式错误，请使用 'YYYY-MM-DD' 格式。")
         
-        search_term, all_results = f"%{topic}%", []
+        all_results = []
         search_configs = {
             'bilibili_video': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'video', 'time_col': 'create_time', 'time_type': 'sec'}, 'douyin_aweme': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'video', 'time_col': 'create_time', 'time_type': 'ms'},
             'kuaishou_video': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'video', 'time_col': 'create_time', 'time_type': 'ms'}, 'weibo_note': {'fields': ['content', 'source_keyword'], 'type': 'note', 'time_col': 'create_date_time', 'time_type': 'str'},
@@ -262,30 +387,11 @@ class MediaCrawlerDB:
             'tieba_note': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'note', 'time_col': 'publish_time', 'time_type': 'str'}, 'daily_news': {'fields': ['title'], 'type': 'news', 'time_col': 'crawl_date', 'time_type': 'date_str'},
         }
 
-        for table, config in search_configs.items():
-            param_dict = {}
-            where_clauses = []
-            for idx, field in enumerate(config['fields']):
-                pname = f"term_{idx}"
-                where_clauses.append(f'{self._wrap_query_field_with_dialect(field)} LIKE :{pname}')
-                param_dict[pname] = search_term
-            param_dict['limit'] = limit_per_table
-            where_clause = ' OR '.join(where_clauses)
-            query = f'SELECT * FROM {self._wrap_query_field_with_dialect(table)} WHERE {where_clause} ORDER BY id DESC LIMIT :limit'
-            raw_results = self._execute_query(query, param_dict)
-            for row in raw_results:
-                content = (row.get('title') or row.get('content') or row.get('desc') or row.get('content_text', ''))
-                time_key = row.get('create_time') or row.get('time') or row.get('created_time') or row.get('publish_time') or row.get('crawl_date')
-                all_results.append(QueryResult(
-                    platform=table.split('_')[0], content_type=config['type'],
-                    title_or_content=content if content else '',
-                    author_nickname=row.get('nickname') or row.get('user_nickname') or row.get('user_name'),
-                    url=row.get('video_url') or row.get('note_url') or row.get('content_url') or row.get('url') or row.get('aweme_url'),
-                    publish_time=self._to_datetime(time_key),
-                    engagement=self._extract_engagement(row),
-                    source_keyword=row.get('source_keyword'),
-                    source_table=table
-                ))
+        await self._search_backend.prepare(search_configs)
+        queries = [self._build_topic_table_query(table, config['fields'], topic, limit_per_table) for table, config in search_configs.items()]
+        table_results = await self._aexecute_many(queries)
+        for (table, config), raw_results in zip(search_configs.items(), table_results):
+            all_results.extend(self._row_to_query_result(row, table, config['type']) for row in raw_results)
         return DBResponse("search_topic_by_date", params_for_log, results=all_results, results_count=len(all_results))
         
     def get_comments_for_topic(self, topic: str, limit: int = 500) -> DBResponse:
@@ -299,28 +405,34 @@ class MediaCrawlerDB:
         Returns:
             DBResponse: 包含匹配的评论列表。
         """
+        return self._run_sync(self.aget_comments_for_topic(topic, limit=limit))
+
+    async def aget_comments_for_topic(self, topic: str, limit: int = 500) -> DBResponse:
+        """`get_comments_for_topic` 的异步版本，各评论表的列信息并发获取。"""
         params_for_log = {'topic': topic, 'limit': limit}
         logger.info(f"--- TOOL: 获取话题评论 (params: {params_for_log}) ---")
         
-        search_term = f"%{topic}%"
         comment_tables = ['bilibili_video_comment', 'douyin_aweme_comment', 'kuaishou_video_comment', 'weibo_note_comment', 'xhs_note_comment', 'zhihu_comment', 'tieba_comment']
+        await self._search_backend.prepare(comment_tables)
+        table_columns = await asyncio.gather(*(self._aget_table_columns(table) for table in comment_tables))
         
-        all_queries = []
-        for table in comment_tables:
-            cols = self._get_table_columns(table)
+        all_queries, params = [], {}
+        for t_idx, (table, cols) in enumerate(zip(comment_tables, table_columns)):
             author_col = 'user_nickname' if 'user_nickname' in cols else 'nickname'
             like_col = 'comment_like_count' if 'comment_like_count' in cols else 'like_count' if 'like_count' in cols else None
             time_col = 'publish_time' if 'publish_time' in cols else 'create_date_time' if 'create_date_time' in cols else 'create_time'
             like_select = f"`{like_col}` as likes" if like_col else "'0' as likes"
+            topic_clause, topic_params = self._search_backend.build_clause(table, ['content'], topic, param_prefix=f"term_{t_idx}")
+            params.update(topic_params)
             
             query = (f"SELECT '{table.split('_')[0]}' as platform, `content`, `{author_col}` as author, "
                      f"`{time_col}` as ts, {like_select}, '{table}' as source_table "
-                     f"FROM `{table}` WHERE `content` LIKE %s")
+                     f"FROM `{table}` WHERE {topic_clause}")
             all_queries.append(query)
 
-        final_query = f"({' ) UNION ALL ( '.join(all_queries)}) ORDER BY ts DESC LIMIT %s"
-        params = (search_term,) * len(comment_tables) + (limit,)
-        raw_results = self._execute_query(final_query, params)
+        final_query = f"({' ) UNION ALL ( '.join(all_queries)}) ORDER BY ts DESC LIMIT :limit"
+        params['limit'] = limit
+        raw_results = await self._aexecute_query(final_query, params)
         
         formatted = [QueryResult(platform=r['platform'], content_type='comment', title_or_content=r['content'], author_nickname=r['author'], publish_time=self._to_datetime(r['ts']), engagement={'likes': int(r['likes']) if str(r['likes']).isdigit() else 0}, source_table=r['source_table']) for r in raw_results]
         return DBResponse("get_comments_for_topic", params_for_log, results=formatted, results_count=len(formatted))
@@ -346,6 +458,17 @@ class MediaCrawlerDB:
         Returns:
             DBResponse: 包含在该平台找到的结果列表。
         """
+        return self._run_sync(self.asearch_topic_on_platform(platform, topic, start_date=start_date, end_date=end_date, limit=limit))
+
+    async def asearch_topic_on_platform(
+        self,
+        platform: Literal['bilibili', 'weibo', 'douyin', 'kuaishou', 'xhs', 'zhihu', 'tieba'],
+        topic: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        limit: int = 20
+    ) -> DBResponse:
+        """`search_topic_on_platform` 的异步版本，内容表与评论表并发查询。"""
         params_for_log = {'platform': platform, 'topic': topic, 'start_date': start_date, 'end_date': end_date, 'limit': limit}
         logger.info(f"--- TOOL: 平台定向搜索 (params: {params_for_log}) ---")
 
@@ -354,8 +477,9 @@ class MediaCrawlerDB:
         if platform not in all_configs:
             return DBResponse("search_topic_on_platform", params_for_log, error_message=f"不支持的平台: {platform}")
 
-        search_term, all_results = f"%{topic}%", []
+        all_results = []
         platform_configs = all_configs[platform]
+        await self._search_backend.prepare([config['table'] for config in platform_configs])
 
         time_clause, time_params_tuple = "", ()
         if start_date and end_date:
@@ -366,11 +490,11 @@ class MediaCrawlerDB:
         else:
             start_dt, end_dt = None, None
 
+        queries = []
         for config in platform_configs:
             table = config['table']
-            topic_clause = " OR ".join([f"`{field}` LIKE %s" for field in config['fields']])
+            topic_clause, params = self._search_backend.build_clause(table, config['fields'], topic)
             query = f"SELECT * FROM `{table}` WHERE {topic_clause}"
-            params = [search_term] * len(config['fields'])
 
             if start_dt and end_dt and 'time_col' in config:
                 time_col, time_type = config['time_col'], config['time_type']
@@ -379,16 +503,19 @@ class MediaCrawlerDB:
                 elif time_type in ['str', 'date_str']: t_params = (start_dt.strftime('%Y-%m-%d'), end_dt.strftime('%Y-%m-%d'))
                 else: t_params = (str(int(start_dt.timestamp())), str(int(end_dt.timestamp())))
                 
-                t_clause = f"`{time_col}` >= %s AND `{time_col}` < %s"
-                if table == 'zhihu_content': t_clause = f"CAST(`{time_col}` AS UNSIGNED) >= %s AND CAST(`{time_col}` AS UNSIGNED) < %s"
+                t_clause = f"`{time_col}` >= :start_ts AND `{time_col}` < :end_ts"
+                if table == 'zhihu_content': t_clause = f"CAST(`{time_col}` AS UNSIGNED) >= :start_ts AND CAST(`{time_col}` AS UNSIGNED) < :end_ts"
                 
                 query += f" AND ({t_clause})"
-                params.extend(t_params)
+                params.update(start_ts=t_params[0], end_ts=t_params[1])
 
-            query += f" ORDER BY id DESC LIMIT %s"
-            params.append(limit)
+            query += f" ORDER BY id DESC LIMIT :limit"
+            params['limit'] = limit
+            queries.append((query, params))
 
-            raw_results = self._execute_query(query, tuple(params))
+        table_results = await self._aexecute_many(queries)
+        for config, raw_results in zip(platform_configs, table_results):
+            table = config['table']
             for row in raw_results:
                 content = (row.get('title') or row.get('content') or row.get('desc') or row.get('content_text', ''))
                 time_key = config.get('time_col') and row.get(config.get('time_col'))
@@ -0,0 +1,139 @@
+"""
+话题检索后端
+
+为 MediaCrawlerDB 的话题搜索生成 WHERE 子句，根据数据库方言与已有索引选择可走索引的匹配方式：
+- MySQL: 若表上存在覆盖全部检索字段的 ngram FULLTEXT 索引，使用 `MATCH ... AGAINST` 布尔模式短语匹配；
+- PostgreSQL: 保持 `LIKE '%topic%'`，由 pg_trgm 的 GIN 索引直接加速，谓词无需改写；
+- 其他情况（索引缺失、关键词短于 ngram 长度、显式配置为 like）: 回退为逐字段 `LIKE` 以 OR 连接。
+
+索引由 MindSpider/schema/init_search_index.py 创建。
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from loguru import logger
+
+from ..utils.db import fetch_all
+from InsightEngine.utils.config import settings
+
+__all__ = [
+    "LikeSearchBackend",
+    "MySQLFulltextSearchBackend",
+    "get_search_backend",
+]
+
+
+class LikeSearchBackend:
+    """默认检索后端：逐字段 `LIKE '%topic%'`，任何方言下均可用"""
+
+    name = "like"
+
+    def __init__(self, dialect: Optional[str] = None):
+        self.dialect = (dialect or "mysql").lower()
+
+    def quote(self, field: str) -> str:
+        """根据数据库方言包装标识符"""
+        if self.dialect == "postgresql":
+            return f'"{field}"'
+        return f"`{field}`"
+
+    async def prepare(self, tables: Iterable[str]) -> None:
+        """预加载检索所需的索引元数据；LIKE 后端无需任何准备"""
+        return None
+
+    def build_clause(self, table: str, fields: List[str], topic: str, param_prefix: str = "term") -> Tuple[str, Dict[str, Any]]:
+        """
+        构建单表的话题匹配条件。
+
+        Returns:
+            (SQL 片段, 命名参数字典)，片段已带括号，可直接与其他条件 AND 组合。
+        """
+        params: Dict[str, Any] = {}
+        clauses = []
+        for idx, field in enumerate(fields):
+            pname = f"{param_prefix}_{idx}"
+            clauses.append(f"{self.quote(field)} LIKE :{pname}")
+            params[pname] = f"%{topic}%"
+        return f"({' OR '.join(clauses)})", params
+
+
+class MySQLFulltextSearchBackend(LikeSearchBackend):
+    """MySQL FULLTEXT (ngram) 检索后端，索引缺失的表自动回退到 LIKE"""
+
+    name = "mysql_fulltext"
+    # 与 MySQL 默认 ngram_token_size 一致，更短的关键词无法命中 ngram 索引
+    NGRAM_TOKEN_SIZE = 2
+
+    _INDEX_QUERY = (
+        "SELECT TABLE_NAME AS table_name, INDEX_NAME AS index_name, COLUMN_NAME AS column_name "
+        "FROM information_schema.STATISTICS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND INDEX_TYPE = 'FULLTEXT'"
+    )
+
+    def __init__(self, dialect: Optional[str] = "mysql"):
+        super().__init__(dialect)
+        self._fulltext_indexes: Optional[Dict[str, List[FrozenSet[str]]]] = None
+
+    async def prepare(self, tables: Iterable[str]) -> None:
+        if self._fulltext_indexes is not None:
+            return
+        indexes: Dict[Tuple[str, str], set] = {}
+        try:
+            for row in await fetch_all(self._INDEX_QUERY):
+                indexes.setdefault((row["table_name"], row["index_name"]), set()).add(row["column_name"])
+        except Exception as e:
+            logger.warning(f"读取FULLTEXT索引信息失败，话题检索回退为LIKE: {e}")
+        by_table: Dict[str, List[FrozenSet[str]]] = {}
+        for (table, _), columns in indexes.items():
+            by_table.setdefault(table, []).append(frozenset(columns))
+        self._fulltext_indexes = by_table
+
+        missing = [t for t in tables if t not in by_table]
+        if missing:
+            logger.info(f"以下表缺少FULLTEXT索引，将使用LIKE检索: {', '.join(missing)}")
+
+    def has_fulltext_index(self, table: str, fields: List[str]) -> bool:
+        """MATCH() 的列集合必须与某个FULLTEXT索引的列集合完全一致才能使用该索引"""
+        return frozenset(fields) in (self._fulltext_indexes or {}).get(table, [])
+
+    def build_clause(self, table: str, fields: List[str], topic: str, param_prefix: str = "term") -> Tuple[str, Dict[str, Any]]:
+        phrase = topic.replace('"', " ").strip()
+        if len(phrase) < self.NGRAM_TOKEN_SIZE or not self.has_fulltext_index(table, fields):
+            return super().build_clause(table, fields, topic, param_prefix)
+        columns = ", ".join(self.quote(field) for field in fields)
+        # 布尔模式下的双引号短语要求 ngram 连续出现，语义上接近子串匹配
+        return f"(MATCH({columns}) AGAINST (:{param_prefix} IN BOOLEAN MODE))", {param_prefix: f'"{phrase}"'}
+
+
+_backend: Optional[LikeSearchBackend] = None
+
+# 配置中常见的方言别名
+_DIALECT_ALIASES = {"postgres": "postgresql", "pgsql": "postgresql"}
+
+
+def _normalize_dialect(dialect: Optional[str]) -> str:
+    """规范化配置的方言名：忽略大小写与驱动后缀（如 postgresql+asyncpg），postgres 视为 postgresql"""
+    name = (dialect or "mysql").strip().lower().split("+", 1)[0]
+    return _DIALECT_ALIASES.get(name, name)
+
+
+def get_search_backend() -> LikeSearchBackend:
+    """
+    按配置返回进程内共享的检索后端。
+
+    INSIGHT_SEARCH_BACKEND:
+        - auto: MySQL 使用 FULLTEXT（缺索引时逐表回退 LIKE），其他方言使用 LIKE
+        - like: 始终使用 LIKE
+    """
+    global _backend
+    if _backend is None:
+        dialect = _normalize_dialect(settings.DB_DIALECT)
+        mode = (settings.INSIGHT_SEARCH_BACKEND or "auto").lower()
+        if mode == "auto" and dialect == "mysql":
+            _backend = MySQLFulltextSearchBackend(dialect)
+        else:
+            _backend = LikeSearchBackend(dialect)
+        logger.info(f"话题检索后端: {_backend.name} (dialect={dialect})")
+    return _backend
@@ -5,10 +5,21 @@
 
 import os
 import sys
+import threading
 from typing import List, Dict, Any, Optional, Union
 from dataclasses import dataclass
 import re
 
+from InsightEngine.utils.config import settings
+from .sentiment_cache import SentimentResultCache
+from .sentiment_onnx import (
+    MIN_LABEL_AGREEMENT,
+    ONNXRUNTIME_AVAILABLE,
+    OnnxSentimentModel,
+    compare_backends,
+    export_quantized_model,
+)
+
 try:
     import torch
 
@@ -90,6 +101,23 @@ class WeiboMultilingualSentimentAnalyzer:
         self.is_initialized = False
         self.is_disabled = False
         self.disable_reason: Optional[str] = None
+        self.model_name = "tabularisai/multilingual-sentiment-analysis"
+        # 推理后端：torch 或 onnx（int8 量化，仅在 initialize 成功导出并通过精度校验后启用）
+        self.inference_backend = "torch"
+        self.onnx_model: Optional[OnnxSentimentModel] = None
+        self.onnx_accuracy: Optional[Dict[str, float]] = None
+        # 分词器与模型由多个段落工作线程共享，推理串行执行（fast tokenizer 不支持并发调用）
+        self._inference_lock = threading.Lock()
+
+        # 结果缓存：键为模型名+规范化文本哈希，跨轮次/跨任务复用
+        self.cache: Optional[SentimentResultCache] = None
+        if settings.SENTIMENT_CACHE_ENABLED:
+            cache_path = settings.SENTIMENT_CACHE_PATH or os.path.join(
+                weibo_sentiment_path, "cache", "sentiment_cache.db"
+            )
+            self.cache = SentimentResultCache(
+                cache_path, self.model_name, settings.SENTIMENT_CACHE_MAX_ENTRIES
+            )
 
         # 情感标签映射（5级分类）
         self.sentiment_map = {
@@ -124,6 +152,8 @@ class WeiboMultilingualSentimentAnalyzer:
             self.model = None
             self.tokenizer = None
             self.device = None
+            self.onnx_model = None
+            self.inference_backend = "torch"
             self.is_initialized = False
 
     def enable(self) -> bool:
@@ -183,7 +213,7 @@ class WeiboMultilingualSentimentAnalyzer:
             assert AutoModelForSequenceClassification is not None
 
             # 使用多语言情感分析模型
-            model_name = "tabularisai/multilingual-sentiment-analysis"
+            model_name = self.model_name
             local_model_path = os.path.join(weibo_sentiment_path, "model")
 
             # 检查本地是否已有模型
@@ -218,6 +248,9 @@ class WeiboMultilingualSentimentAnalyzer:
             self.is_initialized = True
             self.enable()
 
+            if (settings.SENTIMENT_INFERENCE_BACKEND or "torch").lower() == "onnx":
+                self._init_onnx_backend(local_model_path)
+
             device_type = getattr(self.device, "type", str(self.device))
             if device_type == "cuda":
                 print("检测到可用 GPU，已优先使用 CUDA 进行推理。")
@@ -226,7 +259,12 @@ class WeiboMultilingualSentimentAnalyzer:
             else:
                 print("未检测到 GPU，自动使用 CPU 进行推理。")
 
-            print(f"模型加载成功! 使用设备: {self.device}")
+            if self.inference_backend == "onnx":
+                print(
+                    f"模型加载成功! 使用ONNX Runtime int8后端 (线程数: {settings.SENTIMENT_ONNX_THREADS or '自动'})"
+                )
+            else:
+                print(f"模型加载成功! 使用设备: {self.device}")
             print("支持语言: 中文、英文、西班牙文、阿拉伯文、日文、韩文等22种语言")
             print("情感等级: 非常负面、负面、中性、正面、非常正面")
 
@@ -239,6 +277,60 @@ class WeiboMultilingualSentimentAnalyzer:
             self.disable(error_message, drop_state=True)
             return False
 
+    def _init_onnx_backend(self, local_model_path: str) -> bool:
+        """
+        导出（或复用已缓存的）int8 ONNX 模型，并与 PyTorch 输出做精度校验
+
+        校验通过后切换到 ONNX 后端并释放 PyTorch 模型；任何失败都保留 PyTorch 后端。
+
+        Args:
+            local_model_path: 本地模型目录
+
+        Returns:
+            是否已切换到 ONNX 后端
+        """
+        if not ONNXRUNTIME_AVAILABLE:
+            print("未安装 onnxruntime，情感分析继续使用 PyTorch 后端。")
+            return False
+
+        try:
+            onnx_path = export_quantized_model(
+                self.model, self.tokenizer, local_model_path
+            )
+            onnx_model = OnnxSentimentModel(onnx_path, settings.SENTIMENT_ONNX_THREADS)
+            self.onnx_model = onnx_model
+            report = compare_backends(
+                lambda texts: self._predict_probabilities(
+                    list(texts), len(texts), backend="torch"
+                ),
+                lambda texts: self._predict_probabilities(
+                    list(texts), len(texts), backend="onnx"
+                ),
+            )
+        except Exception as e:
+            self.onnx_model = None
+            print(f"ONNX 后端初始化失败，继续使用 PyTorch 后端: {e}")
+            return False
+
+        self.onnx_accuracy = report
+        print(
+            f"ONNX int8 精度校验: 标签一致率 {report['label_agreement']:.2%}，"
+            f"概率最大误差 {report['max_prob_diff']:.4f}"
+        )
+        if report["label_agreement"] < MIN_LABEL_AGREEMENT:
+            self.onnx_model = None
+            print(
+                f"ONNX int8 标签一致率低于 {MIN_LABEL_AGREEMENT:.0%}，继续使用 PyTorch 后端。"
+            )
+            return False
+
+        self.inference_backend = "onnx"
+        # 量化模型的输出与全精度模型不完全一致，缓存按后端区分
+        if self.cache is not None:
+            self.cache.model_name = f"{self.model_name}#onnx-int8"
+        self.model = None
+        return True
+
     def _preprocess_text(self, text: str) -> str:
         """
         文本预处理
@@ -258,6 +350,132 @@ class WeiboMultilingualSentimentAnalyzer:
 
         return text
 
+    def _build_success_result(
+        self, text: str, probabilities: List[float]
+    ) -> SentimentResult:
+        """
+        根据单条文本的概率分布构建分析结果
+
+        Args:
+            text: 原始文本
+            probabilities: 按标签顺序排列的softmax概率
+
+        Returns:
+            SentimentResult对象
+        """
+        prediction = max(range(len(probabilities)), key=probabilities.__getitem__)
+        prob_dist = {
+            label_name: prob
+            for label_name, prob in zip(self.sentiment_map.values(), probabilities)
+        }
+        return SentimentResult(
+            text=text,
+            sentiment_label=self.sentiment_map[prediction],
+            confidence=probabilities[prediction],
+            probability_distribution=prob_dist,
+            success=True,
+        )
+
+    def _predict_probabilities(
+        self,
+        texts: List[str],
+        batch_size: int,
+        show_progress: bool = False,
+        backend: Optional[str] = None,
+    ) -> List[List[float]]:
+        """
+        按长度分桶的小批量推理
+
+        先整体分词（不填充），按token长度排序后切分为小批次，
+        每批只填充到批内最长序列，一次前向、一次softmax，再按原顺序还原。
+
+        Args:
+            texts: 已预处理的非空文本列表
+            batch_size: 每批文本数
+            show_progress: 是否显示进度
+            backend: 推理后端，默认使用当前启用的后端
+
+        Returns:
+            与texts顺序一致的概率分布列表
+        """
+        assert self.tokenizer is not None
+        use_onnx = (backend or self.inference_backend) == "onnx"
+        if use_onnx:
+            assert self.onnx_model is not None
+        else:
+            assert torch is not None
+            assert self.model is not None
+
+        with self._inference_lock:
+            return self._predict_probabilities_locked(
+                texts, batch_size, show_progress, use_onnx
+            )
+
+    def _predict_probabilities_locked(
+        self, texts: List[str], batch_size: int, show_progress: bool, use_onnx: bool
+    ) -> List[List[float]]:
+        """在推理锁内执行 _predict_probabilities 的分词、分批与前向计算"""
+        encodings = self.tokenizer(texts, max_length=512, truncation=True)
+        keys = list(encodings.keys())
+        order = sorted(range(len(texts)), key=lambda i: len(encodings["input_ids"][i]))
+        probabilities: List[List[float]] = [[] for _ in texts]
+
+        for start in range(0, len(order), batch_size):
+            indices = order[start : start + batch_size]
+            if show_progress and len(texts) > batch_size:
+                print(f"处理进度: {min(start + batch_size, len(texts))}/{len(texts)}")
+            features = [{key: encodings[key][i] for key in keys} for i in indices]
+            if use_onnx:
+                inputs = self.tokenizer.pad(features, padding=True, return_tensors="np")
+                batch_probabilities = self.onnx_model.predict_proba(inputs)
+            else:
+                inputs = self.tokenizer.pad(features, padding=True, return_tensors="pt")
+                inputs = {k: v.to(self.device) for k, v in inputs.items()}
+                with torch.inference_mode():
+                    logits = self.model(**inputs).logits
+                    batch_probabilities = torch.softmax(logits, dim=1).cpu().tolist()
+            for i, row in zip(indices, batch_probabilities):
+                probabilities[i] = row
+
+        return probabilities
+
+    def _cache_lookup(self, processed_texts: List[str]) -> Dict[str, List[float]]:
+        """
+        查询结果缓存
+
+        Args:
+            processed_texts: 已预处理的文本列表
+
+        Returns:
+            命中的 {预处理文本: 概率分布}，缓存不可用时为空
+        """
+        if self.cache is None:
+            return {}
+        unique_texts = list(dict.fromkeys(processed_texts))
+        try:
+            keys = {self.cache.make_key(text): text for text in unique_texts}
+            found = self.cache.get_many(keys)
+        except Exception as e:
+            print(f"读取情感分析缓存失败，本次不使用缓存: {e}")
+            return {}
+        return {keys[key]: probabilities for key, probabilities in found.items()}
+
+    def _cache_store(self, inferred: Dict[str, List[float]]) -> None:
+        """
+        写入结果缓存，失败不影响分析结果
+
+        Args:
+            inferred: {预处理文本: 概率分布}
+        """
+        if self.cache is None or not inferred:
+            return
+        try:
+            self.cache.put_many(
+                {self.cache.make_key(text): row for text, row in inferred.items()}
+            )
+        except Exception as e:
+            print(f"写入情感分析缓存失败: {e}")
+
     def analyze_single_text(self, text: str) -> SentimentResult:
         """
         对单个文本进行情感分析
@@ -304,44 +522,9 @@ class WeiboMultilingualSentimentAnalyzer:
                     error_message="输入文本为空或无效内容",
                     analysis_performed=False,
                 )
-            assert self.tokenizer is not None
-            # 分词编码
-            inputs = self.tokenizer(
-                processed_text,
-                max_length=512,
-                padding=True,
-                truncation=True,
-                return_tensors="pt",
-            )
-
-            # 转移到设备
-            inputs = {k: v.to(self.device) for k, v in inputs.items()}
-
-            # 预测
-            assert torch is not None
-            assert self.model is not None
-            with torch.no_grad():
-                outputs = self.model(**inputs)
-                logits = outputs.logits
-                probabilities = torch.softmax(logits, dim=1)
-                prediction = int(torch.argmax(probabilities, dim=1).item())
-
-            # 构建结果
-            confidence = probabilities[0][prediction].item()
-            label = self.sentiment_map[prediction]
-
-            # 构建概率分布字典
-            prob_dist = {}
-            for label_name, prob in zip(self.sentiment_map.values(), probabilities[0]):
-                prob_dist[label_name] = prob.item()
-
-            return SentimentResult(
-                text=text,
-                sentiment_label=label,
-                confidence=confidence,
-                probability_distribution=prob_dist,
-                success=True,
-            )
+            # 单条文本即一个无填充的批次，与批量路径共用推理后端
+            probabilities = self._predict_probabilities([processed_text], 1)[0]
+            return self._build_success_result(text, probabilities)
 
         except Exception as e:
             return SentimentResult(
@@ -355,14 +538,20 @@ class WeiboMultilingualSentimentAnalyzer:
             )
 
     def analyze_batch(
-        self, texts: List[str], show_progress: bool = True
+        self,
+        texts: List[str],
+        show_progress: bool = True,
+        batch_size: Optional[int] = None,
     ) -> BatchSentimentResult:
         """
         批量情感分析
+        空文本直接返回输入错误；其余文本先查结果缓存，仅对未命中的文本按长度分桶做小批量推理；
+        批量推理失败时逐条回退到单文本分析，以便定位出错文本
 
         Args:
             texts: 文本列表
             show_progress: 是否显示进度
+            batch_size: 每批文本数，默认使用配置 SENTIMENT_BATCH_SIZE
 
         Returns:
             BatchSentimentResult对象
@@ -399,18 +588,51 @@ class WeiboMultilingualSentimentAnalyzer:
                 analysis_performed=False,
             )
 
-        results = []
-        success_count = 0
-        total_confidence = 0.0
-
+        batch_size = max(1, batch_size or settings.SENTIMENT_BATCH_SIZE)
+        results: List[Optional[SentimentResult]] = [None] * len(texts)
+        valid_indices = []
+        processed_texts = []
         for i, text in enumerate(texts):
-            if show_progress and len(texts) > 1:
-                print(f"处理进度: {i + 1}/{len(texts)}")
-
-            result = self.analyze_single_text(text)
-            results.append(result)
+            processed_text = self._preprocess_text(text)
+            if processed_text:
+                valid_indices.append(i)
+                processed_texts.append(processed_text)
+            else:
+                # 与单文本路径一致：空文本不进入模型
+                results[i] = self.analyze_single_text(text)
+
+        if processed_texts:
+            # 先查缓存，模型只推理未命中且去重后的文本
+            cached = self._cache_lookup(processed_texts)
+            pending = list(
+                dict.fromkeys(t for t in processed_texts if t not in cached)
+            )
+            try:
+                if pending:
+                    probabilities = self._predict_probabilities(
+                        pending, batch_size, show_progress=show_progress
+                    )
+                    inferred = dict(zip(pending, probabilities))
+                    self._cache_store(inferred)
+                    cached.update(inferred)
+                for i, processed_text in zip(valid_indices, processed_texts):
+                    results[i] = self._build_success_result(
+                        texts[i], cached[processed_text]
+                    )
+            except Exception as e:
+                print(f"批量推理失败，回退为逐条分析: {e}")
+                for i, processed_text in zip(valid_indices, processed_texts):
+                    if processed_text in cached:
+                        results[i] = self._build_success_result(
+                            texts[i], cached[processed_text]
+                        )
+                    else:
+                        results[i] = self.analyze_single_text(texts[i])
 
-            if result.success:
+        success_count = 0
+        total_confidence = 0.0
+        for result in results:
+            if result is not None and result.success:
                 success_count += 1
                 total_confidence += result.confidence
 
@@ -420,7 +642,7 @@ class WeiboMultilingualSentimentAnalyzer:
         failed_count = len(texts) - success_count
 
         return BatchSentimentResult(
-            results=results,
+            results=[result for result in results if result is not None],
             total_processed=len(texts),
             success_count=success_count,
             failed_count=failed_count,
@@ -597,7 +819,7 @@ class WeiboMultilingualSentimentAnalyzer:
             模型信息字典
         """
         return {
-            "model_name": "tabularisai/multilingual-sentiment-analysis",
+            "model_name": self.model_name,
             "supported_languages": [
                 "中文",
                 "英文",
@@ -625,6 +847,9 @@ class WeiboMultilingualSentimentAnalyzer:
             "sentiment_levels": list(self.sentiment_map.values()),
             "is_initialized": self.is_initialized,
             "device": str(self.device) if self.device else "未设置",
+            "inference_backend": self.inference_backend,
+            "onnx_accuracy": self.onnx_accuracy,
+            "cache": self.cache.stats() if self.cache else {"enabled": False},
         }
 
 
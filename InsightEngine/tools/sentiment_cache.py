@@ -0,0 +1,137 @@
+"""
+情感分析结果缓存
+以「模型名 + 规范化文本」的哈希为键，将概率分布持久化到本地SQLite，
+跨反思轮次、跨研究任务乃至跨引擎进程复用，模型只需推理未命中的文本。
+按条目数做LRU淘汰：命中时刷新访问时间，超过上限时删除最久未访问的条目。
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+
+class SentimentResultCache:
+    """基于SQLite的情感分析概率分布缓存（线程安全，多进程共享同一文件）"""
+
+    # 超出上限时一次多淘汰的比例，避免每次写入都触发删除
+    EVICTION_SLACK = 0.1
+
+    def __init__(self, db_path: str, model_name: str, max_entries: int = 200000):
+        self.db_path = db_path
+        self.model_name = model_name
+        self.max_entries = max(1, max_entries)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sentiment_cache ("
+                "cache_key TEXT PRIMARY KEY, "
+                "probabilities TEXT NOT NULL, "
+                "last_access REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_sentiment_cache_access "
+                "ON sentiment_cache (last_access)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def make_key(self, normalized_text: str) -> str:
+        """生成缓存键：模型名与规范化文本的SHA-256"""
+        payload = f"{self.model_name}\x00{normalized_text}".encode("utf-8")
+        return hashlib.sha256(payload).hexdigest()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, List[float]]:
+        """
+        批量查询缓存并刷新命中条目的访问时间
+
+        Args:
+            keys: 缓存键
+
+        Returns:
+            命中的 {缓存键: 概率分布}
+        """
+        unique_keys = list(dict.fromkeys(keys))
+        if not unique_keys:
+            return {}
+        found: Dict[str, List[float]] = {}
+        with self._lock:
+            conn = self._connect()
+            # SQLite 默认最多 999 个绑定参数
+            for start in range(0, len(unique_keys), 500):
+                chunk = unique_keys[start : start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT cache_key, probabilities FROM sentiment_cache "
+                    f"WHERE cache_key IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+                for cache_key, probabilities in rows:
+                    found[cache_key] = json.loads(probabilities)
+            if found:
+                now = time.time()
+                conn.executemany(
+                    "UPDATE sentiment_cache SET last_access = ? WHERE cache_key = ?",
+                    [(now, cache_key) for cache_key in found],
+                )
+                conn.commit()
+            self.hits += len(found)
+            self.misses += len(unique_keys) - len(found)
+        return found
+
+    def put_many(self, entries: Dict[str, List[float]]) -> None:
+        """
+        批量写入缓存，必要时按LRU淘汰
+
+        Args:
+            entries: {缓存键: 概率分布}
+        """
+        if not entries:
+            return
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.executemany(
+                "INSERT OR REPLACE INTO sentiment_cache (cache_key, probabilities, last_access) "
+                "VALUES (?, ?, ?)",
+                [(key, json.dumps(value), now) for key, value in entries.items()],
+            )
+            total = conn.execute("SELECT COUNT(*) FROM sentiment_cache").fetchone()[0]
+            if total > self.max_entries:
+                target = int(self.max_entries * (1 - self.EVICTION_SLACK))
+                conn.execute(
+                    "DELETE FROM sentiment_cache WHERE cache_key IN ("
+                    "SELECT cache_key FROM sentiment_cache ORDER BY last_access LIMIT ?)",
+                    (total - target,),
+                )
+            conn.commit()
+
+    def stats(self) -> Dict[str, object]:
+        """返回命中统计"""
+        lookups = self.hits + self.misses
+        return {
+            "path": self.db_path,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "max_entries": self.max_entries,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -10,7 +10,7 @@ from __future__ import annotations
 from urllib.parse import quote_plus
 import asyncio
 import os
-from typing import Any, Dict, Iterable, List, Optional, Union
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy import text
@@ -18,10 +18,16 @@ from InsightEngine.utils.config import settings
 
 __all__ = [
     "get_async_engine",
+    "dispose_async_engine",
     "fetch_all",
 ]
 
 
+# 异步连接池与创建它的事件循环绑定，不能跨循环使用。同步工具接口（含段落并行的各工作线程）
+# 统一提交到 tools/search.py 中唯一的后台事件循环，直接 await 异步接口的调用方则在各自的循环上，
+# 因此按事件循环缓存引擎。引擎的连接会引用其循环，弱引用无法自动回收，
+# 临时事件循环结束前应调用 dispose_async_engine；已关闭循环的引擎在下次创建引擎时清理
+_engines: Dict[int, Tuple[asyncio.AbstractEventLoop, AsyncEngine]] = {}
 _engine: Optional[AsyncEngine] = None
 
 
@@ -46,16 +52,43 @@ def _build_database_url() -> str:
     return f"mysql+aiomysql://{user}:{password}@{host}:{port}/{db_name}"
 
 
+def _create_engine() -> AsyncEngine:
+    database_url: str = _build_database_url()
+    engine_kwargs: Dict[str, Any] = {"pool_pre_ping": True, "pool_recycle": 1800}
+    if not database_url.startswith("sqlite"):
+        # 连接池至少容纳一次工具调用的全部并发查询，避免多表并发时排队等待连接
+        engine_kwargs["pool_size"] = max(5, settings.DB_QUERY_CONCURRENCY)
+    return create_async_engine(database_url, **engine_kwargs)
+
+
 def get_async_engine() -> AsyncEngine:
+    """
+    获取当前事件循环专属的异步引擎；不在事件循环中调用时返回进程级默认引擎。
+    """
     global _engine
-    if _engine is None:
-        database_url: str = _build_database_url()
-        _engine = create_async_engine(
-            database_url,
-            pool_pre_ping=True,
-            pool_recycle=1800,
-        )
-    return _engine
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        if _engine is None:
+            _engine = _create_engine()
+        return _engine
+    entry = _engines.get(id(loop))
+    if entry is None or entry[0] is not loop:
+        for key, (other_loop, _) in list(_engines.items()):
+            if other_loop.is_closed():
+                _engines.pop(key, None)
+        entry = (loop, _create_engine())
+        _engines[id(loop)] = entry
+    return entry[1]
+
+
+async def dispose_async_engine() -> None:
+    """关闭并移除当前事件循环专属的异步引擎（在临时事件循环结束前调用）"""
+    loop = asyncio.get_running_loop()
+    entry = _engines.get(id(loop))
+    if entry is not None and entry[0] is loop:
+        _engines.pop(id(loop), None)
+        await entry[1].dispose()
 
 
 async def fetch_all(query: str, params: Optional[Union[Iterable[Any], Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
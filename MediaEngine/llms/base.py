@@ -4,7 +4,7 @@ Unified OpenAI-compatible LLM client for the Media Engine, with retry support.
 
 import os
 import sys
-from datetime import datetime
+from contextlib import nullcontext
 from typing import Any, Dict, Optional, Generator
 from loguru import logger
 
@@ -27,13 +27,34 @@ except ImportError:
 
     LLM_RETRY_CONFIG = None
 
+from prompt_cache import (
+    PromptCacheStats,
+    build_messages,
+    cache_params_from_kwargs,
+    create_chat_stream,
+    record_usage,
+    time_note,
+)
+
+try:
+    from rate_limiter import RateLimiter, get_rate_limiter
+except ImportError:
+    RateLimiter = None  # type: ignore
+    get_rate_limiter = None  # type: ignore
+
 
 class LLMClient:
     """
     Minimal wrapper around the OpenAI-compatible chat completion API.
     """
 
-    def __init__(self, api_key: str, model_name: str, base_url: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: str,
+        model_name: str,
+        base_url: Optional[str] = None,
+        rate_limiter: Optional["RateLimiter"] = None,
+    ):
         if not api_key:
             raise ValueError("Media Engine LLM API key is required.")
         if not model_name:
@@ -56,32 +77,37 @@ class LLMClient:
         if base_url:
             client_kwargs["base_url"] = base_url
         self.client = OpenAI(**client_kwargs)
+        # 可选限流器：并行处理段落时限制对LLM接口的并发数与请求速率
+        self.rate_limiter = rate_limiter
+        # 统计prompt token与前缀缓存命中情况；流式请求通过 stream_options 获取usage
+        self.cache_stats = PromptCacheStats()
+        self.stream_usage = os.getenv("LLM_STREAM_INCLUDE_USAGE", "true").lower() not in ("0", "false", "no")
+
+    def _rate_limit(self):
+        """返回限流上下文；未配置限流器时不做限制"""
+        if self.rate_limiter is None:
+            return nullcontext()
+        return self.rate_limiter.limit()
 
     @with_retry(LLM_RETRY_CONFIG)
     def invoke(self, system_prompt: str, user_prompt: str, **kwargs) -> str:
-        current_time = datetime.now().strftime("%Y年%m月%d日%H时%M分")
-        time_prefix = f"今天的实际时间是{current_time}"
-        if user_prompt:
-            user_prompt = f"{time_prefix}\n{user_prompt}"
-        else:
-            user_prompt = time_prefix
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ]
+        messages = build_messages(system_prompt, user_prompt, suffix=time_note())
 
         allowed_keys = {"temperature", "top_p", "presence_penalty", "frequency_penalty", "stream"}
         extra_params = {key: value for key, value in kwargs.items() if key in allowed_keys and value is not None}
+        extra_params.update(cache_params_from_kwargs(kwargs))
 
         timeout = kwargs.pop("timeout", self.timeout)
 
-        response = self.client.chat.completions.create(
-            model=self.model_name,
-            messages=messages,
-            timeout=timeout,
-            **extra_params,
-        )
+        with self._rate_limit():
+            response = self.client.chat.completions.create(
+                model=self.model_name,
+                messages=messages,
+                timeout=timeout,
+                **extra_params,
+            )
 
+        record_usage(self.cache_stats, getattr(response, "usage", None))
         if response.choices and response.choices[0].message:
             return self.validate_response(response.choices[0].message.content)
         return ""
@@ -98,37 +124,33 @@ class LLMClient:
         Yields:
             响应文本块（str）
         """
-        current_time = datetime.now().strftime("%Y年%m月%d日%H时%M分")
-        time_prefix = f"今天的实际时间是{current_time}"
-        if user_prompt:
-            user_prompt = f"{time_prefix}\n{user_prompt}"
-        else:
-            user_prompt = time_prefix
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ]
+        messages = build_messages(system_prompt, user_prompt, suffix=time_note())
 
         allowed_keys = {"temperature", "top_p", "presence_penalty", "frequency_penalty"}
         extra_params = {key: value for key, value in kwargs.items() if key in allowed_keys and value is not None}
+        extra_params.update(cache_params_from_kwargs(kwargs))
         # 强制使用流式
         extra_params["stream"] = True
+        if self.stream_usage:
+            extra_params["stream_options"] = {"include_usage": True}
 
         timeout = kwargs.pop("timeout", self.timeout)
 
         try:
-            stream = self.client.chat.completions.create(
-                model=self.model_name,
-                messages=messages,
-                timeout=timeout,
-                **extra_params,
-            )
-            
-            for chunk in stream:
-                if chunk.choices and len(chunk.choices) > 0:
-                    delta = chunk.choices[0].delta
-                    if delta and delta.content:
-                        yield delta.content
+            # 流式请求在整个读取过程中占用一个并发名额
+            with self._rate_limit():
+                stream = create_chat_stream(self.client, self.model_name, messages, timeout, extra_params)
+                # 接口不支持时 stream_options 已被移除，后续请求不再申请usage
+                self.stream_usage = "stream_options" in extra_params
+
+                for chunk in stream:
+                    # 开启include_usage时，最后一个chunk的choices为空、只携带usage
+                    if getattr(chunk, "usage", None):
+                        record_usage(self.cache_stats, chunk.usage)
+                    if chunk.choices and len(chunk.choices) > 0:
+                        delta = chunk.choices[0].delta
+                        if delta and delta.content:
+                            yield delta.content
         except Exception as e:
             logger.error(f"流式请求失败: {str(e)}")
             raise e
@@ -167,4 +189,5 @@ class LLMClient:
             "provider": self.provider,
             "model": self.model_name,
             "api_base": self.base_url or "default",
+            "prompt_cache": self.cache_stats.snapshot(),
         }
@@ -72,9 +72,59 @@ class DatabaseManager:
 
     # ==================== 新闻数据操作 ====================
 
+    def _build_daily_news_rows(self, news_data: List[Dict], crawl_date: date) -> List[Dict]:
+        """把新闻数据转换为 daily_news 行，同一批次内重复的 news_id 只保留第一条"""
+        current_timestamp = int(datetime.now().timestamp())
+        rows: Dict[str, Dict] = {}
+        for news_item in news_data:
+            # news_item.get('id') 已经是完整的 news_id（格式：source_item_id）
+            # 为了支持同一条新闻在不同日期出现，将 crawl_date 加入到 news_id 中
+            base_news_id = news_item.get(
+                'id') or f"{news_item.get('source', 'unknown')}_rank_{news_item.get('rank', 0)}"
+            # 将日期格式化为字符串并加入到 news_id 中，确保全局唯一性
+            news_id = f"{base_news_id}_{crawl_date.strftime('%Y%m%d')}"
+            if news_id in rows:
+                continue
+
+            title_val = (news_item.get("title", "") or "")
+            if len(title_val) > 500:
+                title_val = title_val[:500]
+            rows[news_id] = {
+                "news_id": news_id,
+                "source_platform": news_item.get("source", "unknown"),
+                "title": title_val,
+                "url": news_item.get("url", ""),
+                "crawl_date": crawl_date,
+                "rank_position": news_item.get("rank", None),
+                "add_ts": current_timestamp,
+                "last_modify_ts": current_timestamp,
+            }
+        return list(rows.values())
+
+    def _daily_news_upsert_sql(self) -> str:
+        """daily_news 的批量 upsert 语句（按数据库方言选择 ON CONFLICT / ON DUPLICATE KEY）"""
+        insert_sql = """
+            INSERT INTO daily_news (
+                news_id, source_platform, title, url, crawl_date,
+                rank_position, add_ts, last_modify_ts
+            ) VALUES (:news_id, :source_platform, :title, :url, :crawl_date, :rank_position, :add_ts, :last_modify_ts)
+        """
+        if self.engine.dialect.name == "postgresql":
+            return insert_sql + """
+            ON CONFLICT (news_id) DO UPDATE SET
+                title = EXCLUDED.title, url = EXCLUDED.url, rank_position = EXCLUDED.rank_position,
+                last_modify_ts = EXCLUDED.last_modify_ts
+            """
+        return insert_sql + """
+            ON DUPLICATE KEY UPDATE
+                title = VALUES(title), url = VALUES(url), rank_position = VALUES(rank_position),
+                last_modify_ts = VALUES(last_modify_ts)
+        """
+
     def save_daily_news(self, news_data: List[Dict], crawl_date: date = None) -> int:
         """
         保存每日新闻数据，如果当天已有数据则覆盖
+        删除当天旧数据与批量 upsert 在同一事务中完成；批量写入失败时退回逐条写入，单条失败不影响其他新闻
 
         Args:
             news_data: 新闻数据列表
@@ -86,54 +136,36 @@ class DatabaseManager:
         if not crawl_date:
             crawl_date = date.today()
 
-        current_timestamp = int(datetime.now().timestamp())
-
         try:
-            saved_count = 0
+            rows = self._build_daily_news_rows(news_data, crawl_date)
+            upsert = text(self._daily_news_upsert_sql())
+
+            try:
+                with self.engine.begin() as conn:
+                    deleted = conn.execute(text("DELETE FROM daily_news WHERE crawl_date = :d"), {"d": crawl_date}).rowcount
+                    if deleted and deleted > 0:
+                        logger.info(f"覆盖模式：删除了当天已有的 {deleted} 条新闻记录")
+                    if rows:
+                        conn.execute(upsert, rows)
+                logger.info(f"成功保存 {len(rows)} 条新闻记录")
+                return len(rows)
+            except Exception as e:
+                logger.warning(f"批量保存新闻失败，改为逐条保存: {e}")
+
             # 先独立事务执行删除，防止后续插入失败导致无法清理
             with self.engine.begin() as conn:
-                deleted = conn.execute(text("DELETE FROM daily_news WHERE crawl_date = :d"), {"d": crawl_date}).rowcount
-                if deleted and deleted > 0:
-                    logger.info(f"覆盖模式：删除了当天已有的 {deleted} 条新闻记录")
-
-            # 逐条插入，单条失败不影响后续（每条独立事务）
-            for news_item in news_data:
-                try:
-                    # news_item.get('id') 已经是完整的 news_id（格式：source_item_id）
-                    # 为了支持同一条新闻在不同日期出现，将 crawl_date 加入到 news_id 中
-                    base_news_id = news_item.get(
-                        'id') or f"{news_item.get('source', 'unknown')}_rank_{news_item.get('rank', 0)}"
-                    # 将日期格式化为字符串并加入到 news_id 中，确保全局唯一性
-                    news_id = f"{base_news_id}_{crawl_date.strftime('%Y%m%d')}"
-
-                    title_val = (news_item.get("title", "") or "")
-                    if len(title_val) > 500:
-                        title_val = title_val[:500]
-                    with self.engine.begin() as conn:
-                        conn.execute(
-                            text(
-                                """
-                                INSERT INTO daily_news (
-                                    news_id, source_platform, title, url, crawl_date,
-                                    rank_position, add_ts, last_modify_ts
-                                ) VALUES (:news_id, :source_platform, :title, :url, :crawl_date, :rank_position, :add_ts, :last_modify_ts)
-                                """
-                            ),
-                            {
-                                "news_id": news_id,
-                                "source_platform": news_item.get("source", "unknown"),
-                                "title": title_val,
-                                "url": news_item.get("url", ""),
-                                "crawl_date": crawl_date,
-                                "rank_position": news_item.get("rank", None),
-                                "add_ts": current_timestamp,
-                                "last_modify_ts": current_timestamp,
-                            },
-                        )
-                    saved_count += 1
-                except Exception as e:
-                    logger.exception(f"保存单条新闻失败: {e}")
-                    continue
+                conn.execute(text("DELETE FROM daily_news WHERE crawl_date = :d"), {"d": crawl_date})
+
+            saved_count = 0
+            with self.engine.connect() as conn:
+                for row in rows:
+                    try:
+                        with conn.begin():
+                            conn.execute(upsert, row)
+                        saved_count += 1
+                    except Exception as e:
+                        logger.exception(f"保存单条新闻失败: {e}")
+                        continue
             logger.info(f"成功保存 {saved_count} 条新闻记录")
             return saved_count
         except Exception as e:
@@ -7,11 +7,13 @@ BroadTopicExtraction模块 - 新闻获取和收集
 
 import sys
 import asyncio
+import time
 import httpx
 import json
 from datetime import datetime, date
 from pathlib import Path
 from typing import List, Dict, Optional
+from urllib.parse import urlsplit
 from loguru import logger
 
 # 添加项目根目录到路径
@@ -19,6 +21,7 @@ project_root = Path(__file__).parent.parent
 sys.path.append(str(project_root))
 
 try:
+    import config
     from BroadTopicExtraction.database_manager import DatabaseManager
 except ImportError as e:
     raise ImportError(f"导入模块失败: {e}")
@@ -42,13 +45,56 @@ SOURCE_NAMES = {
     "xueqiu": "雪球热榜"
 }
 
+REQUEST_HEADERS = {
+    "Accept": "application/json, text/plain, */*",
+    "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/124.0.0.0 Safari/537.36"
+    ),
+    "Referer": BASE_URL,
+    "Connection": "keep-alive",
+}
+
+
+class HostRateLimiter:
+    """按主机限速：同一主机相邻两次请求的发起时间至少间隔 min_interval 秒"""
+    
+    def __init__(self, min_interval: float = 0.2):
+        self.min_interval = max(0.0, min_interval)
+        self._next_slot: Dict[str, float] = {}
+    
+    async def wait(self, url: str):
+        """为该 URL 所在主机预约下一个发送时间点并等待"""
+        if not self.min_interval:
+            return
+        host = urlsplit(url).netloc
+        now = time.monotonic()
+        slot = max(now, self._next_slot.get(host, 0.0))
+        self._next_slot[host] = slot + self.min_interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
 class NewsCollector:
     """新闻收集器 - 整合API调用和数据库存储"""
     
-    def __init__(self):
-        """初始化新闻收集器"""
+    def __init__(self, max_concurrency: Optional[int] = None, host_min_interval: Optional[float] = None):
+        """
+        初始化新闻收集器
+        
+        Args:
+            max_concurrency: 同时请求的新闻源数量，默认使用 NEWS_FETCH_CONCURRENCY
+            host_min_interval: 同一主机相邻请求的最小间隔（秒），默认使用 NEWS_HOST_MIN_INTERVAL
+        """
         self.db_manager = DatabaseManager()
         self.supported_sources = list(SOURCE_NAMES.keys())
+        self.max_concurrency = max(1, max_concurrency or config.settings.NEWS_FETCH_CONCURRENCY)
+        if host_min_interval is None:
+            host_min_interval = config.settings.NEWS_HOST_MIN_INTERVAL
+        self.rate_limiter = HostRateLimiter(host_min_interval)
+        self._client: Optional[httpx.AsyncClient] = None
     
     def close(self):
         """关闭资源"""
@@ -65,38 +111,45 @@ class NewsCollector:
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
         self.close()
     
     # ==================== 新闻API调用 ====================
     
+    def _get_client(self) -> httpx.AsyncClient:
+        """所有新闻源共用一个带连接池的客户端，复用 TCP/TLS 连接"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=30.0,
+                follow_redirects=True,
+                headers=REQUEST_HEADERS,
+                limits=httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency),
+            )
+        return self._client
+    
+    async def aclose(self):
+        """关闭HTTP客户端"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
     async def fetch_news(self, source: str) -> dict:
         """从指定源获取最新新闻"""
         url = f"{BASE_URL}/api/s?id={source}&latest"
-        headers = {
-            "Accept": "application/json, text/plain, */*",
-            "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/124.0.0.0 Safari/537.36"
-            ),
-            "Referer": BASE_URL,
-            "Connection": "keep-alive",
-        }
         
         try:
-            async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
-                response = await client.get(url, headers=headers)
-                response.raise_for_status()
-                
-                # 解析JSON响应
-                data = response.json()
-                return {
-                    "source": source,
-                    "status": "success",
-                    "data": data,
-                    "timestamp": datetime.now().isoformat()
-                }
+            await self.rate_limiter.wait(url)
+            response = await self._get_client().get(url)
+            response.raise_for_status()
+            
+            # 解析JSON响应
+            data = response.json()
+            return {
+                "source": source,
+                "status": "success",
+                "data": data,
+                "timestamp": datetime.now().isoformat()
+            }
         except httpx.TimeoutException:
             return {
                 "source": source,
@@ -120,19 +173,20 @@ class NewsCollector:
             }
     
     async def get_popular_news(self, sources: List[str] = None) -> List[dict]:
-        """获取热门新闻"""
+        """获取热门新闻（有限并发，同一主机的请求按最小间隔错开）"""
         if sources is None:
             sources = list(SOURCE_NAMES.keys())
         
-        logger.info(f"正在获取 {len(sources)} 个新闻源的最新内容...")
+        logger.info(f"正在获取 {len(sources)} 个新闻源的最新内容（并发 {self.max_concurrency}）...")
         logger.info("=" * 80)
         
-        results = []
-        for source in sources:
-            source_name = SOURCE_NAMES.get(source, source)
-            logger.info(f"正在获取 {source_name} 的新闻...")
-            result = await self.fetch_news(source)
-            results.append(result)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        async def fetch_with_limit(source: str) -> dict:
+            async with semaphore:
+                source_name = SOURCE_NAMES.get(source, source)
+                logger.info(f"正在获取 {source_name} 的新闻...")
+                result = await self.fetch_news(source)
             
             if result["status"] == "success":
                 data = result["data"]
@@ -143,11 +197,10 @@ class NewsCollector:
                     logger.info(f"✓ {source_name}: 获取成功")
             else:
                 logger.error(f"✗ {source_name}: {result.get('error', '获取失败')}")
-            
-            # 避免请求过快
-            await asyncio.sleep(0.5)
+            return result
         
-        return results
+        # gather 保持结果顺序与 sources 一致
+        return list(await asyncio.gather(*(fetch_with_limit(source) for source in sources)))
     
     # ==================== 数据处理和存储 ====================
     
@@ -178,8 +231,11 @@ class NewsCollector:
         logger.info(collection_summary_message)
         
         try:
-            # 获取新闻数据
-            results = await self.get_popular_news(sources)
+            # 获取新闻数据，本轮请求结束后释放连接池（收集器可能在多个事件循环中被复用）
+            try:
+                results = await self.get_popular_news(sources)
+            finally:
+                await self.aclose()
             
             # 处理结果
             processed_data = self._process_news_results(results)
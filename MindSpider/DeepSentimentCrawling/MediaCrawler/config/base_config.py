@@ -63,6 +63,15 @@ AUTO_CLOSE_BROWSER = True
 # 数据保存类型选项配置,支持五种类型：csv、db、json、sqlite、postgresql, 最好保存到DB，有排重的功能。
 SAVE_DATA_OPTION = "postgresql"  # csv or db or json or sqlite or postgresql
 
+# 数据库写入缓冲：同一张表攒够 DB_WRITE_BATCH_SIZE 条或距首条超过 DB_WRITE_FLUSH_INTERVAL 秒后批量 upsert
+# DB_WRITE_BATCH_SIZE 设为 1 时退化为逐条写入
+DB_WRITE_BATCH_SIZE = 200
+DB_WRITE_FLUSH_INTERVAL = 2.0
+
+# SAVE_DATA_OPTION 为 json 时的文件格式：jsonl（每条数据追加一行，推荐）| json（整个文件为一个数组，每条数据都要重写全文件）
+# jsonl 文件可用 python -m tools.async_file_writer <jsonl文件> 转换为 json 数组格式
+JSON_SAVE_FORMAT = "jsonl"
+
 # 用户浏览器缓存的浏览器文件配置
 USER_DATA_DIR = "%s_user_data_dir"  # %s will be replaced by platform name
 
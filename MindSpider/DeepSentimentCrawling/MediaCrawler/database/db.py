@@ -13,6 +13,7 @@ if str(project_root) not in sys.path:
 
 from tools import utils
 from database.db_session import create_tables
+from database.write_buffer import flush_write_buffer
 
 async def init_table_schema(db_type: str):
     """
@@ -30,6 +31,6 @@ async def init_db(db_type: str = None):
 
 async def close():
     """
-    Placeholder for closing database connections if needed in the future.
+    Flush the rows still held by the DB store write buffer.
     """
-    pass
+    await flush_write_buffer()
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine, Column, Integer, Text, String, BigInteger
+from sqlalchemy import create_engine, Column, Integer, Text, String, BigInteger, Float, Index, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
@@ -432,3 +432,37 @@ class ZhihuCreator(Base):
     get_voteup_count = Column(Integer, default=0)
     add_ts = Column(BigInteger)
     last_modify_ts = Column(BigInteger)
+
+
+class HotContent(Base):
+    """Precomputed hotness of platform contents, maintained by the store layer on upsert."""
+    __tablename__ = 'hot_content'
+    __table_args__ = (
+        UniqueConstraint('platform', 'content_id', name='uq_hot_content_platform_content'),
+        Index('idx_hot_content_publish_ts', 'publish_ts'),
+        Index('idx_hot_content_score', 'hotness_score'),
+    )
+    id = Column(Integer, primary_key=True)
+    platform = Column(String(32), nullable=False)
+    content_id = Column(String(64), nullable=False)
+    content_type = Column(String(16))
+    source_table = Column(String(64))
+    title = Column(Text)
+    author = Column(Text)
+    url = Column(Text)
+    source_keyword = Column(Text)
+    engagement = Column(Text)
+    hotness_score = Column(Float, default=0)
+    publish_ts = Column(BigInteger)
+    add_ts = Column(BigInteger)
+    last_modify_ts = Column(BigInteger)
+
+
+class HotContentRefresh(Base):
+    """Completion marker of a full hot_content refresh, written as the last step of db_manager --refresh-hot-content."""
+    __tablename__ = 'hot_content_refresh'
+    id = Column(Integer, primary_key=True)
+    window_days = Column(Integer, nullable=False)
+    refreshed_count = Column(Integer, default=0)
+    started_ts = Column(BigInteger)
+    completed_ts = Column(BigInteger, nullable=False)
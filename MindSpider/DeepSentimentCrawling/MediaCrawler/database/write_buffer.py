@@ -0,0 +1,338 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+# -*- coding: utf-8 -*-
+# @Desc    : 写入缓冲：按表攒批后一次性 upsert，替代每条数据一次 SELECT + INSERT/UPDATE + COMMIT
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Table, and_, bindparam, insert, inspect, select, tuple_, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import config
+from database.db_session import get_session
+
+logger = logging.getLogger("MediaCrawler")
+
+# 单条 IN 查询中的最大主键数
+LOOKUP_CHUNK_SIZE = 500
+
+
+@dataclass
+class _PendingRow:
+    key: Tuple[Any, ...]
+    values: Dict[str, Any]
+    update_columns: Tuple[str, ...]
+    update_only: bool
+
+
+@dataclass
+class _PendingTable:
+    table: Table
+    key_columns: Tuple[str, ...]
+    on_error: Optional[Callable[[Exception], None]] = None
+    # optional side tables (e.g. hot_content) drop their rows on a failed flush and never make close() raise
+    optional: bool = False
+    rows: Dict[Tuple[str, ...], _PendingRow] = field(default_factory=dict)
+    first_added: float = field(default_factory=time.monotonic)
+    # monotonic time of the last failed flush, size-triggered flushes wait flush_interval after it
+    failed_at: Optional[float] = None
+
+
+def _reflect_unique_key(connection, table_name: str, key_columns: Sequence[str]) -> bool:
+    """
+    Whether the table in the actual database has a primary key / unique constraint / unique index on
+    exactly the key columns. The ORM metadata is not trusted here: tables created from schema/tables.sql
+    often only have a plain KEY, and a native upsert would then silently insert duplicates.
+    """
+    inspector = inspect(connection)
+    target = set(key_columns)
+    if set(inspector.get_pk_constraint(table_name).get("constrained_columns") or []) == target:
+        return True
+    if any(set(c["column_names"]) == target for c in inspector.get_unique_constraints(table_name)):
+        return True
+    return any(index.get("unique") and set(index["column_names"]) == target
+               for index in inspector.get_indexes(table_name))
+
+
+def _group(rows: List[_PendingRow], with_values: bool = True) -> Dict[Tuple, List[_PendingRow]]:
+    """Group rows by their column set (and update columns) so each group can run as one executemany"""
+    groups: Dict[Tuple, List[_PendingRow]] = {}
+    for row in rows:
+        signature = (tuple(sorted(row.values)) if with_values else (), row.update_columns)
+        groups.setdefault(signature, []).append(row)
+    return groups
+
+
+class UpsertBuffer:
+    """
+    Write-behind buffer for the DB stores.
+    Rows are grouped per table and deduplicated by key (last write wins), then flushed when a table
+    reaches `batch_size` rows, when its oldest row is older than `flush_interval` seconds, or on close().
+    A failed flush puts its rows back into the buffer (newer rows for the same key win) so they are
+    retried by the next flush; close() raises if the final flush still fails.
+    Rows of optional side tables are dropped instead, and their failures never make close() raise.
+    Tables whose key is unique in the actual database schema (reflected once per table) use the
+    dialect-native bulk upsert (MySQL ON DUPLICATE KEY UPDATE, PostgreSQL/SQLite ON CONFLICT DO UPDATE);
+    other tables resolve existing keys with one IN query per chunk and then bulk insert / bulk update.
+    """
+
+    def __init__(self, batch_size: int = 200, flush_interval: float = 2.0):
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self._pending: Dict[str, _PendingTable] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._flusher: Optional[asyncio.Task] = None
+        # (dialect, table, key columns) -> whether the key is unique in the database
+        self._unique_keys: Dict[Tuple[str, str, Tuple[str, ...]], bool] = {}
+
+    def _bind_loop(self, start_flusher: bool = False):
+        """
+        (Re)create loop-bound primitives, the crawler and the shutdown hook may run on different loops
+        Only upsert() starts the periodic flusher, so flush() called from close() never respawns it
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._lock = asyncio.Lock()
+            self._flusher = None
+        if start_flusher and self.flush_interval > 0 and (self._flusher is None or self._flusher.done()):
+            self._flusher = loop.create_task(self._flush_periodically())
+
+    async def upsert(
+        self,
+        model: Any,
+        key_columns: Sequence[str],
+        values: Dict[str, Any],
+        update_columns: Optional[Sequence[str]] = None,
+        update_only: bool = False,
+        on_error: Optional[Callable[[Exception], None]] = None,
+        optional: bool = False,
+    ):
+        """
+        Queue an insert-or-update of one row
+        Args:
+            model: ORM model class of the target table
+            key_columns: columns identifying the row (e.g. ("note_id",))
+            values: column values used when the row is inserted; unknown keys are ignored
+            update_columns: columns overwritten when the row already exists,
+                            defaults to every given column except the key columns and add_ts
+            update_only: only update an existing row, never insert
+            on_error: called with the exception when a flush of this table fails
+            optional: the table is a non-essential side table, its rows are dropped when a flush fails
+        """
+        table: Table = model.__table__
+        values = {k: v for k, v in values.items() if k in table.c}
+        key = tuple(values.get(column) for column in key_columns)
+        if any(part is None for part in key):
+            return
+        if update_columns is None:
+            update_columns = [c for c in values if c not in key_columns and c != "add_ts"]
+
+        self._bind_loop(start_flusher=True)
+        pending = self._pending.get(table.name)
+        if pending is None:
+            pending = self._pending[table.name] = _PendingTable(table, tuple(key_columns), on_error, optional)
+        normalized_key = tuple(str(part) for part in key)
+        previous = pending.rows.pop(normalized_key, None)
+        pending.rows[normalized_key] = _PendingRow(
+            key=key,
+            values=values,
+            update_columns=tuple(c for c in update_columns if c in values),
+            update_only=update_only and (previous is None or previous.update_only),
+        )
+        if len(pending.rows) >= self.batch_size and (
+            pending.failed_at is None or time.monotonic() - pending.failed_at >= self.flush_interval
+        ):
+            await self.flush(table.name)
+
+    async def flush(self, table_name: Optional[str] = None, raise_on_error: bool = False):
+        """
+        Write the buffered rows of one table (or of all tables) to the database
+        Rows of a table that fails to write are put back into the buffer (dropped for optional tables)
+        Args:
+            table_name: table to flush, None for all
+            raise_on_error: re-raise the first failure of a non-optional table after every table has been attempted
+        """
+        if not self._pending:
+            return
+        self._bind_loop()
+        first_error: Optional[Exception] = None
+        async with self._lock:
+            names = [table_name] if table_name else list(self._pending)
+            for name in names:
+                pending = self._pending.pop(name, None)
+                if not pending or not pending.rows:
+                    continue
+                try:
+                    async with get_session() as session:
+                        if session is None:
+                            raise RuntimeError(f"no database session for SAVE_DATA_OPTION={config.SAVE_DATA_OPTION}")
+                        await self._write_table(session, pending)
+                except (SQLAlchemyError, RuntimeError) as e:
+                    if pending.on_error:
+                        pending.on_error(e)
+                    if pending.optional:
+                        logger.warning(f"[UpsertBuffer.flush] failed to write {len(pending.rows)} rows to "
+                                       f"optional table {name}, dropped: {e}")
+                        continue
+                    logger.error(f"[UpsertBuffer.flush] failed to write {len(pending.rows)} rows to {name}, "
+                                 f"kept for retry: {e}")
+                    self._requeue(name, pending)
+                    first_error = first_error or e
+        if first_error is not None and raise_on_error:
+            raise first_error
+
+    def _requeue(self, name: str, failed: _PendingTable):
+        """Put the rows of a failed flush back, rows buffered meanwhile for the same key win"""
+        failed.failed_at = time.monotonic()
+        current = self._pending.get(name)
+        if current is not None:
+            for key, row in current.rows.items():
+                failed.rows.pop(key, None)
+                failed.rows[key] = row
+        self._pending[name] = failed
+
+    async def close(self):
+        """Stop the periodic flusher and write everything that is still buffered, raising if that fails"""
+        if self._flusher and not self._flusher.done() and self._loop is asyncio.get_running_loop():
+            self._flusher.cancel()
+        self._flusher = None
+        await self.flush(raise_on_error=True)
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.flush_interval / 2)
+            now = time.monotonic()
+            due = [name for name, pending in self._pending.items()
+                   if pending.rows and now - pending.first_added >= self.flush_interval]
+            for name in due:
+                await self.flush(name)
+
+    async def _has_unique_key(self, session: AsyncSession, pending: _PendingTable) -> bool:
+        """Reflect (once per table) whether a native upsert can target the key columns"""
+        cache_key = (session.bind.dialect.name, pending.table.name, pending.key_columns)
+        if cache_key not in self._unique_keys:
+            try:
+                self._unique_keys[cache_key] = await session.run_sync(
+                    lambda sync_session: _reflect_unique_key(
+                        sync_session.connection(), pending.table.name, pending.key_columns
+                    )
+                )
+            except SQLAlchemyError as e:
+                # the lookup path is correct for any schema, only slower
+                logger.warning(f"[UpsertBuffer] cannot inspect keys of {pending.table.name}, using lookup path: {e}")
+                return False
+        return self._unique_keys[cache_key]
+
+    async def _write_table(self, session: AsyncSession, pending: _PendingTable):
+        rows = list(pending.rows.values())
+        dialect = session.bind.dialect.name
+        native = dialect in ("mysql", "postgresql", "sqlite") and await self._has_unique_key(session, pending)
+        if native:
+            upserts = [row for row in rows if not row.update_only]
+            await self._native_upsert(session, pending, upserts, dialect)
+            await self._bulk_update(session, pending, [row for row in rows if row.update_only])
+            return
+
+        existing = await self._existing_keys(session, pending, [row.key for row in rows])
+        await self._bulk_insert(session, pending, [
+            row for row in rows
+            if not row.update_only and tuple(str(part) for part in row.key) not in existing
+        ])
+        await self._bulk_update(session, pending, [
+            row for row in rows if tuple(str(part) for part in row.key) in existing
+        ])
+
+    @staticmethod
+    async def _native_upsert(session: AsyncSession, pending: _PendingTable, rows: List[_PendingRow], dialect: str):
+        table = pending.table
+        for (_, update_columns), group in _group(rows).items():
+            if dialect == "mysql":
+                stmt = mysql_insert(table)
+                # ON DUPLICATE KEY UPDATE needs at least one assignment
+                assignments = {c: stmt.inserted[c] for c in update_columns or pending.key_columns[:1]}
+                stmt = stmt.on_duplicate_key_update(assignments)
+            else:
+                stmt = (postgresql_insert if dialect == "postgresql" else sqlite_insert)(table)
+                if update_columns:
+                    stmt = stmt.on_conflict_do_update(
+                        index_elements=list(pending.key_columns),
+                        set_={c: stmt.excluded[c] for c in update_columns},
+                    )
+                else:
+                    stmt = stmt.on_conflict_do_nothing(index_elements=list(pending.key_columns))
+            await session.execute(stmt, [row.values for row in group])
+
+    @staticmethod
+    async def _existing_keys(session: AsyncSession, pending: _PendingTable, keys: List[Tuple]) -> set:
+        table = pending.table
+        columns = [table.c[name] for name in pending.key_columns]
+        existing = set()
+        for start in range(0, len(keys), LOOKUP_CHUNK_SIZE):
+            chunk = keys[start:start + LOOKUP_CHUNK_SIZE]
+            if len(columns) == 1:
+                condition = columns[0].in_([key[0] for key in chunk])
+            else:
+                condition = tuple_(*columns).in_(chunk)
+            result = await session.execute(select(*columns).where(condition))
+            existing.update(tuple(str(part) for part in row) for row in result)
+        return existing
+
+    @staticmethod
+    async def _bulk_insert(session: AsyncSession, pending: _PendingTable, rows: List[_PendingRow]):
+        for group in _group(rows).values():
+            await session.execute(insert(pending.table), [row.values for row in group])
+
+    @staticmethod
+    async def _bulk_update(session: AsyncSession, pending: _PendingTable, rows: List[_PendingRow]):
+        table = pending.table
+        for (_, update_columns), group in _group(rows, with_values=False).items():
+            if not update_columns:
+                continue
+            stmt = (
+                update(table)
+                .where(and_(*(table.c[k] == bindparam(f"key_{k}") for k in pending.key_columns)))
+                .values({c: bindparam(f"new_{c}") for c in update_columns})
+            )
+            params = [
+                {**{f"new_{c}": row.values[c] for c in update_columns},
+                 **{f"key_{k}": row.values[k] for k in pending.key_columns}}
+                for row in group
+            ]
+            await session.execute(stmt, params)
+
+
+_write_buffer: Optional[UpsertBuffer] = None
+
+
+def get_write_buffer() -> UpsertBuffer:
+    """Process-wide write buffer shared by all DB store implementations"""
+    global _write_buffer
+    if _write_buffer is None:
+        _write_buffer = UpsertBuffer(
+            batch_size=getattr(config, "DB_WRITE_BATCH_SIZE", 200),
+            flush_interval=getattr(config, "DB_WRITE_FLUSH_INTERVAL", 2.0),
+        )
+    return _write_buffer
+
+
+async def flush_write_buffer():
+    """Flush all buffered rows and stop the periodic flusher (call on crawler shutdown)"""
+    if _write_buffer is not None:
+        await _write_buffer.close()
@@ -72,7 +72,14 @@ async def main():
 
 
     crawler = CrawlerFactory.create_crawler(platform=config.PLATFORM)
-    await crawler.start()
+    try:
+        await crawler.start()
+    finally:
+        # 在爬虫所在的事件循环中写出缓冲的数据库记录
+        if config.SAVE_DATA_OPTION in ["db", "sqlite", "postgresql"]:
+            await db.close()
+        elif config.SAVE_DATA_OPTION == "json":
+            await AsyncFileWriter.flush_all()
 
     # Generate wordcloud after crawling is complete
     # Only for JSON save mode
@@ -91,7 +98,7 @@ def cleanup():
     if crawler:
         # asyncio.run(crawler.close())
         pass
-    if config.SAVE_DATA_OPTION in ["db", "sqlite"]:
+    if config.SAVE_DATA_OPTION in ["db", "sqlite", "postgresql"]:
         asyncio.run(db.close())
 
 
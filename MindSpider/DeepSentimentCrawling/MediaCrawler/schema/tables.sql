@@ -582,6 +582,46 @@ CREATE TABLE `zhihu_creator` (
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci COMMENT='知乎创作者';
 
 
+-- ----------------------------
+-- Table structure for hot_content
+-- ----------------------------
+DROP TABLE IF EXISTS `hot_content`;
+CREATE TABLE `hot_content` (
+    `id` int NOT NULL AUTO_INCREMENT COMMENT '自增ID',
+    `platform` varchar(32) NOT NULL COMMENT '平台名称',
+    `content_id` varchar(64) NOT NULL COMMENT '平台内容ID',
+    `content_type` varchar(16) DEFAULT NULL COMMENT '内容类型(video|note|content)',
+    `source_table` varchar(64) DEFAULT NULL COMMENT '来源表名',
+    `title` longtext COMMENT '标题或正文',
+    `author` longtext COMMENT '作者昵称',
+    `url` longtext COMMENT '内容链接',
+    `source_keyword` longtext COMMENT '搜索来源关键字',
+    `engagement` longtext COMMENT '互动数据(JSON)',
+    `hotness_score` double DEFAULT 0 COMMENT '加权热度分',
+    `publish_ts` bigint DEFAULT NULL COMMENT '发布时间(秒级时间戳)',
+    `add_ts` bigint NOT NULL COMMENT '记录添加时间戳',
+    `last_modify_ts` bigint NOT NULL COMMENT '记录最后修改时间戳',
+    PRIMARY KEY (`id`),
+    UNIQUE KEY `uq_hot_content_platform_content` (`platform`, `content_id`),
+    KEY `idx_hot_content_publish_ts` (`publish_ts`),
+    KEY `idx_hot_content_score` (`hotness_score`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci COMMENT='内容热度预计算表';
+
+
+-- ----------------------------
+-- Table structure for hot_content_refresh
+-- ----------------------------
+DROP TABLE IF EXISTS `hot_content_refresh`;
+CREATE TABLE `hot_content_refresh` (
+    `id` int NOT NULL AUTO_INCREMENT COMMENT '自增ID',
+    `window_days` int NOT NULL COMMENT '本次全量刷新覆盖的天数',
+    `refreshed_count` int DEFAULT 0 COMMENT '本次刷新写入的记录数',
+    `started_ts` bigint DEFAULT NULL COMMENT '刷新开始时间戳',
+    `completed_ts` bigint NOT NULL COMMENT '刷新完成时间戳',
+    PRIMARY KEY (`id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci COMMENT='hot_content全量刷新完成标记';
+
+
 -- add column `like_count` to douyin_aweme_comment
 alter table douyin_aweme_comment add column `like_count` varchar(255) NOT NULL DEFAULT '0' COMMENT '点赞数';
 
@@ -21,13 +21,13 @@ import pathlib
 from typing import Dict
 
 import aiofiles
-from sqlalchemy import select
 from sqlalchemy.orm import sessionmaker
 
 import config
 from base.base_crawler import AbstractStore
-from database.db_session import get_session
 from database.models import BilibiliVideoComment, BilibiliVideo, BilibiliUpInfo, BilibiliUpDynamic, BilibiliContactInfo
+from database.write_buffer import get_write_buffer
+from store.hot_content import update_hot_content
 from tools.async_file_writer import AsyncFileWriter
 from tools import utils, words
 from var import crawler_type_var
@@ -141,18 +141,9 @@ class BiliDbStoreImplement(AbstractStore):
             video_id = int(video_id) if not isinstance(video_id, int) else video_id
             content_item["video_id"] = video_id
         content_item = _sanitize_strings(content_item)
-        async with get_session() as session:
-            result = await session.execute(select(BilibiliVideo).where(BilibiliVideo.video_id == video_id))
-            video_detail = result.scalar_one_or_none()
-
-            if not video_detail:
-                content_item["add_ts"] = utils.get_current_timestamp()
-                new_content = BilibiliVideo(**content_item)
-                session.add(new_content)
-            else:
-                for key, value in content_item.items():
-                    setattr(video_detail, key, value)
-            await session.commit()
+        content_item["add_ts"] = utils.get_current_timestamp()
+        await get_write_buffer().upsert(BilibiliVideo, ("video_id",), content_item)
+        await update_hot_content("bilibili_video", content_item)
 
     async def store_comment(self, comment_item: Dict):
         """
@@ -166,18 +157,8 @@ class BiliDbStoreImplement(AbstractStore):
             comment_id = int(comment_id) if not isinstance(comment_id, int) else comment_id
             comment_item["comment_id"] = comment_id
         comment_item = _sanitize_strings(comment_item)
-        async with get_session() as session:
-            result = await session.execute(select(BilibiliVideoComment).where(BilibiliVideoComment.comment_id == comment_id))
-            comment_detail = result.scalar_one_or_none()
-
-            if not comment_detail:
-                comment_item["add_ts"] = utils.get_current_timestamp()
-                new_comment = BilibiliVideoComment(**comment_item)
-                session.add(new_comment)
-            else:
-                for key, value in comment_item.items():
-                    setattr(comment_detail, key, value)
-            await session.commit()
+        comment_item["add_ts"] = utils.get_current_timestamp()
+        await get_write_buffer().upsert(BilibiliVideoComment, ("comment_id",), comment_item)
 
     async def store_creator(self, creator: Dict):
         """
@@ -191,18 +172,8 @@ class BiliDbStoreImplement(AbstractStore):
             creator_id = int(creator_id) if not isinstance(creator_id, int) else creator_id
             creator["user_id"] = creator_id
         creator = _sanitize_strings(creator)
-        async with get_session() as session:
-            result = await session.execute(select(BilibiliUpInfo).where(BilibiliUpInfo.user_id == creator_id))
-            creator_detail = result.scalar_one_or_none()
-
-            if not creator_detail:
-                creator["add_ts"] = utils.get_current_timestamp()
-                new_creator = BilibiliUpInfo(**creator)
-                session.add(new_creator)
-            else:
-                for key, value in creator.items():
-                    setattr(creator_detail, key, value)
-            await session.commit()
+        creator["add_ts"] = utils.get_current_timestamp()
+        await get_write_buffer().upsert(BilibiliUpInfo, ("user_id",), creator)
 
     async def store_contact(self, contact_item: Dict):
         """
@@ -220,20 +191,8 @@ class BiliDbStoreImplement(AbstractStore):
             fan_id = int(fan_id) if not isinstance(fan_id, int) else fan_id
             contact_item["fan_id"] = fan_id
         contact_item = _sanitize_strings(contact_item)
-        async with get_session() as session:
-            result = await session.execute(
-                select(BilibiliContactInfo).where(BilibiliContactInfo.up_id == up_id, BilibiliContactInfo.fan_id == fan_id)
-            )
-            contact_detail = result.scalar_one_or_none()
-
-            if not contact_detail:
-                contact_item["add_ts"] = utils.get_current_timestamp()
-                new_contact = BilibiliContactInfo(**contact_item)
-                session.add(new_contact)
-            else:
-                for key, value in contact_item.items():
-                    setattr(contact_detail, key, value)
-            await session.commit()
+        contact_item["add_ts"] = utils.get_current_timestamp()
+        await get_write_buffer().upsert(BilibiliContactInfo, ("up_id", "fan_id"), contact_item)
 
     async def store_dynamic(self, dynamic_item):
         """
@@ -241,20 +200,9 @@ class BiliDbStoreImplement(AbstractStore):
         Args:
             dynamic_item: dynamic item dict
         """
-        dynamic_id = dynamic_item.get("dynamic_id")
         dynamic_item = _sanitize_strings(dynamic_item)
-        async with get_session() as session:
-            result = await session.execute(select(BilibiliUpDynamic).where(BilibiliUpDynamic.dynamic_id == dynamic_id))
-            dynamic_detail = result.scalar_one_or_none()
-
-            if not dynamic_detail:
-                dynamic_item["add_ts"] = utils.get_current_timestamp()
-                new_dynamic = BilibiliUpDynamic(**dynamic_item)
-                session.add(new_dynamic)
-            else:
-                for key, value in dynamic_item.items():
-                    setattr(dynamic_detail, key, value)
-            await session.commit()
+        dynamic_item["add_ts"] = utils.get_current_timestamp()
+        await get_write_buffer().upsert(BilibiliUpDynamic, ("dynamic_id",), dynamic_item)
 
 
 class BiliJsonStoreImplement(AbstractStore):
@@ -19,12 +19,12 @@ import os
 import pathlib
 from typing import Dict
 
-from sqlalchemy import select
 
 import config
 from base.base_crawler import AbstractStore
-from database.db_session import get_session
 from database.models import DouyinAweme, DouyinAwemeComment, DyCreator
+from database.write_buffer import get_write_buffer
+from store.hot_content import update_hot_content
 from tools import utils, words
 from tools.async_file_writer import AsyncFileWriter
 from var import crawler_type_var
@@ -87,20 +87,11 @@ class DouyinDbStoreImplement(AbstractStore):
         Args:
             content_item: content item dict
         """
-        aweme_id = content_item.get("aweme_id")
-        async with get_session() as session:
-            result = await session.execute(select(DouyinAweme).where(DouyinAweme.aweme_id == aweme_id))
-            aweme_detail = result.scalar_one_or_none()
-
-            if not aweme_detail:
-                content_item["add_ts"] = utils.get_current_timestamp()
-                if content_item.get("title"):
-                    new_content = DouyinAweme(**content_item)
-                    session.add(new_content)
-            else:
-                for key, value in content_item.items():
-                    setattr(aweme_detail, key, value)
-            await session.commit()
+        content_item["add_ts"] = utils.get_current_timestamp()
+        # 没有标题的作品只更新已有记录，不新增
+        update_only = not content_item.get("title")
+        await get_write_buffer().upsert(DouyinAweme, ("aweme_id",), content_item, update_only=update_only)
+        await update_hot_content("douyin_aweme", content_item, update_only=update_only)
 
     async def store_comment(self, comment_item: Dict):
         """
@@ -108,19 +99,8 @@ class DouyinDbStoreImplement(AbstractStore):
         Args:
             comment_item: comment item dict
         """
-        comment_id = comment_item.get("comment_id")
-        async with get_session() as session:
-            result = await session.execute(select(DouyinAwemeComment).where(DouyinAwemeComment.comment_id == comment_id))
-            comment_detail = result.scalar_one_or_none()
-
-            if not comment_detail:
-                comment_item["add_ts"] = utils.get_current_timestamp()
-                new_comment = DouyinAwemeComment(**comment_item)
-                session.add(new_comment)
-            else:
-                for key, value in comment_item.items():
-                    setattr(comment_detail, key, value)
-            await session.commit()
+        comment_item["add_ts"] = utils.get_current_timestamp()
+        await get_write_buffer().upsert(DouyinAwemeComment, ("comment_id",), comment_item)
 
     async def store_creator(self, creator: Dict):
         """
@@ -128,20 +108,8 @@ class DouyinDbStoreImplement(AbstractStore):
         Args:
             creator: creator dict
         """
-        user_id = creator.get("user_id")
-        async with get_session() as session:
-            result = await session.execute(select(DyCreator).where(DyCreator.user_id == user_id))
-            user_detail = result.scalar_one_or_none()
-
-            if not user_detail:
-                creator["add_ts"] = utils.get_current_timestamp()
-                new_creator = DyCreator(**creator)
-                session.add(new_creator)
-            else:
-                for key, value in creator.items():
-                    setattr(user_detail, key, value)
-            await session.commit()
-
+        creator["add_ts"] = utils.get_current_timestamp()
+        await get_write_buffer().upsert(DyCreator, ("user_id",), creator)
 
 class DouyinJsonStoreImplement(AbstractStore):
     def __init__(self):
@@ -0,0 +1,179 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+# -*- coding: utf-8 -*-
+# @Desc    : 内容热度预计算：入库时增量维护 hot_content 表，供 InsightEngine search_hot_content 直接读取
+import json
+import logging
+import re
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from database.models import HotContent
+from tools.time_util import get_current_timestamp
+
+logger = logging.getLogger("MediaCrawler")
+
+# 热度权重，与 InsightEngine MediaCrawlerDB 的 W_* 常量保持一致
+W_LIKE = 1.0
+W_COMMENT = 5.0
+W_SHARE = 10.0  # 分享/转发/收藏/投币等高价值互动
+W_VIEW = 0.1
+W_DANMAKU = 0.5
+
+# 来源表 -> 热度计算规则；ts_unit 用于刷新任务在 SQL 中按时间窗口过滤
+HOT_CONTENT_SPECS: Dict[str, Dict[str, Any]] = {
+    "bilibili_video": {
+        "platform": "bilibili", "content_type": "video", "id_col": "video_id", "title_col": "title",
+        "author_col": "nickname", "url_col": "video_url", "ts_col": "create_time", "ts_unit": "sec",
+        "weights": [("liked_count", W_LIKE), ("video_comment", W_COMMENT), ("video_share_count", W_SHARE),
+                    ("video_favorite_count", W_SHARE), ("video_coin_count", W_SHARE),
+                    ("video_danmaku", W_DANMAKU), ("video_play_count", W_VIEW)],
+    },
+    "douyin_aweme": {
+        "platform": "douyin", "content_type": "video", "id_col": "aweme_id", "title_col": "title",
+        "author_col": "nickname", "url_col": "aweme_url", "ts_col": "create_time", "ts_unit": "sec",
+        "weights": [("liked_count", W_LIKE), ("comment_count", W_COMMENT), ("share_count", W_SHARE),
+                    ("collected_count", W_SHARE)],
+    },
+    "weibo_note": {
+        "platform": "weibo", "content_type": "note", "id_col": "note_id", "title_col": "content",
+        "author_col": "nickname", "url_col": "note_url", "ts_col": "create_date_time", "ts_unit": "datetime_str",
+        "weights": [("liked_count", W_LIKE), ("comments_count", W_COMMENT), ("shared_count", W_SHARE)],
+    },
+    "xhs_note": {
+        "platform": "xhs", "content_type": "note", "id_col": "note_id", "title_col": "title",
+        "author_col": "nickname", "url_col": "note_url", "ts_col": "time", "ts_unit": "ms",
+        "weights": [("liked_count", W_LIKE), ("comment_count", W_COMMENT), ("share_count", W_SHARE),
+                    ("collected_count", W_SHARE)],
+    },
+    "kuaishou_video": {
+        "platform": "kuaishou", "content_type": "video", "id_col": "video_id", "title_col": "title",
+        "author_col": "nickname", "url_col": "video_url", "ts_col": "create_time", "ts_unit": "ms",
+        "weights": [("liked_count", W_LIKE), ("viewd_count", W_VIEW)],
+    },
+    "zhihu_content": {
+        "platform": "zhihu", "content_type": "content", "id_col": "content_id", "title_col": "title",
+        "author_col": "user_nickname", "url_col": "content_url", "ts_col": "created_time", "ts_unit": "sec_str",
+        "weights": [("voteup_count", W_LIKE), ("comment_count", W_COMMENT)],
+    },
+}
+
+_NUMBER_PATTERN = re.compile(r"\d+(?:\.\d+)?")
+
+
+def parse_count(value: Any) -> float:
+    """
+    Parse an interaction counter stored as int or text (e.g. "1.2万", "3,456")
+    Args:
+        value: raw counter value
+
+    Returns:
+        numeric value, 0 when unparsable
+    """
+    if value is None:
+        return 0.0
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).replace(",", "").strip()
+    match = _NUMBER_PATTERN.search(text)
+    if not match:
+        return 0.0
+    number = float(match.group())
+    if "万" in text or text.lower().endswith("w"):
+        number *= 10000
+    return number
+
+
+def normalize_publish_ts(value: Any) -> Optional[int]:
+    """
+    Normalize a publish time (second/millisecond timestamp, numeric string or datetime string) to a second timestamp
+    Args:
+        value: raw publish time
+
+    Returns:
+        second timestamp, None when unparsable
+    """
+    if value is None or value == "":
+        return None
+    try:
+        if isinstance(value, datetime):
+            return int(value.timestamp())
+        if isinstance(value, (int, float)) or str(value).strip().isdigit():
+            ts = float(value)
+            return int(ts / 1000) if ts > 1_000_000_000_000 else int(ts)
+        return int(datetime.fromisoformat(str(value).split("+")[0].strip()).timestamp())
+    except (ValueError, TypeError, OverflowError):
+        return None
+
+
+def build_hot_content_row(source_table: str, item: Dict) -> Optional[Dict]:
+    """
+    Build a hot_content row from a platform content item
+    Args:
+        source_table: platform content table name, must be a key of HOT_CONTENT_SPECS
+        item: content item dict (same keys as the platform table columns)
+
+    Returns:
+        hot_content row dict, None if the table is not tracked or the item has no id
+    """
+    spec = HOT_CONTENT_SPECS.get(source_table)
+    if not spec or item.get(spec["id_col"]) in (None, ""):
+        return None
+    engagement = {col: int(parse_count(item.get(col))) for col, _ in spec["weights"] if item.get(col) is not None}
+    return {
+        "platform": spec["platform"],
+        "content_id": str(item.get(spec["id_col"])),
+        "content_type": spec["content_type"],
+        "source_table": source_table,
+        "title": item.get(spec["title_col"]),
+        "author": item.get(spec["author_col"]),
+        "url": item.get(spec["url_col"]),
+        "source_keyword": item.get("source_keyword"),
+        "engagement": json.dumps(engagement, ensure_ascii=False),
+        "hotness_score": sum(parse_count(item.get(col)) * weight for col, weight in spec["weights"]),
+        "publish_ts": normalize_publish_ts(item.get(spec["ts_col"])),
+        "last_modify_ts": get_current_timestamp(),
+    }
+
+
+_hot_content_disabled = False
+
+
+def _disable_hot_content(error: Exception):
+    global _hot_content_disabled
+    _hot_content_disabled = True
+    logger.warning(f"[store.hot_content.update_hot_content] hot_content update disabled for this run: {error}")
+
+
+async def update_hot_content(source_table: str, content_item: Dict, update_only: bool = False):
+    """
+    Queue an upsert of the hot_content row of a content item on the shared write buffer
+    Failures never affect the platform table write (it is flushed separately): hot_content is queued as an
+    optional table, so a failed flush drops its rows instead of failing close(), and after the first failure
+    (e.g. hot_content table not created yet) updates are skipped for this run.
+    Args:
+        source_table: platform content table name
+        content_item: content item dict
+        update_only: only refresh an existing hot_content row
+    """
+    # 延迟导入：MindSpider 的全量刷新任务只复用本模块的计算规则，不加载爬虫的数据库会话配置
+    from database.write_buffer import get_write_buffer
+
+    if _hot_content_disabled:
+        return
+    row = build_hot_content_row(source_table, content_item)
+    if row is None:
+        return
+    row["add_ts"] = get_current_timestamp()
+    await get_write_buffer().upsert(
+        HotContent, ("platform", "content_id"), row, update_only=update_only,
+        on_error=_disable_hot_content, optional=True,
+    )
@@ -0,0 +1,80 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : JSONL 追加写入与 JSON 数组转换
+
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+
+import config
+from tools import async_file_writer
+from tools.async_file_writer import AsyncFileWriter, convert_jsonl_to_json
+
+
+class TestAsyncFileWriterJsonl(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.origin_cwd = os.getcwd()
+        self.origin_format = config.JSON_SAVE_FORMAT
+        os.chdir(self.tmp_dir.name)
+        config.JSON_SAVE_FORMAT = "jsonl"
+        async_file_writer._jsonl_buffers.clear()
+        async_file_writer._jsonl_last_flush.clear()
+        async_file_writer._file_locks.clear()
+
+    async def asyncTearDown(self):
+        os.chdir(self.origin_cwd)
+        config.JSON_SAVE_FORMAT = self.origin_format
+        self.tmp_dir.cleanup()
+
+    async def test_concurrent_writers_append_every_item(self):
+        items = [{"note_id": str(i), "title": f"标题{i}"} for i in range(120)]
+        # 存储层每条数据新建一个 writer，缓冲和锁必须跨实例共享
+        await asyncio.gather(*(
+            AsyncFileWriter("xhs", "search").write_single_item_to_json(item, "contents") for item in items
+        ))
+        await AsyncFileWriter.flush_all()
+
+        path = AsyncFileWriter("xhs", "search")._get_file_path("jsonl", "contents")
+        with open(path, encoding="utf-8") as f:
+            written = [json.loads(line) for line in f]
+        self.assertEqual(sorted(written, key=lambda x: int(x["note_id"])), items)
+
+    async def test_convert_matches_legacy_json_output(self):
+        items = [{"id": 1, "text": "你好", "tags": ["a", "b"]}, {"id": 2, "nested": {"k": None}}]
+        jsonl_path = os.path.join(self.tmp_dir.name, "data", "jsonl", "search_comments.jsonl")
+        os.makedirs(os.path.dirname(jsonl_path))
+        with open(jsonl_path, "w", encoding="utf-8") as f:
+            for item in items:
+                f.write(json.dumps(item, ensure_ascii=False) + "\n")
+            f.write("{broken\n")
+
+        json_path = convert_jsonl_to_json(jsonl_path)
+
+        self.assertEqual(json_path, os.path.join(self.tmp_dir.name, "data", "json", "search_comments.json"))
+        with open(json_path, encoding="utf-8") as f:
+            self.assertEqual(f.read(), json.dumps(items, ensure_ascii=False, indent=4))
+
+    async def test_convert_empty_file(self):
+        jsonl_path = os.path.join(self.tmp_dir.name, "empty.jsonl")
+        open(jsonl_path, "w").close()
+        json_path = convert_jsonl_to_json(jsonl_path)
+        with open(json_path, encoding="utf-8") as f:
+            self.assertEqual(json.load(f), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 写入缓冲在 SQLite 上的批量 upsert 行为
+
+import asyncio
+import os
+import tempfile
+import unittest
+
+from unittest import mock
+
+from sqlalchemy import select, text
+from sqlalchemy.exc import OperationalError
+
+import config
+from config.db_config import sqlite_db_config
+from database import db_session
+from database.models import BilibiliVideo, HotContent, XhsNoteComment
+from database.write_buffer import UpsertBuffer
+
+
+class TestUpsertBuffer(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.origin = (config.SAVE_DATA_OPTION, sqlite_db_config["db_path"])
+        config.SAVE_DATA_OPTION = "sqlite"
+        sqlite_db_config["db_path"] = os.path.join(self.tmp_dir.name, "test.db")
+        db_session._engines.pop("sqlite", None)
+        await db_session.create_tables("sqlite")
+        self.buffer = UpsertBuffer(batch_size=3, flush_interval=0.2)
+
+    async def asyncTearDown(self):
+        await self.buffer.close()
+        engine = db_session._engines.pop("sqlite", None)
+        if engine:
+            await engine.dispose()
+        config.SAVE_DATA_OPTION, sqlite_db_config["db_path"] = self.origin
+        self.tmp_dir.cleanup()
+
+    async def fetch(self, model):
+        async with db_session.get_session() as session:
+            return (await session.execute(select(model))).scalars().all()
+
+    async def test_lookup_path_inserts_then_updates(self):
+        await self.buffer.upsert(XhsNoteComment, ("comment_id",), {"comment_id": "c1", "content": "a", "like_count": "1"})
+        await self.buffer.flush()
+        await self.buffer.upsert(XhsNoteComment, ("comment_id",), {"comment_id": "c1", "content": "b", "like_count": "9"},
+                                 update_columns=("like_count",))
+        await self.buffer.upsert(XhsNoteComment, ("comment_id",), {"comment_id": "c2"}, update_only=True)
+        await self.buffer.flush()
+        rows = await self.fetch(XhsNoteComment)
+        self.assertEqual([(r.comment_id, r.content, r.like_count) for r in rows], [("c1", "a", "9")])
+
+    async def test_native_upsert_dedups_by_key(self):
+        await self.buffer.upsert(BilibiliVideo, ("video_id",), {"video_id": 1, "video_url": "u", "title": "old"})
+        await self.buffer.upsert(BilibiliVideo, ("video_id",), {"video_id": 1, "video_url": "u", "title": "new"})
+        await self.buffer.flush()
+        await self.buffer.upsert(BilibiliVideo, ("video_id",), {"video_id": 1, "video_url": "u", "title": "newer"})
+        await self.buffer.flush()
+        rows = await self.fetch(BilibiliVideo)
+        self.assertEqual([(r.video_id, r.title) for r in rows], [(1, "newer")])
+
+    async def test_flush_on_size_and_interval(self):
+        for i in range(4):
+            await self.buffer.upsert(XhsNoteComment, ("comment_id",), {"comment_id": f"c{i}"})
+        self.assertEqual(len(await self.fetch(XhsNoteComment)), 3)
+        await asyncio.sleep(0.5)
+        self.assertEqual(len(await self.fetch(XhsNoteComment)), 4)
+
+    async def test_close_does_not_respawn_flusher(self):
+        await self.buffer.upsert(XhsNoteComment, ("comment_id",), {"comment_id": "c1"})
+        await self.buffer.close()
+        flushers = [task for task in asyncio.all_tasks()
+                    if task.get_coro().__name__ == "_flush_periodically" and not task.done()]
+        self.assertEqual(flushers, [])
+        self.assertEqual(len(await self.fetch(XhsNoteComment)), 1)
+
+    async def test_failed_flush_keeps_rows_for_retry(self):
+        await self.buffer.upsert(XhsNoteComment, ("comment_id",), {"comment_id": "c1", "content": "old"})
+        await self.buffer.upsert(XhsNoteComment, ("comment_id",), {"comment_id": "c2"})
+        error = OperationalError("INSERT", {}, Exception("database is locked"))
+        with mock.patch.object(UpsertBuffer, "_write_table", side_effect=error):
+            await self.buffer.flush()
+            # 失败期间新写入的同键数据覆盖旧数据
+            await self.buffer.upsert(XhsNoteComment, ("comment_id",), {"comment_id": "c1", "content": "new"})
+            with self.assertRaises(OperationalError):
+                await self.buffer.close()
+        self.assertEqual(await self.fetch(XhsNoteComment), [])
+
+        await self.buffer.flush()
+        rows = await self.fetch(XhsNoteComment)
+        self.assertEqual(sorted((r.comment_id, r.content) for r in rows), [("c1", "new"), ("c2", None)])
+
+    async def test_missing_optional_table_does_not_fail_close(self):
+        async with db_session.get_session() as session:
+            await session.execute(text("DROP TABLE hot_content"))
+        errors = []
+        await self.buffer.upsert(XhsNoteComment, ("comment_id",), {"comment_id": "c1"})
+        await self.buffer.upsert(HotContent, ("platform", "content_id"),
+                                 {"platform": "xhs", "content_id": "n1", "add_ts": 1, "last_modify_ts": 1},
+                                 on_error=errors.append, optional=True)
+        await self.buffer.close()
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(len(await self.fetch(XhsNoteComment)), 1)
+
+    async def test_plain_index_in_schema_uses_lookup_path(self):
+        # 与 schema/tables.sql 一致：video_id 只有普通索引，ORM 上的 unique 不能当真
+        async with db_session.get_session() as session:
+            await session.execute(text("ALTER TABLE bilibili_video RENAME TO bilibili_video_orm"))
+            await session.execute(text("CREATE TABLE bilibili_video AS SELECT * FROM bilibili_video_orm WHERE 0"))
+            await session.execute(text("CREATE INDEX idx_bilibili_video_id ON bilibili_video (video_id)"))
+        for title in ("old", "new"):
+            await self.buffer.upsert(BilibiliVideo, ("video_id",), {"video_id": 1, "video_url": "u", "title": title})
+            await self.buffer.flush()
+        async with db_session.get_session() as session:
+            rows = (await session.execute(select(BilibiliVideo.video_id, BilibiliVideo.title))).all()
+        self.assertEqual([tuple(r) for r in rows], [(1, "new")])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,17 +1,93 @@
+import argparse
 import asyncio
 import csv
 import json
 import os
 import pathlib
-from typing import Dict, List
+import textwrap
+import time
+from typing import AsyncIterator, Dict, List, Optional
 import aiofiles
 import config
 from tools.utils import utils
 from tools.words import AsyncWordCloudGenerator
 
+# JSONL 缓冲：攒够行数或距上次落盘超过秒数时追加写入
+JSONL_BUFFER_LINES = 50
+JSONL_BUFFER_SECONDS = 1.0
+
+# 存储层每条数据都会新建一个 AsyncFileWriter，锁和缓冲必须按文件路径在进程内共享
+_file_locks: Dict[str, asyncio.Lock] = {}
+_jsonl_buffers: Dict[str, List[str]] = {}
+_jsonl_last_flush: Dict[str, float] = {}
+
+
+def _get_file_lock(file_path: str) -> asyncio.Lock:
+    lock = _file_locks.get(file_path)
+    if lock is None:
+        lock = _file_locks[file_path] = asyncio.Lock()
+    return lock
+
+
+async def _flush_jsonl_file(file_path: str):
+    async with _get_file_lock(file_path):
+        lines = _jsonl_buffers.get(file_path)
+        if not lines:
+            return
+        _jsonl_buffers[file_path] = []
+        async with aiofiles.open(file_path, 'a', encoding='utf-8') as f:
+            await f.write(''.join(lines))
+        _jsonl_last_flush[file_path] = time.monotonic()
+
+
+def _comment_text(comment) -> str:
+    """Extract the comment text, field names differ across platforms"""
+    if not isinstance(comment, dict):
+        return ''
+    return comment.get('content') or comment.get('comment_text') or comment.get('text') or ''
+
+
+def convert_jsonl_to_json(jsonl_path: str, json_path: Optional[str] = None) -> str:
+    """
+    Convert a JSONL file into the legacy JSON array format, streaming line by line
+    Args:
+        jsonl_path: source .jsonl file
+        json_path: target .json file, defaults to the same name under the sibling json directory
+
+    Returns:
+        path of the written JSON file
+    """
+    if json_path is None:
+        base_dir, file_name = os.path.split(jsonl_path)
+        if os.path.basename(base_dir) == 'jsonl':
+            base_dir = os.path.join(os.path.dirname(base_dir), 'json')
+        json_path = os.path.join(base_dir, os.path.splitext(file_name)[0] + '.json')
+    pathlib.Path(os.path.dirname(json_path) or '.').mkdir(parents=True, exist_ok=True)
+
+    tmp_path = json_path + '.tmp'
+    count = 0
+    with open(jsonl_path, 'r', encoding='utf-8') as src, open(tmp_path, 'w', encoding='utf-8') as dst:
+        dst.write('[')
+        for line_no, line in enumerate(src, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError:
+                utils.logger.warning(f"[convert_jsonl_to_json] Skip invalid line {line_no} in {jsonl_path}")
+                continue
+            # 与 json.dumps(list, indent=4) 的输出格式保持一致
+            dst.write('\n' if count == 0 else ',\n')
+            dst.write(textwrap.indent(json.dumps(item, ensure_ascii=False, indent=4), '    '))
+            count += 1
+        dst.write('\n]' if count else ']')
+    os.replace(tmp_path, json_path)
+    return json_path
+
+
 class AsyncFileWriter:
     def __init__(self, platform: str, crawler_type: str):
-        self.lock = asyncio.Lock()
         self.platform = platform
         self.crawler_type = crawler_type
         self.wordcloud_generator = AsyncWordCloudGenerator() if config.ENABLE_GET_WORDCLOUD else None
@@ -24,7 +100,7 @@ class AsyncFileWriter:
 
     async def write_to_csv(self, item: Dict, item_type: str):
         file_path = self._get_file_path('csv', item_type)
-        async with self.lock:
+        async with _get_file_lock(file_path):
             file_exists = os.path.exists(file_path)
             async with aiofiles.open(file_path, 'a', newline='', encoding='utf-8-sig') as f:
                 writer = csv.DictWriter(f, fieldnames=item.keys())
@@ -33,8 +109,12 @@ class AsyncFileWriter:
                 await writer.writerow(item)
 
     async def write_single_item_to_json(self, item: Dict, item_type: str):
+        if config.JSON_SAVE_FORMAT == 'jsonl':
+            await self.write_single_item_to_jsonl(item, item_type)
+            return
+
         file_path = self._get_file_path('json', item_type)
-        async with self.lock:
+        async with _get_file_lock(file_path):
             existing_data = []
             if os.path.exists(file_path) and os.path.getsize(file_path) > 0:
                 async with aiofiles.open(file_path, 'r', encoding='utf-8') as f:
@@ -46,12 +126,59 @@ class AsyncFileWriter:
                             existing_data = [existing_data]
                     except json.JSONDecodeError:
                         existing_data = []
-            
+
             existing_data.append(item)
 
             async with aiofiles.open(file_path, 'w', encoding='utf-8') as f:
                 await f.write(json.dumps(existing_data, ensure_ascii=False, indent=4))
 
+    async def write_single_item_to_jsonl(self, item: Dict, item_type: str):
+        """
+        Append one item as a JSON line; lines are buffered per file and written in batches
+        """
+        file_path = self._get_file_path('jsonl', item_type)
+        buffer = _jsonl_buffers.setdefault(file_path, [])
+        buffer.append(json.dumps(item, ensure_ascii=False) + '\n')
+        last_flush = _jsonl_last_flush.setdefault(file_path, time.monotonic())
+        if len(buffer) >= JSONL_BUFFER_LINES or time.monotonic() - last_flush >= JSONL_BUFFER_SECONDS:
+            await _flush_jsonl_file(file_path)
+
+    @staticmethod
+    async def flush_all():
+        """Write out every buffered JSONL line (call before reading the files and on shutdown)"""
+        for file_path in list(_jsonl_buffers):
+            await _flush_jsonl_file(file_path)
+
+    async def convert_to_json(self, item_type: str) -> Optional[str]:
+        """
+        Convert today's JSONL file of an item type into the legacy JSON array file
+        Args:
+            item_type: contents / comments / creators ...
+
+        Returns:
+            path of the JSON file, None if there is no JSONL file
+        """
+        jsonl_path = self._get_file_path('jsonl', item_type)
+        await _flush_jsonl_file(jsonl_path)
+        if not os.path.exists(jsonl_path):
+            return None
+        async with _get_file_lock(jsonl_path):
+            return await asyncio.to_thread(convert_jsonl_to_json, jsonl_path, self._get_file_path('json', item_type))
+
+    @staticmethod
+    async def _iter_jsonl_comment_texts(file_path: str) -> AsyncIterator[str]:
+        async with aiofiles.open(file_path, 'r', encoding='utf-8') as f:
+            async for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    content_text = _comment_text(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+                if content_text:
+                    yield content_text
+
     async def generate_wordcloud_from_comments(self):
         """
         Generate wordcloud from comments data
@@ -64,6 +191,26 @@ class AsyncFileWriter:
             return
 
         try:
+            words_base_path = f"data/{self.platform}/words"
+            words_file_prefix = f"{words_base_path}/{self.crawler_type}_comments_{utils.get_current_date()}"
+
+            if config.JSON_SAVE_FORMAT == 'jsonl':
+                # Stream the JSONL file, only the word counter is kept in memory
+                comments_file_path = self._get_file_path('jsonl', 'comments')
+                await _flush_jsonl_file(comments_file_path)
+                if not os.path.exists(comments_file_path) or os.path.getsize(comments_file_path) == 0:
+                    utils.logger.info(f"[AsyncFileWriter.generate_wordcloud_from_comments] No comments file found at {comments_file_path}")
+                    return
+                pathlib.Path(words_base_path).mkdir(parents=True, exist_ok=True)
+                word_freq = await self.wordcloud_generator.generate_word_frequency_and_cloud_from_stream(
+                    self._iter_jsonl_comment_texts(comments_file_path), words_file_prefix
+                )
+                if not word_freq:
+                    utils.logger.info(f"[AsyncFileWriter.generate_wordcloud_from_comments] No valid comment content found")
+                    return
+                utils.logger.info(f"[AsyncFileWriter.generate_wordcloud_from_comments] Wordcloud generated successfully at {words_file_prefix}")
+                return
+
             # Read comments from JSON file
             comments_file_path = self._get_file_path('json', 'comments')
             if not os.path.exists(comments_file_path) or os.path.getsize(comments_file_path) == 0:
@@ -84,24 +231,32 @@ class AsyncFileWriter:
             # Handle different comment data structures across platforms
             filtered_data = []
             for comment in comments_data:
-                if isinstance(comment, dict):
-                    # Try different possible content field names
-                    content_text = comment.get('content') or comment.get('comment_text') or comment.get('text') or ''
-                    if content_text:
-                        filtered_data.append({'content': content_text})
+                content_text = _comment_text(comment)
+                if content_text:
+                    filtered_data.append({'content': content_text})
 
             if not filtered_data:
                 utils.logger.info(f"[AsyncFileWriter.generate_wordcloud_from_comments] No valid comment content found")
                 return
 
             # Generate wordcloud
-            words_base_path = f"data/{self.platform}/words"
             pathlib.Path(words_base_path).mkdir(parents=True, exist_ok=True)
-            words_file_prefix = f"{words_base_path}/{self.crawler_type}_comments_{utils.get_current_date()}"
 
             utils.logger.info(f"[AsyncFileWriter.generate_wordcloud_from_comments] Generating wordcloud from {len(filtered_data)} comments")
             await self.wordcloud_generator.generate_word_frequency_and_cloud(filtered_data, words_file_prefix)
             utils.logger.info(f"[AsyncFileWriter.generate_wordcloud_from_comments] Wordcloud generated successfully at {words_file_prefix}")
 
         except Exception as e:
-            utils.logger.error(f"[AsyncFileWriter.generate_wordcloud_from_comments] Error generating wordcloud: {e}")
\ No newline at end of file
+            utils.logger.error(f"[AsyncFileWriter.generate_wordcloud_from_comments] Error generating wordcloud: {e}")
+
+
+if __name__ == '__main__':
+    # python -m tools.async_file_writer data/xhs/jsonl/search_comments_2025-01-01.jsonl
+    parser = argparse.ArgumentParser(description='Convert JSONL crawl output into JSON array files')
+    parser.add_argument('files', nargs='+', help='JSONL files to convert')
+    parser.add_argument('--output', help='output JSON path (only valid with a single input file)')
+    args = parser.parse_args()
+    if args.output and len(args.files) > 1:
+        parser.error('--output can only be used with a single input file')
+    for jsonl_file in args.files:
+        print(convert_jsonl_to_json(jsonl_file, args.output))
@@ -12,6 +12,7 @@
 import asyncio
 import json
 import logging
+import os
 from collections import Counter
 
 import aiofiles
@@ -42,9 +43,26 @@ class AsyncWordCloudGenerator:
 
     async def generate_word_frequency_and_cloud(self, data, save_words_prefix):
         all_text = ' '.join(item['content'] for item in data)
-        words = [word for word in jieba.lcut(all_text) if word not in self.stop_words and len(word.strip()) > 0]
-        word_freq = Counter(words)
+        word_freq = Counter(self.cut_words(all_text))
+        await self.save_word_frequency_and_cloud(word_freq, save_words_prefix)
 
+    async def generate_word_frequency_and_cloud_from_stream(self, texts, save_words_prefix):
+        """
+        Same as generate_word_frequency_and_cloud, but consumes an async iterator of texts
+        and only keeps the running word counter in memory
+        """
+        word_freq = Counter()
+        async for text in texts:
+            word_freq.update(self.cut_words(text))
+        if not word_freq:
+            return word_freq
+        await self.save_word_frequency_and_cloud(word_freq, save_words_prefix)
+        return word_freq
+
+    def cut_words(self, text):
+        return [word for word in jieba.lcut(text) if word not in self.stop_words and len(word.strip()) > 0]
+
+    async def save_word_frequency_and_cloud(self, word_freq, save_words_prefix):
         # Save word frequency to file
         freq_file = f"{save_words_prefix}_word_freq.json"
         async with aiofiles.open(freq_file, 'w', encoding='utf-8') as file:
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DeepSentimentCrawling模块 - 多平台爬取调度器
+不同平台在各自的子进程中并发爬取：全局限制同时运行的进程数，同一平台同一时刻只运行一个任务，
+逐行转发子进程输出，支持单平台超时与整体取消，每个任务结束时立即回调，便于调用方汇总统计。
+"""
+
+import os
+import signal
+import subprocess
+import sys
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from loguru import logger
+
+# 超时或取消后等待子进程自行退出的秒数，之后强制结束
+TERMINATE_GRACE_SECONDS = 10
+
+
+@dataclass
+class CrawlJob:
+    """一个平台的爬取任务"""
+    platform: str
+    cmd: List[str]
+    timeout: Optional[float] = 3600  # 秒，None 表示不限时
+    env: Dict[str, str] = field(default_factory=dict)  # 额外的环境变量，如该任务独占的CDP端口
+
+
+@dataclass
+class CrawlJobResult:
+    """爬取任务的执行结果"""
+    platform: str
+    start_time: datetime
+    end_time: datetime
+    return_code: Optional[int] = None
+    timed_out: bool = False
+    cancelled: bool = False
+    error: Optional[str] = None
+    output_tail: List[str] = field(default_factory=list)  # 子进程最后若干行输出
+
+    @property
+    def success(self) -> bool:
+        return self.return_code == 0 and not (self.timed_out or self.cancelled or self.error)
+
+    @property
+    def duration_seconds(self) -> float:
+        return (self.end_time - self.start_time).total_seconds()
+
+
+class CrawlScheduler:
+    """多平台爬取调度器（线程池驱动子进程）"""
+
+    def __init__(self, cwd: Path, max_parallel: int = 3, output_tail_lines: int = 50):
+        """
+        Args:
+            cwd: 子进程工作目录（MediaCrawler目录）
+            max_parallel: 同时运行的爬虫进程上限
+            output_tail_lines: 每个任务保留的末尾输出行数
+        """
+        self.cwd = Path(cwd)
+        self.max_parallel = max(1, max_parallel)
+        self.output_tail_lines = output_tail_lines
+        self._cancel_event = threading.Event()
+        self._processes: Dict[str, subprocess.Popen] = {}
+        self._lock = threading.Lock()
+
+    def cancel(self):
+        """取消调度：正在运行的子进程被终止，尚未开始的任务直接标记为取消"""
+        self._cancel_event.set()
+        with self._lock:
+            processes = list(self._processes.values())
+        for process in processes:
+            self._terminate(process)
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def run(self, jobs: List[CrawlJob],
+            on_output: Optional[Callable[[str, str], None]] = None,
+            on_complete: Optional[Callable[[CrawlJobResult], None]] = None) -> List[CrawlJobResult]:
+        """
+        执行全部任务，阻塞直到结束
+
+        Args:
+            jobs: 任务列表，同一平台的多个任务按顺序依次执行
+            on_output: 子进程每输出一行调用一次 (platform, line)，在工作线程中调用
+            on_complete: 每个任务结束时在调用线程中调用，可直接在其中汇总统计
+
+        Returns:
+            按完成顺序排列的结果列表
+        """
+        # 同一平台的任务放在同一个工作单元中串行执行，保证每个站点同时只有一个爬虫进程
+        jobs_by_platform: Dict[str, List[CrawlJob]] = {}
+        for job in jobs:
+            jobs_by_platform.setdefault(job.platform, []).append(job)
+
+        results: List[CrawlJobResult] = []
+        executor = ThreadPoolExecutor(max_workers=self.max_parallel, thread_name_prefix="crawl")
+        try:
+            futures = [
+                executor.submit(self._run_platform_jobs, platform_jobs, on_output)
+                for platform_jobs in jobs_by_platform.values()
+            ]
+            for future in as_completed(futures):
+                for result in future.result():
+                    results.append(result)
+                    if on_complete:
+                        on_complete(result)
+        except KeyboardInterrupt:
+            logger.warning("收到中断信号，正在终止所有爬虫进程...")
+            self.cancel()
+            raise
+        finally:
+            executor.shutdown(wait=True)
+        return results
+
+    def _run_platform_jobs(self, jobs: List[CrawlJob],
+                           on_output: Optional[Callable[[str, str], None]]) -> List[CrawlJobResult]:
+        return [self._run_job(job, on_output) for job in jobs]
+
+    def _run_job(self, job: CrawlJob, on_output: Optional[Callable[[str, str], None]]) -> CrawlJobResult:
+        start_time = datetime.now()
+        if self.cancelled:
+            return CrawlJobResult(job.platform, start_time, start_time, cancelled=True, error="爬取已取消")
+
+        tail: deque = deque(maxlen=self.output_tail_lines)
+        env = dict(os.environ, PYTHONUNBUFFERED="1", PYTHONIOENCODING="utf-8", **job.env)
+        try:
+            process = subprocess.Popen(
+                job.cmd,
+                cwd=self.cwd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                encoding="utf-8",
+                errors="replace",
+                bufsize=1,
+                env=env,
+                # 独立进程组，超时/取消时连同浏览器等子进程一起结束
+                start_new_session=os.name == "posix",
+            )
+        except OSError as e:
+            return CrawlJobResult(job.platform, start_time, datetime.now(), error=f"启动爬虫进程失败: {e}")
+
+        with self._lock:
+            self._processes[job.platform] = process
+        reader = threading.Thread(
+            target=self._pump_output, args=(job.platform, process, tail, on_output),
+            name=f"crawl-output-{job.platform}", daemon=True,
+        )
+        reader.start()
+
+        timed_out = False
+        try:
+            process.wait(timeout=job.timeout)
+        except subprocess.TimeoutExpired:
+            timed_out = True
+            logger.error(f"❌ {job.platform} 爬取超时（{job.timeout:.0f}秒），正在终止进程")
+            self._terminate(process)
+        finally:
+            with self._lock:
+                self._processes.pop(job.platform, None)
+        reader.join(timeout=5)
+
+        result = CrawlJobResult(
+            platform=job.platform,
+            start_time=start_time,
+            end_time=datetime.now(),
+            return_code=process.returncode,
+            timed_out=timed_out,
+            cancelled=self.cancelled and process.returncode != 0,
+            output_tail=list(tail),
+        )
+        if result.timed_out:
+            result.error = "爬取超时"
+        elif result.cancelled:
+            result.error = "爬取已取消"
+        return result
+
+    @staticmethod
+    def _pump_output(platform: str, process: subprocess.Popen, tail: deque,
+                     on_output: Optional[Callable[[str, str], None]]):
+        for line in process.stdout:
+            line = line.rstrip()
+            if not line:
+                continue
+            tail.append(line)
+            if on_output:
+                try:
+                    on_output(platform, line)
+                except Exception as e:
+                    logger.debug(f"处理 {platform} 爬虫输出失败: {e}")
+        process.stdout.close()
+
+    @staticmethod
+    def _terminate(process: subprocess.Popen):
+        """先发送 SIGTERM（Windows 上为 terminate），宽限期后仍未退出则强制结束"""
+        if process.poll() is not None:
+            return
+        try:
+            if os.name == "posix":
+                os.killpg(process.pid, signal.SIGTERM)
+            else:
+                process.terminate()
+            process.wait(timeout=TERMINATE_GRACE_SECONDS)
+        except subprocess.TimeoutExpired:
+            if os.name == "posix":
+                os.killpg(process.pid, signal.SIGKILL)
+            else:
+                process.kill()
+            process.wait()
+        except (ProcessLookupError, PermissionError):
+            pass
+
+
+def log_crawl_output(platform: str, line: str):
+    """默认的输出转发：带平台前缀写入日志"""
+    logger.info(f"[{platform}] {line}")
+
+
+if __name__ == "__main__":
+    # 简单自测：两个假任务并发执行
+    scheduler = CrawlScheduler(Path.cwd(), max_parallel=2)
+    demo_jobs = [
+        CrawlJob("a", [sys.executable, "-c", "import time\nfor i in range(3): print(i); time.sleep(0.2)"]),
+        CrawlJob("b", [sys.executable, "-c", "import time; time.sleep(5)"], timeout=1),
+    ]
+    for demo_result in scheduler.run(demo_jobs, on_output=log_crawl_output):
+        logger.info(f"{demo_result.platform}: success={demo_result.success}, error={demo_result.error}")
@@ -30,7 +30,7 @@ class DeepSentimentCrawling:
     def run_daily_crawling(self, target_date: date = None, platforms: List[str] = None, 
                           max_keywords_per_platform: int = 50, 
                           max_notes_per_platform: int = 50,
-                          login_type: str = "qrcode") -> Dict:
+                          login_type: str = "qrcode", max_parallel: int = None) -> Dict:
         """
         执行每日爬取任务
         
@@ -40,6 +40,7 @@ class DeepSentimentCrawling:
             max_keywords_per_platform: 每个平台最大关键词数量
             max_notes_per_platform: 每个平台最大爬取内容数量
             login_type: 登录方式
+            max_parallel: 同时爬取的平台数上限，默认使用 CRAWL_MAX_PARALLEL_PLATFORMS
         
         Returns:
             爬取结果统计
@@ -76,7 +77,7 @@ class DeepSentimentCrawling:
         # 3. 执行全平台关键词爬取
         print(f"\n🔄 开始全平台关键词爬取...")
         crawl_results = self.platform_crawler.run_multi_platform_crawl_by_keywords(
-            keywords, platforms, login_type, max_notes_per_platform
+            keywords, platforms, login_type, max_notes_per_platform, max_parallel
         )
         
         # 4. 生成最终报告
@@ -206,6 +207,8 @@ def main():
                        help="每个平台最大爬取内容数量 (默认: 50)")
     parser.add_argument("--login-type", type=str, choices=['qrcode', 'phone', 'cookie'], 
                        default='qrcode', help="登录方式 (默认: qrcode)")
+    parser.add_argument("--max-parallel", type=int, default=None,
+                       help="同时爬取的平台数上限 (默认: 配置项 CRAWL_MAX_PARALLEL_PLATFORMS，扫码登录时始终为1)")
     
     # 功能参数
     parser.add_argument("--list-topics", action="store_true", help="列出最近的话题数据")
@@ -262,7 +265,7 @@ def main():
         platforms = args.platforms if args.platforms else None
         result = crawler.run_daily_crawling(
             target_date, platforms, args.max_keywords, 
-            args.max_notes, args.login_type
+            args.max_notes, args.login_type, args.max_parallel
         )
         
         if result['success']:
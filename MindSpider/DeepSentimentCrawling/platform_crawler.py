@@ -7,7 +7,6 @@ DeepSentimentCrawling模块 - 平台爬虫管理器
 
 import os
 import sys
-import subprocess
 import tempfile
 from datetime import datetime
 from pathlib import Path
@@ -24,6 +23,8 @@ try:
 except ImportError:
     raise ImportError("无法导入config.py配置文件")
 
+from crawl_scheduler import CrawlJob, CrawlJobResult, CrawlScheduler, log_crawl_output
+
 class PlatformCrawler:
     """平台爬虫管理器"""
     
@@ -32,6 +33,7 @@ class PlatformCrawler:
         self.mediacrawler_path = Path(__file__).parent / "MediaCrawler"
         self.supported_platforms = ['xhs', 'dy', 'ks', 'bili', 'wb', 'tieba', 'zhihu']
         self.crawl_stats = {}
+        self.scheduler: Optional[CrawlScheduler] = None
         
         # 确保MediaCrawler目录存在
         if not self.mediacrawler_path.exists():
@@ -186,6 +188,11 @@ postgresql_db_config = {{
                     new_lines.append('CRAWLER_MAX_COMMENTS_COUNT_SINGLENOTES = 20')
                 elif line.startswith('HEADLESS = '):
                     new_lines.append('HEADLESS = True')  # 使用无头模式
+                elif line.startswith('CDP_DEBUG_PORT = '):
+                    # 多平台并发时各爬虫进程通过环境变量使用独立端口，避免同时探测同一端口
+                    if 'import os' not in new_lines:
+                        new_lines.append('import os')
+                    new_lines.append(f'CDP_DEBUG_PORT = int(os.getenv("CDP_DEBUG_PORT", "{config.settings.CRAWL_CDP_BASE_PORT}"))')
                 else:
                     new_lines.append(line)
             
@@ -200,8 +207,67 @@ postgresql_db_config = {{
             logger.exception(f"创建基础配置失败: {e}")
             return False
     
+    def _get_save_data_option(self) -> str:
+        """根据数据库类型确定 MediaCrawler 的 SAVE_DATA_OPTION"""
+        db_dialect = (config.settings.DB_DIALECT or "mysql").lower()
+        return "postgresql" if db_dialect in ("postgresql", "postgres") else "db"
+
+    def _prepare_mediacrawler(self, platform: str, keywords: List[str], max_notes: int) -> Optional[str]:
+        """写入 MediaCrawler 的数据库与基础配置，失败时返回错误信息"""
+        if not self.configure_mediacrawler_db():
+            return "数据库配置失败"
+        if not self.create_base_config(platform, keywords, "search", max_notes):
+            return "基础配置创建失败"
+        return None
+
+    def _build_crawl_job(self, platform: str, keywords: List[str], login_type: str,
+                         timeout: Optional[float], job_index: int = 0) -> CrawlJob:
+        """
+        构建单个平台的爬取任务
+        平台和关键词通过命令行传入，多个平台并发时不依赖共享配置文件中的 PLATFORM / KEYWORDS；
+        CDP调试端口按任务序号分配（起始端口+序号），并发的浏览器不会争抢同一端口
+        """
+        cmd = [
+            sys.executable, "main.py",
+            "--platform", platform,
+            "--lt", login_type,
+            "--type", "search",
+            "--keywords", ",".join(keywords),
+            "--save_data_option", self._get_save_data_option()
+        ]
+        cdp_port = config.settings.CRAWL_CDP_BASE_PORT + job_index
+        return CrawlJob(platform=platform, cmd=cmd, timeout=timeout, env={"CDP_DEBUG_PORT": str(cdp_port)})
+
+    def _build_crawl_stats(self, result: CrawlJobResult, keywords: List[str]) -> Dict:
+        """将调度结果转换为爬取统计并记录到 crawl_stats"""
+        crawl_stats = {
+            "platform": result.platform,
+            "keywords_count": len(keywords),
+            "duration_seconds": result.duration_seconds,
+            "start_time": result.start_time.isoformat(),
+            "end_time": result.end_time.isoformat(),
+            "return_code": result.return_code,
+            "success": result.success,
+            "notes_count": 0,
+            "comments_count": 0,
+            "errors_count": 0
+        }
+        if result.error:
+            crawl_stats["error"] = result.error
+        self.crawl_stats[result.platform] = crawl_stats
+
+        if result.success:
+            logger.info(f"✅ {result.platform} 爬取完成，耗时: {result.duration_seconds:.1f}秒")
+        elif result.error:
+            logger.error(f"❌ {result.platform} {result.error}，耗时: {result.duration_seconds:.1f}秒")
+        else:
+            tail = "\n".join(result.output_tail[-10:])
+            logger.error(f"❌ {result.platform} 爬取失败，返回码: {result.return_code}\n{tail}")
+        return crawl_stats
+
     def run_crawler(self, platform: str, keywords: List[str], 
-                   login_type: str = "qrcode", max_notes: int = 50) -> Dict:
+                   login_type: str = "qrcode", max_notes: int = 50,
+                   timeout: Optional[float] = None) -> Dict:
         """
         运行爬虫
         
@@ -210,6 +276,7 @@ postgresql_db_config = {{
             keywords: 关键词列表
             login_type: 登录方式
             max_notes: 最大爬取数量
+            timeout: 超时时间（秒），默认使用 CRAWL_PLATFORM_TIMEOUT
         
         Returns:
             爬取结果统计
@@ -224,70 +291,20 @@ postgresql_db_config = {{
         start_message += f"\n关键词: {keywords[:5]}{'...' if len(keywords) > 5 else ''} (共{len(keywords)}个)"
         logger.info(start_message)
         
-        start_time = datetime.now()
-        
         try:
-            # 配置数据库
-            if not self.configure_mediacrawler_db():
-                return {"success": False, "error": "数据库配置失败"}
-            
-            # 创建基础配置
-            if not self.create_base_config(platform, keywords, "search", max_notes):
-                return {"success": False, "error": "基础配置创建失败"}
-            
-            # 判断数据库类型，确定 save_data_option
-            db_dialect = (config.settings.DB_DIALECT or "mysql").lower()
-            is_postgresql = db_dialect in ("postgresql", "postgres")
-            save_data_option = "postgresql" if is_postgresql else "db"
-            
-            # 构建命令
-            cmd = [
-                sys.executable, "main.py",
-                "--platform", platform,
-                "--lt", login_type,
-                "--type", "search",
-                "--save_data_option", save_data_option
-            ]
-            
-            logger.info(f"执行命令: {' '.join(cmd)}")
-            
-            # 切换到MediaCrawler目录并执行
-            result = subprocess.run(
-                cmd,
-                cwd=self.mediacrawler_path,
-                timeout=3600  # 60分钟超时
-            )
-            
-            end_time = datetime.now()
-            duration = (end_time - start_time).total_seconds()
-            
-            # 创建统计信息
-            crawl_stats = {
-                "platform": platform,
-                "keywords_count": len(keywords),
-                "duration_seconds": duration,
-                "start_time": start_time.isoformat(),
-                "end_time": end_time.isoformat(),
-                "return_code": result.returncode,
-                "success": result.returncode == 0,
-                "notes_count": 0,
-                "comments_count": 0,
-                "errors_count": 0
-            }
-            
-            # 保存统计信息
-            self.crawl_stats[platform] = crawl_stats
+            error = self._prepare_mediacrawler(platform, keywords, max_notes)
+            if error:
+                return {"success": False, "error": error}
             
-            if result.returncode == 0:
-                logger.info(f"✅ {platform} 爬取完成，耗时: {duration:.1f}秒")
-            else:
-                logger.error(f"❌ {platform} 爬取失败，返回码: {result.returncode}")
+            job = self._build_crawl_job(platform, keywords, login_type,
+                                        timeout or config.settings.CRAWL_PLATFORM_TIMEOUT)
+            logger.info(f"执行命令: {' '.join(job.cmd)}")
             
-            return crawl_stats
+            # 切换到MediaCrawler目录并执行，实时转发爬虫输出
+            self.scheduler = CrawlScheduler(self.mediacrawler_path, max_parallel=1)
+            result = self.scheduler.run([job], on_output=log_crawl_output)[0]
+            return self._build_crawl_stats(result, keywords)
             
-        except subprocess.TimeoutExpired:
-            logger.exception(f"❌ {platform} 爬取超时")
-            return {"success": False, "error": "爬取超时", "platform": platform}
         except Exception as e:
             logger.exception(f"❌ {platform} 爬取异常: {e}")
             return {"success": False, "error": str(e), "platform": platform}
@@ -330,24 +347,44 @@ postgresql_db_config = {{
         
         return stats
     
+    def cancel(self):
+        """取消正在进行的爬取（可从其他线程调用），运行中的爬虫进程会被终止"""
+        if self.scheduler:
+            self.scheduler.cancel()
+
     def run_multi_platform_crawl_by_keywords(self, keywords: List[str], platforms: List[str],
-                                            login_type: str = "qrcode", max_notes_per_keyword: int = 50) -> Dict:
+                                            login_type: str = "qrcode", max_notes_per_keyword: int = 50,
+                                            max_parallel: Optional[int] = None,
+                                            platform_timeout: Optional[float] = None) -> Dict:
         """
         基于关键词的多平台爬取 - 每个关键词在所有平台上都进行爬取
+        不同平台在各自的进程中并发爬取，同一平台同时只有一个进程，每个平台完成时立即汇总统计
         
         Args:
             keywords: 关键词列表
             platforms: 平台列表
             login_type: 登录方式
             max_notes_per_keyword: 每个关键词在每个平台的最大爬取数量
+            max_parallel: 同时运行的平台数上限，默认使用 CRAWL_MAX_PARALLEL_PLATFORMS；
+                扫码登录（qrcode）是例外，始终逐个平台串行爬取
+            platform_timeout: 单个平台的超时时间（秒），默认使用 CRAWL_PLATFORM_TIMEOUT
         
         Returns:
             总体爬取统计
         """
+        platforms = list(dict.fromkeys(platforms))
+        max_parallel = max_parallel or config.settings.CRAWL_MAX_PARALLEL_PLATFORMS
+        if login_type == "qrcode" and max_parallel > 1:
+            # 扫码登录需要人工逐个扫码，并发启动的浏览器会同时弹出二维码并互相超时，
+            # 因此串行爬取；并发上限只对 cookie/phone 登录生效
+            logger.info(f"扫码登录按平台串行爬取（并发上限 {max_parallel} 仅对cookie/phone登录生效）")
+            max_parallel = 1
+        platform_timeout = platform_timeout or config.settings.CRAWL_PLATFORM_TIMEOUT
         
         start_message = f"\n🚀 开始全平台关键词爬取"
         start_message += f"\n   关键词数量: {len(keywords)}"
         start_message += f"\n   平台数量: {len(platforms)}"
+        start_message += f"\n   并发平台数: {min(max_parallel, len(platforms))}"
         start_message += f"\n   登录方式: {login_type}"
         start_message += f"\n   每个关键词在每个平台的最大爬取数量: {max_notes_per_keyword}"
         start_message += f"\n   总爬取任务: {len(keywords)} × {len(platforms)} = {len(keywords) * len(platforms)}"
@@ -374,65 +411,61 @@ postgresql_db_config = {{
                 "total_comments": 0
             }
         
-        # 对每个平台一次性爬取所有关键词
-        for platform in platforms:
-            logger.info(f"\n📝 在 {platform} 平台爬取所有关键词")
-            logger.info(f"   关键词: {', '.join(keywords[:5])}{'...' if len(keywords) > 5 else ''}")
-            
-            try:
-                # 一次性传递所有关键词给平台
-                result = self.run_crawler(platform, keywords, login_type, max_notes_per_keyword)
+        def record_result(platform: str, result: Dict):
+            """汇总单个平台的结果"""
+            if result.get("success"):
+                total_stats["successful_tasks"] += len(keywords)
+                total_stats["platform_summary"][platform]["successful_keywords"] = len(keywords)
                 
-                if result.get("success"):
-                    total_stats["successful_tasks"] += len(keywords)
-                    total_stats["platform_summary"][platform]["successful_keywords"] = len(keywords)
-                    
-                    notes_count = result.get("notes_count", 0)
-                    comments_count = result.get("comments_count", 0)
-                    
-                    total_stats["total_notes"] += notes_count
-                    total_stats["total_comments"] += comments_count
-                    total_stats["platform_summary"][platform]["total_notes"] = notes_count
-                    total_stats["platform_summary"][platform]["total_comments"] = comments_count
-                    
-                    # 为每个关键词记录结果
-                    for keyword in keywords:
-                        if keyword not in total_stats["keyword_results"]:
-                            total_stats["keyword_results"][keyword] = {}
-                        total_stats["keyword_results"][keyword][platform] = result
-                    
-                    logger.info(f"   ✅ 成功: {notes_count} 条内容, {comments_count} 条评论")
-                else:
-                    total_stats["failed_tasks"] += len(keywords)
-                    total_stats["platform_summary"][platform]["failed_keywords"] = len(keywords)
-                    
-                    # 为每个关键词记录失败结果
-                    for keyword in keywords:
-                        if keyword not in total_stats["keyword_results"]:
-                            total_stats["keyword_results"][keyword] = {}
-                        total_stats["keyword_results"][keyword][platform] = result
-                    
-                    logger.error(f"   ❌ 失败: {result.get('error', '未知错误')}")
-            
-            except Exception as e:
-                total_stats["failed_tasks"] += len(keywords)
-                total_stats["platform_summary"][platform]["failed_keywords"] = len(keywords)
-                error_result = {"success": False, "error": str(e)}
+                notes_count = result.get("notes_count", 0)
+                comments_count = result.get("comments_count", 0)
                 
-                # 为每个关键词记录异常结果
-                for keyword in keywords:
-                    if keyword not in total_stats["keyword_results"]:
-                        total_stats["keyword_results"][keyword] = {}
-                    total_stats["keyword_results"][keyword][platform] = error_result
+                total_stats["total_notes"] += notes_count
+                total_stats["total_comments"] += comments_count
+                total_stats["platform_summary"][platform]["total_notes"] = notes_count
+                total_stats["platform_summary"][platform]["total_comments"] = comments_count
                 
-                logger.error(f"   ❌ 异常: {e}")
+                logger.info(f"   ✅ {platform} 成功: {notes_count} 条内容, {comments_count} 条评论")
+            else:
+                total_stats["failed_tasks"] += len(keywords)
+                total_stats["platform_summary"][platform]["failed_keywords"] = len(keywords)
+                logger.error(f"   ❌ {platform} 失败: {result.get('error', '未知错误')}")
+            
+            # 为每个关键词记录结果
+            for keyword in keywords:
+                total_stats["keyword_results"].setdefault(keyword, {})[platform] = result
+        
+        jobs = []
+        for platform in platforms:
+            if platform not in self.supported_platforms:
+                record_result(platform, {"success": False, "error": f"不支持的平台: {platform}"})
+                continue
+            logger.info(f"\n📝 在 {platform} 平台爬取所有关键词")
+            logger.info(f"   关键词: {', '.join(keywords[:5])}{'...' if len(keywords) > 5 else ''}")
+            jobs.append(self._build_crawl_job(platform, keywords, login_type, platform_timeout, job_index=len(jobs)))
+        
+        # 所有平台共用同一份配置，启动子进程前一次性写好，平台和关键词通过命令行区分
+        error = self._prepare_mediacrawler(jobs[0].platform, keywords, max_notes_per_keyword) if jobs else None
+        if error:
+            for job in jobs:
+                record_result(job.platform, {"success": False, "error": error})
+            jobs = []
+        
+        if jobs:
+            self.scheduler = CrawlScheduler(self.mediacrawler_path, max_parallel=max_parallel)
+            self.scheduler.run(
+                jobs,
+                on_output=log_crawl_output,
+                on_complete=lambda result: record_result(result.platform, self._build_crawl_stats(result, keywords)),
+            )
         
         # 打印详细统计
         finish_message = f"\n📊 全平台关键词爬取完成!"
         finish_message += f"\n   总任务: {total_stats['total_tasks']}"
         finish_message += f"\n   成功: {total_stats['successful_tasks']}"
         finish_message += f"\n   失败: {total_stats['failed_tasks']}"
-        finish_message += f"\n   成功率: {total_stats['successful_tasks']/total_stats['total_tasks']*100:.1f}%"
+        if total_stats['total_tasks']:
+            finish_message += f"\n   成功率: {total_stats['successful_tasks']/total_stats['total_tasks']*100:.1f}%"
         finish_message += f"\n   总内容: {total_stats['total_notes']} 条"
         finish_message += f"\n   总评论: {total_stats['total_comments']} 条"
         logger.info(finish_message)
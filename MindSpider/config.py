@@ -25,6 +25,11 @@ class Settings(BaseSettings):
     MINDSPIDER_API_KEY: Optional[str] = Field(None, description="MINDSPIDER API密钥")
     MINDSPIDER_BASE_URL: Optional[str] = Field("https://api.deepseek.com", description="MINDSPIDER API基础URL，推荐deepseek-chat模型使用https://api.deepseek.com")
     MINDSPIDER_MODEL_NAME: Optional[str] = Field("deepseek-chat", description="MINDSPIDER API模型名称, 推荐deepseek-chat")
+    CRAWL_MAX_PARALLEL_PLATFORMS: int = Field(3, description="cookie/手机号登录时多平台爬取同时运行的爬虫进程数上限（同一平台始终只有一个进程）；扫码登录需逐个人工扫码，始终串行爬取")
+    CRAWL_CDP_BASE_PORT: int = Field(9222, description="并发爬取时各爬虫进程的CDP调试端口起始值，第N个任务使用起始值+N")
+    CRAWL_PLATFORM_TIMEOUT: int = Field(3600, description="单个平台爬取的超时时间（秒）")
+    NEWS_FETCH_CONCURRENCY: int = Field(4, description="热点新闻采集时同时请求的新闻源数量")
+    NEWS_HOST_MIN_INTERVAL: float = Field(0.2, description="热点新闻采集时同一主机相邻请求的最小间隔（秒）")
 
     class Config:
         env_file = ENV_FILE
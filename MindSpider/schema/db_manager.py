@@ -261,6 +261,96 @@ class DatabaseManager:
             cleanup_message += "\n"
         logger.info(cleanup_message)
 
+    def refresh_hot_content(self, days=365, batch_size=1000):
+        """
+        全量刷新热度预计算表 hot_content
+
+        爬虫入库时会增量维护 hot_content；本方法作为定期任务（如cron）补齐历史数据、
+        修正权重调整后的分值，并删除超出时间窗口的记录。
+        全部完成后写入一条 hot_content_refresh 完成标记，InsightEngine 只有看到覆盖所需时间窗口的标记
+        才会从实时计算切换到读取 hot_content，避免回填进行中或中途失败时返回不完整的结果。
+        """
+        # 热度计算规则与爬虫存储层共用同一实现
+        mediacrawler_root = project_root / "DeepSentimentCrawling" / "MediaCrawler"
+        if str(mediacrawler_root) not in sys.path:
+            sys.path.append(str(mediacrawler_root))
+        from store.hot_content import HOT_CONTENT_SPECS, build_hot_content_row
+        from database.models import HotContent, HotContentRefresh
+
+        refresh_message = "\n" + "=" * 60
+        refresh_message += f"刷新热度预计算表 hot_content（最近{days}天）"
+        refresh_message += "=" * 60 + "\n"
+
+        started_ts = int(datetime.now().timestamp())
+        cutoff_dt = datetime.now() - timedelta(days=days)
+        cutoff_sec = int(cutoff_dt.timestamp())
+        cutoff_params = {
+            "sec": cutoff_sec,
+            "ms": cutoff_sec * 1000,
+            "sec_str": str(cutoff_sec),
+            "datetime_str": cutoff_dt.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        existing_tables = set(inspect(self.engine).get_table_names())
+        for table in (HotContent.__table__, HotContentRefresh.__table__):
+            if table.name not in existing_tables:
+                table.create(self.engine)
+
+        total_refreshed = 0
+
+        for source_table, spec in HOT_CONTENT_SPECS.items():
+            if source_table not in existing_tables:
+                refresh_message += f"  {source_table}: 表不存在，跳过\n"
+                continue
+            quote = self.engine.dialect.identifier_preparer.quote
+            query = text(f"SELECT * FROM {quote(source_table)} WHERE {quote(spec['ts_col'])} >= :cutoff")
+            refreshed = 0
+            with self.engine.connect() as read_conn:
+                result = read_conn.execution_options(stream_results=True).execute(query, {"cutoff": cutoff_params[spec["ts_unit"]]})
+                for partition in result.mappings().partitions(batch_size):
+                    rows = [build_hot_content_row(source_table, dict(row)) for row in partition]
+                    rows = [row for row in rows if row and (row["publish_ts"] or 0) >= cutoff_sec]
+                    if rows:
+                        with self.engine.begin() as write_conn:
+                            self._upsert_hot_content(write_conn, HotContent.__table__, rows)
+                        refreshed += len(rows)
+            total_refreshed += refreshed
+            refresh_message += f"  {source_table}: 刷新 {refreshed} 条\n"
+
+        with self.engine.begin() as conn:
+            deleted = conn.execute(
+                text("DELETE FROM hot_content WHERE publish_ts IS NULL OR publish_ts < :cutoff"),
+                {"cutoff": cutoff_sec},
+            ).rowcount
+            # 完成标记与过期清理同一事务提交：标记存在即代表窗口内的回填已全部完成
+            conn.execute(HotContentRefresh.__table__.insert().values(
+                window_days=days,
+                refreshed_count=total_refreshed,
+                started_ts=started_ts,
+                completed_ts=int(datetime.now().timestamp()),
+            ))
+        refresh_message += f"  过期记录: 删除 {deleted} 条\n"
+        refresh_message += f"  完成标记: 已写入（覆盖最近{days}天）\n"
+        logger.info(refresh_message)
+
+    def _upsert_hot_content(self, conn, table, rows):
+        """按方言批量 upsert hot_content，冲突键为 (platform, content_id)"""
+        now_ts = int(datetime.now().timestamp() * 1000)
+        for row in rows:
+            row["add_ts"] = now_ts
+        update_columns = [c.name for c in table.columns if c.name not in ("id", "platform", "content_id", "add_ts")]
+        if self.engine.dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+            stmt = insert(table).values(rows)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["platform", "content_id"],
+                set_={name: stmt.excluded[name] for name in update_columns},
+            )
+        else:
+            from sqlalchemy.dialects.mysql import insert
+            stmt = insert(table).values(rows)
+            stmt = stmt.on_duplicate_key_update({name: stmt.inserted[name] for name in update_columns})
+        conn.execute(stmt)
+
 def main():
     parser = argparse.ArgumentParser(description="MindSpider数据库管理工具")
     parser.add_argument("--tables", action="store_true", help="显示所有表")
@@ -268,11 +358,12 @@ def main():
     parser.add_argument("--recent", type=int, default=7, help="显示最近N天的数据 (默认7天)")
     parser.add_argument("--cleanup", type=int, help="清理N天前的数据")
     parser.add_argument("--execute", action="store_true", help="执行实际清理操作")
+    parser.add_argument("--refresh-hot-content", type=int, metavar="DAYS", help="全量刷新最近N天的热度预计算表hot_content（适合cron定期执行）")
     
     args = parser.parse_args()
     
     # 如果没有参数，显示所有信息
-    if not any([args.tables, args.stats, args.recent != 7, args.cleanup]):
+    if not any([args.tables, args.stats, args.recent != 7, args.cleanup, args.refresh_hot_content]):
         args.tables = True
         args.stats = True
     
@@ -285,11 +376,14 @@ def main():
         if args.stats:
             db_manager.show_statistics()
         
-        if args.recent != 7 or not any([args.tables, args.stats, args.cleanup]):
+        if args.recent != 7 or not any([args.tables, args.stats, args.cleanup, args.refresh_hot_content]):
             db_manager.show_recent_data(args.recent)
         
         if args.cleanup:
             db_manager.cleanup_old_data(args.cleanup, dry_run=not args.execute)
+
+        if args.refresh_hot_content:
+            db_manager.refresh_hot_content(args.refresh_hot_content)
     
     finally:
         db_manager.close()
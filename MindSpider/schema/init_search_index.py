@@ -0,0 +1,113 @@
+"""
+MindSpider 话题检索索引初始化（SQLAlchemy 2.x 异步引擎）
+
+为 InsightEngine 话题搜索涉及的 MediaCrawler 平台表创建全文/三元组索引，
+替代 `LIKE '%topic%'` 的全表扫描：
+- MySQL: 每张表一个覆盖全部检索字段的 FULLTEXT 索引（WITH PARSER ngram，支持中文）
+- PostgreSQL: 启用 pg_trgm 扩展，并为每个检索字段创建 GIN (gin_trgm_ops) 索引
+
+脚本可重复执行，已存在的索引与不存在的表会被跳过。索引缺失时检索自动回退为 LIKE。
+
+检索字段定义需与以下位置保持一致：
+- InsightEngine/tools/search.py（search_topic_globally / get_comments_for_topic 的 search_configs）
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+from loguru import logger
+from sqlalchemy import text, inspect
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from init_database import _build_database_url
+
+# 表 -> 话题检索字段；MySQL 的 MATCH() 列集合必须与索引列集合完全一致
+TOPIC_SEARCH_FIELDS: Dict[str, List[str]] = {
+    "bilibili_video": ["title", "desc", "source_keyword"],
+    "bilibili_video_comment": ["content"],
+    "douyin_aweme": ["title", "desc", "source_keyword"],
+    "douyin_aweme_comment": ["content"],
+    "kuaishou_video": ["title", "desc", "source_keyword"],
+    "kuaishou_video_comment": ["content"],
+    "weibo_note": ["content", "source_keyword"],
+    "weibo_note_comment": ["content"],
+    "xhs_note": ["title", "desc", "tag_list", "source_keyword"],
+    "xhs_note_comment": ["content"],
+    "zhihu_content": ["title", "desc", "content_text", "source_keyword"],
+    "zhihu_comment": ["content"],
+    "tieba_note": ["title", "desc", "source_keyword"],
+    "tieba_comment": ["content"],
+    "daily_news": ["title"],
+}
+
+FULLTEXT_INDEX_NAME = "ft_topic_search"
+
+
+async def _existing_tables(conn: AsyncConnection) -> List[str]:
+    return await conn.run_sync(lambda sync_conn: inspect(sync_conn).get_table_names())
+
+
+async def _create_mysql_indexes(conn: AsyncConnection) -> None:
+    tables = set(await _existing_tables(conn))
+    rows = await conn.execute(text(
+        "SELECT DISTINCT TABLE_NAME FROM information_schema.STATISTICS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND INDEX_NAME = :name"
+    ), {"name": FULLTEXT_INDEX_NAME})
+    indexed = {row[0] for row in rows}
+
+    for table, fields in TOPIC_SEARCH_FIELDS.items():
+        if table not in tables:
+            logger.info(f"[init_search_index] 跳过不存在的表: {table}")
+            continue
+        if table in indexed:
+            logger.info(f"[init_search_index] 索引已存在: {table}.{FULLTEXT_INDEX_NAME}")
+            continue
+        columns = ", ".join(f"`{field}`" for field in fields)
+        logger.info(f"[init_search_index] 创建FULLTEXT索引: {table}({columns})，大表可能耗时较长")
+        await conn.execute(text(
+            f"ALTER TABLE `{table}` ADD FULLTEXT INDEX `{FULLTEXT_INDEX_NAME}` ({columns}) WITH PARSER ngram"
+        ))
+
+
+async def _create_postgresql_indexes(conn: AsyncConnection) -> None:
+    tables = set(await _existing_tables(conn))
+    await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
+    for table, fields in TOPIC_SEARCH_FIELDS.items():
+        if table not in tables:
+            logger.info(f"[init_search_index] 跳过不存在的表: {table}")
+            continue
+        for field in fields:
+            index_name = f"idx_{table}_{field}_trgm"
+            logger.info(f"[init_search_index] 创建三元组索引: {index_name}")
+            await conn.execute(text(
+                f'CREATE INDEX IF NOT EXISTS "{index_name}" ON "{table}" USING gin ("{field}" gin_trgm_ops)'
+            ))
+
+
+async def main() -> None:
+    engine = create_async_engine(_build_database_url(), pool_pre_ping=True)
+    dialect_name = engine.url.get_backend_name()
+
+    async with engine.begin() as conn:
+        if dialect_name == "mysql":
+            await _create_mysql_indexes(conn)
+        elif dialect_name == "postgresql":
+            await _create_postgresql_indexes(conn)
+        else:
+            logger.warning(f"[init_search_index] 不支持的数据库方言: {dialect_name}，话题检索将继续使用LIKE")
+
+    await engine.dispose()
+    logger.info("[init_search_index] 话题检索索引创建完成")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -10,7 +10,7 @@
 """
 
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import Integer, String, BigInteger, Text, ForeignKey
+from sqlalchemy import Integer, String, BigInteger, Text, Float, ForeignKey, Index, UniqueConstraint
 
 # 使用 models_sa 中的 Base，确保所有表在同一个 metadata 中，外键引用可以正常工作
 from models_sa import Base
@@ -465,3 +465,37 @@ class ZhihuCreator(Base):
     get_voteup_count: Mapped[int | None] = mapped_column(Integer, default=0, nullable=True)
     add_ts: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
     last_modify_ts: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+
+
+class HotContent(Base):
+    """内容热度预计算表：由爬虫存储层在入库时增量维护，db_manager --refresh-hot-content 定期全量刷新"""
+    __tablename__ = "hot_content"
+    __table_args__ = (
+        UniqueConstraint("platform", "content_id", name="uq_hot_content_platform_content"),
+        Index("idx_hot_content_publish_ts", "publish_ts"),
+        Index("idx_hot_content_score", "hotness_score"),
+    )
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    platform: Mapped[str] = mapped_column(String(32), nullable=False)
+    content_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    content_type: Mapped[str | None] = mapped_column(String(16), nullable=True)
+    source_table: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    title: Mapped[str | None] = mapped_column(Text, nullable=True)
+    author: Mapped[str | None] = mapped_column(Text, nullable=True)
+    url: Mapped[str | None] = mapped_column(Text, nullable=True)
+    source_keyword: Mapped[str | None] = mapped_column(Text, nullable=True)
+    engagement: Mapped[str | None] = mapped_column(Text, nullable=True)
+    hotness_score: Mapped[float | None] = mapped_column(Float, default=0, nullable=True)
+    publish_ts: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    add_ts: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    last_modify_ts: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+
+
+class HotContentRefresh(Base):
+    """hot_content 全量刷新完成标记：db_manager --refresh-hot-content 最后一步写入，InsightEngine 据此切换到预计算表"""
+    __tablename__ = "hot_content_refresh"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    window_days: Mapped[int] = mapped_column(Integer, nullable=False)
+    refreshed_count: Mapped[int | None] = mapped_column(Integer, default=0, nullable=True)
+    started_ts: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    completed_ts: Mapped[int] = mapped_column(BigInteger, nullable=False)
@@ -6,10 +6,13 @@ Deep Search Agent主类
 import json
 import os
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from typing import Optional, Dict, Any, List
 
 from .llms import LLMClient
+from .llms.base import get_rate_limiter
 from .nodes import (
     ReportStructureNode,
     FirstSearchNode, 
@@ -23,6 +26,17 @@ from .tools import TavilyNewsAgency, TavilyResponse
 from .utils import Settings, format_search_results_for_prompt
 from loguru import logger
 
+
+def _tag_paragraph_log(record):
+    """段落处理期间的日志（包括各节点内部的日志）加上"[段落 N]"前缀，使并行段落交错的输出可区分归属"""
+    paragraph = record["extra"].get("paragraph")
+    if paragraph is not None:
+        record["message"] = f"[段落 {paragraph}] {record['message']}"
+
+
+logger.configure(patcher=_tag_paragraph_log)
+
+
 class DeepSearchAgent:
     """Deep Search Agent主类"""
     
@@ -58,10 +72,20 @@ class DeepSearchAgent:
     
     def _initialize_llm(self) -> LLMClient:
         """初始化LLM客户端"""
+        model_name = self.config.QUERY_ENGINE_MODEL_NAME
+        rate_limiter = None
+        if get_rate_limiter is not None:
+            # 同一引擎同一模型的所有客户端共享一份并发/速率配额
+            rate_limiter = get_rate_limiter(
+                f"QueryEngine:{model_name}",
+                self.config.LLM_MAX_CONCURRENCY,
+                self.config.LLM_REQUESTS_PER_MINUTE,
+            )
         return LLMClient(
             api_key=self.config.QUERY_ENGINE_API_KEY,
-            model_name=self.config.QUERY_ENGINE_MODEL_NAME,
+            model_name=model_name,
             base_url=self.config.QUERY_ENGINE_BASE_URL,
+            rate_limiter=rate_limiter,
         )
     
     def _initialize_nodes(self):
@@ -195,26 +219,61 @@ class DeepSearchAgent:
         logger.info(_message)
     
     def _process_paragraphs(self):
-        """处理所有段落"""
+        """
+        处理所有段落
+
+        段落在生成最终报告前互不依赖，按 PARAGRAPH_CONCURRENCY 有界并行处理：
+        每个工作线程只修改自己段落的 Research，完成进度在锁内统计与播报；
+        LLM 请求的并发数与速率由 LLMClient 的限流器统一约束。
+        """
         total_paragraphs = len(self.state.paragraphs)
-        
-        for i in range(total_paragraphs):
-            logger.info(f"\n[步骤 2.{i+1}] 处理段落: {self.state.paragraphs[i].title}")
+        if total_paragraphs == 0:
+            return
+        workers = max(1, min(self.config.PARAGRAPH_CONCURRENCY, total_paragraphs))
+        progress_lock = threading.Lock()
+        completed = 0
+
+        def process(i: int):
+            nonlocal completed
+            paragraph = self.state.paragraphs[i]
+            logger.info(f"\n[步骤 2.{i + 1}] 处理段落: {paragraph.title}")
             logger.info("-" * 50)
-            
-            # 初始搜索和总结
-            self._initial_search_and_summary(i)
-            
-            # 反思循环
-            self._reflection_loop(i)
-            
-            # 标记段落完成
-            self.state.paragraphs[i].research.mark_completed()
-            
-            progress = (i + 1) / total_paragraphs * 100
-            self.speak(f"段落《{self.state.paragraphs[i].title}》深度分析已完成 ({progress:.1f}%)")
-            logger.info(f"段落处理完成 ({progress:.1f}%)")
-    
+
+            # 段落内（包括各节点）的日志都带上段落编号，见 _tag_paragraph_log
+            with logger.contextualize(paragraph=i + 1):
+                # 初始搜索和总结
+                self._initial_search_and_summary(i)
+
+                # 反思循环
+                self._reflection_loop(i)
+
+                # 标记段落完成
+                paragraph.research.mark_completed()
+
+                with progress_lock:
+                    completed += 1
+                    progress = completed / total_paragraphs * 100
+                    self.speak(f"段落《{paragraph.title}》深度分析已完成 ({progress:.1f}%)")
+                    logger.info(f"段落 {i + 1} 处理完成 ({progress:.1f}%)")
+
+        if workers == 1:
+            for i in range(total_paragraphs):
+                process(i)
+            return
+
+        logger.info(f"并行处理 {total_paragraphs} 个段落（并发数: {workers}）")
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="QueryEngine-paragraph") as executor:
+            futures = {executor.submit(process, i): i for i in range(total_paragraphs)}
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception:
+                    # 与串行处理一致：任一段落失败即终止研究，未开始的段落不再执行
+                    for pending in futures:
+                        pending.cancel()
+                    logger.error(f"段落 {futures[future] + 1} 处理失败，取消剩余段落")
+                    raise
+
     def _initial_search_and_summary(self, paragraph_index: int):
         """执行初始搜索和总结"""
         paragraph = self.state.paragraphs[paragraph_index]
@@ -299,8 +358,8 @@ class DeepSearchAgent:
             )
         }
         
-        # 更新状态
-        self.state = self.first_summary_node.mutate_state(
+        # 更新状态：节点原地更新本段落的总结，不重新绑定 self.state，避免并行段落互相覆盖
+        self.first_summary_node.mutate_state(
             summary_input, self.state, paragraph_index
         )
         
@@ -394,7 +453,7 @@ class DeepSearchAgent:
             }
             
             # 更新状态
-            self.state = self.reflection_summary_node.mutate_state(
+            self.reflection_summary_node.mutate_state(
                 reflection_summary_input, self.state, paragraph_index
             )
             
@@ -23,6 +23,12 @@ from ..utils.text_processing import (
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from utils.prompt_cache import order_payload
+
+# 跨请求不变的输入放在提示词最前：HOST发言对同一时刻的所有段落相同，
+# 段落标题与内容在该段落的各轮反思中不变；搜索结果与最新总结放在其后
+SHARED_PROMPT_KEYS = ("host_speech", "title", "content")
+
 try:
     from utils.forum_reader import get_latest_host_speech, format_host_speech_for_prompt
     FORUM_READER_AVAILABLE = True
@@ -89,8 +95,8 @@ class FirstSummaryNode(StateMutationNode):
                 except Exception as e:
                     logger.exception(f"读取HOST发言失败: {str(e)}")
             
-            # 转换为JSON字符串
-            message = json.dumps(data, ensure_ascii=False)
+            # 转换为JSON字符串（共享字段在前，便于命中前缀缓存）
+            message = json.dumps(order_payload(data, SHARED_PROMPT_KEYS), ensure_ascii=False)
             
             # 如果有HOST发言，添加到消息前面作为参考
             if FORUM_READER_AVAILABLE and 'host_speech' in data and data['host_speech']:
@@ -257,8 +263,8 @@ class ReflectionSummaryNode(StateMutationNode):
                 except Exception as e:
                     logger.exception(f"读取HOST发言失败: {str(e)}")
             
-            # 转换为JSON字符串
-            message = json.dumps(data, ensure_ascii=False)
+            # 转换为JSON字符串（共享字段在前，便于命中前缀缓存）
+            message = json.dumps(order_payload(data, SHARED_PROMPT_KEYS), ensure_ascii=False)
             
             # 如果有HOST发言，添加到消息前面作为参考
             if FORUM_READER_AVAILABLE and 'host_speech' in data and data['host_speech']:
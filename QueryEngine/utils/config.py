@@ -39,6 +39,9 @@ class Settings(BaseSettings):
     SEARCH_CONTENT_MAX_LENGTH: int = Field(20000, description="用于提示的最长内容长度")
     MAX_REFLECTIONS: int = Field(2, description="最大反思轮数")
     MAX_PARAGRAPHS: int = Field(5, description="最大段落数")
+    PARAGRAPH_CONCURRENCY: int = Field(5, description="并行处理的段落数（搜索+总结+反思），1 表示逐段串行")
+    LLM_MAX_CONCURRENCY: int = Field(5, description="同一引擎同时进行的LLM请求上限，0 表示不限制")
+    LLM_REQUESTS_PER_MINUTE: int = Field(0, description="同一引擎每分钟LLM请求上限，0 表示不限制")
     MAX_SEARCH_RESULTS: int = Field(20, description="最大搜索结果数")
     
     # ================== 输出配置 ====================
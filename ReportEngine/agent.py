@@ -10,6 +10,8 @@ Report Agent主类。
 
 import json
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from copy import deepcopy
 from pathlib import Path
 from uuid import uuid4
@@ -20,6 +22,7 @@ from loguru import logger
 
 from .core import (
     ChapterStorage,
+    ContextIndex,
     DocumentComposer,
     TemplateSection,
     parse_template_sections,
@@ -30,6 +33,7 @@ from .nodes import (
     TemplateSelectionNode,
     ChapterGenerationNode,
     ChapterJsonParseError,
+    ChapterStreamAbortedError,
     ChapterContentError,
     ChapterValidationError,
     DocumentLayoutNode,
@@ -437,7 +441,7 @@ class ReportAgent:
         主要阶段：
             1. 归一化三引擎报告 + 论坛日志，并输出流式事件；
             2. 模板选择 → 模板切片 → 文档布局 → 篇幅规划；
-            3. 结合篇幅目标逐章调用LLM，遇到解析错误会自动重试；
+            3. 结合篇幅目标按 CHAPTER_CONCURRENCY 有界并行调用LLM生成章节，遇到解析错误会自动重试；
             4. 将章节装订成Document IR，再交给HTML渲染器生成成品；
             5. 可选地将HTML/IR/状态落盘，并向外界回传路径信息。
 
@@ -476,12 +480,15 @@ class ReportAgent:
 
         normalized_reports = self._normalize_reports(reports)
 
+        emit_lock = threading.Lock()
+
         def emit(event_type: str, payload: Dict[str, Any]):
-            """面向Report Engine流通道的事件分发器，保证错误不外泄。"""
+            """面向Report Engine流通道的事件分发器，保证错误不外泄；并行章节的事件逐条串行投递。"""
             if not stream_handler:
                 return
             try:
-                stream_handler(event_type, payload)
+                with emit_lock:
+                    stream_handler(event_type, payload)
             except Exception as callback_error:  # pragma: no cover - 仅记录
                 logger.warning(f"流式事件回调失败: {callback_error}")
 
@@ -566,6 +573,9 @@ class ReportAgent:
                 word_plan,
                 template_overview,
             )
+            if self.config.LLM_PROMPT_CACHE_HINTS:
+                # 同一报告的章节共享提示词前缀，提示接口把它们路由到同一份前缀缓存
+                generation_context["prompt_cache_key"] = f"report-{report_id}"
             # IR/渲染需要的全局元数据，带上设计稿给出的标题/主题/目录/篇幅信息
             manifest_meta = {
                 "query": query,
@@ -630,14 +640,27 @@ class ReportAgent:
                     emit('stage', {'stage': 'graphrag_error', 'error': str(graph_error)})
             # ==================== GraphRAG 初始化结束 ====================
 
-            chapters = []
             chapter_max_attempts = max(
                 self._CONTENT_SPARSE_MIN_ATTEMPTS, self.config.CHAPTER_JSON_MAX_ATTEMPTS
             )
             total_chapters = len(sections)  # 总章节数
             completed_chapters = 0  # 已完成章节数
-
-            for section in sections:
+            # 按模板下标收集章节结果，并行完成的先后不影响装订顺序
+            chapter_results: List[Optional[Dict[str, Any]]] = [None] * total_chapters
+            progress_lock = threading.Lock()
+            # 流式阶段逐块推送校验后的block、发现结构故障时提前中止重试
+            stream_blocks = self.config.CHAPTER_STREAM_BLOCKS
+            stream_validation = self.config.CHAPTER_STREAM_VALIDATION
+
+            def generate_chapter(index: int, section: TemplateSection):
+                """
+                生成单个章节：GraphRAG查询 → 流式生成 → 失败重试/稀疏兜底。
+
+                章节之间只共享只读的生成上下文与篇幅规划，可在工作线程中并行执行；
+                所有事件都带上本章的chapterId，章节JSON由ChapterGenerationNode
+                在完成时立即落盘，结果按模板下标写回 `chapter_results`。
+                """
+                nonlocal completed_chapters
                 logger.info(f"生成章节: {section.title}")
                 emit('chapter_status', {
                     'chapterId': section.chapter_id,
@@ -660,6 +683,22 @@ class ReportAgent:
                         'delta': delta
                     })
 
+                def block_callback(block_payload: Dict[str, Any], meta: Dict[str, Any], section_ref: TemplateSection = section):
+                    """
+                    章节block流式回调：推送已解析、清洗并校验过的顶层block。
+
+                    Args:
+                        block_payload: 包含 index/block/valid/errors 的字典。
+                        meta: 节点回传的章节元数据。
+                        section_ref: 默认指向当前章节。
+                    """
+                    emit('chapter_block', {
+                        'chapterId': meta.get('chapterId') or section_ref.chapter_id,
+                        'title': meta.get('title') or section_ref.title,
+                        'attempt': attempt,
+                        **block_payload,
+                    })
+
                 chapter_payload: Dict[str, Any] | None = None
                 attempt = 1
                 best_sparse_candidate: Dict[str, Any] | None = None
@@ -716,7 +755,10 @@ class ReportAgent:
                             section,
                             chapter_context,  # 使用包含图谱结果的上下文
                             run_dir,
-                            stream_callback=chunk_callback
+                            stream_callback=None if stream_blocks else chunk_callback,
+                            block_callback=block_callback if stream_blocks else None,
+                            # 最后一次尝试不再提前中止，交给完整输出后的修复/占位兜底
+                            abort_on_stream_error=stream_validation and attempt < chapter_max_attempts,
                         )
                         break
                     except (AttributeError, TypeError, KeyError, IndexError, ValueError, json.JSONDecodeError) as structure_error:
@@ -757,6 +799,9 @@ class ReportAgent:
                         if isinstance(structured_error, ChapterContentError):
                             error_kind = "content_sparse"
                             readable_label = "内容密度异常"
+                        elif isinstance(structured_error, ChapterStreamAbortedError):
+                            error_kind = "stream_aborted"
+                            readable_label = "流式结构校验失败"
                         elif isinstance(structured_error, ChapterValidationError):
                             error_kind = "validation"
                             readable_label = "结构校验失败"
@@ -839,14 +884,7 @@ class ReportAgent:
                     raise ChapterJsonParseError(
                         f"{section.title} 章节JSON在 {chapter_max_attempts} 次尝试后仍无法解析"
                     )
-                chapters.append(chapter_payload)
-                completed_chapters += 1  # 更新已完成章节数
-                # 计算当前进度：20% + 80% * (已完成章节数 / 总章节数)，四舍五入
-                chapter_progress = 20 + round(80 * completed_chapters / total_chapters)
-                emit('progress', {
-                    'progress': chapter_progress,
-                    'message': f'章节 {completed_chapters}/{total_chapters} 已完成'
-                })
+                chapter_results[index] = chapter_payload
                 completion_status = {
                     'chapterId': section.chapter_id,
                     'title': section.title,
@@ -856,7 +894,38 @@ class ReportAgent:
                 if fallback_used:
                     completion_status['warning'] = 'content_sparse_fallback'
                     completion_status['warningMessage'] = self._CONTENT_SPARSE_WARNING_TEXT
-                emit('chapter_status', completion_status)
+                with progress_lock:
+                    completed_chapters += 1  # 更新已完成章节数
+                    # 计算当前进度：20% + 80% * (已完成章节数 / 总章节数)，四舍五入
+                    chapter_progress = 20 + round(80 * completed_chapters / total_chapters)
+                    emit('progress', {
+                        'progress': chapter_progress,
+                        'message': f'章节 {completed_chapters}/{total_chapters} 已完成'
+                    })
+                    emit('chapter_status', completion_status)
+
+            workers = max(1, min(self.config.CHAPTER_CONCURRENCY, total_chapters))
+            if workers == 1:
+                for index, section in enumerate(sections):
+                    generate_chapter(index, section)
+            else:
+                logger.info(f"并行生成 {total_chapters} 个章节（并发数: {workers}）")
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ReportEngine-chapter") as executor:
+                    futures = {
+                        executor.submit(generate_chapter, index, section): section
+                        for index, section in enumerate(sections)
+                    }
+                    for future in as_completed(futures):
+                        try:
+                            future.result()
+                        except Exception:
+                            # 与串行生成一致：任一章节失败即终止，未开始的章节不再执行
+                            for pending in futures:
+                                pending.cancel()
+                            logger.error(f"章节 {futures[future].title} 生成失败，取消剩余章节")
+                            raise
+            chapters = list(chapter_results)
+            logger.info(f"章节生成LLM用量（含前缀缓存命中）: {self.llm_client.cache_stats.snapshot()}")
 
             document_ir = self.document_composer.build_document(
                 report_id,
@@ -1066,12 +1135,17 @@ class ReportAgent:
             layout_design.get("themeTokens")
             if layout_design else None
         ) or self._default_theme_tokens()
+        forum_text = self._stringify(forum_logs)
 
         return {
             "query": query,
             "template_name": template_result.get("template_name"),
             "reports": reports,
-            "forum_logs": self._stringify(forum_logs),
+            "forum_logs": forum_text,
+            # 素材切块索引只构建一次，各章按需检索，不再每章携带全文
+            "context_index": self._build_context_index(reports, forum_text),
+            "context_top_k": self.config.CHAPTER_CONTEXT_TOP_K,
+            "context_token_budget": self.config.CHAPTER_CONTEXT_TOKEN_BUDGET,
             "theme_tokens": theme_tokens,
             "style_directives": {
                 "tone": "analytical",
@@ -1086,6 +1160,38 @@ class ReportAgent:
             "word_plan": word_plan or {},
         }
 
+    def _build_context_index(self, reports: Dict[str, str], forum_logs: str) -> Optional[ContextIndex]:
+        """
+        为本次运行构建章节级上下文检索索引。
+
+        关闭 `CHAPTER_CONTEXT_RETRIEVAL` 或构建失败时返回None，
+        章节节点随即退回携带三引擎报告全文的旧行为。
+
+        参数:
+            reports: 归一化后的 query/media/insight 报告映射。
+            forum_logs: 字符串化的论坛日志。
+
+        返回:
+            ContextIndex | None: 可供所有章节共享的只读索引。
+        """
+        if not getattr(self.config, "CHAPTER_CONTEXT_RETRIEVAL", False):
+            return None
+        embedder = None
+        model_name = getattr(self.config, "CHAPTER_CONTEXT_EMBEDDING_MODEL", None)
+        if model_name:
+            from .core.context_index import load_sentence_embedder
+            embedder = load_sentence_embedder(model_name)
+        try:
+            return ContextIndex(
+                reports,
+                forum_logs,
+                max_chunk_chars=self.config.CHAPTER_CONTEXT_CHUNK_CHARS,
+                embedder=embedder,
+            )
+        except Exception as exc:
+            logger.warning(f"构建章节上下文索引失败，章节将携带完整报告: {exc}")
+            return None
+
     def _normalize_reports(self, reports: List[Any]) -> Dict[str, str]:
         """
         将不同来源的报告统一转为字符串。
@@ -0,0 +1,358 @@
+"""
+章节级上下文检索。
+
+三引擎报告与论坛日志动辄数万token，若每章都原样塞进提示词，
+N 章报告就要为同一份素材付 N 次输入成本，首token延迟也随之变长。
+本模块在每次运行时把素材按段落切块、建立一次BM25倒排索引（可选叠加句向量），
+每章只按标题/提纲/强调点检索相关片段，并在token预算内按原文顺序回填。
+"""
+
+from __future__ import annotations
+
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from loguru import logger
+
+try:
+    import jieba
+
+    jieba.setLogLevel(60)
+    JIEBA_AVAILABLE = True
+except ImportError:  # pragma: no cover - jieba 在 requirements 中，缺失时退回二元切分
+    jieba = None
+    JIEBA_AVAILABLE = False
+
+REPORT_SOURCES = ("query_engine", "media_engine", "insight_engine")
+FORUM_SOURCE = "forum"
+
+_HEADING_RE = re.compile(r"^\s{0,3}#{1,6}\s+(.*?)\s*#*\s*$")
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9_.%-]*|[一-鿿]+")
+_CJK_RE = re.compile(r"[一-鿿]")
+_STOPWORDS = frozenset(
+    "的 了 和 与 及 或 在 是 为 对 将 等 也 就 都 而 及其 以及 其 中 这 那 一个 我们 他们 "
+    "the a an of to and or in on for is are with by as at from".split()
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估算token数：中文约1字1token，其余约4字符1token"""
+    if not text:
+        return 0
+    cjk = len(_CJK_RE.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def tokenize(text: str) -> List[str]:
+    """切分检索词：优先jieba搜索模式，不可用时中文按二元组切分"""
+    tokens: List[str] = []
+    for piece in _TOKEN_RE.findall((text or "").lower()):
+        if not _CJK_RE.match(piece):
+            tokens.append(piece)
+        elif JIEBA_AVAILABLE:
+            tokens.extend(w for w in jieba.lcut_for_search(piece) if w.strip())
+        elif len(piece) == 1:
+            tokens.append(piece)
+        else:
+            tokens.extend(piece[i:i + 2] for i in range(len(piece) - 1))
+    return [t for t in tokens if t not in _STOPWORDS]
+
+
+@dataclass
+class ContextChunk:
+    """一个可检索的素材片段，order 为其在所属来源中的原文位置"""
+
+    chunk_id: int
+    source: str
+    heading: str
+    text: str
+    tokens: int
+    order: int
+
+
+class ContextIndex:
+    """
+    基于段落切块的BM25上下文索引（每次生成运行构建一次，线程安全只读）。
+
+    参数:
+        reports: query/media/insight 三引擎报告文本。
+        forum_logs: 论坛讨论记录。
+        max_chunk_chars: 单个片段的最大字符数，过长段落会按句切开。
+        embedder: 可选的句向量函数（文本列表 -> 向量列表），用于与BM25分数融合。
+    """
+
+    K1 = 1.5
+    B = 0.75
+    # 融合句向量时的BM25权重，其余为余弦相似度
+    BM25_WEIGHT = 0.6
+
+    def __init__(
+        self,
+        reports: Dict[str, str],
+        forum_logs: str = "",
+        max_chunk_chars: int = 800,
+        embedder: Optional[Callable[[List[str]], Sequence[Sequence[float]]]] = None,
+    ):
+        self.max_chunk_chars = max(200, max_chunk_chars)
+        self.chunks: List[ContextChunk] = []
+        self.total_tokens = 0
+        self._postings: Dict[str, List[tuple]] = defaultdict(list)
+        self._doc_lengths: List[int] = []
+        self._embedder = embedder
+        self._embeddings: Optional[List[List[float]]] = None
+        self._embed_lock = threading.Lock()
+
+        for source in REPORT_SOURCES:
+            self._add_chunks(source, self._split_markdown(reports.get(source) or ""))
+        self._add_chunks(FORUM_SOURCE, self._split_forum(forum_logs or ""))
+
+        self._avg_length = (sum(self._doc_lengths) / len(self._doc_lengths)) if self._doc_lengths else 0.0
+        doc_count = len(self.chunks)
+        self._idf = {
+            term: math.log(1 + (doc_count - len(posting) + 0.5) / (len(posting) + 0.5))
+            for term, posting in self._postings.items()
+        }
+        logger.info(f"上下文索引构建完成: {doc_count} 个片段，约 {self.total_tokens} tokens")
+
+    # ======== 切块 ========
+
+    def _split_markdown(self, text: str) -> List[tuple]:
+        """按空行切段，记录最近的标题；短段落合并、长段落按句拆分"""
+        pieces: List[tuple] = []
+        heading = ""
+        buffer: List[str] = []
+
+        def flush():
+            if buffer:
+                pieces.append((heading, "\n".join(buffer).strip()))
+                buffer.clear()
+
+        for line in text.splitlines():
+            match = _HEADING_RE.match(line)
+            if match:
+                flush()
+                heading = match.group(1).strip()
+                continue
+            if not line.strip():
+                flush()
+                continue
+            buffer.append(line.rstrip())
+        flush()
+        return self._pack(pieces)
+
+    def _split_forum(self, text: str) -> List[tuple]:
+        """论坛日志按行聚合，每块不超过 max_chunk_chars"""
+        lines = [(None, line.strip()) for line in text.splitlines() if line.strip()]
+        return self._pack(lines)
+
+    def _pack(self, pieces: Iterable[tuple]) -> List[tuple]:
+        """把同一标题下的相邻短段合并到接近 max_chunk_chars，超长段按句号等切开"""
+        packed: List[tuple] = []
+        limit = self.max_chunk_chars
+        for heading, text in pieces:
+            if not text:
+                continue
+            for part in self._split_long(text, limit):
+                if (
+                    packed
+                    and packed[-1][0] == heading
+                    and len(packed[-1][1]) + len(part) + 1 <= limit
+                ):
+                    packed[-1] = (heading, f"{packed[-1][1]}\n{part}")
+                else:
+                    packed.append((heading, part))
+        return packed
+
+    @staticmethod
+    def _split_long(text: str, limit: int) -> List[str]:
+        if len(text) <= limit:
+            return [text]
+        parts: List[str] = []
+        current = ""
+        for sentence in re.split(r"(?<=[。！？；.!?;])\s*", text):
+            while len(sentence) > limit:
+                if current:
+                    parts.append(current)
+                    current = ""
+                parts.append(sentence[:limit])
+                sentence = sentence[limit:]
+            if current and len(current) + len(sentence) > limit:
+                parts.append(current)
+                current = ""
+            current += sentence
+        if current:
+            parts.append(current)
+        return parts
+
+    def _add_chunks(self, source: str, pieces: List[tuple]):
+        for order, (heading, text) in enumerate(pieces):
+            chunk_id = len(self.chunks)
+            chunk = ContextChunk(chunk_id, source, heading or "", text, estimate_tokens(text), order)
+            self.chunks.append(chunk)
+            self.total_tokens += chunk.tokens
+            # 标题参与检索，使"## 舆情走势"下的段落也能被"舆情"命中
+            terms = Counter(tokenize(f"{chunk.heading}\n{text}"))
+            self._doc_lengths.append(sum(terms.values()))
+            for term, freq in terms.items():
+                self._postings[term].append((chunk_id, freq))
+
+    # ======== 检索 ========
+
+    def score(self, query: str) -> Dict[int, float]:
+        """返回每个命中片段的BM25分数（启用句向量时为融合分数）"""
+        scores: Dict[int, float] = defaultdict(float)
+        avg_length = self._avg_length or 1.0
+        for term, query_freq in Counter(tokenize(query)).items():
+            idf = self._idf.get(term)
+            if idf is None:
+                continue
+            for chunk_id, freq in self._postings[term]:
+                norm = self.K1 * (1 - self.B + self.B * self._doc_lengths[chunk_id] / avg_length)
+                scores[chunk_id] += idf * freq * (self.K1 + 1) / (freq + norm) * min(query_freq, 3)
+
+        similarities = self._semantic_scores(query)
+        if similarities is None:
+            return dict(scores)
+        top = max(scores.values(), default=0.0) or 1.0
+        return {
+            chunk_id: self.BM25_WEIGHT * scores.get(chunk_id, 0.0) / top
+            + (1 - self.BM25_WEIGHT) * max(similarity, 0.0)
+            for chunk_id, similarity in enumerate(similarities)
+            if chunk_id in scores or similarity > 0
+        }
+
+    def _semantic_scores(self, query: str) -> Optional[List[float]]:
+        """用句向量计算余弦相似度，片段向量在首次检索时编码一次；失败时关闭向量检索"""
+        if self._embedder is None or not self.chunks:
+            return None
+        try:
+            with self._embed_lock:
+                if self._embeddings is None:
+                    texts = [f"{c.heading}\n{c.text}" for c in self.chunks]
+                    self._embeddings = [self._normalize(v) for v in self._embedder(texts)]
+                query_vector = self._normalize(self._embedder([query])[0])
+        except Exception as exc:
+            logger.warning(f"句向量检索不可用，仅使用BM25: {exc}")
+            self._embedder = None
+            return None
+        return [sum(a * b for a, b in zip(query_vector, vector)) for vector in self._embeddings]
+
+    @staticmethod
+    def _normalize(vector: Sequence[float]) -> List[float]:
+        values = [float(v) for v in vector]
+        norm = math.sqrt(sum(v * v for v in values)) or 1.0
+        return [v / norm for v in values]
+
+    def select(self, query: str, top_k: int = 24, token_budget: int = 12000) -> Dict[str, Any]:
+        """
+        检索与 query 相关的片段并按来源、原文顺序重组。
+
+        先保证每个有命中的来源至少入选一块（避免某个引擎的视角整体缺席），
+        其余按分数从高到低填充，直到达到 top_k 或 token_budget。
+        没有任何命中时退回各来源开头的片段。
+
+        返回:
+            dict: `reports`（三引擎片段文本）、`forumLogs` 与检索统计 `retrieval`。
+        """
+        scores = self.score(query)
+        ranked = sorted(scores, key=lambda cid: (-scores[cid], cid))
+        fallback = not ranked
+        if fallback:
+            ranked = sorted(range(len(self.chunks)), key=lambda cid: (self.chunks[cid].order, cid))
+
+        selected: List[int] = []
+        used_tokens = 0
+
+        def take(chunk_id: int) -> bool:
+            nonlocal used_tokens
+            chunk = self.chunks[chunk_id]
+            if chunk_id in selected or len(selected) >= top_k:
+                return False
+            if selected and used_tokens + chunk.tokens > token_budget:
+                return False
+            selected.append(chunk_id)
+            used_tokens += chunk.tokens
+            return True
+
+        seen_sources = set()
+        for chunk_id in ranked:
+            source = self.chunks[chunk_id].source
+            if source not in seen_sources:
+                seen_sources.add(source)
+                take(chunk_id)
+        for chunk_id in ranked:
+            take(chunk_id)
+
+        grouped: Dict[str, List[ContextChunk]] = defaultdict(list)
+        for chunk_id in selected:
+            grouped[self.chunks[chunk_id].source].append(self.chunks[chunk_id])
+
+        def render(source: str) -> str:
+            parts = []
+            last_heading = None
+            for chunk in sorted(grouped.get(source, []), key=lambda c: c.order):
+                if chunk.heading and chunk.heading != last_heading:
+                    parts.append(f"## {chunk.heading}")
+                    last_heading = chunk.heading
+                parts.append(chunk.text)
+            return "\n\n".join(parts)
+
+        return {
+            "reports": {source: render(source) for source in REPORT_SOURCES},
+            "forumLogs": render(FORUM_SOURCE),
+            "retrieval": {
+                "selectedChunks": len(selected),
+                "totalChunks": len(self.chunks),
+                "selectedTokens": used_tokens,
+                "totalTokens": self.total_tokens,
+                "fallback": fallback,
+            },
+        }
+
+
+def build_chapter_query(section: Any, chapter_plan: Optional[Dict[str, Any]], query: str = "") -> str:
+    """用章节标题、提纲、篇幅规划中的强调点与小节标题拼出检索语句"""
+    parts: List[str] = [getattr(section, "title", "") or ""]
+    parts.extend(getattr(section, "outline", None) or [])
+    plan = chapter_plan or {}
+    # 篇幅规划可能用 emphasis 或 emphasisPoints，值可能是列表也可能是单个字符串
+    for key in ("emphasis", "emphasisPoints"):
+        emphasis = plan.get(key) or []
+        if isinstance(emphasis, str):
+            emphasis = [emphasis]
+        parts.extend(str(item) for item in emphasis if item)
+    if plan.get("rationale"):
+        parts.append(str(plan["rationale"]))
+    for sub in plan.get("sections") or []:
+        if isinstance(sub, dict):
+            parts.append(str(sub.get("title") or ""))
+            parts.append(str(sub.get("notes") or ""))
+    if query:
+        parts.append(query)
+    return "\n".join(part for part in parts if part)
+
+
+def load_sentence_embedder(model_name: str) -> Optional[Callable[[List[str]], Sequence[Sequence[float]]]]:
+    """按需加载sentence-transformers模型，未安装或加载失败时返回None"""
+    try:
+        from sentence_transformers import SentenceTransformer
+
+        model = SentenceTransformer(model_name)
+    except Exception as exc:
+        logger.warning(f"加载句向量模型 {model_name} 失败，章节检索仅使用BM25: {exc}")
+        return None
+    return lambda texts: model.encode(texts, show_progress_bar=False)
+
+
+__all__ = [
+    "ContextChunk",
+    "ContextIndex",
+    "build_chapter_query",
+    "estimate_tokens",
+    "load_sentence_embedder",
+    "tokenize",
+]
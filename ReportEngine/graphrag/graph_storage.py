@@ -4,9 +4,12 @@
 定义图谱的核心数据结构（Node、Edge、Graph）及 JSON 存储功能。
 """
 
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from typing import Dict, Any, List, Optional, Set
+from typing import Dict, Any, List, Optional, Set, Tuple
+import os
 import re
+import threading
 from datetime import datetime
 import json
 from pathlib import Path
@@ -111,13 +114,25 @@ class Graph:
     知识图谱
     
     仅负责存储节点/边与邻接表，不依赖外部数据库，便于在章节侧内存查询。
-    邻接表 _adjacency 用于 QueryEngine 按深度扩展邻居节点。
+    邻接表 _adjacency 用于 QueryEngine 按深度扩展邻居节点；同时维护按类型的节点索引、
+    每个节点的出/入边列表，以及节点检索文本的字符 n-gram 倒排索引（供关键词查询）。
     """
+
+    # 参与关键词检索的节点字段，与 QueryEngine 的匹配规则一致
+    SEARCH_FIELDS = ('title', 'query_text', 'summary')
     
     def __init__(self):
         self._nodes: Dict[str, Node] = {}
         self._edges: List[Edge] = []
         self._adjacency: Dict[str, Set[str]] = {}  # 邻接表
+        self._type_index: Dict[str, Dict[str, Node]] = {}  # 类型 -> {节点ID: 节点}（保持插入顺序）
+        self._out_edges: Dict[str, List[Edge]] = {}
+        self._in_edges: Dict[str, List[Edge]] = {}
+        # 倒排索引首次检索时构建，之后新增的节点增量加入
+        self._search_texts: Dict[str, str] = {}
+        self._ngram_index: Dict[str, Set[str]] = {}
+        self._unindexed: List[str] = []
+        self._search_lock = threading.Lock()  # 图谱对象会被多个请求共享（GraphStorage 缓存）
         
     @property
     def nodes(self) -> Dict[str, Node]:
@@ -143,6 +158,22 @@ class Graph:
     def edge_count(self) -> int:
         """边数量"""
         return len(self._edges)
+
+    def _register_node(self, node: Node):
+        self._nodes[node.id] = node
+        self._adjacency[node.id] = set()
+        self._type_index.setdefault(node.type, {})[node.id] = node
+        self._unindexed.append(node.id)
+
+    def _register_edge(self, edge: Edge):
+        self._edges.append(edge)
+        self._out_edges.setdefault(edge.from_id, []).append(edge)
+        self._in_edges.setdefault(edge.to_id, []).append(edge)
+        # 更新邻接表
+        if edge.from_id in self._adjacency:
+            self._adjacency[edge.from_id].add(edge.to_id)
+        if edge.to_id in self._adjacency:
+            self._adjacency[edge.to_id].add(edge.from_id)
     
     def add_node(self, node_type: str, name: str = "", 
                  node_id: Optional[str] = None, **attributes) -> Node:
@@ -174,8 +205,7 @@ class Graph:
             attributes=attributes
         )
         
-        self._nodes[node_id] = node
-        self._adjacency[node_id] = set()
+        self._register_node(node)
         
         return node
     
@@ -206,13 +236,7 @@ class Graph:
             attributes=attributes
         )
         
-        self._edges.append(edge)
-        
-        # 更新邻接表
-        if from_node.id in self._adjacency:
-            self._adjacency[from_node.id].add(to_node.id)
-        if to_node.id in self._adjacency:
-            self._adjacency[to_node.id].add(from_node.id)
+        self._register_edge(edge)
         
         return edge
     
@@ -223,21 +247,79 @@ class Graph:
     
     def get_edges_from(self, node_id: str) -> List[Edge]:
         """获取从指定节点出发的边"""
-        return [e for e in self._edges if e.from_id == node_id]
+        return list(self._out_edges.get(node_id, []))
     
     def get_edges_to(self, node_id: str) -> List[Edge]:
         """获取指向指定节点的边"""
-        return [e for e in self._edges if e.to_id == node_id]
+        return list(self._in_edges.get(node_id, []))
     
     def get_nodes_by_type(self, node_type: str) -> List[Node]:
         """按类型获取节点"""
-        return [n for n in self._nodes.values() if n.type == node_type]
+        return list(self._type_index.get(node_type, {}).values())
+
+    def get_node_ids_by_type(self, node_type: str) -> Set[str]:
+        """按类型获取节点ID集合"""
+        return set(self._type_index.get(node_type, {}))
+
+    # ==================== 关键词检索 ====================
+
+    def get_search_text(self, node: Node) -> str:
+        """节点的检索文本（名称 + 标题/搜索词/摘要，小写）"""
+        parts = [str(node.name)] + [str(node.get(key, '')) for key in self.SEARCH_FIELDS]
+        return ' '.join(parts).lower()
+
+    @staticmethod
+    def _ngrams(text: str) -> Set[str]:
+        """单字 + 相邻两字：中文不分词也能命中，英文/数字同样适用"""
+        grams = set(text)
+        grams.update(text[i:i + 2] for i in range(len(text) - 1))
+        return grams
+
+    def _ensure_search_index(self):
+        """把尚未索引的节点加入倒排索引（调用方需持有 _search_lock）"""
+        if not self._unindexed:
+            return
+        for node_id in self._unindexed:
+            node = self._nodes.get(node_id)
+            if node is None:
+                continue
+            text = self.get_search_text(node)
+            self._search_texts[node_id] = text
+            for gram in self._ngrams(text):
+                self._ngram_index.setdefault(gram, set()).add(node_id)
+        self._unindexed = []
+
+    def search_nodes(self, keyword: str) -> Set[str]:
+        """
+        查找检索文本包含关键词（不区分大小写的子串匹配）的节点
+
+        先用关键词的 n-gram 倒排列表求交集得到候选，再逐个做子串校验，
+        结果与逐节点子串匹配完全一致，耗时只与候选数量相关。
+
+        Args:
+            keyword: 关键词
+
+        Returns:
+            匹配的节点ID集合
+        """
+        keyword = str(keyword).lower()
+        if not keyword:
+            return set(self._nodes)
+
+        with self._search_lock:
+            self._ensure_search_index()
+            grams = [keyword] if len(keyword) == 1 else list(self._ngrams(keyword) - set(keyword))
+            postings = sorted((self._ngram_index.get(gram, set()) for gram in grams), key=len)
+            candidates = set(postings[0])
+            for posting in postings[1:]:
+                if not candidates:
+                    break
+                candidates &= posting
+            return {node_id for node_id in candidates if keyword in self._search_texts[node_id]}
     
     def get_stats(self) -> Dict[str, int]:
         """获取图谱统计信息"""
-        type_counts = {}
-        for node in self._nodes.values():
-            type_counts[node.type] = type_counts.get(node.type, 0) + 1
+        type_counts = {node_type: len(nodes) for node_type, nodes in self._type_index.items() if nodes}
         
         return {
             'total_nodes': self.node_count,
@@ -278,22 +360,43 @@ class Graph:
         # 添加节点
         for node_data in data.get('nodes', []):
             node = Node.from_dict(node_data)
-            graph._nodes[node.id] = node
-            graph._adjacency[node.id] = set()
+            if node.id in graph._nodes:
+                # 与旧逻辑一致：重复ID以后出现的为准
+                graph._type_index[graph._nodes[node.id].type].pop(node.id, None)
+            graph._register_node(node)
         
         # 添加边
         for edge_data in data.get('edges', []):
-            edge = Edge.from_dict(edge_data)
-            graph._edges.append(edge)
-            # 更新邻接表
-            if edge.from_id in graph._adjacency:
-                graph._adjacency[edge.from_id].add(edge.to_id)
-            if edge.to_id in graph._adjacency:
-                graph._adjacency[edge.to_id].add(edge.from_id)
+            graph._register_edge(Edge.from_dict(edge_data))
         
         return graph
 
 
+@dataclass
+class _GraphIndex:
+    """某个章节目录的 报告ID → 运行目录 索引（对应 graph_index.json）"""
+    graphs: Dict[str, Dict[str, Any]] = field(default_factory=dict)  # 目录名 -> {ids, mtime}
+    dir_mtime_ns: int = 0  # 上次扫描时章节目录的 mtime，目录有增删时触发增量扫描
+    file_mtime_ns: int = 0  # 索引文件的 mtime，其他进程更新索引后重新加载
+    name_map: Dict[str, str] = field(default_factory=dict)  # 归一化目录名 -> 目录名
+    id_map: Dict[str, str] = field(default_factory=dict)  # 归一化 task_id/report_id -> 目录名
+
+    def rebuild_maps(self):
+        self.name_map = {}
+        self.id_map = {}
+        for dir_name, entry in self.graphs.items():
+            self.name_map.setdefault(GraphStorage._normalize_identifier(dir_name), dir_name)
+            for graph_id in entry.get('ids', []):
+                self.id_map.setdefault(graph_id, dir_name)
+
+
+# 进程内共享：Flask 每个请求都会新建 GraphStorage
+_index_lock = threading.Lock()
+_indexes: Dict[str, _GraphIndex] = {}
+_graph_cache_lock = threading.Lock()
+_graph_cache: "OrderedDict[str, Tuple[int, int, Graph]]" = OrderedDict()
+
+
 class GraphStorage:
     """
     图谱存储管理器
@@ -301,31 +404,47 @@ class GraphStorage:
     将 Graph 对象序列化为 JSON（graphrag.json），路径与 ChapterStorage 输出目录一致，
     便于 Web/Report 引擎共享。支持按报告ID查找、列举最新图谱，供 Flask API 或
     GraphRAGQueryNode 直接读取。
+
+    章节目录下维护 .graph_index/graph_index.json（报告ID → 运行目录），save 时更新，查找时不再遍历并解析
+    每个 graphrag.json；已加载的 Graph 按文件 mtime 缓存在进程内 LRU 中。
     """
     
     FILENAME = "graphrag.json"
+    # 索引放在子目录中，写索引不会改变章节目录本身的 mtime
+    INDEX_PATH = Path(".graph_index") / "graph_index.json"
+    CACHE_SIZE = 16  # 进程内缓存的 Graph 数量
 
     @staticmethod
     def _normalize_identifier(value: str) -> str:
         """统一规约ID，去除分隔符便于模糊匹配。"""
         return re.sub(r'[^a-zA-Z0-9]', '', str(value or '')).lower()
 
-    def _graph_file_matches(self, graph_path: Path, normalized_target: str) -> bool:
-        """检查图文件中的 task_id/report_id 是否与目标匹配。"""
+    def _graph_file_ids(self, graph_path: Path) -> List[str]:
+        """读取图文件中的 task_id/report_id（已归一化）。"""
         try:
             with open(graph_path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
-            candidates = [
-                data.get('task_id'),
-                data.get('report_id'),
-                data.get('metadata', {}).get('report_id') if isinstance(data.get('metadata'), dict) else None
-            ]
-            for candidate in candidates:
-                if candidate and self._normalize_identifier(candidate) == normalized_target:
-                    return True
         except Exception:
-            return False
-        return False
+            return []
+        return self._graph_data_ids(data)
+
+    def _graph_data_ids(self, data: Dict[str, Any]) -> List[str]:
+        metadata = data.get('metadata')
+        candidates = [
+            data.get('task_id'),
+            data.get('report_id'),
+            metadata.get('report_id') if isinstance(metadata, dict) else None
+        ]
+        ids = []
+        for candidate in candidates:
+            normalized = self._normalize_identifier(candidate) if candidate else ''
+            if normalized and normalized not in ids:
+                ids.append(normalized)
+        return ids
+
+    def _graph_file_matches(self, graph_path: Path, normalized_target: str) -> bool:
+        """检查图文件中的 task_id/report_id 是否与目标匹配。"""
+        return normalized_target in self._graph_file_ids(graph_path)
     
     @property
     def chapters_dir(self) -> Path:
@@ -336,10 +455,100 @@ class GraphStorage:
         except ImportError:
             # 回退到默认值
             return Path("final_reports/chapters")
+
+    # ==================== 报告ID索引 ====================
+
+    @staticmethod
+    def _mtime_ns(path: Path) -> int:
+        try:
+            return path.stat().st_mtime_ns
+        except OSError:
+            return 0
+
+    def _read_index_file(self, index_path: Path) -> _GraphIndex:
+        index = _GraphIndex(file_mtime_ns=self._mtime_ns(index_path))
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if isinstance(data.get('graphs'), dict):
+                index.graphs = data['graphs']
+                index.dir_mtime_ns = int(data.get('dir_mtime_ns', 0))
+        except (OSError, ValueError, TypeError):
+            pass
+        index.rebuild_maps()
+        return index
+
+    def _write_index_file(self, index_path: Path, index: _GraphIndex):
+        """原子写入索引文件（写临时文件后替换）。"""
+        tmp_path = index_path.with_name(f"{index_path.name}.{os.getpid()}.tmp")
+        try:
+            index_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'dir_mtime_ns': index.dir_mtime_ns, 'graphs': index.graphs}, f, ensure_ascii=False)
+            os.replace(tmp_path, index_path)
+            index.file_mtime_ns = self._mtime_ns(index_path)
+        except OSError:
+            # 目录只读等情况下仅保留内存索引
+            tmp_path.unlink(missing_ok=True)
+
+    def _get_index(self, chapters_dir: Path) -> _GraphIndex:
+        """
+        获取章节目录的索引（调用方需持有 _index_lock）
+
+        索引文件被其他进程更新时重新加载；章节目录有新增/删除的运行目录时做一次增量扫描，
+        只读取新目录中的 graphrag.json。
+        """
+        key = str(chapters_dir.resolve())
+        index_path = chapters_dir / self.INDEX_PATH
+        index = _indexes.get(key)
+        if index is None or index.file_mtime_ns != self._mtime_ns(index_path):
+            index = _indexes[key] = self._read_index_file(index_path)
+
+        dir_mtime_ns = self._mtime_ns(chapters_dir)
+        if dir_mtime_ns != index.dir_mtime_ns:
+            self._refresh_index(chapters_dir, index)
+            index.dir_mtime_ns = dir_mtime_ns
+            self._write_index_file(index_path, index)
+            # 首次创建索引子目录本身也会改变章节目录的 mtime，写完后再取一次
+            if self._mtime_ns(chapters_dir) != dir_mtime_ns:
+                index.dir_mtime_ns = self._mtime_ns(chapters_dir)
+                self._write_index_file(index_path, index)
+        return index
+
+    def _refresh_index(self, chapters_dir: Path, index: _GraphIndex):
+        """增量扫描：补充新出现的图谱，移除已删除的目录。"""
+        present = set()
+        for run_dir in chapters_dir.iterdir():
+            if not run_dir.is_dir():
+                continue
+            graph_path = run_dir / self.FILENAME
+            if not graph_path.exists():
+                continue
+            present.add(run_dir.name)
+            if run_dir.name not in index.graphs:
+                index.graphs[run_dir.name] = {
+                    'ids': self._graph_file_ids(graph_path),
+                    'mtime': graph_path.stat().st_mtime,
+                }
+        for dir_name in list(index.graphs):
+            if dir_name not in present:
+                del index.graphs[dir_name]
+        index.rebuild_maps()
+
+    def _record_in_index(self, run_dir: Path, ids: List[str], mtime: float):
+        """save 后把图谱登记到其所在章节目录的索引中。"""
+        chapters_dir = run_dir.parent
+        with _index_lock:
+            index = self._get_index(chapters_dir)
+            index.graphs[run_dir.name] = {'ids': ids, 'mtime': mtime}
+            index.rebuild_maps()
+            self._write_index_file(chapters_dir / self.INDEX_PATH, index)
+
+    # ==================== 读写 ====================
     
     def save(self, graph: Graph, task_id: str, run_dir: Path) -> Path:
         """
-        保存图谱到 JSON 文件
+        保存图谱到 JSON 文件，并更新报告ID索引
         
         Args:
             graph: 图谱对象
@@ -362,12 +571,15 @@ class GraphStorage:
         with open(file_path, 'w', encoding='utf-8') as f:
             json.dump(output, f, ensure_ascii=False, indent=2)
         
+        self._record_in_index(run_dir, self._graph_data_ids(output), file_path.stat().st_mtime)
         return file_path
     
     def load(self, path: Path) -> Optional[Graph]:
         """
         从 JSON 文件加载图谱
         
+        同一文件在 mtime/大小未变化时直接返回缓存的 Graph 对象（多个请求共享，调用方不应修改）。
+
         Args:
             path: 文件路径或运行目录
             
@@ -382,15 +594,31 @@ class GraphStorage:
         else:
             file_path = path
         
-        if not file_path.exists():
+        try:
+            st = file_path.stat()
+        except OSError:
             return None
+
+        key = str(file_path.resolve())
+        with _graph_cache_lock:
+            cached = _graph_cache.get(key)
+            if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+                _graph_cache.move_to_end(key)
+                return cached[2]
         
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
-            return Graph.from_dict(data)
+            graph = Graph.from_dict(data)
         except Exception:
             return None
+
+        with _graph_cache_lock:
+            _graph_cache[key] = (st.st_mtime_ns, st.st_size, graph)
+            _graph_cache.move_to_end(key)
+            while len(_graph_cache) > self.CACHE_SIZE:
+                _graph_cache.popitem(last=False)
+        return graph
     
     def exists(self, run_dir: Path) -> bool:
         """检查图谱文件是否存在"""
@@ -406,9 +634,9 @@ class GraphStorage:
         Returns:
             图谱文件路径，未找到返回 None
         
-        工作方式：
+        工作方式（均基于索引，不读取图谱文件）：
         1) 优先匹配目录名是否含 report_id（兼容 _/- 差异）；
-        2) 否则读取 graphrag.json 内 task_id/report_id 做兜底匹配；
+        2) 否则按 graphrag.json 内 task_id/report_id 做兜底匹配；
         适配 Agent 运行目录命名不一致的场景。
         """
         # 在章节目录中搜索（与 ChapterStorage 保持一致）
@@ -425,32 +653,21 @@ class GraphStorage:
             str(report_id).replace('_', '-'),
             str(report_id).replace('-', '_'),
         }
-        fallback_match: Optional[Path] = None
-        
-        # 查找匹配报告ID的目录
-        for run_dir in chapters_dir.iterdir():
-            if not run_dir.is_dir():
-                continue
-            
-            name = run_dir.name
-            normalized_name = self._normalize_identifier(name)
-
-            # 检查目录名是否包含报告ID或归一化后相等
-            if (
-                any(t for t in alt_targets if t and t in name)
-                or normalized_name == normalized_target
-            ):
-                graph_path = run_dir / self.FILENAME
-                if graph_path.exists():
-                    return graph_path
-
-            # 若目录名不匹配，则尝试读取文件内容比对 task_id/report_id
-            graph_path = run_dir / self.FILENAME
-            if graph_path.exists() and not fallback_match:
-                if self._graph_file_matches(graph_path, normalized_target):
-                    fallback_match = graph_path
-        
-        return fallback_match
+
+        with _index_lock:
+            index = self._get_index(chapters_dir)
+            dir_name = index.name_map.get(normalized_target)
+            candidates = [dir_name] if dir_name else []
+            candidates.extend(name for name in index.graphs if any(t and t in name for t in alt_targets))
+            dir_name = index.id_map.get(normalized_target)
+            if dir_name:
+                candidates.append(dir_name)
+
+        for dir_name in candidates:
+            graph_path = chapters_dir / dir_name / self.FILENAME
+            if graph_path.exists():
+                return graph_path
+        return None
     
     def find_latest_graph(self) -> Optional[Path]:
         """
@@ -459,28 +676,21 @@ class GraphStorage:
         Returns:
             最新图谱文件路径，未找到返回 None
         
-        根据文件修改时间排序，用于前端“最近一次生成”快速预览。
+        根据索引中记录的文件修改时间排序，用于前端“最近一次生成”快速预览。
         """
         chapters_dir = self.chapters_dir
         if not chapters_dir.exists():
             return None
         
-        latest_path = None
-        latest_time = None
-        
-        # 遍历所有运行目录
-        for run_dir in chapters_dir.iterdir():
-            if not run_dir.is_dir():
-                continue
-            
-            graph_path = run_dir / self.FILENAME
+        with _index_lock:
+            index = self._get_index(chapters_dir)
+            ordered = sorted(index.graphs.items(), key=lambda item: item[1].get('mtime', 0), reverse=True)
+
+        for dir_name, _ in ordered:
+            graph_path = chapters_dir / dir_name / self.FILENAME
             if graph_path.exists():
-                mtime = graph_path.stat().st_mtime
-                if latest_time is None or mtime > latest_time:
-                    latest_time = mtime
-                    latest_path = graph_path
-        
-        return latest_path
+                return graph_path
+        return None
     
     def list_all_graphs(self) -> List[Dict[str, Any]]:
         """
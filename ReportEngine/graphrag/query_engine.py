@@ -113,11 +113,30 @@ class QueryEngine:
         return result
     
     def _match_keywords(self, params: QueryParams) -> Set[str]:
-        """关键词匹配"""
-        matched_ids = set()
+        """
+        关键词匹配
+
+        通过 Graph 的倒排索引/类型索引取候选节点，再做类型与引擎筛选，
+        耗时与匹配数量相关而不是与图谱规模相关。
+        """
+        keywords = self._normalize_keywords(params.keywords)
         
-        # 使用 .values() 遍历 Node 对象，而非字典键
-        for node in self.graph.nodes.values():
+        if keywords:
+            # 任一关键词匹配即可
+            candidate_ids: Set[str] = set()
+            for keyword in keywords:
+                candidate_ids |= self.graph.search_nodes(keyword)
+        else:
+            # 无关键词时：只匹配 section 类型（避免返回整个图谱）
+            # 这样至少能获取到各引擎的段落摘要
+            candidate_ids = self.graph.get_node_ids_by_type('section')
+        
+        matched_ids = set()
+        for node_id in candidate_ids:
+            node = self.graph.get_node(node_id)
+            if node is None:
+                continue
+            
             # 类型筛选
             if params.node_types and node.type not in params.node_types:
                 continue
@@ -128,33 +147,33 @@ class QueryEngine:
                 if node_engine and node_engine not in params.engine_filter:
                     continue
             
-            # 关键词匹配
-            if self._matches_keywords(node, params.keywords):
-                matched_ids.add(node.id)
+            matched_ids.add(node.id)
         
         return matched_ids
     
-    def _matches_keywords(self, node: Node, keywords: List[str]) -> bool:
-        """检查节点是否匹配关键词"""
+    @staticmethod
+    def _normalize_keywords(keywords: Any) -> List[str]:
+        """规范化关键词列表"""
         # 防御性检查：确保 keywords 为列表类型
         # 若传入字符串，逐字符迭代会导致单字符匹配（如 'a', 'e'），污染结果
         if isinstance(keywords, str):
-            keywords = [k.strip() for k in keywords.replace(',', ' ').split() if k.strip()]
-        elif not isinstance(keywords, list):
-            keywords = []
+            return [k.strip() for k in keywords.replace(',', ' ').split() if k.strip()]
+        if not isinstance(keywords, list):
+            return []
+        return keywords
+    
+    def _matches_keywords(self, node: Node, keywords: List[str]) -> bool:
+        """检查单个节点是否匹配关键词"""
+        keywords = self._normalize_keywords(keywords)
         
         if not keywords:
-            # 无关键词时：只匹配 section 类型（避免返回整个图谱）
-            # 这样至少能获取到各引擎的段落摘要
             return node.type == 'section'
         
-        # 构建搜索文本
-        search_text = f"{node.name} {node.get('title', '')} {node.get('query_text', '')} {node.get('summary', '')}"
-        search_text = search_text.lower()
+        search_text = self.graph.get_search_text(node)
         
         # 任一关键词匹配即可
         for keyword in keywords:
-            if keyword.lower() in search_text:
+            if str(keyword).lower() in search_text:
                 return True
         
         return False
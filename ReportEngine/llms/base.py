@@ -29,6 +29,14 @@ except ImportError:
 
     LLM_RETRY_CONFIG = None
 
+from prompt_cache import (
+    PromptCacheStats,
+    build_messages,
+    cache_params_from_kwargs,
+    create_chat_stream,
+    record_usage,
+)
+
 
 class LLMClient:
     """针对OpenAI Chat Completion API的轻量封装，统一Report Engine调用入口。"""
@@ -64,6 +72,9 @@ class LLMClient:
         if base_url:
             client_kwargs["base_url"] = base_url
         self.client = OpenAI(**client_kwargs)
+        # 统计prompt token与前缀缓存命中情况；流式请求通过 stream_options 获取usage
+        self.cache_stats = PromptCacheStats()
+        self.stream_usage = os.getenv("LLM_STREAM_INCLUDE_USAGE", "true").lower() not in ("0", "false", "no")
 
     @with_retry(LLM_RETRY_CONFIG)
     def invoke(self, system_prompt: str, user_prompt: str, **kwargs) -> str:
@@ -78,13 +89,11 @@ class LLMClient:
         Returns:
             去除首尾空白后的LLM响应文本
         """
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ]
+        messages = build_messages(system_prompt, user_prompt)
 
         allowed_keys = {"temperature", "top_p", "presence_penalty", "frequency_penalty", "stream"}
         extra_params = {key: value for key, value in kwargs.items() if key in allowed_keys and value is not None}
+        extra_params.update(cache_params_from_kwargs(kwargs))
 
         timeout = kwargs.pop("timeout", self.timeout)
 
@@ -95,6 +104,7 @@ class LLMClient:
             **extra_params,
         )
 
+        record_usage(self.cache_stats, getattr(response, "usage", None))
         if response.choices and response.choices[0].message:
             return self.validate_response(response.choices[0].message.content)
         return ""
@@ -111,31 +121,37 @@ class LLMClient:
         产出:
             str: 每次yield一段delta文本，方便上层实时渲染。
         """
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ]
+        messages = build_messages(system_prompt, user_prompt)
 
         allowed_keys = {"temperature", "top_p", "presence_penalty", "frequency_penalty"}
         extra_params = {key: value for key, value in kwargs.items() if key in allowed_keys and value is not None}
+        extra_params.update(cache_params_from_kwargs(kwargs))
         # 强制使用流式
         extra_params["stream"] = True
+        if self.stream_usage:
+            extra_params["stream_options"] = {"include_usage": True}
 
         timeout = kwargs.pop("timeout", self.timeout)
 
         try:
-            stream = self.client.chat.completions.create(
-                model=self.model_name,
-                messages=messages,
-                timeout=timeout,
-                **extra_params,
-            )
+            stream = create_chat_stream(self.client, self.model_name, messages, timeout, extra_params)
+            # 接口不支持时 stream_options 已被移除，后续请求不再申请usage
+            self.stream_usage = "stream_options" in extra_params
             
-            for chunk in stream:
-                if chunk.choices and len(chunk.choices) > 0:
-                    delta = chunk.choices[0].delta
-                    if delta and delta.content:
-                        yield delta.content
+            try:
+                for chunk in stream:
+                    # 开启include_usage时，最后一个chunk的choices为空、只携带usage
+                    if getattr(chunk, "usage", None):
+                        record_usage(self.cache_stats, chunk.usage)
+                    if chunk.choices and len(chunk.choices) > 0:
+                        delta = chunk.choices[0].delta
+                        if delta and delta.content:
+                            yield delta.content
+            finally:
+                # 调用方提前关闭生成器（如章节流式校验中止）时断开HTTP连接，停止服务端继续生成
+                close = getattr(stream, "close", None)
+                if close:
+                    close()
         except Exception as e:
             logger.error(f"流式请求失败: {str(e)}")
             raise e
@@ -176,4 +192,5 @@ class LLMClient:
             "provider": self.provider,
             "model": self.model_name,
             "api_base": self.base_url or "default",
+            "prompt_cache": self.cache_stats.snapshot(),
         }
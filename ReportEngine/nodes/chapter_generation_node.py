@@ -8,14 +8,14 @@
 from __future__ import annotations
 
 import json
+import threading
 from datetime import datetime
 from pathlib import Path
-import re
 from typing import Any, Dict, List, Tuple, Callable, Optional, Set
 
 from loguru import logger
 
-from ..core import TemplateSection, ChapterStorage
+from ..core import TemplateSection, ChapterStorage, build_chapter_query
 from ..ir import (
     ALLOWED_BLOCK_TYPES,
     ALLOWED_INLINE_MARKS,
@@ -31,6 +31,8 @@ from ..prompts import (
     build_chapter_user_prompt,
 )
 from ..utils.json_parser import RobustJSONParser, JSONParseError
+from ..utils.json_repairer import fast_loads, repair_json_text
+from ..utils.streaming_json import StreamingJSONScanner
 from .base_node import BaseNode
 
 try:
@@ -54,6 +56,14 @@ class ChapterJsonParseError(ValueError):
         self.raw_text = raw_text
 
 
+class ChapterStreamAbortedError(ChapterJsonParseError):
+    """
+    流式扫描在输出过程中发现不可恢复的结构故障、提前中止生成时抛出。
+
+    作为 ChapterJsonParseError 的子类沿用同一套重试逻辑，raw_text 为中止前的部分输出。
+    """
+
+
 class ChapterContentError(ValueError):
     """
     章节内容稀疏异常。
@@ -100,7 +110,6 @@ class ChapterGenerationNode(BaseNode):
         - 对block结构做容错修复，确保最终JSON可渲染。
     """
 
-    _COLON_EQUALS_PATTERN = re.compile(r'(":\s*)=')
     _LINE_BREAK_SENTINEL = "__LINE_BREAK__"
     _INLINE_MARK_ALIASES = {
         "strong": "bold",
@@ -158,6 +167,8 @@ class ChapterGenerationNode(BaseNode):
         error_dir.mkdir(parents=True, exist_ok=True)
         self.error_log_dir = error_dir
         self._failed_block_counter = 0
+        # 章节可能并行调用run，运行级状态的切换与错误文件编号在锁内完成
+        self._state_lock = threading.Lock()
         self._active_run_id: Optional[str] = None
         self._rescue_attempted_labels: Dict[str, Set[str]] = {}
         self._skipped_placeholder_chapters: Set[str] = set()
@@ -174,6 +185,8 @@ class ChapterGenerationNode(BaseNode):
         context: Dict[str, Any],
         run_dir: Path,
         stream_callback: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+        block_callback: Optional[Callable[[Dict[str, Any], Dict[str, Any]], None]] = None,
+        abort_on_stream_error: bool = False,
         **kwargs,
     ) -> Dict[str, Any]:
         """
@@ -184,6 +197,8 @@ class ChapterGenerationNode(BaseNode):
             context: Agent构造的共享上下文（主题、篇幅、布局等）。
             run_dir: 章节存盘目录，由 `ChapterStorage.start_session` 返回。
             stream_callback: 可选流式回调，将LLM delta 推送给前端。
+            block_callback: 可选回调，顶层block在流中闭合后立即回传清洗、校验后的block。
+            abort_on_stream_error: 流式扫描发现结构故障时是否立即中止本次生成。
             **kwargs: 透传温度、top_p等采样参数。
 
         返回:
@@ -191,6 +206,7 @@ class ChapterGenerationNode(BaseNode):
 
         异常:
             ChapterJsonParseError: 多次尝试后仍无法解析合法JSON。
+            ChapterStreamAbortedError: 流式输出提前暴露结构故障（仅在 abort_on_stream_error 时）。
             ChapterContentError: 正文密度不足或只有标题，需要触发重试。
         """
         chapter_meta = {
@@ -208,14 +224,22 @@ class ChapterGenerationNode(BaseNode):
         # 检查是否有GraphRAG结果，决定是否使用增强提示词
         graph_enhanced = bool(context.get("graph_results"))
 
-        raw_text = self._stream_llm(
-            user_message,
-            chapter_dir,
-            stream_callback=stream_callback,
-            section_meta=chapter_meta,
-            graph_enhanced=graph_enhanced,
-            **kwargs,
-        )
+        try:
+            raw_text = self._stream_llm(
+                user_message,
+                chapter_dir,
+                stream_callback=stream_callback,
+                section_meta=chapter_meta,
+                graph_enhanced=graph_enhanced,
+                block_callback=block_callback,
+                abort_on_stream_error=abort_on_stream_error,
+                cache_key=context.get("prompt_cache_key"),
+                **kwargs,
+            )
+        except ChapterStreamAbortedError as abort_error:
+            # 保留中止前的部分输出，最后一次尝试降级为占位时可用于排查
+            self._archive_failed_output(section, abort_error.raw_text or "")
+            raise
         parse_context: List[str] = []
         placeholder_created = False
         try:
@@ -310,6 +334,25 @@ class ChapterGenerationNode(BaseNode):
         # 章节篇幅规划（来自WordBudgetNode），用于指导字数与强调点
         chapter_plan_map = context.get("chapter_directives", {})
         chapter_plan = chapter_plan_map.get(section.chapter_id) if chapter_plan_map else {}
+        forum_logs = context.get("forum_logs", "")
+        retrieval_meta = None
+
+        # 有上下文索引时只携带与本章标题/提纲/强调点相关的素材片段
+        context_index = context.get("context_index")
+        if context_index is not None:
+            query_text = build_chapter_query(section, chapter_plan, context.get("query") or "")
+            selection = context_index.select(
+                query_text,
+                top_k=context.get("context_top_k", 24),
+                token_budget=context.get("context_token_budget", 12000),
+            )
+            reports = selection["reports"]
+            forum_logs = selection["forumLogs"]
+            retrieval_meta = selection["retrieval"]
+            logger.info(
+                f"章节 {section.title} 检索素材 {retrieval_meta['selectedChunks']}/{retrieval_meta['totalChunks']} 块，"
+                f"约 {retrieval_meta['selectedTokens']}/{retrieval_meta['totalTokens']} tokens"
+            )
 
         # 从 layout 的 tocPlan 中查找该章节是否允许使用SWOT块和PEST块
         allow_swot = self._get_chapter_swot_permission(section.chapter_id, context)
@@ -338,7 +381,7 @@ class ChapterGenerationNode(BaseNode):
                 "media_engine": reports.get("media_engine", ""),
                 "insight_engine": reports.get("insight_engine", ""),
             },
-            "forumLogs": context.get("forum_logs", ""),
+            "forumLogs": forum_logs,
             "dataBundles": context.get("data_bundles", []),
             "constraints": {
                 "language": "zh-CN",
@@ -356,6 +399,10 @@ class ChapterGenerationNode(BaseNode):
             "wordPlan": context.get("word_plan"),
         }
         
+        if retrieval_meta:
+            # 告知模型素材是按章节检索的节选，而非完整报告
+            payload["contextRetrieval"] = retrieval_meta
+
         # GraphRAG 增强：如果上下文中包含图谱查询结果，添加到payload
         graph_results = context.get("graph_results")
         if graph_results:
@@ -459,6 +506,8 @@ class ChapterGenerationNode(BaseNode):
         stream_callback: Optional[Callable[[str, Dict[str, Any]], None]] = None,
         section_meta: Optional[Dict[str, Any]] = None,
         graph_enhanced: bool = False,
+        block_callback: Optional[Callable[[Dict[str, Any], Dict[str, Any]], None]] = None,
+        abort_on_stream_error: bool = False,
         **kwargs,
     ) -> str:
         """
@@ -470,10 +519,15 @@ class ChapterGenerationNode(BaseNode):
             stream_callback: SSE流式推送的回调函数。
             section_meta: 附带的章节ID/标题，用于回调payload。
             graph_enhanced: 是否启用GraphRAG增强的系统提示词。
+            block_callback: 顶层block闭合时的回调，参数为清洗校验后的block与章节元数据。
+            abort_on_stream_error: 扫描到结构故障时是否断开流并抛出异常。
             **kwargs: 透传温度、top_p等参数。
 
         返回:
             str: 将所有delta拼接后的原始文本。
+
+        异常:
+            ChapterStreamAbortedError: abort_on_stream_error 为真且流式扫描判定结构故障。
         """
         # 根据是否启用GraphRAG选择不同的系统提示词
         if graph_enhanced:
@@ -483,24 +537,71 @@ class ChapterGenerationNode(BaseNode):
             system_prompt = SYSTEM_PROMPT_CHAPTER_JSON
         
         chunks: List[str] = []
+        meta = section_meta or {}
+        # 每个delta都喂给增量扫描器：闭合的顶层block即时回传，结构故障可在流中途发现
+        scanner = StreamingJSONScanner() if (block_callback or abort_on_stream_error) else None
         with self.storage.capture_stream(chapter_dir) as stream_fp:
             stream = self.llm_client.stream_invoke(
                 system_prompt,
                 user_message,
                 temperature=kwargs.get("temperature", 0.2),
                 top_p=kwargs.get("top_p", 0.95),
+                cache_key=kwargs.get("cache_key"),
             )
-            for delta in stream:
-                stream_fp.write(delta)
-                chunks.append(delta)
-                if stream_callback:
-                    meta = section_meta or {}
-                    try:
-                        stream_callback(delta, meta)
-                    except Exception as callback_error:  # pragma: no cover - 仅记录，不阻断主流程
-                        logger.warning(f"章节流式回调失败: {callback_error}")
+            try:
+                for delta in stream:
+                    stream_fp.write(delta)
+                    chunks.append(delta)
+                    if stream_callback:
+                        try:
+                            stream_callback(delta, meta)
+                        except Exception as callback_error:  # pragma: no cover - 仅记录，不阻断主流程
+                            logger.warning(f"章节流式回调失败: {callback_error}")
+                    if scanner is None:
+                        continue
+                    for index, block in scanner.feed(delta):
+                        if block_callback:
+                            self._emit_stream_block(block, index, meta, block_callback)
+                    if scanner.failure and abort_on_stream_error:
+                        logger.warning(
+                            f"章节 {meta.get('title', '')} 流式输出结构异常，提前中止: {scanner.failure}"
+                        )
+                        raise ChapterStreamAbortedError(
+                            f"章节流式输出结构异常，已提前中止: {scanner.failure}",
+                            raw_text="".join(chunks),
+                        )
+            finally:
+                # 提前中止时立即关闭生成器，由LLM客户端断开HTTP连接，不再等待剩余输出
+                close = getattr(stream, "close", None)
+                if close:
+                    close()
+        if scanner is not None:
+            logger.debug(f"章节 {meta.get('title', '')} 流式扫描统计: {scanner.stats()}")
         return "".join(chunks)
 
+    def _emit_stream_block(
+        self,
+        block: Dict[str, Any],
+        index: int,
+        meta: Dict[str, Any],
+        block_callback: Callable[[Dict[str, Any], Dict[str, Any]], None],
+    ):
+        """对流中闭合的顶层block做与整章相同的清洗与IR校验，再交给回调推送"""
+        holder = {"blocks": [block]}
+        try:
+            self._sanitize_chapter_blocks(holder)
+        except Exception as exc:  # pragma: no cover - 清洗失败时推送原始block
+            logger.debug(f"流式block清洗失败: {exc}")
+        for cleaned in holder.get("blocks") or []:
+            valid, errors = self.validator.validate_block(cleaned, f"blocks[{index}]")
+            payload = {"index": index, "block": cleaned, "valid": valid}
+            if errors:
+                payload["errors"] = errors
+            try:
+                block_callback(payload, meta)
+            except Exception as callback_error:  # pragma: no cover - 仅记录，不阻断主流程
+                logger.warning(f"章节block回调失败: {callback_error}")
+
     def _attempt_cross_engine_json_rescue(
         self,
         section: TemplateSection,
@@ -565,12 +666,13 @@ class ChapterGenerationNode(BaseNode):
 
     def _ensure_run_state(self, run_id: str):
         """确保每次报告运行时的修复状态隔离，防止上一份任务的记录影响新任务。"""
-        if self._active_run_id == run_id:
-            return
-        self._active_run_id = run_id
-        self._rescue_attempted_labels = {}
-        self._skipped_placeholder_chapters = set()
-        self._archived_failed_json = {}
+        with self._state_lock:
+            if self._active_run_id == run_id:
+                return
+            self._active_run_id = run_id
+            self._rescue_attempted_labels = {}
+            self._skipped_placeholder_chapters = set()
+            self._archived_failed_json = {}
 
     def _archive_failed_output(self, section: TemplateSection, raw_text: str):
         """缓存当前章节的原始错误JSON，以便后续占位或人工使用。"""
@@ -673,20 +775,18 @@ class ChapterGenerationNode(BaseNode):
         if not cleaned:
             raise ChapterJsonParseError("LLM返回空内容", raw_text=raw_text)
 
-        candidate_payloads = [cleaned]
-        repaired = self._repair_llm_json(cleaned)
-        if repaired != cleaned:
-            candidate_payloads.append(repaired)
-
         data: Dict[str, Any] | None = None
         try:
-            data = self._parse_with_candidates(candidate_payloads)
-        except json.JSONDecodeError as exc:
-            repaired_payload = self._attempt_json_repair(cleaned)
-            if repaired_payload:
-                candidate_payloads.append(repaired_payload)
+            data = self._parse_with_candidates([cleaned])
+        except json.JSONDecodeError:
+            # 原文无法直接解析时才依次尝试单遍修复与json_repair库
+            repairers = (self._repair_llm_json, self._attempt_json_repair)
+            for payload in (repair(cleaned) for repair in repairers):
+                if not payload or payload == cleaned:
+                    continue
                 try:
-                    data = self._parse_with_candidates(candidate_payloads[-1:])
+                    data = self._parse_with_candidates([payload])
+                    break
                 except json.JSONDecodeError:
                     data = None
             if data is None:
@@ -724,8 +824,9 @@ class ChapterGenerationNode(BaseNode):
     ) -> Optional[Dict[str, str]]:
         """将无法解析的JSON文本落盘，便于在HTML中指向具体文件。"""
         try:
-            self._failed_block_counter += 1
-            entry_id = f"E{self._failed_block_counter:04d}"
+            with self._state_lock:
+                self._failed_block_counter += 1
+                entry_id = f"E{self._failed_block_counter:04d}"
             timestamp = datetime.utcnow().strftime("%Y%m%d-%H%M%S")
             slug = section.slug or "section"
             filename = f"{timestamp}-{slug}-{entry_id}.json"
@@ -770,7 +871,8 @@ class ChapterGenerationNode(BaseNode):
 
     def _repair_llm_json(self, text: str) -> str:
         """
-        处理常见的LLM错误（如":=导致的非法JSON）。
+        单遍修复LLM常见的JSON语法错误（":="、控制字符、缺逗号、括号不平衡等），
+        与 RobustJSONParser 共用 repair_json_text。
 
         参数:
             text: 原始章节JSON文本。
@@ -778,167 +880,10 @@ class ChapterGenerationNode(BaseNode):
         返回:
             str: 修复后的文本；若未做改动则返回原内容。
         """
-        repaired = text
-        mutated = False
-
-        new_text = self._COLON_EQUALS_PATTERN.sub(r"\1", repaired)
-        if new_text != repaired:
-            logger.warning("检测到章节JSON中的\":=\"字符，已自动移除多余的'='号")
-            repaired = new_text
-            mutated = True
-
-        repaired, escaped = self._escape_in_string_controls(repaired)
-        if escaped:
-            logger.warning("检测到章节JSON字符串中存在未转义的控制字符，已自动转换为转义序列")
-            mutated = True
-
-        repaired, balanced = self._balance_brackets(repaired)
-        if balanced:
-            logger.warning("检测到章节JSON括号不平衡，已自动补齐/剔除异常括号")
-            mutated = True
-
-        repaired, commas_fixed = self._fix_missing_commas(repaired)
-        if commas_fixed:
-            logger.warning("检测到章节JSON对象/数组之间缺少逗号，已自动补齐")
-            mutated = True
-
-        return repaired if mutated else text
-
-    def _escape_in_string_controls(self, text: str) -> Tuple[str, bool]:
-        """
-        将字符串字面量中的裸换行/制表符/控制字符替换为JSON合法的转义序列。
-        """
-        if not text:
-            return text, False
-
-        result: List[str] = []
-        in_string = False
-        escaped = False
-        mutated = False
-        control_map = {"\n": "\\n", "\r": "\\n", "\t": "\\t"}
-
-        for ch in text:
-            if escaped:
-                result.append(ch)
-                escaped = False
-                continue
-
-            if ch == "\\":
-                result.append(ch)
-                escaped = True
-                continue
-
-            if ch == '"':
-                result.append(ch)
-                in_string = not in_string
-                continue
-
-            if in_string and ch in control_map:
-                result.append(control_map[ch])
-                mutated = True
-                continue
-
-            if in_string and ord(ch) < 0x20:
-                result.append(f"\\u{ord(ch):04x}")
-                mutated = True
-                continue
-
-            result.append(ch)
-
-        return "".join(result), mutated
-
-    def _fix_missing_commas(self, text: str) -> Tuple[str, bool]:
-        """在对象/数组连续出现时自动补逗号"""
-        if not text:
-            return text, False
-
-        chars: List[str] = []
-        mutated = False
-        in_string = False
-        escaped = False
-        length = len(text)
-        i = 0
-        while i < length:
-            ch = text[i]
-            chars.append(ch)
-            if escaped:
-                escaped = False
-                i += 1
-                continue
-            if ch == "\\":
-                escaped = True
-                i += 1
-                continue
-            if ch == '"':
-                in_string = not in_string
-                i += 1
-                continue
-            if not in_string and ch in "}]":
-                j = i + 1
-                while j < length and text[j] in " \t\r\n":
-                    j += 1
-                if j < length:
-                    next_ch = text[j]
-                    if next_ch in "{[":
-                        chars.append(",")
-                        mutated = True
-            i += 1
-        return "".join(chars), mutated
-
-    def _balance_brackets(self, text: str) -> Tuple[str, bool]:
-        """尝试修复因LLM多写/少写括号导致的不平衡结构"""
-        if not text:
-            return text, False
-
-        result: List[str] = []
-        stack: List[str] = []
-        mutated = False
-        in_string = False
-        escaped = False
-
-        opener_map = {"{": "}", "[": "]"}
-
-        for ch in text:
-            if escaped:
-                result.append(ch)
-                escaped = False
-                continue
-
-            if ch == "\\":
-                result.append(ch)
-                escaped = True
-                continue
-
-            if ch == '"':
-                result.append(ch)
-                in_string = not in_string
-                continue
-
-            if in_string:
-                result.append(ch)
-                continue
-
-            if ch in "{[":
-                stack.append(ch)
-                result.append(ch)
-                continue
-
-            if ch in "}]":
-                if stack and ((ch == "}" and stack[-1] == "{") or (ch == "]" and stack[-1] == "[")):
-                    stack.pop()
-                    result.append(ch)
-                else:
-                    mutated = True
-                continue
-
-            result.append(ch)
-
-        while stack:
-            opener = stack.pop()
-            result.append(opener_map[opener])
-            mutated = True
-
-        return "".join(result), mutated
+        result = repair_json_text(text)
+        if result.mutated:
+            logger.warning(f"检测到章节JSON语法问题，已单遍修复: {result.describe()}")
+        return result.text
 
     def _attempt_json_repair(self, text: str) -> str | None:
         """使用可选的json_repair库进一步修复复杂语法错误"""
@@ -2042,11 +1987,11 @@ class ChapterGenerationNode(BaseNode):
 
     @staticmethod
     def _parse_with_candidates(payloads: List[str]) -> Dict[str, Any]:
-        """按顺序尝试多个payload，直到解析成功"""
+        """按顺序尝试多个payload，直到解析成功（优先走C解析器快速路径）"""
         last_exc: json.JSONDecodeError | None = None
         for payload in payloads:
             try:
-                return json.loads(payload)
+                return fast_loads(payload)
             except json.JSONDecodeError as exc:
                 last_exc = exc
         assert last_exc is not None
@@ -2056,6 +2001,7 @@ class ChapterGenerationNode(BaseNode):
 __all__ = [
     "ChapterGenerationNode",
     "ChapterJsonParseError",
+    "ChapterStreamAbortedError",
     "ChapterContentError",
     "ChapterValidationError",
 ]
@@ -7,6 +7,8 @@ Report Engine 的所有提示词定义。
 
 import json
 
+from utils.prompt_cache import order_payload
+
 from ..ir import (
     ALLOWED_BLOCK_TYPES,
     ALLOWED_INLINE_MARKS,
@@ -72,6 +74,17 @@ chapter_generation_input_schema = {
             }
         },
         "forumLogs": {"type": "string"},
+        "contextRetrieval": {
+            "type": "object",
+            "description": "存在时表示 reports/forumLogs 是按本章提纲检索出的相关节选",
+            "properties": {
+                "selectedChunks": {"type": "number"},
+                "totalChunks": {"type": "number"},
+                "selectedTokens": {"type": "number"},
+                "totalTokens": {"type": "number"},
+                "fallback": {"type": "boolean"}
+            }
+        },
         "dataBundles": {
             "type": "array",
             "items": {"type": "object"}
@@ -465,13 +478,23 @@ SYSTEM_PROMPT_WORD_BUDGET = f"""
 """
 
 
+# 各章节完全相同的顶层字段，序列化时排在最前，使所有章节提示词共享同一段前缀
+CHAPTER_SHARED_PAYLOAD_KEYS = ("globalContext", "wordPlan", "dataBundles")
+
+
 def build_chapter_user_prompt(payload: dict) -> str:
     """
     将章节上下文序列化为提示词输入。
 
     统一使用 `json.dumps(..., indent=2, ensure_ascii=False)`，便于LLM读取。
+    运行级共享字段（未做章节检索时也包括 reports/forumLogs）按固定顺序、键排序后放在最前，
+    章节特有的 section/chapterPlan/constraints 等放在最后，
+    第2..N章即可命中 vLLM/DeepSeek 等接口的前缀缓存，跳过共享部分的prefill。
     """
-    return json.dumps(payload, ensure_ascii=False, indent=2)
+    shared_keys = list(CHAPTER_SHARED_PAYLOAD_KEYS)
+    if "contextRetrieval" not in payload:
+        shared_keys += ["reports", "forumLogs"]
+    return json.dumps(order_payload(payload, shared_keys), ensure_ascii=False, indent=2)
 
 
 def build_chapter_repair_prompt(chapter: dict, errors, original_text=None) -> str:
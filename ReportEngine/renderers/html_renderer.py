@@ -11,11 +11,14 @@ from __future__ import annotations
 
 import ast
 import copy
+import hashlib
 import html
 import json
 import os
 import re
 import base64
+import threading
+from collections import OrderedDict
 from pathlib import Path
 from typing import Any, Dict, List
 from loguru import logger
@@ -32,6 +35,48 @@ from ReportEngine.utils.chart_repair_api import create_llm_repair_functions
 from ReportEngine.utils.chart_review_service import get_chart_review_service
 
 
+# ===== 进程级渲染缓存（跨 HTMLRenderer 实例共享） =====
+# 重生成脚本、重复的 /result 请求会反复渲染相同IR：<head>/CSS 按主题缓存，
+# 章节HTML片段按章节JSON+主题的内容指纹缓存，只有变化的章节才重新渲染。
+CHAPTER_CACHE_MAX_ENTRIES = 512
+HEAD_CACHE_MAX_ENTRIES = 16
+
+_render_cache_lock = threading.Lock()
+_chapter_fragment_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_head_cache: "OrderedDict[str, str]" = OrderedDict()
+_css_cache: "OrderedDict[str, str]" = OrderedDict()
+
+
+def _content_digest(*parts: Any) -> str:
+    """对任意JSON结构做规范化序列化（键排序）后取SHA-256"""
+    canonical = json.dumps(parts, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _cache_get(cache: OrderedDict, key: str) -> Any:
+    with _render_cache_lock:
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+        return value
+
+
+def _cache_put(cache: OrderedDict, key: str, value: Any, max_entries: int) -> None:
+    with _render_cache_lock:
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > max_entries:
+            cache.popitem(last=False)
+
+
+def clear_render_cache() -> None:
+    """清空进程内的章节片段与head/CSS缓存"""
+    with _render_cache_lock:
+        _chapter_fragment_cache.clear()
+        _head_cache.clear()
+        _css_cache.clear()
+
+
 class HTMLRenderer:
     """
     Document IR → HTML 渲染器。
@@ -43,7 +88,8 @@ class HTMLRenderer:
 
     # ===== 渲染流程快速导览（便于定位注释） =====
     # render(document_ir): 单一公开入口，负责重置状态并串联 _render_head / _render_body。
-    # _render_head: 根据 themeTokens 构造 <head>，注入 CSS 变量、内联库与 CDN fallback。
+    # _render_head: 根据 themeTokens 构造 <head>，注入 CSS 变量、内联库与 CDN fallback（按标题+主题缓存）。
+    # _render_cached_chapter: 按章节内容指纹复用已渲染的章节片段，未命中时调用 _render_chapter。
     # _render_body: 组装页面骨架（页眉/header、目录/toc、章节/blocks、脚本注水）。
     # _render_header: 生成顶部按钮区域，按钮 ID 及事件在 _hydration_script 内绑定。
     # _render_widget: 处理 Chart.js/词云组件，先校验与修复数据，再写入 <script type="application/json"> 配置。
@@ -108,6 +154,7 @@ class HTMLRenderer:
         self.toc_rendered = False
         self.hero_kpi_signature: tuple | None = None
         self._current_chapter: Dict[str, Any] | None = None
+        self._chapter_digests: List[str] = []
         self._lib_cache: Dict[str, str] = {}
         self._pdf_font_base64: str | None = None
 
@@ -291,6 +338,23 @@ class HTMLRenderer:
             str: 可直接写入磁盘的完整HTML文档。
         """
         self.document = document_ir or {}
+        self.metadata = self.document.get("metadata", {}) or {}
+        raw_chapters = self.document.get("chapters", []) or []
+        metadata = self.metadata
+        theme_tokens = metadata.get("themeTokens") or self.document.get("themeTokens", {})
+        hero_kpis = (metadata.get("hero") or {}).get("kpis")
+        self.hero_kpi_signature = self._kpi_signature_from_items(hero_kpis)
+
+        # 在图表审查改写IR之前计算各章节的内容指纹，已缓存的章节无需再次审查
+        self._chapter_digests = [
+            _content_digest(type(self).__name__, theme_tokens, self.hero_kpi_signature, chapter)
+            for chapter in raw_chapters
+        ]
+        chapters_to_review = [
+            chapter
+            for chapter, digest in zip(raw_chapters, self._chapter_digests)
+            if _cache_get(_chapter_fragment_cache, digest) is None
+        ]
 
         # 使用统一的 ChartReviewService 进行图表审查与修复
         # 修复结果会直接回写到 document_ir，避免多次渲染重复修复
@@ -300,7 +364,8 @@ class HTMLRenderer:
             self.document,
             ir_file_path=ir_file_path,
             reset_stats=True,
-            save_on_repair=bool(ir_file_path)
+            save_on_repair=bool(ir_file_path),
+            chapters=chapters_to_review,
         )
         # 同步统计信息到本地（用于兼容旧的 _log_chart_validation_stats）
         # 使用返回的 ReviewStats 对象，而非共享的 chart_service.stats
@@ -309,8 +374,6 @@ class HTMLRenderer:
         self.widget_scripts = []
         self.chart_counter = 0
         self.heading_counter = 0
-        self.metadata = self.document.get("metadata", {}) or {}
-        raw_chapters = self.document.get("chapters", []) or []
         self.toc_rendered = False
         self.chapters = self._prepare_chapters(raw_chapters)
         self.chapter_anchor_map = {
@@ -321,11 +384,7 @@ class HTMLRenderer:
         self.heading_label_map = self._compute_heading_labels(self.chapters)
         self.toc_entries = self._collect_toc_entries(self.chapters)
 
-        metadata = self.metadata
-        theme_tokens = metadata.get("themeTokens") or self.document.get("themeTokens", {})
         title = metadata.get("title") or metadata.get("query") or "智能舆情报告"
-        hero_kpis = (metadata.get("hero") or {}).get("kpis")
-        self.hero_kpi_signature = self._kpi_signature_from_items(hero_kpis)
 
         head = self._render_head(title, theme_tokens)
         body = self._render_body()
@@ -384,7 +443,16 @@ class HTMLRenderer:
         返回:
             str: head片段HTML。
         """
-        css = self._build_css(theme_tokens)
+        head_key = _content_digest(type(self).__name__, title, theme_tokens)
+        cached_head = _cache_get(_head_cache, head_key)
+        if cached_head is not None:
+            return cached_head
+
+        css_key = _content_digest(type(self).__name__, theme_tokens)
+        css = _cache_get(_css_cache, css_key)
+        if css is None:
+            css = self._build_css(theme_tokens)
+            _cache_put(_css_cache, css_key, css, HEAD_CACHE_MAX_ENTRIES)
 
         # 加载第三方库
         chartjs = self._load_lib("chart.js")
@@ -447,7 +515,7 @@ class HTMLRenderer:
         # PDF字体数据不再嵌入HTML，减小文件体积
         pdf_font_script = ""
 
-        return f"""
+        head_html = f"""
 <head>
   <meta charset="utf-8" />
   <meta http-equiv="X-UA-Compatible" content="IE=edge" />
@@ -480,6 +548,8 @@ class HTMLRenderer:
     document.documentElement.classList.add('js-ready');
   </script>
 </head>""".strip()
+        _cache_put(_head_cache, head_key, head_html, HEAD_CACHE_MAX_ENTRIES)
+        return head_html
 
     def _render_body(self) -> str:
         """
@@ -493,7 +563,10 @@ class HTMLRenderer:
         # cover = self._render_cover()  # 不再单独渲染cover
         hero = self._render_hero()
         toc_section = self._render_toc_section()
-        chapters = "".join(self._render_chapter(chapter) for chapter in self.chapters)
+        chapters = "".join(
+            self._render_cached_chapter(index, chapter)
+            for index, chapter in enumerate(self.chapters)
+        )
         widget_scripts = "\n".join(self.widget_scripts)
         hydration = self._hydration_script()
         overlay = """
@@ -1094,6 +1167,43 @@ class HTMLRenderer:
             self._current_chapter = prev_chapter
         return f'<section id="{section_id}" class="chapter">\n{blocks_html}\n</section>'
 
+    def _render_cached_chapter(self, index: int, chapter: Dict[str, Any]) -> str:
+        """
+        优先复用缓存的章节片段，未命中时渲染并写入缓存。
+
+        片段中的图表/标题编号依赖前序章节，因此缓存条目同时记录渲染时的
+        章节序号与图表、标题计数器起点，起点一致才复用，并补回图表配置脚本与计数。
+
+        参数:
+            index: 章节在文档中的序号。
+            chapter: 预处理后的章节JSON。
+
+        返回:
+            str: section包裹的HTML。
+        """
+        digest = self._chapter_digests[index] if index < len(self._chapter_digests) else None
+        context = (index, self.chart_counter, self.heading_counter)
+        entry = _cache_get(_chapter_fragment_cache, digest) if digest else None
+        if entry is not None and entry["context"] == context:
+            self.widget_scripts.extend(entry["widget_scripts"])
+            self.chart_counter += entry["charts"]
+            self.heading_counter += entry["headings"]
+            return entry["html"]
+
+        scripts_start = len(self.widget_scripts)
+        toc_rendered = self.toc_rendered
+        html_fragment = self._render_chapter(chapter)
+        # 章节内嵌目录依赖全局状态，这类章节不缓存
+        if digest and self.toc_rendered == toc_rendered:
+            _cache_put(_chapter_fragment_cache, digest, {
+                "context": context,
+                "html": html_fragment,
+                "widget_scripts": self.widget_scripts[scripts_start:],
+                "charts": self.chart_counter - context[1],
+                "headings": self.heading_counter - context[2],
+            }, CHAPTER_CACHE_MAX_ENTRIES)
+        return html_fragment
+
     def _render_blocks(self, blocks: List[Dict[str, Any]]) -> str:
         """
         顺序渲染章节内所有block。
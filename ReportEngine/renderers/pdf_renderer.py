@@ -9,10 +9,9 @@ import base64
 import copy
 import os
 import sys
-import io
 import re
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, List
 from datetime import datetime
 from loguru import logger
 from ReportEngine.utils.dependency_check import (
@@ -71,7 +70,16 @@ from .html_renderer import HTMLRenderer
 from .pdf_layout_optimizer import PDFLayoutOptimizer, PDFLayoutConfig
 from .chart_to_svg import create_chart_converter
 from .math_to_svg import MathToSVG
+from .render_cache import (
+    RenderCache,
+    RenderJob,
+    render_jobs,
+    render_payload,
+    render_wordcloud_data_uri,
+    resolve_workers,
+)
 from ReportEngine.utils.chart_review_service import get_chart_review_service
+from ReportEngine.utils.config import settings
 try:
     from wordcloud import WordCloud
     WORDCLOUD_AVAILABLE = True
@@ -128,6 +136,13 @@ class PDFRenderer:
             logger.warning(f"数学公式SVG转换器初始化失败: {e}，公式将显示为文本")
             self.math_converter = None
 
+        # 图表/词云/公式渲染缓存与进程池（matplotlib非线程安全，未命中的任务交给子进程并行渲染）
+        self.render_cache = RenderCache(
+            settings.PDF_RENDER_CACHE_DIR,
+            enabled=settings.PDF_RENDER_CACHE_ENABLED,
+        )
+        self.render_workers = resolve_workers(settings.PDF_RENDER_WORKERS)
+
     @staticmethod
     def _get_font_path() -> Path:
         """获取字体文件路径"""
@@ -204,17 +219,21 @@ class PDFRenderer:
         返回:
             Dict[str, str]: widgetId到SVG字符串的映射
         """
-        svg_map = {}
-
         if not hasattr(self, 'chart_converter') or not self.chart_converter:
             logger.warning("图表转换器未初始化，跳过图表转换")
-            return svg_map
+            return {}
 
-        # 遍历所有章节
+        # 遍历所有章节，先收集任务，再统一查缓存/并行渲染
+        jobs: List[RenderJob] = []
         chapters = document_ir.get('chapters', [])
         for chapter in chapters:
             blocks = chapter.get('blocks', [])
-            self._extract_and_convert_widgets(blocks, svg_map)
+            self._collect_chart_jobs(blocks, jobs)
+
+        svg_map = self._render_jobs(jobs)
+        for job in jobs:
+            if job.target_id not in svg_map:
+                logger.warning(f"图表 {job.target_id} 转换为SVG失败")
 
         logger.info(f"成功转换 {len(svg_map)} 个图表为SVG")
         return svg_map
@@ -223,33 +242,33 @@ class PDFRenderer:
         """
         将document_ir中的词云widget转换为PNG并返回data URI映射
         """
-        img_map: Dict[str, str] = {}
-
         if not WORDCLOUD_AVAILABLE:
             logger.debug("wordcloud库未安装，词云将使用表格兜底")
-            return img_map
+            return {}
 
         # 遍历所有章节
+        jobs: List[RenderJob] = []
         chapters = document_ir.get('chapters', [])
         for chapter in chapters:
             blocks = chapter.get('blocks', [])
-            self._extract_wordcloud_widgets(blocks, img_map)
+            self._collect_wordcloud_jobs(blocks, jobs)
 
+        img_map = self._render_jobs(jobs)
         if img_map:
             logger.info(f"成功转换 {len(img_map)} 个词云为图片")
         return img_map
 
-    def _extract_and_convert_widgets(
+    def _collect_chart_jobs(
         self,
         blocks: list,
-        svg_map: Dict[str, str]
+        jobs: List[RenderJob]
     ) -> None:
         """
-        递归遍历blocks，找到所有widget并转换为SVG
+        递归遍历blocks，找到所有需要转换为SVG的widget并生成渲染任务
 
         参数:
             blocks: block列表
-            svg_map: 用于存储转换结果的字典
+            jobs: 用于收集渲染任务的列表
         """
         for block in blocks:
             if not isinstance(block, dict):
@@ -278,32 +297,29 @@ class PDFRenderer:
                             f"{f'，原因: {fail_reason}' if fail_reason else ''}"
                         )
                         continue
-                    try:
-                        svg_content = self.chart_converter.convert_widget_to_svg(
-                            block,
-                            width=800,
-                            height=500,
-                            dpi=100
-                        )
-                        if svg_content:
-                            svg_map[widget_id] = svg_content
-                            logger.debug(f"图表 {widget_id} 转换为SVG成功")
-                        else:
-                            logger.warning(f"图表 {widget_id} 转换为SVG失败")
-                    except Exception as e:
-                        logger.error(f"转换图表 {widget_id} 时出错: {e}")
+                    # 只有类型、数据与配置影响渲染结果，审查标记等字段不参与缓存键
+                    jobs.append(RenderJob(widget_id, 'chart', {
+                        'widget': {
+                            'widgetType': widget_type,
+                            'props': block.get('props') or {},
+                            'data': block.get('data') or {},
+                        },
+                        'width': 800,
+                        'height': 500,
+                        'dpi': 100,
+                    }))
 
             # 递归处理嵌套的blocks
             nested_blocks = block.get('blocks')
             if isinstance(nested_blocks, list):
-                self._extract_and_convert_widgets(nested_blocks, svg_map)
+                self._collect_chart_jobs(nested_blocks, jobs)
 
             # 处理列表项
             if block_type == 'list':
                 items = block.get('items', [])
                 for item in items:
                     if isinstance(item, list):
-                        self._extract_and_convert_widgets(item, svg_map)
+                        self._collect_chart_jobs(item, jobs)
 
             # 处理表格单元格
             if block_type == 'table':
@@ -313,15 +329,15 @@ class PDFRenderer:
                     for cell in cells:
                         cell_blocks = cell.get('blocks', [])
                         if isinstance(cell_blocks, list):
-                            self._extract_and_convert_widgets(cell_blocks, svg_map)
+                            self._collect_chart_jobs(cell_blocks, jobs)
 
-    def _extract_wordcloud_widgets(
+    def _collect_wordcloud_jobs(
         self,
         blocks: list,
-        img_map: Dict[str, str]
+        jobs: List[RenderJob]
     ) -> None:
         """
-        递归遍历blocks，找到词云widget并生成图片
+        递归遍历blocks，找到词云widget并生成渲染任务
         """
         for block in blocks:
             if not isinstance(block, dict):
@@ -339,23 +355,23 @@ class PDFRenderer:
                 ) or ('wordcloud' in props_type.lower())
 
                 if widget_id and is_wordcloud:
-                    try:
-                        data_uri = self._generate_wordcloud_image(block)
-                        if data_uri:
-                            img_map[widget_id] = data_uri
-                            logger.debug(f"词云 {widget_id} 转换为图片成功")
-                    except Exception as exc:
-                        logger.warning(f"生成词云图片失败 {widget_id}: {exc}")
+                    frequencies = self._wordcloud_frequencies(block)
+                    if frequencies:
+                        jobs.append(RenderJob(widget_id, 'wordcloud', {
+                            'frequencies': frequencies,
+                            'width': 1000,
+                            'height': 360,
+                        }))
 
             nested_blocks = block.get('blocks')
             if isinstance(nested_blocks, list):
-                self._extract_wordcloud_widgets(nested_blocks, img_map)
+                self._collect_wordcloud_jobs(nested_blocks, jobs)
 
             if block_type == 'list':
                 items = block.get('items', [])
                 for item in items:
                     if isinstance(item, list):
-                        self._extract_wordcloud_widgets(item, img_map)
+                        self._collect_wordcloud_jobs(item, jobs)
 
             if block_type == 'table':
                 rows = block.get('rows', [])
@@ -364,7 +380,7 @@ class PDFRenderer:
                     for cell in cells:
                         cell_blocks = cell.get('blocks', [])
                         if isinstance(cell_blocks, list):
-                            self._extract_wordcloud_widgets(cell_blocks, img_map)
+                            self._collect_wordcloud_jobs(cell_blocks, jobs)
 
     def _normalize_wordcloud_items(self, block: Dict[str, Any]) -> list:
         """
@@ -392,39 +408,27 @@ class PDFRenderer:
             normalized.append({'word': str(word), 'weight': weight_val, 'category': category})
         return normalized
 
-    def _generate_wordcloud_image(self, block: Dict[str, Any]) -> str | None:
+    def _wordcloud_frequencies(self, block: Dict[str, Any]) -> Dict[str, float]:
         """
-        生成词云PNG并返回data URI
+        将词云数据转换为wordcloud库使用的词频字典
         """
-        items = self._normalize_wordcloud_items(block)
-        if not items:
-            return None
-
         # 使用频次形式馈入wordcloud库
         frequencies = {}
-        for item in items:
+        for item in self._normalize_wordcloud_items(block):
             weight = item['weight']
             # 兼容权重为0-1的小数，放大以体现差异
             freq = weight * 100 if 0 < weight <= 1.5 else weight
             frequencies[item['word']] = max(1, freq)
+        return frequencies
 
-        font_path = str(self._get_font_path())
-        wc = WordCloud(
-            width=1000,
-            height=360,
-            background_color="white",
-            font_path=font_path,
-            prefer_horizontal=0.98,
-            random_state=42,
-            max_words=180,
-            collocations=False,
-        )
-        wc.generate_from_frequencies(frequencies)
-
-        buffer = io.BytesIO()
-        wc.to_image().save(buffer, format='PNG')
-        encoded = base64.b64encode(buffer.getvalue()).decode('ascii')
-        return f"data:image/png;base64,{encoded}"
+    def _generate_wordcloud_image(self, block: Dict[str, Any]) -> str | None:
+        """
+        生成词云PNG并返回data URI
+        """
+        frequencies = self._wordcloud_frequencies(block)
+        if not frequencies:
+            return None
+        return render_wordcloud_data_uri(frequencies, str(self._get_font_path()))
 
     def _convert_math_to_svg(self, document_ir: Dict[str, Any]) -> Dict[str, str]:
         """
@@ -436,38 +440,59 @@ class PDFRenderer:
         返回:
             Dict[str, str]: 公式块ID到SVG字符串的映射
         """
-        svg_map = {}
-
         if not hasattr(self, 'math_converter') or not self.math_converter:
             logger.warning("数学公式转换器未初始化，跳过公式转换")
-            return svg_map
+            return {}
 
         # 遍历所有章节，保持全局计数器避免ID重复
         block_counter = [0]
+        jobs: List[RenderJob] = []
+        math_blocks: Dict[str, Dict[str, Any]] = {}
         chapters = document_ir.get('chapters', [])
         for chapter in chapters:
             blocks = chapter.get('blocks', [])
-            self._extract_and_convert_math_blocks(blocks, svg_map, block_counter)
+            self._collect_math_jobs(blocks, jobs, block_counter, math_blocks)
+
+        svg_map = self._render_jobs(jobs)
+        for job in jobs:
+            if job.target_id not in svg_map:
+                logger.warning(f"公式 {job.target_id} 转换为SVG失败: {job.payload['latex'][:50]}...")
+        # 仅转换成功的公式块写入mathId，失败的由HTML渲染器按文本兜底
+        for math_id, block in math_blocks.items():
+            if math_id in svg_map:
+                block['mathId'] = math_id
 
         logger.info(f"成功转换 {len(svg_map)} 个数学公式为SVG")
         return svg_map
 
-    def _extract_and_convert_math_blocks(
+    def _collect_math_jobs(
         self,
         blocks: list,
-        svg_map: Dict[str, str],
-        block_counter: list = None
+        jobs: List[RenderJob],
+        block_counter: list = None,
+        math_blocks: Dict[str, Dict[str, Any]] | None = None
     ) -> None:
         """
-        递归遍历blocks，找到所有math块并转换为SVG
+        递归遍历blocks，找到所有math块与内联公式并生成渲染任务
 
         参数:
             blocks: block列表
-            svg_map: 用于存储转换结果的字典
+            jobs: 用于收集渲染任务的列表
             block_counter: 用于生成唯一ID的计数器
+            math_blocks: 公式块ID到block的映射，渲染成功后写回mathId
         """
         if block_counter is None:
             block_counter = [0]
+        if math_blocks is None:
+            math_blocks = {}
+
+        def _add_job(math_id: str, latex: str, is_display: bool):
+            jobs.append(RenderJob(math_id, 'math', {
+                'latex': latex,
+                'display': is_display,
+                'font_size': self.math_converter.font_size,
+                'color': self.math_converter.color,
+            }))
 
         def _extract_inline_math_from_inlines(inlines: list):
             """从段落内联节点中提取数学公式"""
@@ -490,19 +515,7 @@ class PDFRenderer:
                     block_counter[0] += 1
                     math_id = run.get('mathId') or f"math-inline-{block_counter[0]}"
                     run['mathId'] = math_id
-                    try:
-                        svg_content = (
-                            self.math_converter.convert_display_to_svg(latex)
-                            if is_display else
-                            self.math_converter.convert_inline_to_svg(latex)
-                        )
-                        if svg_content:
-                            svg_map[math_id] = svg_content
-                            logger.debug(f"公式 {math_id} 转换为SVG成功")
-                        else:
-                            logger.warning(f"公式 {math_id} 转换为SVG失败: {latex[:50]}...")
-                    except Exception as exc:
-                        logger.error(f"转换内联公式 {latex[:50]}... 时出错: {exc}")
+                    _add_job(math_id, latex, is_display)
                     continue
 
                 # 无math mark，尝试解析文本中的多个公式
@@ -519,19 +532,7 @@ class PDFRenderer:
                     block_counter[0] += 1
                     math_id = f"auto-math-{block_counter[0]}"
                     ids_for_html.append(math_id)
-                    try:
-                        svg_content = (
-                            self.math_converter.convert_display_to_svg(latex)
-                            if is_display else
-                            self.math_converter.convert_inline_to_svg(latex)
-                        )
-                        if svg_content:
-                            svg_map[math_id] = svg_content
-                            logger.debug(f"公式 {math_id} 转换为SVG成功")
-                        else:
-                            logger.warning(f"公式 {math_id} 转换为SVG失败: {latex[:50]}...")
-                    except Exception as exc:
-                        logger.error(f"转换内联公式 {latex[:50]}... 时出错: {exc}")
+                    _add_job(math_id, latex, is_display)
                 if ids_for_html:
                     # 将ID列表写回run，便于HTML渲染时使用相同ID（顺序对应segments）
                     run['mathIds'] = ids_for_html
@@ -548,17 +549,9 @@ class PDFRenderer:
                 if latex:
                     block_counter[0] += 1
                     math_id = f"math-block-{block_counter[0]}"
-                    try:
-                        svg_content = self.math_converter.convert_display_to_svg(latex)
-                        if svg_content:
-                            svg_map[math_id] = svg_content
-                            # 将ID添加到block中，以便后续注入时识别
-                            block['mathId'] = math_id
-                            logger.debug(f"公式 {math_id} 转换为SVG成功")
-                        else:
-                            logger.warning(f"公式 {math_id} 转换为SVG失败: {latex[:50]}...")
-                    except Exception as e:
-                        logger.error(f"转换公式 {latex[:50]}... 时出错: {e}")
+                    _add_job(math_id, latex, True)
+                    # 渲染成功后再将ID添加到block中，以便后续注入时识别
+                    math_blocks[math_id] = block
             else:
                 # 提取段落、表格等内部的内联公式
                 inlines = block.get('inlines')
@@ -568,14 +561,14 @@ class PDFRenderer:
             # 递归处理嵌套的blocks
             nested_blocks = block.get('blocks')
             if isinstance(nested_blocks, list):
-                self._extract_and_convert_math_blocks(nested_blocks, svg_map, block_counter)
+                self._collect_math_jobs(nested_blocks, jobs, block_counter, math_blocks)
 
             # 处理列表项
             if block_type == 'list':
                 items = block.get('items', [])
                 for item in items:
                     if isinstance(item, list):
-                        self._extract_and_convert_math_blocks(item, svg_map, block_counter)
+                        self._collect_math_jobs(item, jobs, block_counter, math_blocks)
 
             # 处理表格单元格
             if block_type == 'table':
@@ -585,13 +578,50 @@ class PDFRenderer:
                     for cell in cells:
                         cell_blocks = cell.get('blocks', [])
                         if isinstance(cell_blocks, list):
-                            self._extract_and_convert_math_blocks(cell_blocks, svg_map, block_counter)
+                            self._collect_math_jobs(cell_blocks, jobs, block_counter, math_blocks)
 
             # 处理callout内部的blocks
             if block_type == 'callout':
                 callout_blocks = block.get('blocks', [])
                 if isinstance(callout_blocks, list):
-                    self._extract_and_convert_math_blocks(callout_blocks, svg_map, block_counter)
+                    self._collect_math_jobs(callout_blocks, jobs, block_counter, math_blocks)
+
+    def _render_jobs(self, jobs: List[RenderJob]) -> Dict[str, str]:
+        """
+        查缓存并渲染任务：命中直接复用，未命中的在进程池中并行渲染后写回缓存
+
+        返回:
+            Dict[str, str]: target_id到SVG字符串/data URI的映射
+        """
+        if not jobs:
+            return {}
+        return render_jobs(
+            jobs,
+            self.render_cache,
+            str(self._get_font_path()),
+            workers=self.render_workers,
+            local_render=self._render_job_locally,
+            timeout=settings.PDF_RENDER_TIMEOUT,
+        )
+
+    def _render_job_locally(self, job: RenderJob) -> str | None:
+        """在当前进程中渲染单个任务，复用已初始化的转换器"""
+        try:
+            if job.kind == 'chart':
+                return self.chart_converter.convert_widget_to_svg(
+                    job.payload['widget'],
+                    width=job.payload['width'],
+                    height=job.payload['height'],
+                    dpi=job.payload['dpi']
+                )
+            if job.kind == 'math':
+                if job.payload['display']:
+                    return self.math_converter.convert_display_to_svg(job.payload['latex'])
+                return self.math_converter.convert_inline_to_svg(job.payload['latex'])
+            return render_payload(job.kind, job.payload, str(self._get_font_path()))
+        except Exception as e:
+            logger.error(f"转换 {job.target_id} 时出错: {e}")
+            return None
 
     def _inject_svg_into_html(self, html: str, svg_map: Dict[str, str]) -> str:
         """
@@ -0,0 +1,323 @@
+"""
+PDF导出的图表/词云/公式渲染缓存与并行渲染。
+
+- 以 widget/latex 载荷的规范化JSON + 渲染尺寸 + 字体 计算SHA-256作为键，
+  渲染结果落盘，同一份IR重复导出时直接命中，不再调用matplotlib；
+- 未命中的任务交给进程池渲染（matplotlib非线程安全，不能用线程池），
+  每个子进程只初始化一次转换器，进程池在多次导出之间复用；
+- 进程池固定用spawn启动（调用方是多线程的Flask服务，fork会把其他线程持有的锁带进子进程），
+  按配置的进程数只创建一次、不随任务数伸缩，多个并发导出共用；
+- 等待结果有超时，卡死的进程池会被丢弃并结束子进程，受影响的任务（包括其他导出的）改在当前进程渲染。
+"""
+
+from __future__ import annotations
+
+import atexit
+import base64
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import CancelledError, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from loguru import logger
+
+# 渲染逻辑（配色、尺寸、字体处理等）变化时递增，使旧缓存整体失效
+RENDER_CACHE_VERSION = 1
+
+# 少于该数量的未命中任务直接在当前进程渲染，避免为一两个图表拉起进程池
+MIN_JOBS_FOR_POOL = 2
+
+
+@dataclass
+class RenderJob:
+    """
+    一个待渲染的图表/词云/公式。
+
+    target_id 为注入HTML时使用的ID（widgetId/mathId），payload 只包含影响渲染结果的字段，
+    既是缓存键的来源，也是传给子进程的参数（必须可JSON序列化、可pickle）。
+    """
+
+    target_id: str
+    kind: str  # chart / wordcloud / math
+    payload: Dict[str, Any]
+    digest: str = ""
+
+
+class RenderCache:
+    """按内容寻址的渲染结果磁盘缓存，文件布局为 `<cache_dir>/<kind>/<digest[:2]>/<digest>.txt`。"""
+
+    def __init__(self, cache_dir: str | Path, enabled: bool = True):
+        self.cache_dir = Path(cache_dir)
+        self.enabled = enabled
+
+    @staticmethod
+    def make_digest(kind: str, payload: Dict[str, Any], font_name: str = "") -> str:
+        """对载荷做规范化序列化（键排序、紧凑分隔符）后取SHA-256，字典顺序不同的相同图表得到同一个键。"""
+        canonical = json.dumps(
+            {"v": RENDER_CACHE_VERSION, "kind": kind, "font": font_name, "payload": payload},
+            ensure_ascii=False,
+            sort_keys=True,
+            separators=(",", ":"),
+            default=str,
+        )
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def _path(self, kind: str, digest: str) -> Path:
+        return self.cache_dir / kind / digest[:2] / f"{digest}.txt"
+
+    def get(self, kind: str, digest: str) -> Optional[str]:
+        """读取缓存，不存在或读取失败时返回None"""
+        if not self.enabled:
+            return None
+        try:
+            return self._path(kind, digest).read_text(encoding="utf-8")
+        except OSError:
+            return None
+
+    def put(self, kind: str, digest: str, content: str):
+        """写入缓存（先写临时文件再替换，避免并发导出读到半截内容）"""
+        if not self.enabled or not content:
+            return
+        path = self._path(kind, digest)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp_path.write_text(content, encoding="utf-8")
+            os.replace(tmp_path, path)
+        except OSError as exc:
+            logger.warning(f"写入渲染缓存失败 {path}: {exc}")
+
+
+# ======== 渲染函数（主进程与子进程共用） ========
+
+_converters: Dict[tuple, Any] = {}
+
+
+def _get_chart_converter(font_path: str):
+    key = ("chart", font_path)
+    if key not in _converters:
+        from .chart_to_svg import create_chart_converter
+        _converters[key] = create_chart_converter(font_path=font_path)
+    return _converters[key]
+
+
+def _get_math_converter(font_size: int, color: str):
+    key = ("math", font_size, color)
+    if key not in _converters:
+        from .math_to_svg import MathToSVG
+        _converters[key] = MathToSVG(font_size=font_size, color=color)
+    return _converters[key]
+
+
+def render_wordcloud_data_uri(frequencies: Dict[str, float], font_path: str,
+                              width: int = 1000, height: int = 360) -> Optional[str]:
+    """根据词频生成词云PNG并返回data URI"""
+    from wordcloud import WordCloud
+
+    wc = WordCloud(
+        width=width,
+        height=height,
+        background_color="white",
+        font_path=font_path,
+        prefer_horizontal=0.98,
+        random_state=42,
+        max_words=180,
+        collocations=False,
+    )
+    wc.generate_from_frequencies(frequencies)
+
+    buffer = io.BytesIO()
+    wc.to_image().save(buffer, format='PNG')
+    encoded = base64.b64encode(buffer.getvalue()).decode('ascii')
+    return f"data:image/png;base64,{encoded}"
+
+
+def render_payload(kind: str, payload: Dict[str, Any], font_path: str) -> Optional[str]:
+    """
+    渲染单个任务，返回SVG字符串/data URI，失败返回None。
+
+    作为进程池的工作函数时，转换器在每个子进程中按需创建一次。
+    """
+    try:
+        if kind == "chart":
+            return _get_chart_converter(font_path).convert_widget_to_svg(
+                payload["widget"],
+                width=payload["width"],
+                height=payload["height"],
+                dpi=payload["dpi"],
+            )
+        if kind == "math":
+            converter = _get_math_converter(payload["font_size"], payload["color"])
+            if payload["display"]:
+                return converter.convert_display_to_svg(payload["latex"])
+            return converter.convert_inline_to_svg(payload["latex"])
+        if kind == "wordcloud":
+            return render_wordcloud_data_uri(
+                payload["frequencies"], font_path, width=payload["width"], height=payload["height"]
+            )
+    except Exception as exc:
+        logger.error(f"渲染{kind}失败: {exc}")
+        return None
+    logger.warning(f"未知的渲染任务类型: {kind}")
+    return None
+
+
+# ======== 进程池 ========
+
+_pool_lock = threading.Lock()
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    获取（必要时创建）共享进程池。
+
+    统一使用spawn启动：导出在Flask的请求线程中进行，fork只复制当前线程，
+    其他线程持有的锁（日志、matplotlib、数据库连接池等）会在子进程中永久锁死。
+    spawn子进程需要重新导入渲染模块，因此进程池按配置的进程数只创建一次，之后不再调整大小：
+    重建会取消其他并发导出排队中的任务，并让图表/词云/公式各轮渲染反复付出启动开销。
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def _discard_pool(pool: ProcessPoolExecutor):
+    """
+    丢弃卡死的进程池并结束其子进程。
+
+    只在共享池仍是该池时才清空引用，避免误关其他线程刚重建的新池；
+    同池中其他导出的任务会得到 BrokenProcessPool，由 render_jobs 改在当前进程渲染。
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    processes = list((getattr(pool, "_processes", None) or {}).values())
+    pool.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        if process.is_alive():
+            process.kill()
+
+
+def shutdown_render_pool():
+    """关闭共享进程池（进程退出时自动调用）"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+atexit.register(shutdown_render_pool)
+
+
+def resolve_workers(configured: int) -> int:
+    """0 表示按CPU核数自动决定，1 表示在当前进程串行渲染"""
+    if configured and configured > 0:
+        return configured
+    return max(1, os.cpu_count() or 1)
+
+
+def render_jobs(
+    jobs: List[RenderJob],
+    cache: RenderCache,
+    font_path: str,
+    workers: int = 1,
+    local_render: Optional[Callable[[RenderJob], Optional[str]]] = None,
+    timeout: Optional[float] = None,
+) -> Dict[str, str]:
+    """
+    渲染一批任务：先查缓存，未命中的按内容去重后交给进程池（或当前进程）渲染并回写缓存。
+
+    参数:
+        jobs: 待渲染任务，digest 为空时自动计算。
+        cache: 渲染缓存。
+        font_path: 图表/词云使用的字体路径，字体文件名参与缓存键。
+        workers: 进程数，1 表示在当前进程渲染。
+        local_render: 当前进程的渲染函数，默认使用 render_payload。
+        timeout: 等待进程池中单个任务结果的最长时间（秒），None或0表示不限制；
+            超时的任务视为渲染失败，进程池被整体丢弃，其余未完成的任务改在当前进程渲染。
+
+    返回:
+        dict: target_id 到渲染结果的映射，渲染失败的任务不包含在内。
+    """
+    results: Dict[str, str] = {}
+    font_name = Path(font_path).name if font_path else ""
+    pending: Dict[str, List[RenderJob]] = {}
+    for job in jobs:
+        if not job.digest:
+            job.digest = RenderCache.make_digest(job.kind, job.payload, font_name)
+        cached = cache.get(job.kind, job.digest)
+        if cached is not None:
+            results[job.target_id] = cached
+        else:
+            pending.setdefault(job.digest, []).append(job)
+
+    hits = len(results)
+    if not pending:
+        if hits:
+            logger.info(f"渲染缓存命中 {hits}/{len(jobs)}")
+        return results
+
+    unique_jobs = [group[0] for group in pending.values()]
+    rendered: Dict[str, Optional[str]] = {}
+    if workers > 1 and len(unique_jobs) >= MIN_JOBS_FOR_POOL:
+        pool = _get_pool(workers)
+        futures = {}
+        try:
+            for job in unique_jobs:
+                futures[job.digest] = pool.submit(render_payload, job.kind, job.payload, font_path)
+        except (BrokenProcessPool, RuntimeError, OSError) as exc:
+            # 进程池不可用（被杀、刚被其他导出丢弃、资源受限等），未提交的任务在当前进程渲染
+            logger.warning(f"渲染进程池不可用，改为串行渲染: {exc}")
+            _discard_pool(pool)
+        for digest, future in futures.items():
+            try:
+                rendered[digest] = future.result(timeout=timeout or None)
+            except FutureTimeoutError:
+                logger.warning(f"渲染任务 {pending[digest][0].target_id} 超过 {timeout} 秒未完成，结束渲染进程池")
+                # 卡住的任务不再在当前进程重试
+                rendered[digest] = None
+                _discard_pool(pool)
+            except (CancelledError, BrokenProcessPool) as exc:
+                # 进程池被丢弃（本次或其他导出超时）时，该任务改在当前进程渲染
+                logger.debug(f"渲染任务 {pending[digest][0].target_id} 未在进程池完成，改为本地渲染: {exc!r}")
+    render_local = local_render or (lambda job: render_payload(job.kind, job.payload, font_path))
+    for job in unique_jobs:
+        if job.digest not in rendered:
+            rendered[job.digest] = render_local(job)
+
+    for digest, content in rendered.items():
+        if not content:
+            continue
+        group = pending[digest]
+        cache.put(group[0].kind, digest, content)
+        for job in group:
+            results[job.target_id] = content
+
+    logger.info(
+        f"渲染完成: 缓存命中 {hits}，新渲染 {len(unique_jobs)}（进程数 {workers}），"
+        f"成功 {len(results)}/{len(jobs)}"
+    )
+    return results
+
+
+__all__ = [
+    "RenderJob",
+    "RenderCache",
+    "render_jobs",
+    "render_payload",
+    "render_wordcloud_data_uri",
+    "resolve_workers",
+    "shutdown_render_pool",
+]
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+JSON修复基准工具。
+
+用真实失败的章节输出（stream.raw、json_repair_failures中的rawOutput）
+对比单遍修复引擎 repair_json_text 与 json_repair 库：
+- 修复率：修复后能否被解析为合法JSON
+- 耗时：每个样本的修复+解析时间（平均值/P95/总计）
+
+使用方法:
+    python -m ReportEngine.scripts.benchmark_json_repair
+    python -m ReportEngine.scripts.benchmark_json_repair ./final_reports/chapters --only-failed
+    python -m ReportEngine.scripts.benchmark_json_repair logs/json_repair_failures --repeat 5 --show-failures 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from loguru import logger
+
+from ReportEngine.utils.config import settings
+from ReportEngine.utils.json_repairer import ORJSON_AVAILABLE, fast_loads, repair_json_text
+
+try:
+    from json_repair import repair_json as _json_repair_fn
+except ImportError:
+    _json_repair_fn = None
+
+
+@dataclass
+class Sample:
+    """一条待修复的LLM输出"""
+    source: str
+    text: str
+
+
+@dataclass
+class EngineResult:
+    """单个修复方案在整个语料上的统计"""
+    name: str
+    repaired: int = 0
+    timings: List[float] = field(default_factory=list)
+    failures: List[Tuple[str, str]] = field(default_factory=list)
+
+    def summary(self, total: int) -> Dict[str, object]:
+        timings = sorted(self.timings)
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))] if timings else 0.0
+        return {
+            "engine": self.name,
+            "samples": total,
+            "repaired": self.repaired,
+            "repairRate": round(self.repaired / total, 4) if total else 0.0,
+            "meanMs": round(sum(timings) / len(timings) * 1000, 3) if timings else 0.0,
+            "p95Ms": round(p95 * 1000, 3),
+            "totalMs": round(sum(timings) * 1000, 3),
+        }
+
+
+def strip_fences(text: str) -> str:
+    """与章节节点一致：去掉```json包裹"""
+    cleaned = text.strip()
+    if cleaned.startswith("```json"):
+        cleaned = cleaned[7:]
+    if cleaned.startswith("```"):
+        cleaned = cleaned[3:]
+    if cleaned.endswith("```"):
+        cleaned = cleaned[:-3]
+    return cleaned.strip()
+
+
+def _load_file(path: Path) -> List[Sample]:
+    try:
+        text = path.read_text(encoding="utf-8")
+    except (OSError, UnicodeDecodeError) as exc:
+        logger.warning(f"跳过无法读取的文件 {path}: {exc}")
+        return []
+    if path.suffix == ".json":
+        # json_repair_failures 落盘格式：{"rawOutput": "..."}
+        try:
+            payload = json.loads(text)
+        except json.JSONDecodeError:
+            payload = None
+        if isinstance(payload, dict) and isinstance(payload.get("rawOutput"), str):
+            return [Sample(str(path), payload["rawOutput"])]
+    return [Sample(str(path), text)]
+
+
+def collect_corpus(paths: List[Path]) -> List[Sample]:
+    """收集语料：目录下的 stream.raw / *.json，或直接指定的文件"""
+    samples: List[Sample] = []
+    for path in paths:
+        if path.is_file():
+            samples.extend(_load_file(path))
+        elif path.is_dir():
+            for pattern in ("**/stream.raw", "**/*.json"):
+                for file_path in sorted(path.glob(pattern)):
+                    if file_path.suffix == ".json" and "json_repair_failures" not in file_path.parts:
+                        # 章节目录下的 chapter.json 是成功结果，不纳入语料
+                        continue
+                    samples.extend(_load_file(file_path))
+        else:
+            logger.warning(f"路径不存在: {path}")
+    return [sample for sample in samples if sample.text.strip()]
+
+
+def _parses(text: Optional[str]) -> bool:
+    if not text:
+        return False
+    try:
+        fast_loads(text)
+        return True
+    except json.JSONDecodeError:
+        return False
+
+
+def _single_pass(text: str) -> Optional[str]:
+    repaired = repair_json_text(text).text
+    if _parses(repaired):
+        return repaired
+    collapsed = repair_json_text(text, collapse_nested_arrays=True).text
+    return collapsed if collapsed != repaired else None
+
+
+def _json_repair(text: str) -> Optional[str]:
+    try:
+        return _json_repair_fn(text)
+    except Exception:
+        return None
+
+
+def run_engine(name: str, repair: Callable[[str], Optional[str]], samples: List[Sample], repeat: int) -> EngineResult:
+    result = EngineResult(name)
+    for sample in samples:
+        cleaned = strip_fences(sample.text)
+        elapsed = 0.0
+        ok = False
+        for _ in range(repeat):
+            start = time.perf_counter()
+            ok = _parses(cleaned) or _parses(repair(cleaned))
+            elapsed += time.perf_counter() - start
+        result.timings.append(elapsed / repeat)
+        if ok:
+            result.repaired += 1
+        else:
+            result.failures.append((sample.source, cleaned[:200]))
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="对比单遍JSON修复引擎与json_repair库的修复率和耗时")
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        type=Path,
+        help="语料文件或目录（默认：章节缓存目录与JSON失败日志目录）",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="每个样本重复计时的次数")
+    parser.add_argument("--only-failed", action="store_true", help="只保留无法直接解析的样本")
+    parser.add_argument("--show-failures", type=int, default=0, help="打印每个方案前N个修复失败的样本")
+    parser.add_argument("--json", action="store_true", help="以JSON输出统计结果")
+    args = parser.parse_args(argv)
+
+    paths = args.paths or [Path(settings.CHAPTER_OUTPUT_DIR), Path(settings.JSON_ERROR_LOG_DIR)]
+    samples = collect_corpus(paths)
+    if args.only_failed:
+        samples = [sample for sample in samples if not _parses(strip_fences(sample.text))]
+    if not samples:
+        logger.error(f"未找到语料: {', '.join(str(path) for path in paths)}")
+        return 1
+
+    engines = [("single_pass", _single_pass)]
+    if _json_repair_fn is not None:
+        engines.append(("json_repair", _json_repair))
+    else:
+        logger.warning("未安装json_repair库，只测试单遍修复引擎")
+
+    valid = sum(1 for sample in samples if _parses(strip_fences(sample.text)))
+    results = [run_engine(name, fn, samples, max(1, args.repeat)) for name, fn in engines]
+    summaries = [result.summary(len(samples)) for result in results]
+
+    if args.json:
+        print(json.dumps({
+            "samples": len(samples),
+            "validAsIs": valid,
+            "orjson": ORJSON_AVAILABLE,
+            "engines": summaries,
+        }, ensure_ascii=False, indent=2))
+    else:
+        print(f"样本数: {len(samples)}（无需修复: {valid}，orjson快速路径: {'是' if ORJSON_AVAILABLE else '否'}）")
+        for summary in summaries:
+            print(
+                f"{summary['engine']:<12} 修复率 {summary['repairRate']:.2%} "
+                f"({summary['repaired']}/{summary['samples']})  "
+                f"平均 {summary['meanMs']}ms  P95 {summary['p95Ms']}ms  总计 {summary['totalMs']}ms"
+            )
+    if args.show_failures:
+        for result in results:
+            for source, preview in result.failures[:args.show_failures]:
+                print(f"[{result.name}] 修复失败: {source}\n    {preview!r}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -362,6 +362,14 @@ def build_chart_repair_prompt(
     return prompt
 
 
+def _repair_invoke_kwargs() -> Dict[str, Any]:
+    """修复调用的采样参数；配置了超时时同时限制单次请求，避免被挂起的连接拖住"""
+    kwargs: Dict[str, Any] = {"temperature": 0.0, "top_p": 0.05}
+    if settings.CHART_REPAIR_TIMEOUT and settings.CHART_REPAIR_TIMEOUT > 0:
+        kwargs["timeout"] = settings.CHART_REPAIR_TIMEOUT
+    return kwargs
+
+
 def create_llm_repair_functions() -> List:
     """
     创建LLM修复函数列表。
@@ -394,8 +402,7 @@ def create_llm_repair_functions() -> List:
                 response = client.invoke(
                     CHART_REPAIR_SYSTEM_PROMPT,
                     prompt,
-                    temperature=0.0,
-                    top_p=0.05
+                    **_repair_invoke_kwargs()
                 )
 
                 if not response:
@@ -429,8 +436,7 @@ def create_llm_repair_functions() -> List:
                 response = client.invoke(
                     CHART_REPAIR_SYSTEM_PROMPT,
                     prompt,
-                    temperature=0.0,
-                    top_p=0.05
+                    **_repair_invoke_kwargs()
                 )
 
                 if not response:
@@ -463,8 +469,7 @@ def create_llm_repair_functions() -> List:
                 response = client.invoke(
                     CHART_REPAIR_SYSTEM_PROMPT,
                     prompt,
-                    temperature=0.0,
-                    top_p=0.05
+                    **_repair_invoke_kwargs()
                 )
 
                 if not response:
@@ -497,8 +502,7 @@ def create_llm_repair_functions() -> List:
                 response = client.invoke(
                     CHART_REPAIR_SYSTEM_PROMPT,
                     prompt,
-                    temperature=0.0,
-                    top_p=0.05
+                    **_repair_invoke_kwargs()
                 )
 
                 if not response:
@@ -550,8 +554,7 @@ def create_table_repair_functions() -> List:
                 response = client.invoke(
                     TABLE_REPAIR_SYSTEM_PROMPT,
                     prompt,
-                    temperature=0.0,
-                    top_p=0.05
+                    **_repair_invoke_kwargs()
                 )
 
                 if not response:
@@ -604,8 +607,7 @@ def create_wordcloud_repair_functions() -> List:
                 response = client.invoke(
                     WORDCLOUD_REPAIR_SYSTEM_PROMPT,
                     prompt,
-                    temperature=0.0,
-                    top_p=0.05
+                    **_repair_invoke_kwargs()
                 )
 
                 if not response:
@@ -4,6 +4,10 @@
 提供单例服务，确保所有渲染器共享修复状态，避免重复修复。
 修复成功后可自动持久化到 IR 文件。
 
+审查分两步：先串行遍历并校验所有图表，再把校验失败、彼此独立的图表交给
+小线程池并发修复（内容相同的图表只修复一次）；LLM修复结果按内容哈希落盘缓存，
+单个Engine超时即改用下一个，避免一个慢Engine拖住整个渲染。
+
 线程安全说明：
 - 验证器和修复器实例是无状态的，可安全共享
 - 每次 review_document 调用会创建独立的 ReviewSession
@@ -15,20 +19,27 @@ from __future__ import annotations
 import copy
 import json
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from loguru import logger
 
 from ReportEngine.utils.chart_validator import (
     ChartValidator,
     ChartRepairer,
+    RepairResult,
     ValidationResult,
     create_chart_validator,
     create_chart_repairer
 )
 from ReportEngine.utils.chart_repair_api import create_llm_repair_functions
+from ReportEngine.utils.config import settings
+from ReportEngine.utils.repair_cache import RepairCache
+
+# 待修复的图表：(block, 校验结果)
+PendingRepair = Tuple[Dict[str, Any], ValidationResult]
 
 
 @dataclass
@@ -101,8 +112,14 @@ class ChartReviewService:
         self.llm_repair_fns = create_llm_repair_functions()
         self.repairer = create_chart_repairer(
             validator=self.validator,
-            llm_repair_fns=self.llm_repair_fns
+            llm_repair_fns=self.llm_repair_fns,
+            repair_cache=RepairCache(
+                settings.CHART_REPAIR_CACHE_DIR,
+                enabled=settings.CHART_REPAIR_CACHE_ENABLED
+            ),
+            engine_timeout=settings.CHART_REPAIR_TIMEOUT
         )
+        self.repair_workers = max(1, settings.CHART_REPAIR_WORKERS)
 
         # 打印 LLM 修复函数状态
         if not self.llm_repair_fns:
@@ -155,7 +172,8 @@ class ChartReviewService:
         ir_file_path: Optional[str | Path] = None,
         *,
         reset_stats: bool = True,
-        save_on_repair: bool = True
+        save_on_repair: bool = True,
+        chapters: Optional[List[Dict[str, Any]]] = None
     ) -> ReviewStats:
         """
         审查并修复文档中的所有图表。
@@ -170,6 +188,7 @@ class ChartReviewService:
             ir_file_path: IR 文件路径，如果提供且有修复，会自动保存
             reset_stats: 保留参数以保持向后兼容，不再有实际作用
             save_on_repair: 修复后是否自动保存到文件
+            chapters: 只审查这些章节（默认审查全部章节），保存时仍写出完整文档
 
         返回:
             ReviewStats: 本次审查的统计信息（线程安全）
@@ -184,17 +203,19 @@ class ChartReviewService:
                 self._last_stats = session_stats
             return session_stats
 
-        has_repairs = False
-
-        # 遍历所有章节
-        for chapter in document_ir.get("chapters", []) or []:
+        # 第一步：串行遍历并校验，收集需要修复的图表
+        pending: List[PendingRepair] = []
+        if chapters is None:
+            chapters = document_ir.get("chapters", []) or []
+        for chapter in chapters:
             if not isinstance(chapter, dict):
                 continue
             blocks = chapter.get("blocks", [])
             if isinstance(blocks, list):
-                chapter_repairs = self._walk_and_review_blocks(blocks, chapter, session_stats)
-                if chapter_repairs:
-                    has_repairs = True
+                self._walk_and_review_blocks(blocks, chapter, session_stats, pending)
+
+        # 第二步：并发修复彼此独立的图表
+        has_repairs = self._repair_pending_blocks(pending, session_stats)
 
         # 输出统计信息
         self._log_stats(session_stats)
@@ -213,43 +234,36 @@ class ChartReviewService:
         self,
         blocks: List[Any],
         chapter_context: Dict[str, Any] | None,
-        session_stats: ReviewStats
-    ) -> bool:
+        session_stats: ReviewStats,
+        pending: List[PendingRepair]
+    ) -> None:
         """
-        递归遍历 blocks 并审查图表。
+        递归遍历 blocks 并校验图表，校验失败的图表加入 pending 等待修复。
 
         参数:
             blocks: 要遍历的 block 列表
             chapter_context: 章节上下文
             session_stats: 本次审查会话的统计对象
-
-        返回:
-            bool: 是否有修复发生
+            pending: 收集待修复图表的列表
         """
-        has_repairs = False
-
         for block in blocks or []:
             if not isinstance(block, dict):
                 continue
 
             # 检查是否是图表 widget
             if block.get("type") == "widget":
-                repaired = self._review_chart_block(block, chapter_context, session_stats)
-                if repaired:
-                    has_repairs = True
+                self._review_chart_block(block, chapter_context, session_stats, pending)
 
             # 递归处理嵌套的 blocks
             nested_blocks = block.get("blocks")
             if isinstance(nested_blocks, list):
-                if self._walk_and_review_blocks(nested_blocks, chapter_context, session_stats):
-                    has_repairs = True
+                self._walk_and_review_blocks(nested_blocks, chapter_context, session_stats, pending)
 
             # 处理 list 类型的 items
             if block.get("type") == "list":
                 for item in block.get("items", []):
                     if isinstance(item, list):
-                        if self._walk_and_review_blocks(item, chapter_context, session_stats):
-                            has_repairs = True
+                        self._walk_and_review_blocks(item, chapter_context, session_stats, pending)
 
             # 处理 table 类型的 cells
             if block.get("type") == "table":
@@ -260,45 +274,41 @@ class ChartReviewService:
                         if isinstance(cell, dict):
                             cell_blocks = cell.get("blocks", [])
                             if isinstance(cell_blocks, list):
-                                if self._walk_and_review_blocks(cell_blocks, chapter_context, session_stats):
-                                    has_repairs = True
-
-        return has_repairs
+                                self._walk_and_review_blocks(cell_blocks, chapter_context, session_stats, pending)
 
     def _review_chart_block(
         self,
         block: Dict[str, Any],
         chapter_context: Dict[str, Any] | None,
-        session_stats: ReviewStats
-    ) -> bool:
+        session_stats: ReviewStats,
+        pending: List[PendingRepair]
+    ) -> None:
         """
-        审查单个图表 block。
+        校验单个图表 block，校验失败时加入 pending 等待修复。
 
         参数:
             block: 要审查的 block
             chapter_context: 章节上下文
             session_stats: 本次审查会话的统计对象
-
-        返回:
-            bool: 是否进行了修复
+            pending: 收集待修复图表的列表
         """
         widget_type = block.get("widgetType", "")
         if not isinstance(widget_type, str):
-            return False
+            return
 
         # 只处理 chart.js 类型（词云单独处理，不需要修复）
         is_chart = widget_type.startswith("chart.js")
         is_wordcloud = "wordcloud" in widget_type.lower()
 
         if not is_chart:
-            return False
+            return
 
         widget_id = block.get("widgetId", "unknown")
 
         # 检查是否已审查过
         if block.get("_chart_reviewed"):
             logger.debug(f"图表 {widget_id} 已审查过，跳过")
-            return False
+            return
 
         session_stats.total += 1
 
@@ -308,7 +318,7 @@ class ChartReviewService:
             block["_chart_reviewed"] = True
             block["_chart_review_status"] = "valid"
             block["_chart_review_method"] = "none"
-            return False
+            return
 
         # 先进行数据规范化（从章节上下文补充数据）
         self._normalize_chart_block(block, chapter_context)
@@ -324,14 +334,88 @@ class ChartReviewService:
             block["_chart_review_method"] = "none"
             if validation_result.warnings:
                 logger.debug(f"图表 {widget_id} 验证通过，但有警告: {validation_result.warnings}")
-            return False
+            return
 
-        # 验证失败，尝试修复
+        # 验证失败，留待并发修复
         logger.warning(f"图表 {widget_id} 验证失败: {validation_result.errors}")
+        pending.append((block, validation_result))
 
-        repair_result = self.repairer.repair(block, validation_result)
+    def _repair_pending_blocks(
+        self,
+        pending: List[PendingRepair],
+        session_stats: ReviewStats
+    ) -> bool:
+        """
+        修复校验失败的图表：内容相同的图表只修复一次，其余图表在线程池中并发修复。
+
+        修复器只读取传入的 block（本地修复在副本上进行），结果统一在当前线程写回，
+        统计对象也只在当前线程更新。
+
+        参数:
+            pending: 待修复的 (block, 校验结果) 列表
+            session_stats: 本次审查会话的统计对象
+
+        返回:
+            bool: 是否有修复发生
+        """
+        if not pending:
+            return False
+
+        groups: Dict[str, List[PendingRepair]] = {}
+        for item in pending:
+            groups.setdefault(self.repairer.build_cache_key(item[0]), []).append(item)
+
+        results: Dict[str, Optional[RepairResult]] = {}
+        workers = min(self.repair_workers, len(groups))
+        if workers <= 1:
+            for key, items in groups.items():
+                results[key] = self._safe_repair(*items[0])
+        else:
+            logger.info(f"ChartReviewService: 使用 {workers} 个线程并发修复 {len(groups)} 个图表")
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="chart-repair") as executor:
+                futures = {key: executor.submit(self._safe_repair, *items[0]) for key, items in groups.items()}
+                for key, future in futures.items():
+                    results[key] = future.result()
+
+        has_repairs = False
+        for key, items in groups.items():
+            for idx, (block, validation_result) in enumerate(items):
+                repair_result = results.get(key)
+                if idx > 0 and repair_result is not None:
+                    # 同内容的图表各自持有一份副本，避免共享嵌套对象
+                    repair_result = copy.deepcopy(repair_result)
+                if self._apply_repair_result(block, validation_result, repair_result, session_stats):
+                    has_repairs = True
+        return has_repairs
+
+    def _safe_repair(
+        self,
+        block: Dict[str, Any],
+        validation_result: ValidationResult
+    ) -> Optional[RepairResult]:
+        """在工作线程中调用修复器，异常按修复失败处理"""
+        try:
+            return self.repairer.repair(block, validation_result)
+        except Exception as exc:
+            logger.exception(f"图表 {block.get('widgetId', 'unknown')} 修复过程中发生异常: {exc}")
+            return None
+
+    def _apply_repair_result(
+        self,
+        block: Dict[str, Any],
+        validation_result: ValidationResult,
+        repair_result: Optional[RepairResult],
+        session_stats: ReviewStats
+    ) -> bool:
+        """
+        将修复结果写回 block 并更新统计。
+
+        返回:
+            bool: 是否进行了修复
+        """
+        widget_id = block.get("widgetId", "unknown")
 
-        if repair_result.success and repair_result.repaired_block:
+        if repair_result is not None and repair_result.success and repair_result.repaired_block:
             # 修复成功，覆盖原始 block 数据
             repaired_block = repair_result.repaired_block
             # 保留原始的一些元信息
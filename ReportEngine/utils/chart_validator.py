@@ -24,10 +24,13 @@ from __future__ import annotations
 import copy
 import json
 import hashlib
+import threading
 from typing import Any, Dict, List, Optional, Tuple, Callable
 from dataclasses import dataclass
 from loguru import logger
 
+from ReportEngine.utils.repair_cache import RepairCache
+
 
 @dataclass
 class ValidationResult:
@@ -373,10 +376,15 @@ class ChartRepairer:
     3. 验证修复结果：确保修复后能正常渲染
     """
 
+    # 每个Engine最多允许多少个超时后仍在后台运行的调用；达到上限的Engine在这些调用结束前直接跳过
+    MAX_ABANDONED_CALLS_PER_ENGINE = 1
+
     def __init__(
         self,
         validator: ChartValidator,
-        llm_repair_fns: Optional[List[Callable]] = None
+        llm_repair_fns: Optional[List[Callable]] = None,
+        repair_cache: Optional[RepairCache] = None,
+        engine_timeout: Optional[float] = None
     ):
         """
         初始化修复器。
@@ -384,11 +392,18 @@ class ChartRepairer:
         Args:
             validator: 图表验证器实例
             llm_repair_fns: LLM修复函数列表（对应4个Engine）
+            repair_cache: API修复结果的磁盘缓存（可选）
+            engine_timeout: 单个Engine修复的超时时间（秒），None或0表示不限制
         """
         self.validator = validator
         self.llm_repair_fns = llm_repair_fns or []
+        self.repair_cache = repair_cache
+        self.engine_timeout = engine_timeout
         # 缓存修复结果，避免同一个图表在多处被重复调用LLM
         self._result_cache: Dict[str, RepairResult] = {}
+        # Engine序号 -> 已超时但仍在后台运行的调用数
+        self._abandoned_calls: Dict[int, int] = {}
+        self._abandoned_lock = threading.Lock()
 
     def build_cache_key(self, widget_block: Dict[str, Any]) -> str:
         """
@@ -681,18 +696,31 @@ class ChartRepairer:
             return RepairResult(False, None, 'api', [])
 
         widget_id = widget_block.get('widgetId', 'unknown')
+
+        # 同样的图表与错误此前已修复过，直接复用磁盘缓存
+        if self.repair_cache is not None:
+            cached = self.repair_cache.get(widget_block, validation_result.errors)
+            if cached is not None and self.validator.validate(cached).is_valid:
+                logger.info(f"图表 {widget_id} 命中修复缓存，跳过API修复")
+                return RepairResult(True, cached, 'api', ["命中修复缓存"])
+
         logger.info(f"图表 {widget_id} 开始API修复，共 {len(self.llm_repair_fns)} 个Engine可用")
 
         for idx, repair_fn in enumerate(self.llm_repair_fns):
+            if self._engine_saturated(idx):
+                logger.warning(f"图表 {widget_id} 跳过Engine {idx + 1}：此前超时的调用仍未结束")
+                continue
             try:
                 logger.info(f"尝试使用Engine {idx + 1}/{len(self.llm_repair_fns)} 修复图表 {widget_id}")
-                repaired = repair_fn(widget_block, validation_result.errors)
+                repaired = self._call_with_timeout(idx, repair_fn, widget_block, validation_result.errors)
 
                 if repaired and isinstance(repaired, dict):
                     # 验证修复结果
                     repaired_validation = self.validator.validate(repaired)
                     if repaired_validation.is_valid:
                         logger.info(f"图表 {widget_id} 使用Engine {idx + 1} 修复成功")
+                        if self.repair_cache is not None:
+                            self.repair_cache.put(widget_block, validation_result.errors, repaired)
                         return RepairResult(
                             True,
                             repaired,
@@ -706,6 +734,11 @@ class ChartRepairer:
                         )
                 else:
                     logger.warning(f"图表 {widget_id} Engine {idx + 1} 返回空或无效响应")
+            except TimeoutError:
+                logger.warning(
+                    f"图表 {widget_id} Engine {idx + 1} 超过 {self.engine_timeout} 秒未返回，改用下一个Engine"
+                )
+                continue
             except Exception as e:
                 # 使用 exception 记录完整堆栈
                 logger.exception(f"图表 {widget_id} Engine {idx + 1} 修复过程中发生异常: {e}")
@@ -714,6 +747,51 @@ class ChartRepairer:
         logger.warning(f"图表 {widget_id} 所有 {len(self.llm_repair_fns)} 个Engine均修复失败")
         return RepairResult(False, None, 'api', [])
 
+    def _engine_saturated(self, engine_idx: int) -> bool:
+        """该Engine后台遗留的超时调用是否已达上限"""
+        with self._abandoned_lock:
+            return self._abandoned_calls.get(engine_idx, 0) >= self.MAX_ABANDONED_CALLS_PER_ENGINE
+
+    def _call_with_timeout(self, engine_idx: int, repair_fn: Callable, *args: Any) -> Any:
+        """
+        在后台线程中调用单个Engine的修复函数，超时即放弃等待。
+
+        LLM客户端自带重试，单次调用可能远超请求超时；超时的调用留在守护线程中自行结束，
+        不再阻塞当前图表和整个渲染流程。遗留调用按Engine计数，结束时扣减，
+        达到 MAX_ABANDONED_CALLS_PER_ENGINE 的Engine会被跳过，避免卡住的Engine不断堆积线程。
+
+        Raises:
+            TimeoutError: 超过 engine_timeout 仍未返回
+        """
+        if not self.engine_timeout or self.engine_timeout <= 0:
+            return repair_fn(*args)
+
+        outcome: Dict[str, Any] = {}
+        state = {'done': False, 'abandoned': False}
+
+        def _target():
+            try:
+                outcome['value'] = repair_fn(*args)
+            except Exception as exc:  # 交由调用方统一记录
+                outcome['error'] = exc
+            finally:
+                with self._abandoned_lock:
+                    state['done'] = True
+                    if state['abandoned']:
+                        self._abandoned_calls[engine_idx] -= 1
+
+        worker = threading.Thread(target=_target, name="chart-repair-engine", daemon=True)
+        worker.start()
+        worker.join(self.engine_timeout)
+        with self._abandoned_lock:
+            if not state['done']:
+                state['abandoned'] = True
+                self._abandoned_calls[engine_idx] = self._abandoned_calls.get(engine_idx, 0) + 1
+                raise TimeoutError(f"Engine修复超过 {self.engine_timeout} 秒")
+        if 'error' in outcome:
+            raise outcome['error']
+        return outcome.get('value')
+
 
 def create_chart_validator() -> ChartValidator:
     """创建图表验证器实例"""
@@ -722,9 +800,11 @@ def create_chart_validator() -> ChartValidator:
 
 def create_chart_repairer(
     validator: Optional[ChartValidator] = None,
-    llm_repair_fns: Optional[List[Callable]] = None
+    llm_repair_fns: Optional[List[Callable]] = None,
+    repair_cache: Optional[RepairCache] = None,
+    engine_timeout: Optional[float] = None
 ) -> ChartRepairer:
     """创建图表修复器实例"""
     if validator is None:
         validator = create_chart_validator()
-    return ChartRepairer(validator, llm_repair_fns)
+    return ChartRepairer(validator, llm_repair_fns, repair_cache=repair_cache, engine_timeout=engine_timeout)
@@ -56,13 +56,60 @@ class Settings(BaseSettings):
     CHAPTER_JSON_MAX_ATTEMPTS: int = Field(
         2, description="章节JSON解析失败时的最大尝试次数"
     )
+    # 章节之间只依赖共享的生成上下文与篇幅规划，可有界并行生成
+    CHAPTER_CONCURRENCY: int = Field(
+        3, description="并行生成的章节数（GraphRAG查询+流式生成+重试），1 表示逐章串行"
+    )
+    # 章节流式输出边生成边扫描：闭合的block即时推送，结构故障提前中止并重试
+    CHAPTER_STREAM_VALIDATION: bool = Field(
+        True, description="流式生成时检测到不可恢复的JSON结构故障是否提前中止本次尝试"
+    )
+    CHAPTER_STREAM_BLOCKS: bool = Field(
+        True, description="SSE推送已解析并校验的章节block（chapter_block），关闭则推送原始delta（chapter_chunk）"
+    )
+    # 每章只检索与标题/提纲相关的素材片段，避免三引擎报告全文在每章重复计费
+    CHAPTER_CONTEXT_RETRIEVAL: bool = Field(
+        True, description="是否按章节检索三引擎报告与论坛日志片段（关闭则每章携带全文）"
+    )
+    CHAPTER_CONTEXT_TOP_K: int = Field(24, description="每章最多携带的素材片段数")
+    CHAPTER_CONTEXT_TOKEN_BUDGET: int = Field(
+        12000, description="每章素材片段的token预算（估算值）"
+    )
+    CHAPTER_CONTEXT_CHUNK_CHARS: int = Field(800, description="素材切块的最大字符数")
+    CHAPTER_CONTEXT_EMBEDDING_MODEL: Optional[str] = Field(
+        None, description="可选的sentence-transformers模型名，设置后与BM25分数融合"
+    )
+    # 章节提示词按"运行级共享上下文在前、章节内容在后"排列，vLLM/DeepSeek等可自动复用前缀KV缓存
+    LLM_PROMPT_CACHE_HINTS: bool = Field(
+        False, description="是否随章节请求发送prompt_cache_key（OpenAI等支持，不识别的兼容接口会忽略）"
+    )
     TEMPLATE_DIR: str = Field("ReportEngine/report_template", description="多模板目录")
     API_TIMEOUT: float = Field(900.0, description="单API超时时间（秒）")
     MAX_RETRY_DELAY: float = Field(180.0, description="最大重试间隔（秒）")
     MAX_RETRIES: int = Field(8, description="最大重试次数")
     LOG_FILE: str = Field("logs/report.log", description="日志输出文件")
     ENABLE_PDF_EXPORT: bool = Field(True, description="是否允许导出PDF")
+    # PDF导出时图表/词云/公式按内容哈希缓存，重复导出同一份IR无需重新渲染
+    PDF_RENDER_CACHE_ENABLED: bool = Field(True, description="是否缓存PDF导出的图表/词云/公式渲染结果")
+    PDF_RENDER_CACHE_DIR: str = Field(
+        "final_reports/render_cache", description="PDF图表/词云/公式渲染缓存目录"
+    )
+    PDF_RENDER_WORKERS: int = Field(
+        0, description="PDF图表渲染进程数，0 表示按CPU核数，1 表示在当前进程串行渲染"
+    )
+    PDF_RENDER_TIMEOUT: float = Field(
+        120.0, description="进程池中单个图表/词云/公式渲染的超时时间（秒），超时视为渲染失败，0 表示不限制"
+    )
     CHART_STYLE: str = Field("modern", description="图表样式：modern/classic/")
+    # 图表LLM修复结果按（原始block + 校验错误）的内容哈希落盘，重复渲染同一份IR无需再次调用LLM
+    CHART_REPAIR_CACHE_ENABLED: bool = Field(True, description="是否缓存图表LLM修复结果")
+    CHART_REPAIR_CACHE_DIR: str = Field(
+        "final_reports/repair_cache", description="图表LLM修复结果缓存目录"
+    )
+    CHART_REPAIR_WORKERS: int = Field(4, description="并发修复图表的线程数，1 表示串行")
+    CHART_REPAIR_TIMEOUT: float = Field(
+        60.0, description="单个Engine修复单个图表的超时时间（秒），超时后改用下一个Engine，0 表示不限制"
+    )
     JSON_ERROR_LOG_DIR: str = Field(
         "logs/json_repair_failures", description="无法修复的JSON块落盘目录"
     )
@@ -100,6 +147,8 @@ def print_config(config: Settings):
     message += f"输出目录: {config.OUTPUT_DIR}\n"
     message += f"章节JSON目录: {config.CHAPTER_OUTPUT_DIR}\n"
     message += f"章节JSON最大尝试次数: {config.CHAPTER_JSON_MAX_ATTEMPTS}\n"
+    message += f"章节并发数: {config.CHAPTER_CONCURRENCY}\n"
+    message += f"章节上下文检索: {config.CHAPTER_CONTEXT_RETRIEVAL}（top_k={config.CHAPTER_CONTEXT_TOP_K}，预算={config.CHAPTER_CONTEXT_TOKEN_BUDGET} tokens）\n"
     message += f"整本IR目录: {config.DOCUMENT_IR_OUTPUT_DIR}\n"
     message += f"模板目录: {config.TEMPLATE_DIR}\n"
     message += f"API 超时时间: {config.API_TIMEOUT} 秒\n"
@@ -107,7 +156,11 @@ def print_config(config: Settings):
     message += f"最大重试次数: {config.MAX_RETRIES}\n"
     message += f"日志文件: {config.LOG_FILE}\n"
     message += f"PDF 导出: {config.ENABLE_PDF_EXPORT}\n"
+    message += f"PDF 渲染缓存: {config.PDF_RENDER_CACHE_DIR if config.PDF_RENDER_CACHE_ENABLED else '(关闭)'}\n"
+    message += f"PDF 渲染进程数/超时: {config.PDF_RENDER_WORKERS or '(按CPU核数)'} / {config.PDF_RENDER_TIMEOUT or '不限'} 秒\n"
     message += f"图表样式: {config.CHART_STYLE}\n"
+    message += f"图表修复缓存: {config.CHART_REPAIR_CACHE_DIR if config.CHART_REPAIR_CACHE_ENABLED else '(关闭)'}\n"
+    message += f"图表修复并发/超时: {config.CHART_REPAIR_WORKERS} 线程 / {config.CHART_REPAIR_TIMEOUT or '不限'} 秒\n"
     message += f"LLM API Key: {'已配置' if config.REPORT_ENGINE_API_KEY else '未配置'}\n"
     message += "=========================\n"
     logger.info(message)
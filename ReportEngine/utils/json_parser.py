@@ -3,7 +3,7 @@
 
 提供鲁棒的JSON解析能力，支持：
 1. 自动清理markdown代码块标记和思考内容
-2. 本地语法修复（括号平衡、逗号补全、控制字符转义等）
+2. 原文先走C解析器快速路径，失败后单遍扫描修复（括号平衡、逗号补全、控制字符转义等）
 3. 使用json_repair库进行高级修复
 4. LLM辅助修复（可选）
 5. 详细的错误日志和调试信息
@@ -13,7 +13,7 @@ from __future__ import annotations
 
 import json
 import re
-from typing import Any, Dict, List, Optional, Tuple, Callable
+from typing import Any, Callable, Dict, Iterator, List, Optional
 from loguru import logger
 
 try:
@@ -21,6 +21,11 @@ try:
 except ImportError:
     _json_repair_fn = None
 
+try:
+    from .json_repairer import fast_loads, repair_json_text
+except ImportError:  # 以脚本方式在utils目录下运行测试时没有包上下文
+    from json_repairer import fast_loads, repair_json_text
+
 
 class JSONParseError(ValueError):
     """JSON解析失败时抛出的异常，附带原始文本方便排查。"""
@@ -59,9 +64,6 @@ class RobustJSONParser:
         r"^\s*根据.*?(?=\{|\[|$)",
     ]
 
-    # 冒号等号模式（LLM常见错误）
-    _COLON_EQUALS_PATTERN = re.compile(r'(":\s*)=')
-
     def __init__(
         self,
         llm_repair_fn: Optional[Callable[[str, str], Optional[str]]] = None,
@@ -111,15 +113,15 @@ class RobustJSONParser:
         # 原始文本用于后续日志
         original_text = raw_text
 
-        # 步骤1: 构造候选集，包含不同清理策略
-        candidates = self._build_candidate_payloads(raw_text, context_name)
+        # 步骤1: 清理markdown包裹与思考内容
+        cleaned = self._clean_response(raw_text)
 
-        # 步骤2: 尝试解析所有候选
+        # 步骤2: 依次尝试原文快速路径与单遍修复后的候选
         last_error: Optional[json.JSONDecodeError] = None
-        for i, candidate in enumerate(candidates):
+        for i, candidate in enumerate(self._build_candidate_payloads(cleaned)):
             try:
-                data = json.loads(candidate)
-                logger.debug(f"{context_name} JSON解析成功（候选{i + 1}/{len(candidates)}）")
+                data = fast_loads(candidate)
+                logger.debug(f"{context_name} JSON解析成功（候选{i + 1}）")
                 return self._extract_and_validate(
                     data, expected_keys, extract_wrapper_key, context_name
                 )
@@ -127,14 +129,12 @@ class RobustJSONParser:
                 last_error = exc
                 logger.debug(f"{context_name} 候选{i + 1}解析失败: {exc}")
 
-        cleaned = candidates[0] if candidates else original_text
-
         # 步骤3: 使用json_repair库
         if self.enable_json_repair:
             repaired = self._attempt_json_repair(cleaned, context_name)
             if repaired:
                 try:
-                    data = json.loads(repaired)
+                    data = fast_loads(repaired)
                     logger.info(f"{context_name} JSON通过json_repair库修复成功")
                     return self._extract_and_validate(
                         data, expected_keys, extract_wrapper_key, context_name
@@ -148,7 +148,7 @@ class RobustJSONParser:
             llm_repaired = self._attempt_llm_repair(cleaned, str(last_error), context_name)
             if llm_repaired:
                 try:
-                    data = json.loads(llm_repaired)
+                    data = fast_loads(llm_repaired)
                     logger.info(f"{context_name} JSON通过LLM修复成功")
                     return self._extract_and_validate(
                         data, expected_keys, extract_wrapper_key, context_name
@@ -163,26 +163,23 @@ class RobustJSONParser:
         logger.debug(f"原始文本前500字符: {original_text[:500]}")
         raise JSONParseError(error_msg, raw_text=original_text) from last_error
 
-    def _build_candidate_payloads(self, raw_text: str, context_name: str) -> List[str]:
+    def _build_candidate_payloads(self, cleaned: str) -> Iterator[str]:
         """
-        针对原始文本构造多个候选JSON字符串，覆盖不同的清理策略。
+        按代价从低到高依次产出候选JSON字符串，前一个能解析就不再构造后面的候选。
 
         返回:
-            List[str]: 候选JSON文本列表
+            Iterator[str]: 清理后的原文、单遍修复结果、折叠三层数组后的修复结果
         """
-        cleaned = self._clean_response(raw_text)
-        candidates = [cleaned]
+        yield cleaned
 
         local_repaired = self._apply_local_repairs(cleaned)
         if local_repaired != cleaned:
-            candidates.append(local_repaired)
+            yield local_repaired
 
         # 对含有三层列表结构的内容强制拉平一次
-        flattened = self._flatten_nested_arrays(local_repaired)
-        if flattened not in candidates:
-            candidates.append(flattened)
-
-        return candidates
+        flattened = self._apply_local_repairs(cleaned, collapse_nested_arrays=True)
+        if flattened not in (cleaned, local_repaired):
+            yield flattened
 
     def _clean_response(self, raw: str) -> str:
         """
@@ -287,313 +284,22 @@ class RobustJSONParser:
         # 如果没找到完整的结构，返回从起始位置到结尾
         return text[start:] if start < len(text) else text
 
-    def _apply_local_repairs(self, text: str) -> str:
-        """
-        应用本地修复策略。
-
-        参数:
-            text: 原始JSON文本
-
-        返回:
-            str: 修复后的文本
-        """
-        repaired = text
-        mutated = False
-
-        # 修复 ":=" 错误
-        new_text = self._COLON_EQUALS_PATTERN.sub(r"\1", repaired)
-        if new_text != repaired:
-            logger.warning("检测到\":=\"字符，已自动移除多余的'='号")
-            repaired = new_text
-            mutated = True
-
-        # 转义控制字符
-        repaired, escaped = self._escape_control_characters(repaired)
-        if escaped:
-            logger.warning("检测到未转义的控制字符，已自动转换为转义序列")
-            mutated = True
-
-        # 修复缺少的逗号
-        repaired, commas_fixed = self._fix_missing_commas(repaired)
-        if commas_fixed:
-            logger.warning("检测到对象/数组之间缺少逗号，已自动补齐")
-            mutated = True
-
-        # 合并多余的方括号（LLM常见把二维列表层级写成三层）
-        repaired, brackets_collapsed = self._collapse_redundant_brackets(repaired)
-        if brackets_collapsed:
-            logger.warning("检测到连续的方括号嵌套，已尝试折叠为二维结构")
-            mutated = True
-
-        # 平衡括号
-        repaired, balanced = self._balance_brackets(repaired)
-        if balanced:
-            logger.warning("检测到括号不平衡，已自动补齐/剔除异常括号")
-            mutated = True
-
-        # 移除尾随逗号
-        repaired, trailing_removed = self._remove_trailing_commas(repaired)
-        if trailing_removed:
-            logger.warning("检测到尾随逗号，已自动移除")
-            mutated = True
-
-        return repaired if mutated else text
-
-    def _escape_control_characters(self, text: str) -> Tuple[str, bool]:
-        """
-        将字符串字面量中的裸换行/制表符/控制字符替换为JSON合法的转义序列。
-
-        参数:
-            text: 原始JSON文本
-
-        返回:
-            Tuple[str, bool]: (修复后的文本, 是否有修改)
-        """
-        if not text:
-            return text, False
-
-        result: List[str] = []
-        in_string = False
-        escaped = False
-        mutated = False
-        control_map = {"\n": "\\n", "\r": "\\r", "\t": "\\t"}
-
-        for ch in text:
-            if escaped:
-                result.append(ch)
-                escaped = False
-                continue
-
-            if ch == "\\":
-                result.append(ch)
-                escaped = True
-                continue
-
-            if ch == '"':
-                result.append(ch)
-                in_string = not in_string
-                continue
-
-            if in_string and ch in control_map:
-                result.append(control_map[ch])
-                mutated = True
-                continue
-
-            if in_string and ord(ch) < 0x20:
-                result.append(f"\\u{ord(ch):04x}")
-                mutated = True
-                continue
-
-            result.append(ch)
-
-        return "".join(result), mutated
-
-    def _fix_missing_commas(self, text: str) -> Tuple[str, bool]:
-        """
-        在对象/数组元素之间自动补逗号。
-
-        参数:
-            text: 原始JSON文本
-
-        返回:
-            Tuple[str, bool]: (修复后的文本, 是否有修改)
-        """
-        if not text:
-            return text, False
-
-        chars: List[str] = []
-        mutated = False
-        in_string = False
-        escaped = False
-        length = len(text)
-        i = 0
-
-        while i < length:
-            ch = text[i]
-            chars.append(ch)
-
-            if escaped:
-                escaped = False
-                i += 1
-                continue
-
-            if ch == "\\":
-                escaped = True
-                i += 1
-                continue
-
-            if ch == '"':
-                # 如果我们正在退出字符串，检查后面是否需要逗号
-                if in_string:
-                    # 查找下一个非空白字符
-                    j = i + 1
-                    while j < length and text[j] in " \t\r\n":
-                        j += 1
-                    # 如果下一个字符是 " { [ 或数字，可能需要逗号
-                    if j < length:
-                        next_ch = text[j]
-                        if next_ch in "\"[{" or next_ch.isdigit():
-                            # 检查是否已经在对象或数组中
-                            # 通过检查前面是否有未闭合的 { 或 [
-                            has_opener = False
-                            for k in range(len(chars) - 1, -1, -1):
-                                if chars[k] in "{[":
-                                    has_opener = True
-                                    break
-                                elif chars[k] in "]}":
-                                    break
-
-                            if has_opener:
-                                chars.append(",")
-                                mutated = True
-
-                in_string = not in_string
-                i += 1
-                continue
-
-            # 在 } 或 ] 后面检查是否需要逗号
-            if not in_string and ch in "}]":
-                j = i + 1
-                # 跳过空白
-                while j < length and text[j] in " \t\r\n":
-                    j += 1
-                # 如果下一个非空白字符是 { [ " 或数字，添加逗号
-                if j < length:
-                    next_ch = text[j]
-                    if next_ch in "{[\"" or next_ch.isdigit():
-                        chars.append(",")
-                        mutated = True
-
-            i += 1
-
-        return "".join(chars), mutated
-
-    def _collapse_redundant_brackets(self, text: str) -> Tuple[str, bool]:
-        """
-        针对LLM生成的三层或更多层数组（如]]], [[ / [[[）进行折叠，避免表格/列表写出额外维度。
-
-        返回:
-            Tuple[str, bool]: (修复后的文本, 是否有修改)
-        """
-        if not text:
-            return text, False
-
-        mutated = False
-
-        patterns = [
-            # 典型错误: "]]], [[{...}" -> "]], [{...}"
-            (re.compile(r"\]\s*\]\s*\]\s*,\s*\[\s*\["), "]],["),
-            # 极端情况: 连续三层开头 "[[[" -> "[["
-            (re.compile(r"\[\s*\[\s*\["), "[["),
-            # 极端情况: 结尾 "]]]" -> "]]"
-            (re.compile(r"\]\s*\]\s*\]"), "]]"),
-        ]
-
-        repaired = text
-        for pattern, replacement in patterns:
-            new_text, count = pattern.subn(replacement, repaired)
-            if count > 0:
-                mutated = True
-                repaired = new_text
-
-        return repaired, mutated
-
-    def _flatten_nested_arrays(self, text: str) -> str:
-        """
-        对明显多余的一层列表进行折叠，例如 [[[x]]] -> [[x]]。
-        """
-        if not text:
-            return text
-        text = re.sub(r"\]\s*\]\s*\]", "]]", text)
-        text = re.sub(r"\[\s*\[\s*\[", "[[", text)
-        return text
-
-    def _balance_brackets(self, text: str) -> Tuple[str, bool]:
+    def _apply_local_repairs(self, text: str, collapse_nested_arrays: bool = False) -> str:
         """
-        尝试修复因LLM多写/少写括号导致的不平衡结构。
+        应用本地修复：委托给单遍扫描的 repair_json_text，一次线性扫描同时处理
+        ":=" 、控制字符、缺失逗号、尾随逗号、括号平衡等问题。
 
         参数:
             text: 原始JSON文本
+            collapse_nested_arrays: 是否把三层数组折叠为二维结构
 
         返回:
-            Tuple[str, bool]: (修复后的文本, 是否有修改)
+            str: 修复后的文本（无需修复时原样返回）
         """
-        if not text:
-            return text, False
-
-        result: List[str] = []
-        stack: List[str] = []
-        mutated = False
-        in_string = False
-        escaped = False
-
-        opener_map = {"{": "}", "[": "]"}
-
-        for ch in text:
-            if escaped:
-                result.append(ch)
-                escaped = False
-                continue
-
-            if ch == "\\":
-                result.append(ch)
-                escaped = True
-                continue
-
-            if ch == '"':
-                result.append(ch)
-                in_string = not in_string
-                continue
-
-            if in_string:
-                result.append(ch)
-                continue
-
-            if ch in "{[":
-                stack.append(ch)
-                result.append(ch)
-                continue
-
-            if ch in "}]":
-                if stack and (
-                    (ch == "}" and stack[-1] == "{") or (ch == "]" and stack[-1] == "[")
-                ):
-                    stack.pop()
-                    result.append(ch)
-                else:
-                    # 不匹配的闭括号，忽略
-                    mutated = True
-                continue
-
-            result.append(ch)
-
-        # 补齐未闭合的括号
-        while stack:
-            opener = stack.pop()
-            result.append(opener_map[opener])
-            mutated = True
-
-        return "".join(result), mutated
-
-    def _remove_trailing_commas(self, text: str) -> Tuple[str, bool]:
-        """
-        移除JSON对象和数组中的尾随逗号。
-
-        参数:
-            text: 原始JSON文本
-
-        返回:
-            Tuple[str, bool]: (修复后的文本, 是否有修改)
-        """
-        if not text:
-            return text, False
-
-        # 使用正则表达式移除尾随逗号
-        # 匹配 , 后面跟着空白和 } 或 ] 的情况
-        pattern = r",(\s*[}\]])"
-        new_text = re.sub(pattern, r"\1", text)
-
-        return new_text, new_text != text
+        result = repair_json_text(text, collapse_nested_arrays=collapse_nested_arrays)
+        if result.mutated:
+            logger.warning(f"检测到JSON语法问题，已单遍修复: {result.describe()}")
+        return result.text
 
     def _attempt_json_repair(self, text: str, context_name: str) -> Optional[str]:
         """
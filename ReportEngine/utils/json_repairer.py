@@ -0,0 +1,346 @@
+"""
+单遍扫描的JSON修复引擎。
+
+RobustJSONParser 与 ChapterGenerationNode 共用：先用C实现的解析器走快速路径，
+失败后只对文本做一次线性扫描，按JSON语法状态（期待键/冒号/值/逗号）同时修复：
+- 字符串内未转义的换行/制表符/控制字符、非法转义（如LaTeX的 \\alpha）、字符串内裸引号；
+- `":=` 多余的等号、缺失的逗号与冒号、尾随/重复逗号；
+- 错配的右括号（剔除）、未闭合的字符串与括号（补齐）、悬空的键（补 null）；
+- 可选：把 `[[[` 三层数组折叠为两层（LLM常把二维表格多写一层）。
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Any, List
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:  # pragma: no cover - 可选依赖，缺失时退回标准库
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+_WHITESPACE = " \t\r\n"
+_VALID_ESCAPES = '"\\/bfnrtu'
+_HEX = "0123456789abcdefABCDEF"
+_CONTROL_MAP = {"\n": "\\n", "\r": "\\r", "\t": "\\t"}
+# 字符串真正结束后，下一个非空白字符只可能是这些（或文本结束）；{ [ = 对应缺逗号/冒号的情况
+_STRING_TERMINATORS = ',:}]"{[='
+_LITERALS = ("true", "false", "null")
+_PYTHON_LITERALS = {"True": "true", "False": "false", "None": "null"}
+_BARE_KEY_RE = re.compile(r"[A-Za-z_$][A-Za-z0-9_$\-]*$")
+_NUMBER_RE = re.compile(r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?$")
+_TOKEN_STOP = _WHITESPACE + '{}[]:,"='
+
+# 修复类别 -> 日志中的可读名称
+FIX_LABELS = {
+    "control_chars": "未转义的控制字符",
+    "invalid_escape": "非法转义",
+    "inner_quote": "字符串内裸引号",
+    "colon_equals": "\":=\"多余的等号",
+    "missing_comma": "缺失逗号",
+    "missing_colon": "缺失冒号",
+    "bare_key": "未加引号的键",
+    "python_literal": "Python字面量",
+    "extra_comma": "尾随/重复逗号",
+    "stray_closer": "错配的右括号",
+    "unclosed": "未闭合的字符串/括号",
+    "dangling_key": "悬空的键",
+    "nested_array": "多余的数组层级",
+}
+
+
+def fast_loads(text: str) -> Any:
+    """
+    快速路径：优先用orjson（C实现）解析，失败时交给标准库（同样是C扫描器）给出准确的错误位置。
+
+    orjson不支持超出64位的整数、NaN等少数写法，这些情况也由标准库兜底。
+
+    异常:
+        json.JSONDecodeError: 文本不是合法JSON。
+    """
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(text)
+
+
+@dataclass
+class RepairResult:
+    """一次修复的结果：修复后的文本与实际应用的修复类别"""
+
+    text: str
+    fixes: List[str] = field(default_factory=list)
+
+    @property
+    def mutated(self) -> bool:
+        return bool(self.fixes)
+
+    def describe(self) -> str:
+        return "、".join(FIX_LABELS.get(fix, fix) for fix in self.fixes)
+
+
+def _next_token_ends_string(text: str, start: int, in_object: bool) -> bool:
+    """
+    引号后紧跟的是另一个值或裸键时（缺逗号），引号应视为字符串结束而不是正文里的裸引号。
+
+    只认完整的数字/字面量（后面紧跟逗号、右括号、引号或文本结束），以及对象中后跟冒号的裸键，
+    "增长"30%" 这类正文引号仍按裸引号处理。
+    """
+    length = len(text)
+    end = start
+    while end < length and text[end] not in _TOKEN_STOP:
+        end += 1
+    token = text[start:end]
+    if not token:
+        return False
+    follow = end
+    while follow < length and text[follow] in _WHITESPACE:
+        follow += 1
+    next_ch = text[follow] if follow < length else ""
+    if _NUMBER_RE.match(token) or token in _LITERALS or token in _PYTHON_LITERALS:
+        return next_ch in ("", ",", "]", "}", '"')
+    return in_object and bool(_BARE_KEY_RE.match(token)) and next_ch in (":", "=")
+
+
+class _Frame:
+    """容器栈中的一层：kind 为 { 或 [，state 为当前期待的语法成分"""
+
+    __slots__ = ("kind", "state", "elements", "open_index", "phantom")
+
+    def __init__(self, kind: str, open_index: int):
+        self.kind = kind
+        # 对象: key -> colon -> value -> after；数组: value -> after
+        self.state = "key" if kind == "{" else "value"
+        self.elements = 0
+        self.open_index = open_index
+        self.phantom = False
+
+
+def repair_json_text(text: str, collapse_nested_arrays: bool = False) -> RepairResult:
+    """
+    对LLM输出的JSON做单遍修复。
+
+    合法JSON原样返回（fixes为空）；调用方应先用 fast_loads 走快速路径，失败后再调用本函数。
+
+    参数:
+        text: 已去除```包裹的JSON文本。
+        collapse_nested_arrays: 是否把连续三层的数组开头折叠为两层。
+
+    返回:
+        RepairResult: 修复后的文本与修复类别。
+    """
+    if not text:
+        return RepairResult(text or "")
+
+    out: List[str] = []
+    fixes: List[str] = []
+    stack: List[_Frame] = []
+    # 最近一个已输出、尚未被后续值"确认"的逗号在 out 中的位置
+    comma_index = -1
+    in_string = False
+    string_is_key = False
+    length = len(text)
+    i = 0
+
+    def fix(name: str):
+        if name not in fixes:
+            fixes.append(name)
+
+    def begin_value():
+        """即将输出一个值：必要时补逗号/冒号，并推进容器状态"""
+        nonlocal comma_index
+        if not stack:
+            return
+        frame = stack[-1]
+        if frame.state == "after":
+            out.append(",")
+            fix("missing_comma")
+        elif frame.state == "colon":
+            out.append(":")
+            fix("missing_colon")
+        comma_index = -1
+        frame.elements += 1
+        frame.state = "after"
+
+    def close_frame(frame: _Frame):
+        """关闭容器前处理尾随逗号与悬空的键"""
+        nonlocal comma_index
+        if comma_index >= 0:
+            out[comma_index] = ""
+            comma_index = -1
+            fix("extra_comma")
+        if frame.kind == "{" and frame.state in ("colon", "value"):
+            out.append("null" if frame.state == "value" else ":null")
+            fix("dangling_key")
+        out.append("" if frame.phantom else ("}" if frame.kind == "{" else "]"))
+
+    while i < length:
+        ch = text[i]
+
+        if in_string:
+            if ch == "\\":
+                nxt = text[i + 1] if i + 1 < length else ""
+                if nxt and nxt in _VALID_ESCAPES and (
+                    nxt != "u" or (i + 6 <= length and all(c in _HEX for c in text[i + 2:i + 6]))
+                ):
+                    out.append(ch)
+                    out.append(nxt)
+                    i += 2
+                    continue
+                # 非法转义（\alpha、\x、结尾孤立的反斜杠等）按字面反斜杠保留
+                out.append("\\\\")
+                fix("invalid_escape")
+                i += 1
+                continue
+            if ch == '"':
+                j = i + 1
+                while j < length and text[j] in _WHITESPACE:
+                    j += 1
+                if j < length and text[j] not in _STRING_TERMINATORS and not _next_token_ends_string(
+                    text, j, bool(stack) and stack[-1].kind == "{"
+                ):
+                    # 引号后面紧跟正文，说明是字符串内部未转义的引号
+                    out.append('\\"')
+                    fix("inner_quote")
+                    i += 1
+                    continue
+                out.append(ch)
+                in_string = False
+                if string_is_key:
+                    stack[-1].state = "colon"
+                i += 1
+                continue
+            if ch in _CONTROL_MAP:
+                out.append(_CONTROL_MAP[ch])
+                fix("control_chars")
+            elif ord(ch) < 0x20:
+                out.append(f"\\u{ord(ch):04x}")
+                fix("control_chars")
+            else:
+                out.append(ch)
+            i += 1
+            continue
+
+        if ch in _WHITESPACE:
+            out.append(ch)
+        elif ch == '"':
+            frame = stack[-1] if stack else None
+            if frame is not None and frame.kind == "{" and frame.state in ("key", "after"):
+                if frame.state == "after":
+                    out.append(",")
+                    fix("missing_comma")
+                comma_index = -1
+                string_is_key = True
+            else:
+                begin_value()
+                string_is_key = False
+            out.append(ch)
+            in_string = True
+        elif ch in "{[":
+            frame = stack[-1] if stack else None
+            collapse = (
+                ch == "["
+                and collapse_nested_arrays
+                and frame is not None
+                and frame.kind == "["
+                and frame.elements == 0
+                and len(stack) >= 2
+                and stack[-2].kind == "["
+                and stack[-2].elements == 1
+                and not stack[-2].phantom
+                and not "".join(out[stack[-2].open_index + 1:frame.open_index]).strip()
+            )
+            if collapse:
+                # 第三个连续的 [：去掉中间一层（与 [[[x]]] -> [[x]] 等价）
+                out[frame.open_index] = ""
+                frame.phantom = True
+                fix("nested_array")
+            begin_value()
+            stack.append(_Frame(ch, len(out)))
+            out.append(ch)
+        elif ch in "}]":
+            expected = "{" if ch == "}" else "["
+            if stack and stack[-1].kind == expected:
+                close_frame(stack.pop())
+            else:
+                # 多余或错配的右括号直接剔除
+                fix("stray_closer")
+        elif ch == ",":
+            frame = stack[-1] if stack else None
+            if frame is not None and frame.state == "after":
+                comma_index = len(out)
+                out.append(ch)
+                frame.state = "key" if frame.kind == "{" else "value"
+            elif frame is not None:
+                # 开头或连续的逗号
+                fix("extra_comma")
+            else:
+                out.append(ch)
+        elif ch == ":":
+            frame = stack[-1] if stack else None
+            if frame is not None and frame.kind == "{" and frame.state == "colon":
+                frame.state = "value"
+            out.append(ch)
+        elif ch == "=" and stack and stack[-1].kind == "{" and stack[-1].state in ("colon", "value"):
+            if stack[-1].state == "colon":
+                # "key"=value 写法，等号当作冒号
+                out.append(":")
+                stack[-1].state = "value"
+                fix("missing_colon")
+            else:
+                # ":=" 写法，等号多余
+                fix("colon_equals")
+        else:
+            # 裸字面量（数字/true/false/null等）：整段读入
+            j = i
+            while j < length and text[j] not in _WHITESPACE and text[j] not in '{}[]:,"=':
+                j += 1
+            token = text[i:j]
+            frame = stack[-1] if stack else None
+            if frame is not None and frame.kind == "{" and frame.state in ("key", "after") \
+                    and _BARE_KEY_RE.match(token):
+                # 未加引号的ASCII键名
+                if frame.state == "after":
+                    out.append(",")
+                    fix("missing_comma")
+                comma_index = -1
+                token = f'"{token}"'
+                frame.state = "colon"
+                fix("bare_key")
+            elif frame is not None and frame.state in ("after", "value", "colon"):
+                if token in _PYTHON_LITERALS:
+                    token = _PYTHON_LITERALS[token]
+                    fix("python_literal")
+                if token[:1].isdigit() or token[:1] == "-" or token in _LITERALS:
+                    begin_value()
+                elif frame.state == "value":
+                    frame.state = "after"
+                    frame.elements += 1
+            out.append(token)
+            i = j
+            continue
+        i += 1
+
+    if in_string:
+        out.append('"')
+        fix("unclosed")
+        if string_is_key:
+            stack[-1].state = "colon"
+    if stack:
+        fix("unclosed")
+        while stack:
+            close_frame(stack.pop())
+
+    if not fixes:
+        return RepairResult(text)
+    return RepairResult("".join(out), fixes)
+
+
+__all__ = ["FIX_LABELS", "ORJSON_AVAILABLE", "RepairResult", "fast_loads", "repair_json_text"]
@@ -0,0 +1,78 @@
+"""
+图表修复结果的磁盘缓存。
+
+以（原始block + 校验错误）的规范化JSON计算SHA-256作为键，缓存LLM修复后的block，
+同一份IR重复渲染（HTML/PDF/Markdown多次导出）时直接命中，不再逐个Engine调用LLM。
+文件布局为 `<cache_dir>/<kind>/<digest[:2]>/<digest>.json`。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+# 修复提示词或校验规则变化时递增，使旧缓存整体失效
+REPAIR_CACHE_VERSION = 1
+
+# 渲染过程写入的内部标记，不参与缓存键
+_INTERNAL_KEY_PREFIX = "_chart_"
+
+
+class RepairCache:
+    """按内容寻址的修复结果缓存，只缓存修复成功的block。"""
+
+    def __init__(self, cache_dir: str | Path, enabled: bool = True):
+        self.cache_dir = Path(cache_dir)
+        self.enabled = enabled
+
+    @staticmethod
+    def make_digest(block: Dict[str, Any], errors: List[str], kind: str = "chart") -> str:
+        """对block（去掉内部标记）与错误列表做规范化序列化后取SHA-256"""
+        payload = {
+            key: value for key, value in block.items()
+            if not str(key).startswith(_INTERNAL_KEY_PREFIX)
+        } if isinstance(block, dict) else block
+        canonical = json.dumps(
+            {"v": REPAIR_CACHE_VERSION, "kind": kind, "block": payload, "errors": list(errors or [])},
+            ensure_ascii=False,
+            sort_keys=True,
+            separators=(",", ":"),
+            default=str,
+        )
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def _path(self, kind: str, digest: str) -> Path:
+        return self.cache_dir / kind / digest[:2] / f"{digest}.json"
+
+    def get(self, block: Dict[str, Any], errors: List[str], kind: str = "chart") -> Optional[Dict[str, Any]]:
+        """读取缓存的修复结果，不存在或内容损坏时返回None"""
+        if not self.enabled:
+            return None
+        path = self._path(kind, self.make_digest(block, errors, kind))
+        try:
+            repaired = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        return repaired if isinstance(repaired, dict) else None
+
+    def put(self, block: Dict[str, Any], errors: List[str], repaired: Dict[str, Any], kind: str = "chart"):
+        """写入修复结果（先写临时文件再替换，避免并发渲染读到半截内容）"""
+        if not self.enabled or not isinstance(repaired, dict):
+            return
+        path = self._path(kind, self.make_digest(block, errors, kind))
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp_path.write_text(json.dumps(repaired, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as exc:
+            logger.warning(f"写入图表修复缓存失败 {path}: {exc}")
+
+
+__all__ = ["REPAIR_CACHE_VERSION", "RepairCache"]
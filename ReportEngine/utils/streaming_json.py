@@ -0,0 +1,318 @@
+"""
+章节JSON的增量流式扫描器。
+
+LLM每输出一段delta就喂给扫描器，扫描器维护字符串/转义/括号栈等状态：
+1. 顶层 `blocks` 数组中的元素一闭合就解析出来，供SSE推送已校验的block；
+2. 只在本地修复也救不回来的结构性故障（迟迟不出现JSON、嵌套失控、
+   字符串外出现大段非JSON文本、括号错配过多）时判定失败，让上层提前中止并重试，
+   缺逗号、少量多余括号、字符串内裸引号等可修复的问题只计数，仍交给完整输出后的修复流程。
+
+字符串内裸引号（如 "增长6.1"的数据"）的判定与 repair_json_text 一致：引号之后先缓冲，
+下一个有意义的字符是逗号/冒号/括号/引号，或紧跟完整的数字/字面量/裸键时才算字符串结束，
+否则视为正文中的引号，字符串状态不翻转，后续正文也不会被误计为非JSON字符。
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from .json_repairer import fast_loads, repair_json_text
+
+_NUMBER_RE = re.compile(r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?$")
+_BARE_KEY_RE = re.compile(r"[A-Za-z_$][A-Za-z0-9_$\-]*$")
+_LITERALS = frozenset({"true", "false", "null"})
+# 引号之后出现这些完整的词，说明是缺逗号而不是正文中的裸引号
+_VALUE_WORDS = _LITERALS | {"True", "False", "None"}
+_STRUCTURAL = frozenset('{}[]:,"')
+# 字符串真正结束后紧跟的字符（与 json_repairer 的判定一致）
+_STRING_TERMINATORS = frozenset(',:}]"{[=')
+_TOKEN_STOP = frozenset(' \t\r\n{}[]:,"=')
+
+
+class _Frame:
+    """括号栈中的一层容器"""
+
+    __slots__ = ("kind", "key", "expect_key", "is_chapter", "is_blocks")
+
+    def __init__(self, kind: str, is_chapter: bool = False, is_blocks: bool = False):
+        self.kind = kind
+        self.key: Optional[str] = None
+        self.expect_key = kind == "{"
+        self.is_chapter = is_chapter
+        self.is_blocks = is_blocks
+
+
+class StreamingJSONScanner:
+    """
+    按delta增量扫描章节JSON，产出已闭合的顶层block并检测结构性故障。
+
+    顶层block指根对象（或根对象的 `chapter` 字段）下 `blocks` 数组的直接元素，
+    callout/table 等内部嵌套的 blocks 随外层block一起产出。
+
+    属性:
+        failure: 检测到不可恢复的结构故障时的原因，否则为None。
+        complete: 根对象是否已闭合。
+        blocks_closed: 已闭合的顶层block数（含解析失败的），即下一个block的序号。
+    """
+
+    # JSON起始符号之前允许的非空白字符数（```json、简短说明等）
+    MAX_PREAMBLE_CHARS = 2000
+    # 正常章节的嵌套深度不超过十几层，超出视为失控
+    MAX_DEPTH = 48
+    # 字符串之外无法识别为JSON字面量的字符数（如模型中途改写Markdown正文）
+    MAX_STRAY_CHARS = 200
+    # 与栈顶不匹配的闭合括号数（少量可由括号平衡修复）
+    MAX_MISMATCHED_CLOSERS = 8
+    # 合法裸字面量（数字/true/false/null）的最大长度，超出即按非JSON字符计数，不必等到空白出现
+    MAX_LITERAL_CHARS = 32
+
+    def __init__(self):
+        self.failure: Optional[str] = None
+        self.complete = False
+        self.position = 0
+        self.blocks_emitted = 0
+        self.blocks_closed = 0
+        self.unparsed_blocks = 0
+        self.stray_chars = 0
+        self.mismatched_closers = 0
+        self.inner_quotes = 0
+        self._started = False
+        self._preamble_chars = 0
+        self._stack: List[_Frame] = []
+        self._in_string = False
+        self._escape = False
+        self._string_is_key = False
+        self._key_chars: List[str] = []
+        self._token: List[str] = []
+        self._block_chars: List[str] = []
+        self._block_depth = 0
+        # 字符串中遇到引号后尚未确定是否为字符串结束时缓冲的后续字符
+        self._quote_lookahead: Optional[List[str]] = None
+
+    # ======== 对外接口 ========
+
+    def feed(self, delta: str) -> List[Tuple[int, Dict[str, Any]]]:
+        """
+        扫描一段增量文本。
+
+        参数:
+            delta: LLM最新输出的文本片段。
+
+        返回:
+            list: 本段文本中闭合的顶层block，元素为 (block在blocks数组中的序号, 已解析的dict)，
+                  检测到故障后始终为空。
+        """
+        completed: List[Tuple[int, Dict[str, Any]]] = []
+        if self.failure or not delta:
+            return completed
+        for ch in delta:
+            self.position += 1
+            if self._block_depth:
+                self._block_chars.append(ch)
+            block_text = self._consume(ch)
+            if block_text is not None:
+                index = self.blocks_closed
+                self.blocks_closed += 1
+                block = self._parse_block(block_text)
+                if block is not None:
+                    completed.append((index, block))
+            if self.failure:
+                break
+        return completed
+
+    def stats(self) -> Dict[str, Any]:
+        """返回扫描统计，便于写日志与排查"""
+        return {
+            "position": self.position,
+            "complete": self.complete,
+            "blocksEmitted": self.blocks_emitted,
+            "unparsedBlocks": self.unparsed_blocks,
+            "innerQuotes": self.inner_quotes,
+            "strayChars": self.stray_chars,
+            "mismatchedClosers": self.mismatched_closers,
+            "failure": self.failure,
+        }
+
+    # ======== 状态机 ========
+
+    def _consume(self, ch: str) -> Optional[str]:
+        """处理单个字符，某个顶层block闭合时返回其完整文本"""
+        if self._quote_lookahead is not None:
+            return self._consume_after_quote(ch)
+        if self._in_string:
+            self._consume_string_char(ch)
+            return None
+
+        if not self._started:
+            if ch in "{[":
+                self._started = True
+                return self._open(ch)
+            if not ch.isspace():
+                self._preamble_chars += 1
+                if self._preamble_chars > self.MAX_PREAMBLE_CHARS:
+                    self._fail(f"输出前 {self._preamble_chars} 个字符内未出现JSON起始符号")
+            return None
+
+        if self.complete:
+            # 根对象闭合后的内容（``` 结尾等）不再影响结构判断
+            return None
+
+        if ch.isspace() or ch in _STRUCTURAL:
+            self._end_token()
+        else:
+            self._token.append(ch)
+            if len(self._token) > self.MAX_LITERAL_CHARS:
+                self._add_stray(len(self._token))
+                self._token = []
+            return None
+
+        if ch == '"':
+            frame = self._stack[-1] if self._stack else None
+            self._in_string = True
+            self._string_is_key = bool(frame and frame.kind == "{" and frame.expect_key)
+            self._key_chars = []
+        elif ch in "{[":
+            return self._open(ch)
+        elif ch in "}]":
+            return self._close(ch)
+        elif ch == ",":
+            if self._stack and self._stack[-1].kind == "{":
+                self._stack[-1].expect_key = True
+        return None
+
+    def _consume_string_char(self, ch: str):
+        if self._escape:
+            self._escape = False
+        elif ch == "\\":
+            self._escape = True
+        elif ch == '"':
+            # 先不翻转字符串状态，等看到后续字符再判断是否为正文中的裸引号
+            self._quote_lookahead = []
+            return
+        if self._string_is_key:
+            self._key_chars.append(ch)
+
+    def _consume_after_quote(self, ch: str) -> Optional[str]:
+        """缓冲字符串中引号之后的字符，能判定时回放缓冲内容"""
+        lookahead = self._quote_lookahead
+        lookahead.append(ch)
+        token = "".join(lookahead).lstrip()
+        if not token:
+            return None
+        if len(token) == 1 and token in _STRING_TERMINATORS:
+            return self._resolve_quote(True)
+        if ch not in _TOKEN_STOP and len(token) <= self.MAX_LITERAL_CHARS:
+            # 裸词还没结束，继续缓冲
+            return None
+        word = token[:-1] if ch in _TOKEN_STOP else token
+        frame = self._stack[-1] if self._stack else None
+        ends = bool(word) and (
+            word in _VALUE_WORDS
+            or bool(_NUMBER_RE.match(word))
+            or (frame is not None and frame.kind == "{" and bool(_BARE_KEY_RE.match(word)))
+        )
+        return self._resolve_quote(ends)
+
+    def _resolve_quote(self, ends_string: bool) -> Optional[str]:
+        """确定缓冲的引号是否结束字符串，并按结果重新处理缓冲的字符"""
+        pending, self._quote_lookahead = self._quote_lookahead, None
+        if ends_string:
+            self._in_string = False
+            if self._string_is_key:
+                frame = self._stack[-1]
+                frame.key = "".join(self._key_chars)
+                frame.expect_key = False
+        else:
+            self.inner_quotes += 1
+            if self._string_is_key:
+                self._key_chars.append('"')
+        block_text = None
+        for ch in pending:
+            result = self._consume(ch)
+            if result is not None:
+                block_text = result
+        return block_text
+
+    def _open(self, ch: str) -> None:
+        parent = self._stack[-1] if self._stack else None
+        if len(self._stack) >= self.MAX_DEPTH:
+            self._fail(f"嵌套深度超过 {self.MAX_DEPTH} 层")
+            return None
+        if ch == "{":
+            is_chapter = parent is None or (
+                parent.kind == "{" and parent.is_chapter and parent.key == "chapter"
+            )
+            if parent is not None and parent.is_blocks and not self._block_depth:
+                # 顶层block开始，记录其文本直到对应的右括号
+                self._block_chars = [ch]
+                self._block_depth = len(self._stack) + 1
+            self._stack.append(_Frame("{", is_chapter=is_chapter))
+        else:
+            is_blocks = bool(
+                parent is not None and parent.kind == "{" and parent.is_chapter and parent.key == "blocks"
+            )
+            self._stack.append(_Frame("[", is_blocks=is_blocks))
+        return None
+
+    def _close(self, ch: str) -> Optional[str]:
+        expected = "{" if ch == "}" else "["
+        if not self._stack or self._stack[-1].kind != expected:
+            # 与括号平衡修复一致：多余/错配的右括号视为会被剔除
+            self.mismatched_closers += 1
+            if self._block_depth:
+                self._block_chars.pop()
+            if self.mismatched_closers > self.MAX_MISMATCHED_CLOSERS:
+                self._fail(f"错配的右括号超过 {self.MAX_MISMATCHED_CLOSERS} 个")
+            return None
+
+        depth = len(self._stack)
+        self._stack.pop()
+        if not self._stack:
+            self.complete = True
+        if self._block_depth and depth == self._block_depth:
+            self._block_depth = 0
+            text = "".join(self._block_chars)
+            self._block_chars = []
+            return text
+        return None
+
+    def _end_token(self):
+        """字符串之外的裸字面量结束时检查是否为合法的数字/true/false/null"""
+        if not self._token:
+            return
+        token = "".join(self._token)
+        self._token = []
+        if token in _LITERALS or _NUMBER_RE.match(token):
+            return
+        self._add_stray(len(token))
+
+    def _add_stray(self, count: int):
+        self.stray_chars += count
+        if self.stray_chars > self.MAX_STRAY_CHARS:
+            self._fail(f"字符串之外出现 {self.stray_chars} 个非JSON字符（疑似输出了Markdown正文）")
+
+    def _parse_block(self, text: str) -> Optional[Dict[str, Any]]:
+        try:
+            # strict=False 允许字符串中的裸换行，与完整输出后的控制字符修复等价
+            block = json.loads(text, strict=False)
+        except json.JSONDecodeError:
+            # 裸引号、缺逗号等交给与完整输出相同的单遍修复
+            try:
+                block = fast_loads(repair_json_text(text).text)
+            except json.JSONDecodeError:
+                self.unparsed_blocks += 1
+                return None
+        if not isinstance(block, dict):
+            self.unparsed_blocks += 1
+            return None
+        self.blocks_emitted += 1
+        return block
+
+    def _fail(self, reason: str):
+        if not self.failure:
+            self.failure = f"{reason}（第 {self.position} 个字符）"
+
+
+__all__ = ["StreamingJSONScanner"]
@@ -0,0 +1,87 @@
+"""
+多语言情感分析推理后端基准测试
+对比 PyTorch 全精度模型与 ONNX Runtime int8 量化模型的吞吐量与预测一致性。
+
+用法（在项目根目录执行）:
+    python SentimentAnalysisModel/WeiboMultilingualSentiment/benchmark_onnx.py --num-texts 500 --threads 4
+    python SentimentAnalysisModel/WeiboMultilingualSentiment/benchmark_onnx.py --input comments.txt
+"""
+
+import argparse
+import os
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from InsightEngine.tools.sentiment_analyzer import WeiboMultilingualSentimentAnalyzer, weibo_sentiment_path
+from InsightEngine.tools.sentiment_onnx import (
+    ACCURACY_CHECK_TEXTS,
+    OnnxSentimentModel,
+    compare_backends,
+    export_quantized_model,
+)
+from InsightEngine.utils.config import settings
+
+
+def load_texts(input_path, num_texts):
+    """读取待测文本（每行一条），未指定文件时重复内置样本"""
+    if input_path:
+        with open(input_path, "r", encoding="utf-8") as f:
+            texts = [line.strip() for line in f if line.strip()]
+    else:
+        texts = ACCURACY_CHECK_TEXTS
+    return [texts[i % len(texts)] for i in range(num_texts)]
+
+
+def run(analyzer, texts, batch_size, backend, rounds):
+    """返回最佳一轮的耗时（秒）与预测结果"""
+    analyzer._predict_probabilities(texts[:batch_size], batch_size, backend=backend)  # 预热
+    best = float("inf")
+    probabilities = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        probabilities = analyzer._predict_probabilities(texts, batch_size, backend=backend)
+        best = min(best, time.perf_counter() - start)
+    return best, probabilities
+
+
+def main():
+    parser = argparse.ArgumentParser(description="情感分析 PyTorch / ONNX int8 后端基准测试")
+    parser.add_argument("--input", help="测试文本文件，每行一条")
+    parser.add_argument("--num-texts", type=int, default=500, help="测试文本数量")
+    parser.add_argument("--batch-size", type=int, default=settings.SENTIMENT_BATCH_SIZE, help="每批文本数")
+    parser.add_argument("--threads", type=int, default=settings.SENTIMENT_ONNX_THREADS, help="ONNX Runtime 线程数，0为自动")
+    parser.add_argument("--rounds", type=int, default=3, help="每个后端的重复轮数，取最快一轮")
+    args = parser.parse_args()
+
+    settings.SENTIMENT_INFERENCE_BACKEND = "torch"
+    settings.SENTIMENT_CACHE_ENABLED = False
+    analyzer = WeiboMultilingualSentimentAnalyzer()
+    if not analyzer.initialize():
+        print("模型初始化失败，无法进行基准测试")
+        return
+
+    model_dir = os.path.join(weibo_sentiment_path, "model")
+    print("正在导出/加载 ONNX int8 模型...")
+    analyzer.onnx_model = OnnxSentimentModel(
+        export_quantized_model(analyzer.model, analyzer.tokenizer, model_dir), args.threads
+    )
+
+    texts = load_texts(args.input, args.num_texts)
+    print(f"测试文本: {len(texts)} 条，批大小: {args.batch_size}，设备: {analyzer.device}")
+
+    torch_seconds, torch_probs = run(analyzer, texts, args.batch_size, "torch", args.rounds)
+    onnx_seconds, onnx_probs = run(analyzer, texts, args.batch_size, "onnx", args.rounds)
+    report = compare_backends(lambda _: torch_probs, lambda _: onnx_probs, texts)
+
+    print(f"\n{'后端':<12}{'耗时(s)':>10}{'吞吐(条/s)':>14}")
+    print(f"{'torch':<12}{torch_seconds:>10.3f}{len(texts) / torch_seconds:>14.1f}")
+    print(f"{'onnx-int8':<12}{onnx_seconds:>10.3f}{len(texts) / onnx_seconds:>14.1f}")
+    print(f"\n加速比: {torch_seconds / onnx_seconds:.2f}x")
+    print(f"标签一致率: {report['label_agreement']:.2%}，概率最大误差: {report['max_prob_diff']:.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1071,6 +1071,15 @@ def stop_forum_monitoring_api():
     except Exception as e:
         return jsonify({'success': False, 'message': f'停止论坛失败: {str(e)}'})
 
+@app.route('/api/forum/host/metrics')
+def get_forum_host_metrics():
+    """获取论坛主持人发言队列深度与延迟指标"""
+    try:
+        from ForumEngine.monitor import get_host_metrics
+        return jsonify({'success': True, 'metrics': get_host_metrics()})
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'获取主持人指标失败: {str(e)}'})
+
 
 @app.route('/api/fresh-start', methods=['POST'])
 def fresh_start():
@@ -37,6 +37,7 @@ class Settings(BaseSettings):
     DB_PASSWORD: str = Field("your_db_password", description="数据库密码")
     DB_NAME: str = Field("your_db_name", description="数据库名称")
     DB_CHARSET: str = Field("utf8mb4", description="数据库字符集，推荐utf8mb4，兼容emoji")
+    DB_QUERY_CONCURRENCY: int = Field(8, description="Insight Engine 单次工具调用内并发查询的最大表数，同时决定连接池大小")
     
     # ======================= LLM 相关 =======================
     # 我们的LLM模型API赞助商有：https://aihubmix.com/?aff=8Ds9，提供了非常全面的模型api
@@ -95,6 +96,7 @@ class Settings(BaseSettings):
 
     
     # ================== Insight Engine 搜索配置 ====================
+    INSIGHT_SEARCH_BACKEND: str = Field("auto", description="话题检索后端：auto（MySQL优先使用FULLTEXT索引，缺失时回退LIKE）或 like；索引由 MindSpider/schema/init_search_index.py 创建")
     DEFAULT_SEARCH_HOT_CONTENT_LIMIT: int = Field(100, description="热榜内容默认最大数")
     DEFAULT_SEARCH_TOPIC_GLOBALLY_LIMIT_PER_TABLE: int = Field(50, description="按表全局话题最大数")
     DEFAULT_SEARCH_TOPIC_BY_DATE_LIMIT_PER_TABLE: int = Field(100, description="按日期话题最大数")
@@ -102,10 +104,24 @@ class Settings(BaseSettings):
     DEFAULT_SEARCH_TOPIC_ON_PLATFORM_LIMIT: int = Field(200, description="平台搜索话题最大数")
     MAX_SEARCH_RESULTS_FOR_LLM: int = Field(0, description="供LLM用搜索结果最大数")
     MAX_HIGH_CONFIDENCE_SENTIMENT_RESULTS: int = Field(0, description="高置信度情感分析最大数")
+    SENTIMENT_BATCH_SIZE: int = Field(32, description="情感分析批量推理的每批文本数，按长度分桶后动态填充")
+    SENTIMENT_CACHE_ENABLED: bool = Field(True, description="是否启用情感分析结果缓存（按模型名+文本哈希持久化到本地SQLite）")
+    SENTIMENT_CACHE_PATH: Optional[str] = Field(None, description="情感分析缓存文件路径，默认 SentimentAnalysisModel/WeiboMultilingualSentiment/cache/sentiment_cache.db")
+    SENTIMENT_CACHE_MAX_ENTRIES: int = Field(200000, description="情感分析缓存最大条目数，超出后按最近访问时间淘汰")
+    SENTIMENT_INFERENCE_BACKEND: str = Field("torch", description="情感分析推理后端：torch 或 onnx（导出为ONNX并做int8动态量化，适合纯CPU节点，需安装onnxruntime与onnx）")
+    SENTIMENT_ONNX_THREADS: int = Field(0, description="ONNX Runtime 推理线程数，0 表示由onnxruntime自动决定")
+    EMBEDDING_CACHE_ENABLED: bool = Field(True, description="是否缓存聚类用的句向量（按模型名+文本哈希，float16内存映射矩阵）")
+    EMBEDDING_CACHE_DIR: Optional[str] = Field(None, description="句向量缓存目录，默认 InsightEngine/cache/embeddings")
+    EMBEDDING_CACHE_MAX_ENTRIES: int = Field(500000, description="句向量缓存最大条目数，写满后清空重建")
     MAX_REFLECTIONS: int = Field(3, description="最大反思次数")
     MAX_PARAGRAPHS: int = Field(6, description="最大段落数")
     SEARCH_TIMEOUT: int = Field(240, description="单次搜索请求超时")
     MAX_CONTENT_LENGTH: int = Field(500000, description="搜索最大内容长度")
+
+    # ================== 段落并行与LLM限流配置（Insight/Media/Query 共用） ====================
+    PARAGRAPH_CONCURRENCY: int = Field(5, description="并行处理的段落数（搜索+总结+反思），1 表示逐段串行")
+    LLM_MAX_CONCURRENCY: int = Field(5, description="同一引擎同时进行的LLM请求上限，0 表示不限制")
+    LLM_REQUESTS_PER_MINUTE: int = Field(0, description="同一引擎每分钟LLM请求上限，0 表示不限制")
     
     model_config = ConfigDict(
         env_file=ENV_FILE,
@@ -4654,7 +4654,7 @@ function openReportStream(taskId, isRetry = false) {
         scheduleReportStreamReconnect(taskId);
     };
 
-    const events = ['status', 'stage', 'chapter_status', 'chapter_chunk', 'warning', 'error', 'debug', 'html_ready', 'completed', 'heartbeat', 'log'];
+    const events = ['status', 'stage', 'chapter_status', 'chapter_chunk', 'chapter_block', 'warning', 'error', 'debug', 'html_ready', 'completed', 'heartbeat', 'log'];
     events.forEach(evt => {
         reportEventSource.addEventListener(evt, (event) => dispatchReportStreamEvent(evt, event));
     });
@@ -4767,6 +4767,18 @@ function handleReportStreamEvent(eventType, eventData) {
                 );
             }
             break;
+        case 'chapter_block':
+            if (payload.block) {
+                appendReportStreamLine(
+                    `${payload.block.type || 'block'} ${formatStreamChunk(payload.block.text || '')}`.trim(),
+                    'chunk',
+                    {
+                        badge: payload.title || payload.chapterId || '章节流',
+                        genericMessage: '章节内容流式写入中...'
+                    }
+                );
+            }
+            break;
         case 'warning':
             appendReportStreamLine(payload.message || '检测到可重试的网络波动', 'warn', { badge: 'WARNING' });
             break;
@@ -0,0 +1,43 @@
+"""
+按需加载InsightEngine子模块的测试辅助
+
+InsightEngine包的__init__会导入整个Agent（sentence_transformers、sklearn等重依赖），
+单测只关心工具模块本身：能正常导入包时直接导入，否则只注册不执行__init__的空包，
+再导入目标子模块（子模块自身的依赖仍需已安装）。
+"""
+
+import importlib
+import importlib.machinery
+import importlib.util
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+
+def _register_bare_package(name: str):
+    """注册一个不执行__init__.py的包，使其子模块可以按常规方式导入"""
+    if name in sys.modules:
+        return
+    package_dir = project_root.joinpath(*name.split("."))
+    spec = importlib.machinery.ModuleSpec(name, None, is_package=True)
+    spec.submodule_search_locations = [str(package_dir)]
+    module = importlib.util.module_from_spec(spec)
+    module.__path__ = [str(package_dir)]
+    sys.modules[name] = module
+
+
+def load_insight_module(name: str):
+    """
+    导入InsightEngine子模块，例如 load_insight_module("InsightEngine.tools.sentiment_cache")
+    """
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        pass
+    parts = name.split(".")
+    for i in range(1, len(parts)):
+        _register_bare_package(".".join(parts[:i]))
+    return importlib.import_module(name)
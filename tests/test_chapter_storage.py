@@ -0,0 +1,35 @@
+"""
+测试ReportEngine/core/chapter_storage.py在章节并行落盘时的manifest一致性
+"""
+
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from ReportEngine.core.chapter_storage import ChapterStorage
+
+
+def test_parallel_chapters_keep_every_manifest_record(tmp_path):
+    storage = ChapterStorage(str(tmp_path))
+    run_dir = storage.start_session("report-parallel", {"title": "并行章节"})
+
+    def write_chapter(order: int):
+        meta = {"chapterId": f"S{order}", "slug": f"section-{order}", "title": f"第{order}章", "order": order}
+        chapter_dir = storage.begin_chapter(run_dir, meta)
+        with storage.capture_stream(chapter_dir) as fp:
+            fp.write("{}")
+        storage.persist_chapter(run_dir, meta, {"chapterId": f"S{order}", "order": order, "blocks": []})
+
+    # 倒序提交，模拟后面的章节先完成
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(write_chapter, reversed(range(1, 25))))
+
+    manifest = json.loads((run_dir / "manifest.json").read_text(encoding="utf-8"))
+    assert [c["order"] for c in manifest["chapters"]] == list(range(1, 25))
+    assert {c["status"] for c in manifest["chapters"]} == {"ready"}
+    assert [c["order"] for c in storage.load_chapters(run_dir)] == list(range(1, 25))
@@ -0,0 +1,115 @@
+"""
+测试ChartReviewService的图表修复磁盘缓存、并发修复与单Engine超时
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from ReportEngine.utils.chart_review_service import get_chart_review_service
+from ReportEngine.utils.chart_validator import ChartRepairer, create_chart_validator
+from ReportEngine.utils.repair_cache import RepairCache
+
+
+def _broken_chart(widget_id: str, title: str = "销量"):
+    # data 为空，本地规则无法补出可渲染的数据，必须走LLM修复
+    return {"type": "widget", "widgetType": "chart.js/bar", "widgetId": widget_id,
+            "props": {"type": "bar", "title": title}, "data": {}}
+
+
+class _FakeEngine:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = 0
+        self.threads = set()
+        self._lock = threading.Lock()
+
+    def __call__(self, block, errors):
+        with self._lock:
+            self.calls += 1
+            self.threads.add(threading.current_thread().name)
+        time.sleep(self.delay)
+        repaired = {key: value for key, value in block.items() if not key.startswith("_chart_")}
+        repaired["data"] = {"labels": ["一月", "二月"], "datasets": [{"label": "销量", "data": [1, 2]}]}
+        return repaired
+
+
+def test_repair_cache_is_keyed_by_block_and_errors(tmp_path):
+    cache = RepairCache(tmp_path)
+    block = _broken_chart("c1")
+    repaired = {"widgetId": "c1", "data": {"labels": ["a"]}}
+    cache.put(block, ["缺少datasets字段"], repaired)
+
+    # 渲染过程写入的内部标记不影响命中
+    assert cache.get(dict(block, _chart_reviewed=True), ["缺少datasets字段"]) == repaired
+    assert cache.get(block, ["另一个错误"]) is None
+    assert RepairCache(tmp_path, enabled=False).get(block, ["缺少datasets字段"]) is None
+
+
+def test_api_repair_is_reused_from_disk_across_repairers(tmp_path):
+    validator = create_chart_validator()
+    engine = _FakeEngine()
+    first = ChartRepairer(validator, [engine], repair_cache=RepairCache(tmp_path))
+    result = first.repair(_broken_chart("c1"))
+    assert result.success and result.method == "api" and engine.calls == 1
+
+    # 新的修复器（相当于重新启动后再次渲染同一份IR）直接命中磁盘缓存
+    second = ChartRepairer(validator, [engine], repair_cache=RepairCache(tmp_path))
+    cached = second.repair(_broken_chart("c1"))
+    assert cached.success and cached.changes == ["命中修复缓存"]
+    assert cached.repaired_block["data"]["datasets"][0]["data"] == [1, 2]
+    assert engine.calls == 1
+
+
+def test_slow_engine_times_out_and_next_engine_is_used():
+    slow, fast = _FakeEngine(delay=2.0), _FakeEngine()
+    repairer = ChartRepairer(create_chart_validator(), [slow, fast], engine_timeout=0.2)
+
+    start = time.perf_counter()
+    result = repairer.repair(_broken_chart("c1"))
+    assert time.perf_counter() - start < 1.5
+    assert result.success and result.changes == ["使用Engine 2修复成功"]
+    assert slow.calls == 1 and fast.calls == 1
+
+
+def test_review_document_repairs_independent_charts_concurrently(monkeypatch):
+    service = get_chart_review_service()
+    engine = _FakeEngine(delay=0.3)
+    monkeypatch.setattr(service, "repairer", ChartRepairer(service.validator, [engine]))
+    monkeypatch.setattr(service, "repair_workers", 4)
+
+    charts = [_broken_chart(f"c{i}", title=f"图{i}") for i in range(4)]
+    duplicate = _broken_chart("c0", title="图0")
+    document = {"chapters": [{"blocks": charts[:2]}, {"blocks": [{"type": "callout", "blocks": charts[2:] + [duplicate]}]}]}
+
+    start = time.perf_counter()
+    stats = service.review_document(document, save_on_repair=False)
+    elapsed = time.perf_counter() - start
+
+    # 内容相同的图表只修复一次，其余4个并发修复
+    assert engine.calls == 4
+    assert len(engine.threads) > 1 and elapsed < 4 * 0.3
+    assert stats.total == 5 and stats.repaired_api == 5 and stats.failed == 0
+    for block in charts + [duplicate]:
+        assert block["_chart_review_status"] == "repaired"
+        assert block["data"]["labels"] == ["一月", "二月"]
+    assert duplicate["data"] is not charts[0]["data"]
+
+
+def test_timed_out_engine_is_skipped_until_abandoned_call_finishes():
+    slow, fast = _FakeEngine(delay=0.6), _FakeEngine()
+    repairer = ChartRepairer(create_chart_validator(), [slow, fast], engine_timeout=0.1)
+
+    assert repairer.repair(_broken_chart("c1")).success
+    # 第一次超时的调用仍在后台运行，不再向该Engine堆积新的调用
+    assert repairer.repair(_broken_chart("c2", title="利润")).success
+    assert slow.calls == 1 and fast.calls == 2
+
+    time.sleep(0.8)
+    repairer.repair(_broken_chart("c3", title="成本"))
+    assert slow.calls == 2
@@ -0,0 +1,88 @@
+"""
+测试ReportEngine/core/context_index.py中的章节级素材检索
+"""
+
+import sys
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from ReportEngine.core import TemplateSection
+from ReportEngine.core.context_index import ContextIndex, build_chapter_query, estimate_tokens
+
+
+def _build_reports():
+    filler = "。".join(f"第{i}条与主题无关的背景描述" for i in range(40))
+    return {
+        "query_engine": (
+            "# 新能源汽车\n\n## 价格走势\n\n比亚迪在三月再次降价，价格战蔓延到合资品牌。\n\n"
+            f"## 背景\n\n{filler}\n\n## 出口\n\n海外出口量同比增长，欧洲关税带来不确定性。"
+        ),
+        "media_engine": "## 视频舆论\n\n抖音上关于降价的短视频播放量激增，用户讨论价格战是否可持续。",
+        "insight_engine": "## 用户情绪\n\n老车主对降价普遍不满，负面情绪集中在保值率。\n\n## 充电\n\n充电桩覆盖率仍是痛点。",
+    }
+
+
+def test_chapter_payload_only_carries_relevant_chunks():
+    reports = _build_reports()
+    index = ContextIndex(reports, "[INSIGHT] 降价引发老车主维权\n[MEDIA] 出口话题热度一般", max_chunk_chars=200)
+    section = TemplateSection(
+        title="价格战与用户情绪", slug="price", order=1, depth=1, raw_title="价格战与用户情绪",
+        number="1", chapter_id="S1", outline=["降价对老车主的影响"],
+    )
+    query = build_chapter_query(section, {"emphasis": ["保值率"]}, "新能源汽车")
+    selection = index.select(query, top_k=5, token_budget=400)
+
+    assert "比亚迪在三月再次降价" in selection["reports"]["query_engine"]
+    assert "## 价格走势" in selection["reports"]["query_engine"]
+    assert "背景描述" not in selection["reports"]["query_engine"]
+    assert "保值率" in selection["reports"]["insight_engine"]
+    assert "价格战是否可持续" in selection["reports"]["media_engine"]
+    assert "老车主维权" in selection["forumLogs"]
+
+    meta = selection["retrieval"]
+    assert meta["selectedChunks"] <= 5
+    assert meta["selectedTokens"] <= 400
+    assert meta["totalTokens"] > meta["selectedTokens"]
+    assert not meta["fallback"]
+
+
+def test_unmatched_query_falls_back_to_leading_chunks():
+    index = ContextIndex(_build_reports(), "", max_chunk_chars=200)
+    selection = index.select("zzzz", top_k=3, token_budget=10000)
+    assert selection["retrieval"]["fallback"]
+    assert selection["retrieval"]["selectedChunks"] == 3
+    assert "比亚迪" in selection["reports"]["query_engine"]
+
+
+def test_embedder_scores_are_blended():
+    texts_seen = []
+
+    def embedder(texts):
+        texts_seen.extend(texts)
+        return [[1.0, 0.0] if "充电" in text else [0.0, 1.0] for text in texts]
+
+    index = ContextIndex(_build_reports(), "", max_chunk_chars=200, embedder=embedder)
+    selection = index.select("充电", top_k=1, token_budget=10000)
+    assert "充电桩" in selection["reports"]["insight_engine"]
+
+    # 片段向量只编码一次
+    count = len(texts_seen)
+    index.select("出口", top_k=1, token_budget=10000)
+    assert len(texts_seen) == count + 1
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("价格战") == 3
+    assert estimate_tokens("abcdefgh") == 2
+
+
+def test_chapter_query_accepts_string_emphasis_and_emphasis_points():
+    section = TemplateSection(
+        title="价格战", slug="price", order=1, depth=1, raw_title="价格战", number="1", chapter_id="S1",
+    )
+    query = build_chapter_query(section, {"emphasis": "保值率", "emphasisPoints": ["老车主维权"]})
+    assert query.split("\n") == ["价格战", "保值率", "老车主维权"]
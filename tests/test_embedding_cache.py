@@ -0,0 +1,132 @@
+"""
+测试InsightEngine/tools/embedding_cache.py中的句向量缓存（float16内存映射矩阵 + SQLite行号索引）
+"""
+
+import os
+import sqlite3
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from tests.insight_modules import load_insight_module
+
+EmbeddingCache = load_insight_module("InsightEngine.tools.embedding_cache").EmbeddingCache
+
+DIM = 4
+
+
+class CountingEncoder:
+    """确定性的桩编码器，记录每次被要求编码的文本"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return np.array([[len(text), ord(text[0]) % 1000 / 100, ord(text[-1]) % 7, 0.5] for text in texts])
+
+
+def expected(text):
+    return CountingEncoder()([text])[0]
+
+
+def index_rows(directory):
+    conn = sqlite3.connect(os.path.join(directory, "index.db"))
+    try:
+        return dict(conn.execute("SELECT cache_key, row FROM embedding_index").fetchall())
+    finally:
+        conn.close()
+
+
+def refuse(texts):
+    raise AssertionError(f"不应重新编码: {texts}")
+
+
+class TestEmbeddingCache:
+    """行号分配、复用与重新打开"""
+
+    def test_rows_allocated_once_per_unique_text(self, tmp_path):
+        cache = EmbeddingCache(str(tmp_path), "model-a")
+        encoder = CountingEncoder()
+
+        vectors = cache.encode(["苹果", "香蕉", "苹果"], encoder)
+
+        assert encoder.calls == [["苹果", "香蕉"]]
+        assert vectors.shape == (3, DIM) and vectors.dtype == np.float32
+        np.testing.assert_allclose(vectors[0], vectors[2])
+        rows = index_rows(str(tmp_path))
+        assert sorted(rows.values()) == [0, 1]
+        assert rows[cache.make_key("苹果")] == 0
+        # 矩阵文件按 INITIAL_ROWS 预分配
+        assert os.path.getsize(tmp_path / "vectors.f16") == EmbeddingCache.INITIAL_ROWS * DIM * 2
+
+    def test_cached_rows_reused_and_new_rows_appended(self, tmp_path):
+        cache = EmbeddingCache(str(tmp_path), "model-a")
+        cache.encode(["苹果", "香蕉"], CountingEncoder())
+        encoder = CountingEncoder()
+
+        vectors = cache.encode(["香蕉", "橙子"], encoder)
+
+        assert encoder.calls == [["橙子"]]
+        np.testing.assert_allclose(vectors[0], expected("香蕉"), rtol=1e-3)
+        assert index_rows(str(tmp_path))[cache.make_key("橙子")] == 2
+        assert (cache.hits, cache.misses) == (1, 3)
+
+    def test_reopen_reads_vectors_from_disk(self, tmp_path):
+        EmbeddingCache(str(tmp_path), "model-a").encode(["苹果", "香蕉", "橙子"], CountingEncoder())
+
+        reopened = EmbeddingCache(str(tmp_path), "model-a")
+        vectors = reopened.encode(["橙子", "苹果"], refuse)
+
+        np.testing.assert_allclose(vectors[0], expected("橙子"), rtol=1e-3)
+        np.testing.assert_allclose(vectors[1], expected("苹果"), rtol=1e-3)
+        assert reopened.hits == 2
+
+    def test_other_model_does_not_reuse_rows(self, tmp_path):
+        EmbeddingCache(str(tmp_path), "model-a").encode(["苹果"], CountingEncoder())
+        encoder = CountingEncoder()
+
+        EmbeddingCache(str(tmp_path), "model-b").encode(["苹果"], encoder)
+
+        assert encoder.calls == [["苹果"]]
+        assert sorted(index_rows(str(tmp_path)).values()) == [0, 1]
+
+    def test_instances_sharing_directory_get_distinct_rows(self, tmp_path):
+        # 模拟两个进程各自打开同一缓存目录，交替写入
+        first = EmbeddingCache(str(tmp_path), "model-a")
+        second = EmbeddingCache(str(tmp_path), "model-a")
+        first.encode(["苹果"], CountingEncoder())
+        second.encode(["香蕉"], CountingEncoder())
+        first.encode(["橙子"], CountingEncoder())
+
+        assert sorted(index_rows(str(tmp_path)).values()) == [0, 1, 2]
+        vectors = EmbeddingCache(str(tmp_path), "model-a").encode(["苹果", "香蕉", "橙子"], refuse)
+        np.testing.assert_allclose(vectors, [expected(t) for t in ("苹果", "香蕉", "橙子")], rtol=1e-3)
+
+    def test_matrix_grows_and_keeps_existing_rows(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(EmbeddingCache, "INITIAL_ROWS", 2)
+        cache = EmbeddingCache(str(tmp_path), "model-a")
+        cache.encode(["a"], CountingEncoder())
+        cache.encode(["bb", "ccc", "dddd", "eeeee"], CountingEncoder())
+
+        assert os.path.getsize(tmp_path / "vectors.f16") == 8 * DIM * 2
+        vectors = EmbeddingCache(str(tmp_path), "model-a").encode(["a", "eeeee"], refuse)
+        np.testing.assert_allclose(vectors[0], expected("a"), rtol=1e-3)
+        assert vectors[1][0] == pytest.approx(5)
+
+    def test_full_cache_restarts_from_row_zero(self, tmp_path):
+        cache = EmbeddingCache(str(tmp_path), "model-a", max_entries=3)
+        cache.encode(["a", "bb"], CountingEncoder())
+        cache.encode(["ccc", "dddd"], CountingEncoder())
+
+        rows = index_rows(str(tmp_path))
+        assert rows == {cache.make_key("ccc"): 0, cache.make_key("dddd"): 1}
+        encoder = CountingEncoder()
+        cache.encode(["a"], encoder)
+        assert encoder.calls == [["a"]]
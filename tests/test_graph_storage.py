@@ -0,0 +1,128 @@
+"""
+测试ReportEngine/graphrag/graph_storage.py中的报告ID索引与图谱缓存
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from ReportEngine.graphrag import graph_storage
+from ReportEngine.graphrag.graph_storage import Graph, GraphStorage
+
+
+class _TmpGraphStorage(GraphStorage):
+    """把章节目录指向临时目录"""
+
+    def __init__(self, chapters_dir: Path):
+        self._chapters_dir = chapters_dir
+
+    @property
+    def chapters_dir(self) -> Path:
+        return self._chapters_dir
+
+
+def _write_legacy_graph(run_dir: Path, task_id: str):
+    """模拟索引引入之前生成的图谱文件"""
+    run_dir.mkdir(parents=True)
+    graph = Graph()
+    graph.add_node("topic", task_id)
+    (run_dir / GraphStorage.FILENAME).write_text(
+        json.dumps({"task_id": task_id, **graph.to_dict()}), encoding="utf-8"
+    )
+
+
+class TestGraphStorageIndex:
+    """测试报告ID索引"""
+
+    def setup_method(self):
+        graph_storage._indexes.clear()
+        graph_storage._graph_cache.clear()
+
+    def test_finds_legacy_graphs_by_dir_name_and_task_id(self, tmp_path):
+        _write_legacy_graph(tmp_path / "report-20250101-a", "report_20250101_a")
+        _write_legacy_graph(tmp_path / "run-unrelated", "report-xyz-1")
+        storage = _TmpGraphStorage(tmp_path)
+
+        assert storage.find_graph_by_report_id("report_20250101_a").parent.name == "report-20250101-a"
+        assert storage.find_graph_by_report_id("report_xyz_1").parent.name == "run-unrelated"
+        assert storage.find_graph_by_report_id("missing") is None
+        assert (tmp_path / GraphStorage.INDEX_PATH).exists()
+
+    def test_save_updates_index_for_other_processes(self, tmp_path):
+        _write_legacy_graph(tmp_path / "run-old", "report-old")
+        storage = _TmpGraphStorage(tmp_path)
+        assert storage.find_graph_by_report_id("report-new") is None
+
+        # 运行目录提前创建、图谱稍后写入时，目录 mtime 不变，只能依赖 save 维护索引
+        graph = Graph()
+        graph.add_node("topic", "new")
+        path = storage.save(graph, "report-new", tmp_path / "run-old")
+
+        graph_storage._indexes.clear()  # 模拟另一个进程只读取索引文件
+        assert storage.find_graph_by_report_id("report_new") == path
+        assert storage.find_latest_graph() == path
+
+    def test_load_returns_cached_graph_until_file_changes(self, tmp_path):
+        _write_legacy_graph(tmp_path / "run-a", "report-a")
+        storage = _TmpGraphStorage(tmp_path)
+        path = storage.find_graph_by_report_id("report-a")
+
+        graph = storage.load(path)
+        assert storage.load(path) is graph
+
+        stat = path.stat()
+        path.write_text(path.read_text(encoding="utf-8") + "\n", encoding="utf-8")
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        reloaded = storage.load(path)
+        assert reloaded is not graph
+        assert reloaded.node_count == graph.node_count
+
+
+class TestGraphIndexes:
+    """测试图谱的倒排索引、类型索引与出入边索引"""
+
+    def _build_graph(self) -> Graph:
+        graph = Graph()
+        topic = graph.add_node("topic", "新能源汽车")
+        section = graph.add_node("section", "市场", engine="insight", title="价格战与OpenAI舆论", summary="比亚迪降价")
+        query = graph.add_node("search_query", "比亚迪 降价", engine="media", query_text="比亚迪 降价")
+        graph.add_node("source", "OpenAI blog", title="OpenAI")
+        graph.add_edge(topic, section, "contains")
+        graph.add_edge(section, query, "searched")
+        return graph
+
+    def test_search_nodes_keeps_substring_semantics(self):
+        graph = self._build_graph()
+        for keyword in ["ai", "价格", "亚", "比亚迪 降", "战与open", "不存在"]:
+            expected = {
+                node.id for node in graph.nodes.values() if keyword.lower() in graph.get_search_text(node)
+            }
+            assert graph.search_nodes(keyword) == expected
+
+        # 检索之后新增的节点会增量加入索引
+        late = graph.add_node("source", "后加入的价格来源")
+        assert late.id in graph.search_nodes("价格")
+
+    def test_edge_and_type_indexes_survive_round_trip(self):
+        graph = Graph.from_dict(self._build_graph().to_dict())
+        section = graph.get_nodes_by_type("section")[0]
+
+        assert [e.relation for e in graph.get_edges_from(section.id)] == ["searched"]
+        assert [e.relation for e in graph.get_edges_to(section.id)] == ["contains"]
+        assert graph.get_stats()["source"] == 1
+
+    def test_query_engine_filters_indexed_matches(self):
+        from ReportEngine.graphrag.query_engine import QueryEngine, QueryParams
+
+        engine = QueryEngine(self._build_graph())
+        result = engine.query(QueryParams(keywords=["比亚迪"], engine_filter=["media"], depth=0))
+        assert [q["query_text"] for q in result.matched_queries] == ["比亚迪 降价"]
+        assert result.matched_sections == []
+
+        result = engine.query(QueryParams(keywords="", depth=0))
+        assert [s["title"] for s in result.matched_sections] == ["价格战与OpenAI舆论"]
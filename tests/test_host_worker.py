@@ -0,0 +1,98 @@
+"""
+测试ForumEngine/host_worker.py中的主持人发言后台生成
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from ForumEngine.host_worker import HostSpeechWorker
+
+
+def _wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TestHostSpeechWorker:
+    """测试主持人发言队列"""
+
+    def test_submit_does_not_block_and_keeps_order(self):
+        written = []
+        worker = HostSpeechWorker(lambda batch: f"主持人:{batch[0]}", written.append, max_pending=10)
+        try:
+            for i in range(5):
+                worker.submit([f"发言{i}"])
+            assert _wait_until(lambda: len(written) == 5)
+            assert written == [f"主持人:发言{i}" for i in range(5)]
+            metrics = worker.get_metrics()
+            assert metrics["completed"] == 5 and metrics["queue_depth"] == 0
+        finally:
+            worker.stop()
+
+    def test_discard_pending_drops_in_flight_result(self):
+        release = threading.Event()
+        started = threading.Event()
+        written = []
+
+        def slow_generate(batch):
+            started.set()
+            release.wait(5)
+            return "过期的主持人发言"
+
+        worker = HostSpeechWorker(slow_generate, written.append)
+        try:
+            worker.submit(["发言"])
+            assert started.wait(5)
+            worker.discard_pending()
+            release.set()
+            assert _wait_until(lambda: worker.get_metrics()["discarded"] == 1)
+            assert written == []
+        finally:
+            worker.stop()
+
+    def test_full_queue_drops_oldest_batch(self):
+        release = threading.Event()
+        written = []
+        worker = HostSpeechWorker(lambda batch: release.wait(5) and batch[0], written.append, max_pending=1)
+        try:
+            worker.submit(["占用工作线程"])
+            assert _wait_until(lambda: worker.get_metrics()["in_flight"])
+            worker.submit(["较早的批次"])
+            worker.submit(["最新的批次"])
+            release.set()
+            assert _wait_until(lambda: len(written) == 2)
+            assert written == ["占用工作线程", "最新的批次"]
+            assert worker.get_metrics()["dropped"] == 1
+        finally:
+            worker.stop()
+
+
+def test_clear_forum_log_discards_host_backlog_before_new_session(tmp_path):
+    from ForumEngine.monitor import LogMonitor
+
+    monitor = LogMonitor(log_dir=str(tmp_path))
+    (tmp_path / "forum.log").write_text("[10:00:00] [HOST] 上一会话\n", encoding="utf-8")
+    seen_at_discard = []
+
+    class _RecordingWorker:
+        def discard_pending(self):
+            # 丢弃积压时新会话的日志还不存在，旧发言不可能落进新日志
+            seen_at_discard.append((tmp_path / "forum.log").read_text(encoding="utf-8"))
+
+    monitor.host_worker = _RecordingWorker()
+    monitor.agent_speeches_buffer = ["旧发言"]
+    monitor.clear_forum_log()
+
+    assert seen_at_discard == ["[10:00:00] [HOST] 上一会话\n"]
+    assert monitor.agent_speeches_buffer == []
+    assert "ForumEngine 监控开始" in (tmp_path / "forum.log").read_text(encoding="utf-8")
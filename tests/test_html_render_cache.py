@@ -0,0 +1,98 @@
+"""
+测试ReportEngine/renderers/html_renderer.py中的章节片段与head缓存
+"""
+
+import copy
+import sys
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from ReportEngine.renderers import html_renderer
+from ReportEngine.renderers.html_renderer import HTMLRenderer
+
+
+def _build_document():
+    chapters = []
+    for index in range(1, 4):
+        chapters.append({
+            "chapterId": f"S{index}",
+            "anchor": f"section-{index}",
+            "title": f"第{index}章",
+            "order": index,
+            "blocks": [
+                {"type": "heading", "level": 2, "text": f"第{index}章", "anchor": f"section-{index}"},
+                {"type": "paragraph", "inlines": [{"text": f"正文{index}"}]},
+                {
+                    "type": "widget",
+                    "widgetId": f"chart-{index}",
+                    "widgetType": "chart.js/bar",
+                    "props": {"type": "bar", "title": f"图表{index}"},
+                    "data": {"labels": ["A", "B"], "datasets": [{"label": "量", "data": [index, 2]}]},
+                },
+            ],
+        })
+    return {
+        "reportId": "report-cache",
+        "metadata": {"title": "缓存测试", "themeTokens": {"colors": {"primary": "#123456"}}},
+        "chapters": chapters,
+    }
+
+
+class TestHTMLRenderCache:
+    """测试跨实例复用的章节片段缓存"""
+
+    def setup_method(self):
+        html_renderer.clear_render_cache()
+
+    def test_only_changed_chapters_are_rerendered(self, monkeypatch):
+        document = _build_document()
+        rendered = []
+        original = HTMLRenderer._render_chapter
+
+        def spy(self, chapter):
+            rendered.append(chapter.get("chapterId"))
+            return original(self, chapter)
+
+        monkeypatch.setattr(HTMLRenderer, "_render_chapter", spy)
+
+        first = HTMLRenderer().render(copy.deepcopy(document))
+        assert rendered == ["S1", "S2", "S3"]
+
+        rendered.clear()
+        assert HTMLRenderer().render(copy.deepcopy(document)) == first
+        assert rendered == []
+
+        changed = copy.deepcopy(document)
+        changed["chapters"][1]["blocks"][1]["inlines"][0]["text"] = "改写后的正文"
+        rendered.clear()
+        partial = HTMLRenderer().render(copy.deepcopy(changed))
+        assert rendered == ["S2"]
+        assert "改写后的正文" in partial
+
+        html_renderer.clear_render_cache()
+        assert HTMLRenderer().render(copy.deepcopy(changed)) == partial
+
+    def test_chart_ids_shift_invalidates_following_chapters(self, monkeypatch):
+        document = _build_document()
+        HTMLRenderer().render(copy.deepcopy(document))
+
+        rendered = []
+        original = HTMLRenderer._render_chapter
+
+        def spy(self, chapter):
+            rendered.append(chapter.get("chapterId"))
+            return original(self, chapter)
+
+        monkeypatch.setattr(HTMLRenderer, "_render_chapter", spy)
+
+        # 第一章新增图表后，后续章节的canvas编号整体后移，必须重新渲染
+        changed = copy.deepcopy(document)
+        extra_chart = copy.deepcopy(changed["chapters"][0]["blocks"][2])
+        extra_chart["widgetId"] = "chart-extra"
+        changed["chapters"][0]["blocks"].append(extra_chart)
+        html = HTMLRenderer().render(changed)
+        assert rendered == ["S1", "S2", "S3"]
+        assert html.count('<canvas id="chart-') == 4
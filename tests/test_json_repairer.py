@@ -0,0 +1,78 @@
+"""
+测试ReportEngine/utils/json_repairer.py的单遍JSON修复与快速路径
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from ReportEngine.utils.json_parser import RobustJSONParser
+from ReportEngine.utils.json_repairer import fast_loads, repair_json_text
+
+
+def test_valid_json_is_returned_untouched():
+    data = {
+        "chapterId": "S1",
+        "blocks": [{"type": "paragraph", "inlines": [{"text": "他说\"你好\" {不是括号} \\alpha\n"}]}],
+        "rows": [[[1, -2.5e3]], [], {}],
+        "flags": [True, False, None],
+    }
+    for indent in (None, 2):
+        text = json.dumps(data, ensure_ascii=False, indent=indent)
+        result = repair_json_text(text)
+        assert not result.mutated and result.text == text
+    assert fast_loads(text) == data
+
+
+@pytest.mark.parametrize(
+    "text, expected, fix",
+    [
+        ('{"text": "第一行\n第二行\t结束"}', {"text": "第一行\n第二行\t结束"}, "control_chars"),
+        ('{"math": "$\\alpha$"}', {"math": "$\\alpha$"}, "invalid_escape"),
+        ('{"text": "他说"你好"。", "n": 1}', {"text": "他说\"你好\"。", "n": 1}, "inner_quote"),
+        ('{"name":= "test"}', {"name": "test"}, "colon_equals"),
+        ('{"a": [1 2 "x" {"b": 3}] "c": "d"}', {"a": [1, 2, "x", {"b": 3}], "c": "d"}, "missing_comma"),
+        ('{"items": [1, 2,,], "name": "t",}', {"items": [1, 2], "name": "t"}, "extra_comma"),
+        ('{"a": {"b": [1]]}}', {"a": {"b": [1]}}, "stray_closer"),
+        ('{chapterId: "S1", ok: True, v: None}', {"chapterId": "S1", "ok": True, "v": None}, "bare_key"),
+        # 引号后紧跟数字/字面量/裸键是缺逗号，不能当作正文里的裸引号吞掉后续内容
+        ('{"v": ["甲" 12.5, "乙" 3]}', {"v": ["甲", 12.5, "乙", 3]}, "missing_comma"),
+        ('{"v": ["x" true "y" null]}', {"v": ["x", True, "y", None]}, "missing_comma"),
+        ('{"a": "x" b: 1}', {"a": "x", "b": 1}, "missing_comma"),
+        ('{"t": "增长"30%"以上"}', {"t": "增长\"30%\"以上"}, "inner_quote"),
+    ],
+)
+def test_each_error_class_is_fixed_in_one_pass(text, expected, fix):
+    result = repair_json_text(text)
+    assert fix in result.fixes
+    assert fast_loads(result.text) == expected
+
+
+def test_truncated_output_is_closed():
+    result = repair_json_text('{"blocks": [{"type": "paragraph", "text": "被截断的句子')
+    assert fast_loads(result.text) == {"blocks": [{"type": "paragraph", "text": "被截断的句子"}]}
+    assert fast_loads(repair_json_text('{"a": 1, "b":').text) == {"a": 1, "b": None}
+
+    nested = repair_json_text('{"rows": [[[1, 2], [3, 4]]]}', collapse_nested_arrays=True)
+    assert fast_loads(nested.text) == {"rows": [[1, 2], [3, 4]]}
+
+
+def test_parser_and_node_share_the_repair_pass(tmp_path):
+    parser = RobustJSONParser(enable_json_repair=False, enable_llm_repair=False)
+    broken = '```json\n{"chapterId": "S1", "title": "t", "blocks": [{"type": "paragraph" "text": "a\nb"},]\n```'
+    assert parser.parse(broken, "测试")["blocks"] == [{"type": "paragraph", "text": "a\nb"}]
+
+    from ReportEngine.core import ChapterStorage
+    from ReportEngine.ir import IRValidator
+    from ReportEngine.nodes.chapter_generation_node import ChapterGenerationNode
+
+    node = ChapterGenerationNode(None, IRValidator(), ChapterStorage(str(tmp_path / "chapters")),
+                                 error_log_dir=tmp_path / "errors")
+    chapter = node._parse_chapter(broken)
+    assert chapter["chapterId"] == "S1" and chapter["blocks"][0]["text"] == "a\nb"
@@ -0,0 +1,98 @@
+"""
+测试ForumEngine/log_tailer.py中的增量读取与文件变化监听
+"""
+
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from ForumEngine.log_tailer import LogTailer, LogWatcher
+
+
+class TestLogTailer:
+    """测试按字节偏移的增量读取"""
+
+    def test_reads_only_appended_lines(self, tmp_path):
+        log_file = tmp_path / "insight.log"
+        log_file.write_text("旧内容\n", encoding="utf-8")
+        tailer = LogTailer()
+        tailer.seek_to_end("insight", log_file)
+
+        with open(log_file, "a", encoding="utf-8") as f:
+            f.write("第一行\n\n第二行\n")
+        assert tailer.read("insight", log_file).lines == ["第一行", "第二行"]
+        assert tailer.read("insight", log_file).lines == []
+
+    def test_partial_line_is_kept_until_complete(self, tmp_path):
+        log_file = tmp_path / "query.log"
+        log_file.write_bytes(b"")
+        tailer = LogTailer()
+        tailer.seek_to_end("query", log_file)
+
+        data = "完整的一行\n".encode("utf-8")
+        with open(log_file, "ab") as f:
+            f.write(data[:4])  # 截断在多字节字符中间
+        assert tailer.read("query", log_file).lines == []
+        with open(log_file, "ab") as f:
+            f.write(data[4:])
+        assert tailer.read("query", log_file).lines == ["完整的一行"]
+
+    def test_truncation_resets_to_new_end(self, tmp_path):
+        log_file = tmp_path / "media.log"
+        log_file.write_text("a\nb\nc\n", encoding="utf-8")
+        tailer = LogTailer()
+        tailer.seek_to_end("media", log_file)
+
+        log_file.write_text("=== 新的开始 ===\n", encoding="utf-8")
+        result = tailer.read("media", log_file)
+        assert result.truncated and result.lines == []
+
+        with open(log_file, "a", encoding="utf-8") as f:
+            f.write("新会话\n")
+        assert tailer.read("media", log_file).lines == ["新会话"]
+
+    def test_rotation_reads_new_file_from_start(self, tmp_path):
+        log_file = tmp_path / "insight.log"
+        log_file.write_text("旧文件\n", encoding="utf-8")
+        tailer = LogTailer()
+        tailer.seek_to_end("insight", log_file)
+
+        os.rename(log_file, tmp_path / "insight.log.1")
+        log_file.write_text("轮转后第一行\n", encoding="utf-8")
+        result = tailer.read("insight", log_file)
+        assert not result.truncated
+        assert result.lines == ["轮转后第一行"]
+
+
+class TestLogWatcher:
+    """测试文件变化监听"""
+
+    def test_wait_wakes_on_monitored_file(self, tmp_path):
+        watcher = LogWatcher(tmp_path, ["insight.log"])
+        try:
+            def append():
+                time.sleep(0.2)
+                with open(tmp_path / "insight.log", "a", encoding="utf-8") as f:
+                    f.write("x\n")
+
+            threading.Thread(target=append).start()
+            start = time.monotonic()
+            assert watcher.wait(5.0)
+            assert time.monotonic() - start < 4.0
+        finally:
+            watcher.close()
+
+    def test_wait_ignores_other_files(self, tmp_path):
+        watcher = LogWatcher(tmp_path, ["insight.log"])
+        try:
+            (tmp_path / "forum.log").write_text("x\n", encoding="utf-8")
+            if watcher.uses_inotify:
+                assert not watcher.wait(0.3)
+        finally:
+            watcher.close()
@@ -326,6 +326,23 @@ class TestLogMonitor:
         assert not any("JSON解析失败" in content for content in result)
         assert not any("JSON修复失败" in content for content in result)
 
+    def test_interleaved_paragraph_logs_do_not_corrupt_json(self):
+        """测试并行段落：其他段落的日志插入正在捕获的JSON时不混入该JSON"""
+        lines = [
+            "2025-11-06 10:56:41.626 | INFO     | InsightEngine.nodes.summary_node:process_output:131 - [段落 1] 清理后的输出: {",
+            "\"paragraph_latest_state\": \"段落一的总结\"",
+            "2025-11-06 10:56:41.700 | INFO     | InsightEngine.agent:_initial_search_and_summary:760 - [段落 2]   - 执行数据库查询...",
+            "}",
+        ]
+        result = self.monitor.process_lines_for_json(lines, "insight")
+        assert result == ["段落一的总结"]
+
+    def test_paragraph_tag_removed_from_node_content(self):
+        """测试带段落前缀的SummaryNode日志提取内容时去掉前缀"""
+        line = "2025-11-06 10:55:19.563 | INFO     | InsightEngine.nodes.summary_node:run:100 - [段落 2] 正在生成首次段落总结: 《市场反应》"
+        assert self.monitor.get_paragraph_tag(line) == "2"
+        assert self.monitor.extract_node_content(line) == "正在生成首次段落总结: 《市场反应》"
+
 
 def run_tests():
     """运行所有测试"""
@@ -0,0 +1,154 @@
+"""
+测试utils/prompt_cache.py中的前缀稳定提示词布局与缓存token统计
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import httpx
+from openai import BadRequestError
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.prompt_cache import PromptCacheStats, cache_hint_params, extract_cached_tokens, time_note
+from ReportEngine.llms import LLMClient
+from ReportEngine.prompts.prompts import build_chapter_user_prompt
+
+
+def _chapter_payload(order: int, layout_keys):
+    layout = {key: f"{key}-value" for key in layout_keys}
+    return {
+        "section": {"chapterId": f"S{order}", "title": f"第{order}章"},
+        "globalContext": {"query": "新能源汽车", "layout": layout, "themeTokens": {"primary": "#123"}},
+        "reports": {"query_engine": "完整报告", "media_engine": "", "insight_engine": ""},
+        "forumLogs": "论坛记录",
+        "constraints": {"wordTarget": 1000 * order},
+        "wordPlan": {"totalWords": 8000},
+    }
+
+
+def test_chapter_prompts_share_a_byte_identical_prefix():
+    first = build_chapter_user_prompt(_chapter_payload(1, ["title", "hero"]))
+    # 共享上下文的字典构造顺序不同，也不影响前缀
+    second = build_chapter_user_prompt(_chapter_payload(2, ["hero", "title"]))
+
+    prefix_end = first.index('"section"')
+    assert first[:prefix_end] == second[:prefix_end]
+    assert "完整报告" in first[:prefix_end]
+    assert "第1章" in first[prefix_end:]
+
+    # 章节检索模式下 reports 随章节变化，不再属于共享前缀
+    retrieved = _chapter_payload(1, ["title"])
+    retrieved["contextRetrieval"] = {"selectedChunks": 1}
+    text = build_chapter_user_prompt(retrieved)
+    assert text.index('"reports"') > text.index('"section"')
+
+
+def test_usage_parsing_supports_openai_and_deepseek():
+    openai_usage = SimpleNamespace(prompt_tokens=1000, completion_tokens=10,
+                                   prompt_tokens_details=SimpleNamespace(cached_tokens=768))
+    deepseek_usage = {"prompt_tokens": 500, "completion_tokens": 5, "prompt_cache_hit_tokens": 448}
+    assert extract_cached_tokens(openai_usage) == 768
+    assert extract_cached_tokens(deepseek_usage) == 448
+    assert extract_cached_tokens(SimpleNamespace(prompt_tokens=3)) == 0
+
+    stats = PromptCacheStats()
+    stats.record(openai_usage)
+    stats.record(deepseek_usage)
+    snapshot = stats.snapshot()
+    assert snapshot["requests"] == 2
+    assert snapshot["cached_tokens"] == 1216
+    assert snapshot["cache_hit_rate"] == round(1216 / 1500, 4)
+
+    assert cache_hint_params() == {}
+    assert cache_hint_params("report-1", {"cache_salt": "s"}) == {
+        "extra_body": {"cache_salt": "s", "prompt_cache_key": "report-1"}
+    }
+
+
+class _FakeCompletions:
+    def __init__(self):
+        self.calls = []
+
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        usage = SimpleNamespace(prompt_tokens=100, completion_tokens=2,
+                                prompt_tokens_details=SimpleNamespace(cached_tokens=64))
+        delta = SimpleNamespace(content="ok")
+        return iter([
+            SimpleNamespace(choices=[SimpleNamespace(delta=delta)], usage=None),
+            SimpleNamespace(choices=[], usage=usage),
+        ])
+
+
+def test_stream_records_cached_tokens_and_passes_hints():
+    client = LLMClient(api_key="test", model_name="test-model", base_url="http://localhost:1")
+    completions = _FakeCompletions()
+    client.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+    assert client.stream_invoke_to_string("系统", "用户", cache_key="report-1") == "ok"
+    call = completions.calls[0]
+    assert call["stream_options"] == {"include_usage": True}
+    assert call["extra_body"] == {"prompt_cache_key": "report-1"}
+    assert client.cache_stats.snapshot()["cached_tokens"] == 64
+
+
+class _NoStreamOptionsCompletions(_FakeCompletions):
+    def create(self, **kwargs):
+        if "stream_options" in kwargs:
+            self.calls.append(kwargs)
+            request = httpx.Request("POST", "http://localhost:1/chat/completions")
+            raise BadRequestError("Unrecognized request argument: stream_options",
+                                  response=httpx.Response(400, request=request), body=None)
+        return super().create(**kwargs)
+
+
+def test_stream_falls_back_when_stream_options_is_unsupported():
+    client = LLMClient(api_key="test", model_name="test-model", base_url="http://localhost:1")
+    completions = _NoStreamOptionsCompletions()
+    client.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+    assert client.stream_invoke_to_string("系统", "用户") == "ok"
+    assert client.stream_usage is False
+    assert "stream_options" not in completions.calls[-1]
+
+    # 之后的请求不再携带 stream_options
+    assert client.stream_invoke_to_string("系统", "用户") == "ok"
+    assert len(completions.calls) == 3
+    assert time_note().startswith("今天的实际时间是")
+
+
+class _RecordingLLM:
+    def __init__(self):
+        self.messages = []
+
+    def stream_invoke_to_string(self, system_prompt, user_prompt):
+        self.messages.append(user_prompt)
+        return '{"paragraph_latest_state": "ok"}'
+
+
+def test_summary_prompts_put_shared_context_first(monkeypatch):
+    from tests.insight_modules import load_insight_module
+
+    summary_node = load_insight_module("InsightEngine.nodes.summary_node")
+    monkeypatch.setattr(summary_node, "FORUM_READER_AVAILABLE", True)
+    monkeypatch.setattr(summary_node, "get_latest_host_speech", lambda: "主持人引导")
+    llm = _RecordingLLM()
+    node = summary_node.ReflectionSummaryNode(llm)
+    for round_i in range(2):
+        node.run({
+            "title": "市场反应",
+            "content": "段落要点",
+            "search_query": f"查询{round_i}",
+            "search_results": [f"结果{round_i}"],
+            "paragraph_latest_state": f"第{round_i}轮总结",
+        })
+
+    first, second = llm.messages
+    shared = summary_node.format_host_speech_for_prompt("主持人引导") + "\n" + \
+        '{"host_speech": "主持人引导", "title": "市场反应", "content": "段落要点", '
+    assert first.startswith(shared) and second.startswith(shared)
+    assert first.index('"search_query"') > first.index('"content"')
@@ -0,0 +1,117 @@
+"""
+测试ReportEngine/renderers/render_cache.py中的PDF图表/公式渲染缓存
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from ReportEngine.renderers import render_cache
+from ReportEngine.renderers.render_cache import RenderCache, RenderJob, render_jobs, shutdown_render_pool
+
+
+def _chart_job(target_id: str, values):
+    return RenderJob(target_id, "chart", {
+        "widget": {
+            "widgetType": "chart.js/bar",
+            "props": {"type": "bar"},
+            "data": {"labels": ["a", "b"], "datasets": [{"label": "x", "data": values}]},
+        },
+        "width": 800,
+        "height": 500,
+        "dpi": 100,
+    })
+
+
+def test_digest_ignores_key_order():
+    left = RenderCache.make_digest("math", {"latex": "x^2", "display": True}, "font.otf")
+    right = RenderCache.make_digest("math", {"display": True, "latex": "x^2"}, "font.otf")
+    assert left == right
+    assert left != RenderCache.make_digest("math", {"latex": "x^2", "display": False}, "font.otf")
+    assert left != RenderCache.make_digest("math", {"latex": "x^2", "display": True}, "other.otf")
+
+
+def test_repeat_render_is_served_from_cache(tmp_path):
+    rendered = []
+
+    def fake_render(job):
+        rendered.append(job.target_id)
+        return None if job.target_id == "bad" else f"<svg>{job.target_id}</svg>"
+
+    def make_jobs():
+        # 同内容的两个图表只渲染一次，渲染失败的结果不缓存
+        return [_chart_job("c1", [1, 2]), _chart_job("c2", [1, 2]), _chart_job("c3", [3, 4]), _chart_job("bad", [5])]
+
+    cache = RenderCache(tmp_path)
+    first = render_jobs(make_jobs(), cache, "font.otf", workers=1, local_render=fake_render)
+    assert sorted(rendered) == ["bad", "c1", "c3"]
+    assert first == {"c1": "<svg>c1</svg>", "c2": "<svg>c1</svg>", "c3": "<svg>c3</svg>"}
+
+    rendered.clear()
+    second = render_jobs(make_jobs(), cache, "font.otf", workers=1, local_render=fake_render)
+    assert rendered == ["bad"]
+    assert second == first
+
+    rendered.clear()
+    disabled = render_jobs(make_jobs(), RenderCache(tmp_path, enabled=False), "font.otf",
+                           workers=1, local_render=fake_render)
+    assert sorted(rendered) == ["bad", "c1", "c3"]
+    assert disabled == first
+
+
+def _slow_render(kind, payload, font_path):
+    # 进程池工作函数：按载荷模拟卡死的渲染
+    time.sleep(payload.get("sleep", 0))
+    return f"<svg>{payload['name']}</svg>"
+
+
+def test_pool_wait_is_bounded_and_stuck_pool_is_discarded(tmp_path, monkeypatch):
+    monkeypatch.setattr(render_cache, "render_payload", _slow_render)
+    jobs = [RenderJob("fast", "chart", {"name": "fast"}), RenderJob("stuck", "chart", {"name": "stuck", "sleep": 60})]
+    try:
+        # 先预热进程池，超时只衡量渲染本身而不是spawn子进程的导入耗时
+        warmup = [RenderJob("w1", "chart", {"name": "w1"}), RenderJob("w2", "chart", {"name": "w2"})]
+        assert len(render_jobs(warmup, RenderCache(tmp_path, enabled=False), "font.otf", workers=2)) == 2
+
+        start = time.perf_counter()
+        results = render_jobs(jobs, RenderCache(tmp_path), "font.otf", workers=2,
+                              local_render=lambda job: "<svg>local</svg>", timeout=1)
+        assert time.perf_counter() - start < 10
+        assert results == {"fast": "<svg>fast</svg>"}
+        assert render_cache._pool is None
+    finally:
+        shutdown_render_pool()
+
+
+def test_concurrent_exports_share_one_pool_without_cancelling_each_other(tmp_path, monkeypatch):
+    monkeypatch.setattr(render_cache, "render_payload", _slow_render)
+    local_rendered = []
+
+    def local(job):
+        local_rendered.append(job.target_id)
+        return f"<svg>{job.payload['name']}</svg>"
+
+    big = [RenderJob(f"b{i}", "chart", {"name": f"b{i}", "sleep": 0.2}) for i in range(12)]
+    small = [RenderJob(f"s{i}", "chart", {"name": f"s{i}"}) for i in range(2)]
+    outputs = {}
+    try:
+        first = threading.Thread(target=lambda: outputs.setdefault("big", render_jobs(
+            big, RenderCache(tmp_path / "a"), "font.otf", workers=4, local_render=local)))
+        first.start()
+        time.sleep(0.1)
+        pool = render_cache._pool
+        outputs["small"] = render_jobs(small, RenderCache(tmp_path / "b"), "font.otf", workers=4, local_render=local)
+        first.join(60)
+
+        # 任务数不同也不会重建进程池，两次导出都完整拿到结果
+        assert render_cache._pool is pool is not None
+        assert outputs["big"] == {job.target_id: f"<svg>{job.target_id}</svg>" for job in big}
+        assert outputs["small"] == {job.target_id: f"<svg>{job.target_id}</svg>" for job in small}
+        assert local_rendered == []
+    finally:
+        shutdown_render_pool()
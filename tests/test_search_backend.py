@@ -0,0 +1,52 @@
+"""
+测试InsightEngine/tools/search_backend.py中检索后端的方言选择与标识符引用
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from tests.insight_modules import load_insight_module
+
+search_backend = load_insight_module("InsightEngine.tools.search_backend")
+
+
+@pytest.fixture
+def configure(monkeypatch):
+    def apply(dialect, mode="auto"):
+        monkeypatch.setattr(search_backend.settings, "DB_DIALECT", dialect)
+        monkeypatch.setattr(search_backend.settings, "INSIGHT_SEARCH_BACKEND", mode)
+        monkeypatch.setattr(search_backend, "_backend", None)
+        return search_backend.get_search_backend()
+    return apply
+
+
+@pytest.mark.parametrize("dialect", ["postgresql", "postgres", "PostgreSQL", "postgresql+asyncpg"])
+def test_postgres_aliases_use_double_quotes(configure, dialect):
+    backend = configure(dialect)
+
+    assert backend.name == "like"
+    assert backend.dialect == "postgresql"
+    clause, params = backend.build_clause("weibo_note", ["content"], "新能源")
+    assert clause == '("content" LIKE :term_0)'
+    assert params == {"term_0": "%新能源%"}
+
+
+@pytest.mark.parametrize("dialect", [None, "mysql", "MySQL", "mysql+aiomysql"])
+def test_mysql_uses_fulltext_backend_and_backticks(configure, dialect):
+    backend = configure(dialect)
+
+    assert backend.name == "mysql_fulltext"
+    assert backend.quote("content") == "`content`"
+
+
+def test_like_mode_is_respected_for_mysql(configure):
+    backend = configure("mysql", mode="like")
+
+    assert backend.name == "like"
+    assert backend.quote("content") == "`content`"
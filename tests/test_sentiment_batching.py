@@ -0,0 +1,107 @@
+"""
+测试InsightEngine/tools/sentiment_analyzer.py中按长度分桶的小批量推理
+
+用极小的桩分词器/桩模型代替真实模型：批量推理（排序、分批、填充到批内最长）
+与逐条推理得到的标签和概率必须一致。
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from tests.insight_modules import load_insight_module
+
+sentiment_analyzer = load_insight_module("InsightEngine.tools.sentiment_analyzer")
+
+
+class StubTokenizer:
+    """按字符编码的分词器，接口与transformers分词器的 __call__ / pad 一致"""
+
+    def __call__(self, texts, max_length=512, truncation=True):
+        input_ids = [[ord(ch) % 97 + 1 for ch in text][:max_length] for text in texts]
+        return {
+            "input_ids": input_ids,
+            "attention_mask": [[1] * len(ids) for ids in input_ids],
+        }
+
+    def pad(self, features, padding=True, return_tensors="np"):
+        width = max(len(feature["input_ids"]) for feature in features)
+        return {
+            key: np.array([feature[key] + [0] * (width - len(feature[key])) for feature in features])
+            for key in ("input_ids", "attention_mask")
+        }
+
+
+class StubModel:
+    """只看attention_mask内token的5分类模型，记录每批的输入形状"""
+
+    def __init__(self):
+        self.batch_shapes = []
+
+    def predict_proba(self, inputs):
+        ids = inputs["input_ids"].astype(np.float64)
+        mask = inputs["attention_mask"].astype(np.float64)
+        self.batch_shapes.append(ids.shape)
+        mean = (ids * mask).sum(axis=1) / mask.sum(axis=1)
+        length = mask.sum(axis=1)
+        logits = np.stack([np.sin((k + 1) * mean / 7.0) + 0.1 * k * np.log(length) for k in range(5)], axis=1)
+        exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+        return (exp / exp.sum(axis=1, keepdims=True)).tolist()
+
+
+@pytest.fixture
+def analyzer():
+    instance = sentiment_analyzer.WeiboMultilingualSentimentAnalyzer()
+    instance.cache = None
+    instance.tokenizer = StubTokenizer()
+    instance.onnx_model = StubModel()
+    instance.inference_backend = "onnx"
+    instance.is_disabled = False
+    instance.is_initialized = True
+    return instance
+
+
+TEXTS = [
+    "服务态度太差了，很失望",
+    "好",
+    "I absolutely love this product, would buy it again and again!",
+    "",
+    "还行吧",
+    "服务态度太差了，很失望",
+    "The customer service was disappointing.",
+    "简直是灾难，再也不会来了，这是我经历过最糟糕的一次购物",
+]
+
+
+class TestBatchedSentimentInference:
+    """批量推理与单条推理结果一致"""
+
+    def test_batch_matches_single_text(self, analyzer):
+        batch = analyzer.analyze_batch(TEXTS, show_progress=False, batch_size=3)
+        singles = [analyzer.analyze_single_text(text) for text in TEXTS]
+
+        assert len(batch.results) == len(TEXTS)
+        for batched, single in zip(batch.results, singles):
+            assert batched.text == single.text
+            assert batched.success == single.success
+            assert batched.sentiment_label == single.sentiment_label
+            assert batched.confidence == pytest.approx(single.confidence, abs=1e-9)
+            assert batched.probability_distribution == pytest.approx(single.probability_distribution, abs=1e-9)
+        assert batch.success_count == len(TEXTS) - 1
+        assert batch.failed_count == 1
+
+    def test_batches_are_length_bucketed_and_deduplicated(self, analyzer):
+        analyzer.analyze_batch(TEXTS, show_progress=False, batch_size=3)
+        shapes = analyzer.onnx_model.batch_shapes
+
+        # 空文本不进模型，重复文本只推理一次：6条唯一文本分成2批
+        assert [rows for rows, _ in shapes] == [3, 3]
+        # 按长度排序后分批，第一批只填充到批内最长（短文本在一起）
+        lengths = sorted(len(text) for text in dict.fromkeys(TEXTS) if text)
+        assert [width for _, width in shapes] == [lengths[2], lengths[5]]
@@ -0,0 +1,121 @@
+"""
+测试InsightEngine/tools/sentiment_cache.py中的情感分析结果缓存
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from tests.insight_modules import load_insight_module
+
+sentiment_cache = load_insight_module("InsightEngine.tools.sentiment_cache")
+SentimentResultCache = sentiment_cache.SentimentResultCache
+
+PROBS_A = [0.1, 0.2, 0.4, 0.2, 0.1]
+PROBS_B = [0.7, 0.1, 0.1, 0.05, 0.05]
+
+
+class FakeClock:
+    """单调递增的时钟，使LRU顺序不依赖真实时间精度"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        self.now += 1.0
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(sentiment_cache, "time", fake)
+    return fake
+
+
+@pytest.fixture
+def cache(tmp_path):
+    instance = SentimentResultCache(str(tmp_path / "sentiment_cache.db"), "model-a", max_entries=100)
+    yield instance
+    instance.close()
+
+
+class TestSentimentResultCache:
+    """情感分析缓存的命中、淘汰与持久化"""
+
+    def test_hit_and_miss(self, cache):
+        hit_key = cache.make_key("服务太差了")
+        miss_key = cache.make_key("还行吧")
+        cache.put_many({hit_key: PROBS_A})
+
+        found = cache.get_many([hit_key, miss_key])
+
+        assert found == {hit_key: PROBS_A}
+
+    def test_counters_count_unique_keys(self, cache):
+        key = cache.make_key("服务太差了")
+        cache.put_many({key: PROBS_A})
+
+        cache.get_many([key, key, cache.make_key("还行吧")])
+        cache.get_many([cache.make_key("一般")])
+
+        assert (cache.hits, cache.misses) == (1, 2)
+        stats = cache.stats()
+        assert stats["hits"] == 1 and stats["misses"] == 2
+        assert stats["hit_rate"] == pytest.approx(1 / 3, abs=1e-4)
+
+    def test_put_replaces_existing_entry(self, cache):
+        key = cache.make_key("服务太差了")
+        cache.put_many({key: PROBS_A})
+        cache.put_many({key: PROBS_B})
+
+        assert cache.get_many([key]) == {key: PROBS_B}
+
+    def test_lru_eviction_keeps_recently_read_entries(self, tmp_path, clock):
+        cache = SentimentResultCache(str(tmp_path / "lru.db"), "model-a", max_entries=10)
+        keys = [cache.make_key(f"文本{i}") for i in range(11)]
+        for key in keys[:10]:
+            cache.put_many({key: PROBS_A})
+        # 读取最早写入的条目，刷新其访问时间
+        cache.get_many([keys[0]])
+
+        # 超过上限后淘汰到 max_entries * (1 - EVICTION_SLACK) 条，最久未访问的先删
+        cache.put_many({keys[10]: PROBS_B})
+
+        remaining = cache.get_many(keys)
+        cache.close()
+        assert len(remaining) == 9
+        assert keys[0] in remaining and keys[10] in remaining
+        assert keys[1] not in remaining and keys[2] not in remaining
+
+    def test_entries_persist_across_instances(self, tmp_path):
+        db_path = str(tmp_path / "persist.db")
+        writer = SentimentResultCache(db_path, "model-a")
+        key = writer.make_key("今天心情很好")
+        writer.put_many({key: PROBS_A})
+        writer.close()
+
+        reader = SentimentResultCache(db_path, "model-a")
+        try:
+            assert reader.get_many([reader.make_key("今天心情很好")]) == {key: PROBS_A}
+        finally:
+            reader.close()
+
+    def test_keys_are_isolated_by_model(self, tmp_path):
+        db_path = str(tmp_path / "shared.db")
+        cache_a = SentimentResultCache(db_path, "model-a")
+        cache_b = SentimentResultCache(db_path, "model-a#onnx-int8")
+        try:
+            cache_a.put_many({cache_a.make_key("今天心情很好"): PROBS_A})
+
+            assert cache_a.make_key("今天心情很好") != cache_b.make_key("今天心情很好")
+            assert cache_b.get_many([cache_b.make_key("今天心情很好")]) == {}
+            assert cache_b.misses == 1
+        finally:
+            cache_a.close()
+            cache_b.close()
@@ -0,0 +1,155 @@
+"""
+测试ReportEngine/utils/streaming_json.py的增量扫描以及章节生成的流式校验/提前中止
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from ReportEngine.core import ChapterStorage
+from ReportEngine.ir import IRValidator
+from ReportEngine.nodes.chapter_generation_node import ChapterGenerationNode, ChapterStreamAbortedError
+from ReportEngine.utils.streaming_json import StreamingJSONScanner
+
+
+def _chapter_text():
+    chapter = {
+        "chapter": {
+            "chapterId": "S1",
+            "title": "价格战",
+            "anchor": "price",
+            "order": 1,
+            "blocks": [
+                {"type": "heading", "level": 2, "text": "价格战", "anchor": "price"},
+                {"type": "paragraph", "inlines": [{"text": "比亚迪降价 {不是括号} \"引号\""}]},
+                {
+                    "type": "callout",
+                    "tone": "info",
+                    "blocks": [{"type": "paragraph", "inlines": [{"text": "嵌套块"}]}],
+                },
+            ],
+        }
+    }
+    return "```json\n" + json.dumps(chapter, ensure_ascii=False, indent=2) + "\n```"
+
+
+def _chunks(text, size=7):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def test_top_level_blocks_are_emitted_as_they_close():
+    scanner = StreamingJSONScanner()
+    emitted = []
+    for delta in _chunks(_chapter_text()):
+        emitted.extend(scanner.feed(delta))
+
+    assert [index for index, _ in emitted] == [0, 1, 2]
+    emitted = [block for _, block in emitted]
+    assert [block["type"] for block in emitted] == ["heading", "paragraph", "callout"]
+    assert emitted[1]["inlines"][0]["text"] == "比亚迪降价 {不是括号} \"引号\""
+    assert scanner.complete and scanner.failure is None
+    assert scanner.stray_chars == 0
+
+
+def test_markdown_switch_fails_before_stream_ends():
+    text = '{"chapterId": "S1", "title": "t", "blocks": [\n' + "## 市场概况\n" + "这是一段本应写在JSON字符串里的正文。" * 30
+    scanner = StreamingJSONScanner()
+    for delta in _chunks(text):
+        scanner.feed(delta)
+        if scanner.failure:
+            break
+    assert scanner.failure
+    assert scanner.position < len(text)
+
+    # 少量可修复的问题（Python字面量、多余右括号）只计数不判失败
+    tolerant = StreamingJSONScanner()
+    tolerant.feed('{"blocks": [{"type": "paragraph", "ok": True}]}]}')
+    assert tolerant.failure is None
+    assert tolerant.mismatched_closers == 0 and tolerant.stray_chars == 4
+
+
+def test_unescaped_inner_quote_does_not_flip_string_state():
+    prose = "同比增长6.1\"，主要由于以旧换新政策带动终端需求回暖，" * 8
+    text = (
+        '{"chapterId": "S1", "blocks": ['
+        '{"type": "paragraph", "inlines": [{"text": "' + prose + '"}]}, '
+        '{"type": "heading", "text": "甲" "anchor": "a"}, '
+        '{"type": "list", "items": ["乙" 12.5, "丙" true]}]}'
+    )
+    scanner = StreamingJSONScanner()
+    emitted = []
+    for delta in _chunks(text):
+        emitted.extend(scanner.feed(delta))
+
+    assert scanner.failure is None and scanner.complete
+    assert scanner.stray_chars == 0 and scanner.inner_quotes == 8
+    # 含裸引号/缺逗号的block经单遍修复后照常推送，序号不因修复而错位
+    assert [index for index, _ in emitted] == [0, 1, 2]
+    assert emitted[0][1]["inlines"][0]["text"] == prose
+    assert emitted[2][1]["items"] == ["乙", 12.5, "丙", True]
+
+    # 单个delta中闭合多个block时各自拿到正确序号，解析失败的block也占用序号
+    batch = StreamingJSONScanner()
+    blocks = batch.feed('{"blocks": [{"a": 1}, {"b": @@}, {"c": 3}]}')
+    assert [(index, block) for index, block in blocks] == [(0, {"a": 1}), (2, {"c": 3})]
+    assert batch.unparsed_blocks == 1
+
+
+class _FakeLLM:
+    def __init__(self, text):
+        self.text = text
+        self.consumed = 0
+        self.closed = False
+
+    def stream_invoke(self, system_prompt, user_prompt, **kwargs):
+        try:
+            for delta in _chunks(self.text):
+                self.consumed += len(delta)
+                yield delta
+        finally:
+            self.closed = True
+
+
+def _node(tmp_path, llm):
+    return ChapterGenerationNode(llm, IRValidator(), ChapterStorage(str(tmp_path / "chapters")),
+                                 error_log_dir=tmp_path / "errors")
+
+
+def test_stream_llm_pushes_validated_blocks(tmp_path):
+    llm = _FakeLLM(_chapter_text())
+    node = _node(tmp_path, llm)
+    pushed = []
+    chapter_dir = tmp_path / "chapter"
+    chapter_dir.mkdir()
+
+    raw = node._stream_llm("prompt", chapter_dir, block_callback=lambda payload, meta: pushed.append(payload),
+                           abort_on_stream_error=True, section_meta={"chapterId": "S1"})
+
+    assert raw == llm.text
+    assert [p["index"] for p in pushed] == [0, 1, 2]
+    assert all(p["valid"] for p in pushed)
+    assert pushed[2]["block"]["blocks"][0]["type"] == "paragraph"
+
+
+def test_stream_llm_aborts_early_on_structural_failure(tmp_path):
+    text = '{"chapterId": "S1", "blocks": [' + "\n## 标题\n正文内容" * 400
+    llm = _FakeLLM(text)
+    node = _node(tmp_path, llm)
+    chapter_dir = tmp_path / "chapter"
+    chapter_dir.mkdir()
+
+    with pytest.raises(ChapterStreamAbortedError) as exc_info:
+        node._stream_llm("prompt", chapter_dir, abort_on_stream_error=True)
+    assert llm.closed
+    assert llm.consumed < len(text)
+    assert exc_info.value.raw_text and len(exc_info.value.raw_text) == llm.consumed
+
+    # 不允许提前中止时（最后一次尝试）照常读完，交给完整输出后的修复流程
+    llm = _FakeLLM(text)
+    assert _node(tmp_path, llm)._stream_llm("prompt", chapter_dir) == text
@@ -0,0 +1,195 @@
+"""
+提示词前缀缓存工具模块
+为 OpenAI 兼容接口（vLLM、DeepSeek、OpenAI 等）组织前缀稳定的消息，
+透传供应商的缓存提示，并从响应 usage 中统计命中缓存的 token 数
+"""
+
+import json
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from loguru import logger
+
+
+def stable_json(data: Any, indent: Optional[int] = 2) -> str:
+    """
+    以确定的方式序列化JSON：键排序、固定缩进与分隔符
+
+    同一份数据无论字典构造顺序如何，都得到逐字节相同的文本，保证能命中前缀缓存
+    """
+    separators = (",", ": ") if indent is not None else (",", ":")
+    return json.dumps(data, ensure_ascii=False, sort_keys=True, indent=indent, separators=separators, default=str)
+
+
+def order_payload(payload: Dict[str, Any], shared_keys: Iterable[str]) -> Dict[str, Any]:
+    """
+    重排payload：跨请求不变的键按 shared_keys 的顺序放在最前，其余键保持原顺序放在最后
+
+    共享部分的值先做一次规范化（键排序），序列化后的前缀在多次请求之间逐字节一致
+
+    Args:
+        payload: 原始payload
+        shared_keys: 运行级共享（每次请求都相同）的顶层键
+
+    Returns:
+        重排后的新字典
+    """
+    ordered: Dict[str, Any] = {}
+    for key in shared_keys:
+        if key in payload:
+            ordered[key] = json.loads(stable_json(payload[key], indent=None))
+    for key, value in payload.items():
+        if key not in ordered:
+            ordered[key] = value
+    return ordered
+
+
+def build_messages(system_prompt: str, user_prompt: str, suffix: Optional[str] = None) -> List[Dict[str, str]]:
+    """
+    构造前缀稳定的对话消息
+
+    系统提示词在前、用户内容其次，随时间变化的提示（如当前时间）追加在最末尾，
+    避免它出现在用户内容开头而使后续所有 token 都无法复用缓存
+
+    Args:
+        system_prompt: 系统提示词
+        user_prompt: 用户提示词（调用方应把共享上下文放在其开头）
+        suffix: 可变的尾部提示
+
+    Returns:
+        messages列表
+    """
+    if suffix:
+        user_prompt = f"{user_prompt}\n\n{suffix}" if user_prompt else suffix
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
+    ]
+
+
+def cache_hint_params(cache_key: Optional[str] = None, extra_body: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    生成透传给 chat.completions.create 的缓存提示参数
+
+    cache_key 以 prompt_cache_key 发送（OpenAI 用于把同前缀请求路由到同一缓存），
+    其他供应商私有的字段（如 vLLM 的 cache_salt）通过 extra_body 原样透传
+
+    Returns:
+        可直接展开到请求参数中的字典，没有任何提示时为空
+    """
+    body = dict(extra_body or {})
+    if cache_key:
+        body.setdefault("prompt_cache_key", cache_key)
+    return {"extra_body": body} if body else {}
+
+
+def cache_params_from_kwargs(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """从调用方的 kwargs 中取出缓存提示：cache_key -> prompt_cache_key，extra_body 原样传给兼容接口"""
+    return cache_hint_params(kwargs.get("cache_key"), kwargs.get("extra_body"))
+
+
+def time_note() -> str:
+    """当前时间提示；作为 build_messages 的 suffix 放在用户消息末尾，避免其逐分钟变化导致整段提示词无法命中前缀缓存"""
+    current_time = datetime.now().strftime("%Y年%m月%d日%H时%M分")
+    return f"今天的实际时间是{current_time}"
+
+
+def _read(obj: Any, key: str) -> Any:
+    if obj is None:
+        return None
+    if isinstance(obj, dict):
+        return obj.get(key)
+    return getattr(obj, key, None)
+
+
+def extract_cached_tokens(usage: Any) -> int:
+    """
+    从响应 usage 中读取命中缓存的 prompt token 数
+
+    兼容 OpenAI/vLLM 的 prompt_tokens_details.cached_tokens 与 DeepSeek 的 prompt_cache_hit_tokens
+    """
+    details = _read(usage, "prompt_tokens_details")
+    cached = _read(details, "cached_tokens")
+    if cached is None:
+        cached = _read(usage, "prompt_cache_hit_tokens")
+    try:
+        return int(cached or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+class PromptCacheStats:
+    """线程安全的 prompt token 与缓存命中统计"""
+
+    def __init__(self):
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        self.completion_tokens = 0
+        self._lock = threading.Lock()
+
+    def record(self, usage: Any) -> int:
+        """
+        记录一次响应的 usage
+
+        Returns:
+            本次命中缓存的 token 数
+        """
+        if usage is None:
+            return 0
+        cached = extract_cached_tokens(usage)
+        with self._lock:
+            self.requests += 1
+            self.prompt_tokens += int(_read(usage, "prompt_tokens") or 0)
+            self.completion_tokens += int(_read(usage, "completion_tokens") or 0)
+            self.cached_tokens += cached
+        return cached
+
+    def snapshot(self) -> Dict[str, Any]:
+        """返回累计统计，hit_rate 为缓存命中 token 占全部 prompt token 的比例"""
+        with self._lock:
+            hit_rate = self.cached_tokens / self.prompt_tokens if self.prompt_tokens else 0.0
+            return {
+                "requests": self.requests,
+                "prompt_tokens": self.prompt_tokens,
+                "cached_tokens": self.cached_tokens,
+                "completion_tokens": self.completion_tokens,
+                "cache_hit_rate": round(hit_rate, 4),
+            }
+
+
+def record_usage(stats: PromptCacheStats, usage: Any) -> int:
+    """
+    累计响应usage中的prompt token与命中缓存的token数并记录调试日志
+
+    Returns:
+        本次命中缓存的 token 数，usage 为空时为0
+    """
+    if usage is None:
+        return 0
+    cached = stats.record(usage)
+    logger.debug(f"LLM usage: prompt_tokens={_read(usage, 'prompt_tokens') or 0}, cached_tokens={cached}")
+    return cached
+
+
+def create_chat_stream(client: Any, model_name: str, messages: List[Dict[str, str]], timeout: Any,
+                       extra_params: Dict[str, Any]) -> Any:
+    """
+    发起流式 chat.completions 请求；接口不支持 stream_options 时去掉该参数后重试一次
+
+    重试时会从 extra_params 中移除 stream_options，调用方可据此关闭后续请求的usage统计
+
+    Returns:
+        流式响应迭代器
+    """
+    from openai import BadRequestError
+
+    try:
+        return client.chat.completions.create(model=model_name, messages=messages, timeout=timeout, **extra_params)
+    except BadRequestError as exc:
+        if "stream_options" not in extra_params or "stream_options" not in str(exc):
+            raise
+        logger.warning(f"{model_name} 不支持 stream_options，流式请求不再统计usage")
+        extra_params.pop("stream_options")
+        return client.chat.completions.create(model=model_name, messages=messages, timeout=timeout, **extra_params)
@@ -0,0 +1,81 @@
+"""
+LLM 请求限流工具模块
+为并行段落处理等多线程场景限制同一引擎对 LLM 接口的并发数与请求速率
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Tuple
+
+
+class RateLimiter:
+    """线程安全的限流器：并发上限 + 每分钟请求数（请求间最小间隔）"""
+
+    def __init__(self, max_concurrency: int = 0, requests_per_minute: int = 0):
+        """
+        初始化限流器
+
+        Args:
+            max_concurrency: 同时进行中的最大请求数，<=0 表示不限制
+            requests_per_minute: 每分钟最大请求数，<=0 表示不限制
+        """
+        self.max_concurrency = max_concurrency
+        self.requests_per_minute = requests_per_minute
+        self._semaphore = threading.BoundedSemaphore(max_concurrency) if max_concurrency > 0 else None
+        self._interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def _wait_for_slot(self):
+        """按请求间最小间隔预约下一个发送时间点并等待"""
+        if not self._interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self._interval
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    @contextmanager
+    def limit(self) -> Iterator[None]:
+        """
+        在限流约束下执行一次请求
+
+        用法:
+            with limiter.limit():
+                client.chat.completions.create(...)
+        """
+        if self._semaphore:
+            self._semaphore.acquire()
+        try:
+            self._wait_for_slot()
+            yield
+        finally:
+            if self._semaphore:
+                self._semaphore.release()
+
+
+_limiters: Dict[Tuple[str, int, int], RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(name: str, max_concurrency: int = 0, requests_per_minute: int = 0) -> RateLimiter:
+    """
+    获取按名称共享的限流器，同一引擎的多个客户端实例共用一份配额
+
+    Args:
+        name: 限流器名称（通常为引擎名 + 模型名）
+        max_concurrency: 最大并发请求数
+        requests_per_minute: 每分钟最大请求数
+
+    Returns:
+        RateLimiter实例
+    """
+    key = (name, max_concurrency, requests_per_minute)
+    with _limiters_lock:
+        if key not in _limiters:
+            _limiters[key] = RateLimiter(max_concurrency, requests_per_minute)
+        return _limiters[key]